@@ -0,0 +1,287 @@
+"""Short lived cache of the credentials resolved while authenticating requests.
+
+Without it, every bearer request validates the API key against the database and
+refreshes the offline token through Keycloak, and resolving provider tokens
+queries the database and Keycloak once per identity provider. Entries are kept
+in a local LRU and, when AUTH_CACHE_REDIS is set, encrypted in Redis so that all
+replicas share them. An entry never outlives the tokens it holds, and entries
+are dropped when an API key is deleted, provider tokens are stored or a user
+logs out. Another replica may keep using its local copy for up to
+AUTH_CACHE_LOCAL_TTL seconds after an invalidation.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import jwt
+import redis.asyncio as redis
+from server.logger import logger
+from storage.encrypt_utils import decrypt_value, encrypt_value
+from storage.redis import get_redis_authed_url
+
+# Seconds an entry is kept locally
+AUTH_CACHE_LOCAL_TTL = int(os.getenv('AUTH_CACHE_LOCAL_TTL', '60'))
+# Seconds an entry is kept in Redis
+AUTH_CACHE_REDIS_TTL = int(os.getenv('AUTH_CACHE_REDIS_TTL', '300'))
+# Maximum number of entries kept locally for each kind of credential
+AUTH_CACHE_MAX_SIZE = int(os.getenv('AUTH_CACHE_MAX_SIZE', '10000'))
+AUTH_CACHE_REDIS = os.getenv('AUTH_CACHE_REDIS', 'false').lower() in ('1', 'true')
+# Seconds before a token expires at which it is no longer served from the cache
+TOKEN_EXPIRY_MARGIN = 60
+
+_BEARER_PREFIX = 'ohauth_bearer:'
+_PROVIDER_TOKENS_PREFIX = 'ohauth_idp:'
+_USER_BEARER_KEYS_PREFIX = 'ohauth_user_bearer:'
+
+
+@dataclass
+class CachedBearerAuth:
+    """The result of authenticating an API key."""
+
+    user_id: str
+    access_token: str
+    refresh_token: str
+    email: str | None = None
+    email_verified: bool | None = None
+
+
+class _LocalCache:
+    """LRU whose entries each expire at their own time."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, expires_at: float):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: str):
+        self._entries.pop(key, None)
+
+    def pop_where(self, predicate):
+        for key in [k for k, (_, v) in self._entries.items() if predicate(v)]:
+            del self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
+
+
+def hash_api_key(api_key: str) -> str:
+    """API keys are only ever cached under their hash."""
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+def get_token_expiration(token: str) -> float | None:
+    # The signature isn't verified, the expiration only bounds the cache lifetime
+    # of a token which was just issued by Keycloak
+    try:
+        payload = jwt.decode(token, options={'verify_signature': False})
+    except jwt.PyJWTError:
+        return None
+    return payload.get('exp')
+
+
+class AuthCache:
+    def __init__(
+        self,
+        local_ttl: int = AUTH_CACHE_LOCAL_TTL,
+        redis_ttl: int = AUTH_CACHE_REDIS_TTL,
+        max_size: int = AUTH_CACHE_MAX_SIZE,
+        use_redis: bool = AUTH_CACHE_REDIS,
+    ):
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self.use_redis = use_redis
+        self._bearer = _LocalCache(max_size)
+        self._provider_tokens = _LocalCache(max_size)
+        self._redis: redis.Redis | None = None
+
+    async def get_bearer_auth(self, api_key: str) -> CachedBearerAuth | None:
+        key_hash = hash_api_key(api_key)
+        cached = self._bearer.get(key_hash)
+        if cached is not None:
+            return cached
+        payload = await self._redis_get(_BEARER_PREFIX + key_hash)
+        if payload is None:
+            return None
+        expires_at, data = payload
+        cached = CachedBearerAuth(**data)
+        self._bearer.set(key_hash, cached, min(expires_at, self._local_expiry()))
+        return cached
+
+    async def set_bearer_auth(
+        self,
+        api_key: str,
+        auth: CachedBearerAuth,
+        key_expires_at: float | None = None,
+    ):
+        """Cache the result of authenticating an API key until shortly before its
+        access token expires, and no later than the key itself expires."""
+        expires_at = get_token_expiration(auth.access_token)
+        if expires_at is None:
+            return
+        expires_at -= TOKEN_EXPIRY_MARGIN
+        if key_expires_at is not None:
+            expires_at = min(expires_at, key_expires_at)
+        if expires_at <= time.time():
+            return
+        key_hash = hash_api_key(api_key)
+        self._bearer.set(key_hash, auth, min(expires_at, self._local_expiry()))
+        redis_client = self._get_redis_client()
+        if redis_client is None:
+            return
+        try:
+            ttl = self._redis_ttl(expires_at)
+            user_key = _USER_BEARER_KEYS_PREFIX + auth.user_id
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.set(
+                    _BEARER_PREFIX + key_hash,
+                    self._encrypt(expires_at, asdict(auth)),
+                    ex=ttl,
+                )
+                pipe.sadd(user_key, key_hash)
+                pipe.expire(user_key, self.redis_ttl)
+                await pipe.execute()
+        except Exception:
+            logger.warning('auth_cache:redis_set_failed', exc_info=True)
+
+    async def get_provider_tokens(self, user_id: str) -> dict[str, str] | None:
+        """Get the cached provider tokens of a user, keyed by identity provider."""
+        cached = self._provider_tokens.get(user_id)
+        if cached is not None:
+            return cached
+        payload = await self._redis_get(_PROVIDER_TOKENS_PREFIX + user_id)
+        if payload is None:
+            return None
+        expires_at, cached = payload
+        self._provider_tokens.set(
+            user_id, cached, min(expires_at, self._local_expiry())
+        )
+        return cached
+
+    async def set_provider_tokens(
+        self, user_id: str, tokens: dict[str, str], expires_at: float | None
+    ):
+        """Cache the provider tokens of a user until expires_at, when the first of
+        them needs refreshing. None means that none of them expire."""
+        if expires_at is None:
+            expires_at = time.time() + self.redis_ttl
+        else:
+            expires_at -= TOKEN_EXPIRY_MARGIN
+        if expires_at <= time.time():
+            return
+        self._provider_tokens.set(
+            user_id, tokens, min(expires_at, self._local_expiry())
+        )
+        redis_client = self._get_redis_client()
+        if redis_client is None:
+            return
+        try:
+            await redis_client.set(
+                _PROVIDER_TOKENS_PREFIX + user_id,
+                self._encrypt(expires_at, tokens),
+                ex=self._redis_ttl(expires_at),
+            )
+        except Exception:
+            logger.warning('auth_cache:redis_set_failed', exc_info=True)
+
+    async def invalidate_api_key(self, api_key: str):
+        key_hash = hash_api_key(api_key)
+        self._bearer.pop(key_hash)
+        await self._redis_delete(_BEARER_PREFIX + key_hash)
+
+    async def invalidate_provider_tokens(self, user_id: str):
+        self._provider_tokens.pop(user_id)
+        await self._redis_delete(_PROVIDER_TOKENS_PREFIX + user_id)
+
+    async def invalidate_user(self, user_id: str):
+        """Drop everything cached for a user."""
+        self._bearer.pop_where(lambda auth: auth.user_id == user_id)
+        self._provider_tokens.pop(user_id)
+        redis_client = self._get_redis_client()
+        if redis_client is None:
+            return
+        try:
+            user_key = _USER_BEARER_KEYS_PREFIX + user_id
+            key_hashes = await redis_client.smembers(user_key)
+            keys = [_BEARER_PREFIX + _to_str(key_hash) for key_hash in key_hashes]
+            await redis_client.delete(
+                user_key, _PROVIDER_TOKENS_PREFIX + user_id, *keys
+            )
+        except Exception:
+            logger.warning('auth_cache:redis_delete_failed', exc_info=True)
+
+    def clear(self):
+        """Clear the local cache."""
+        self._bearer.clear()
+        self._provider_tokens.clear()
+
+    def _local_expiry(self) -> float:
+        return time.time() + self.local_ttl
+
+    def _redis_ttl(self, expires_at: float) -> int:
+        return max(1, min(self.redis_ttl, int(expires_at - time.time())))
+
+    def _get_redis_client(self) -> redis.Redis | None:
+        if not self.use_redis:
+            return None
+        if self._redis is None:
+            self._redis = redis.from_url(get_redis_authed_url())
+        return self._redis
+
+    @staticmethod
+    def _encrypt(expires_at: float, data: Any) -> str:
+        return encrypt_value(json.dumps({'expires_at': expires_at, 'data': data}))
+
+    async def _redis_get(self, key: str) -> tuple[float, Any] | None:
+        redis_client = self._get_redis_client()
+        if redis_client is None:
+            return None
+        try:
+            value = await redis_client.get(key)
+            if value is None:
+                return None
+            payload = json.loads(decrypt_value(_to_str(value)))
+        except Exception:
+            logger.warning('auth_cache:redis_get_failed', exc_info=True)
+            return None
+        if payload['expires_at'] <= time.time():
+            return None
+        return payload['expires_at'], payload['data']
+
+    async def _redis_delete(self, *keys: str):
+        redis_client = self._get_redis_client()
+        if redis_client is None:
+            return
+        try:
+            await redis_client.delete(*keys)
+        except Exception:
+            logger.warning('auth_cache:redis_delete_failed', exc_info=True)
+
+
+def _to_str(value: str | bytes) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+auth_cache = AuthCache()
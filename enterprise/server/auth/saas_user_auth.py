@@ -6,6 +6,7 @@ import jwt
 from fastapi import Request
 from keycloak.exceptions import KeycloakError
 from pydantic import SecretStr
+from server.auth.auth_cache import CachedBearerAuth, auth_cache
 from server.auth.auth_error import (
     AuthError,
     BearerTokenError,
@@ -20,6 +21,7 @@ from server.logger import logger
 from server.rate_limit import RateLimiter, create_redis_rate_limiter
 from sqlalchemy import delete, select
 from storage.api_key_store import ApiKeyStore
+from storage.auth_token_store import ACCESS_TOKEN_EXPIRY_BUFFER
 from storage.auth_tokens import AuthTokens
 from storage.database import a_session_maker
 from storage.saas_secrets_store import SaasSecretsStore
@@ -160,6 +162,25 @@ class SaasUserAuth(UserAuth):
 
         user_secrets = await self.get_secrets()
 
+        def get_host(idp_type: ProviderType) -> str | None:
+            if user_secrets and idp_type in user_secrets.provider_tokens:
+                return user_secrets.provider_tokens[idp_type].host
+            return None
+
+        cached_tokens = await auth_cache.get_provider_tokens(self.user_id)
+        if cached_tokens is not None:
+            self.provider_tokens = MappingProxyType(
+                {
+                    ProviderType(idp): ProviderToken(
+                        token=SecretStr(provider_token),
+                        user_id=None,
+                        host=get_host(ProviderType(idp)),
+                    )
+                    for idp, provider_token in cached_tokens.items()
+                }
+            )
+            return self.provider_tokens
+
         try:
             # TODO: I think we can do this in a single request if we refactor
             async with a_session_maker() as session:
@@ -170,21 +191,29 @@ class SaasUserAuth(UserAuth):
                 )
                 tokens = result.scalars().all()
 
+            tokens_to_cache = {}
+            # When the first of the tokens would be refreshed by get_idp_token
+            expires_at = None
             for token in tokens:
                 idp_type = ProviderType(token.identity_provider)
                 try:
-                    host = None
-                    if user_secrets and idp_type in user_secrets.provider_tokens:
-                        host = user_secrets.provider_tokens[idp_type].host
-
                     provider_token = await token_manager.get_idp_token(
                         access_token.get_secret_value(),
                         idp=idp_type,
                     )
                     # TODO: Currently we don't store the IDP user id in our refresh table. We should.
                     provider_tokens[idp_type] = ProviderToken(
-                        token=SecretStr(provider_token), user_id=None, host=host
+                        token=SecretStr(provider_token),
+                        user_id=None,
+                        host=get_host(idp_type),
                     )
+                    tokens_to_cache[idp_type.value] = provider_token
+                    if token.access_token_expires_at:
+                        refresh_at = (
+                            token.access_token_expires_at - ACCESS_TOKEN_EXPIRY_BUFFER
+                        )
+                        if expires_at is None or refresh_at < expires_at:
+                            expires_at = refresh_at
                 except Exception as e:
                     # If there was a problem with a refresh token we log and delete it
                     logger.error(
@@ -201,6 +230,9 @@ class SaasUserAuth(UserAuth):
                         await session.commit()
                     raise
 
+            await auth_cache.set_provider_tokens(
+                self.user_id, tokens_to_cache, expires_at
+            )
             self.provider_tokens = MappingProxyType(provider_tokens)
             return self.provider_tokens
         except Exception as e:
@@ -279,10 +311,22 @@ async def saas_user_auth_from_bearer(request: Request) -> SaasUserAuth | None:
         if not api_key:
             return None
 
+        cached = await auth_cache.get_bearer_auth(api_key)
+        if cached is not None:
+            return SaasUserAuth(
+                user_id=cached.user_id,
+                refresh_token=SecretStr(cached.refresh_token),
+                access_token=SecretStr(cached.access_token),
+                email=cached.email,
+                email_verified=cached.email_verified,
+                auth_type=AuthType.BEARER,
+            )
+
         api_key_store = ApiKeyStore.get_instance()
-        user_id = await api_key_store.validate_api_key(api_key)
-        if not user_id:
+        validated_api_key = await api_key_store.validate_api_key(api_key)
+        if not validated_api_key:
             return None
+        user_id = validated_api_key.user_id
         offline_token = await token_manager.load_offline_token(user_id)
         saas_user_auth = SaasUserAuth(
             user_id=user_id,
@@ -290,6 +334,22 @@ async def saas_user_auth_from_bearer(request: Request) -> SaasUserAuth | None:
             auth_type=AuthType.BEARER,
         )
         await saas_user_auth.refresh()
+        assert saas_user_auth.access_token is not None
+        await auth_cache.set_bearer_auth(
+            api_key,
+            CachedBearerAuth(
+                user_id=saas_user_auth.user_id,
+                access_token=saas_user_auth.access_token.get_secret_value(),
+                refresh_token=saas_user_auth.refresh_token.get_secret_value(),
+                email=saas_user_auth.email,
+                email_verified=saas_user_auth.email_verified,
+            ),
+            key_expires_at=(
+                validated_api_key.expires_at.timestamp()
+                if validated_api_key.expires_at
+                else None
+            ),
+        )
         return saas_user_auth
     except Exception as exc:
         raise BearerTokenError from exc
@@ -1,7 +1,9 @@
 import asyncio
 import json
+import os
 import time
 from dataclasses import dataclass, field
+from typing import Any
 from uuid import uuid4
 
 import socketio
@@ -49,6 +51,52 @@ _REDIS_UPDATE_INTERVAL_SECONDS = 5
 
 _REDIS_POLL_TIMEOUT = 0.15
 
+# Sorted sets indexing the conversation and connection keys, scored by the time the
+# entry expires. The global index has `{user_id}:{id}` members, and the per user
+# indexes, suffixed with `:{user_id}`, the `{id}` part alone
+_REDIS_CONVERSATION_INDEX_KEY = 'ohcnv_index'
+_REDIS_CONNECTION_INDEX_KEY = 'ohcnct_index'
+
+# Also scan for the keys missing from the indexes, as servers predating them don't
+# index their entries. This costs O(keyspace) per lookup again, so only enable it
+# while rolling out to a cluster which still runs such servers.
+_REDIS_INDEX_SCAN_FALLBACK = os.getenv(
+    'REDIS_INDEX_SCAN_FALLBACK', 'false'
+).lower() in ('1', 'true')
+
+# Marks a conversation as started if no server is running it, and indexes it
+# KEYS: conversation key, global index, user index
+# ARGV: entry timeout, expiry score, global member, user member
+_START_CONVERSATION_SCRIPT = """
+if redis.call('SET', KEYS[1], 1, 'NX', 'EX', ARGV[1]) then
+  redis.call('ZADD', KEYS[2], ARGV[2], ARGV[3])
+  redis.call('ZADD', KEYS[3], ARGV[2], ARGV[4])
+  return 1
+end
+return 0
+"""
+
+# Removes the expired members of global indexes, and of the user indexes of the
+# users they belong to
+# KEYS: global indexes
+# ARGV: current time, then the user index key prefix of each global index
+_SWEEP_INDEXES_SCRIPT = """
+local removed = 0
+for i, index in ipairs(KEYS) do
+  local expired = redis.call('ZRANGEBYSCORE', index, '-inf', ARGV[1])
+  local swept = {}
+  for _, member in ipairs(expired) do
+    local user_id = string.sub(member, 1, string.find(member, ':', 1, true) - 1)
+    if not swept[user_id] then
+      swept[user_id] = true
+      redis.call('ZREMRANGEBYSCORE', ARGV[i + 1] .. user_id, '-inf', ARGV[1])
+    end
+  end
+  removed = removed + redis.call('ZREMRANGEBYSCORE', index, '-inf', ARGV[1])
+end
+return removed
+"""
+
 
 @dataclass
 class _LLMResponseRequest:
@@ -74,14 +122,18 @@ class ClusteredConversationManager(StandaloneConversationManager):
     The Redis communication uses several key patterns:
     - ohcnv:{user_id}:{conversation_id} - Marks a conversation as active
     - ohcnct:{user_id}:{conversation_id}:{connection_id} - Tracks connections to conversations
+    - ohcnv_index[:{user_id}], ohcnct_index[:{user_id}] - Sorted sets of the above,
+      globally and per user, so they can be listed without scanning the keyspace
     """
 
     _redis_listen_task: asyncio.Task | None = field(default=None)
     _redis_update_task: asyncio.Task | None = field(default=None)
 
     _llm_responses: dict[str, _LLMResponseRequest] = field(default_factory=dict)
+    _redis_scripts: dict[str, Any] = field(default_factory=dict)
 
     def __post_init__(self):
+        super().__post_init__()
         # We increment the max_concurrent_conversations by 1 because this class
         # marks the conversation as started in Redis before checking the number
         # of running conversations. This prevents race conditions where multiple
@@ -222,6 +274,74 @@ class ClusteredConversationManager(StandaloneConversationManager):
     ):
         return f'ohcnct:{user_id}:{conversation_id}:{connection_id}'
 
+    def _get_redis_conversation_index_key(self, user_id: str | None) -> str:
+        return f'{_REDIS_CONVERSATION_INDEX_KEY}:{user_id}'
+
+    def _get_redis_connection_index_key(self, user_id: str | None) -> str:
+        return f'{_REDIS_CONNECTION_INDEX_KEY}:{user_id}'
+
+    def _get_redis_script(self, source: str):
+        """Get a script registered with Redis, so it is run by its SHA."""
+        script = self._redis_scripts.get(source)
+        if script is None:
+            script = self._get_redis_client().register_script(source)
+            self._redis_scripts[source] = script
+        return script
+
+    async def _get_index_members(self, index_key: str, key_prefix: str) -> list[str]:
+        """Get the members of an index which have not expired.
+
+        Members are the indexed keys without key_prefix. With the scan fallback
+        enabled, unindexed keys starting with key_prefix are included too.
+        """
+        redis = self._get_redis_client()
+        members = [
+            _to_str(member)
+            for member in await redis.zrangebyscore(index_key, time.time(), '+inf')
+        ]
+        if _REDIS_INDEX_SCAN_FALLBACK:
+            indexed = set(members)
+            async for key in redis.scan_iter(f'{key_prefix}*'):
+                member = _to_str(key)[len(key_prefix) :]
+                if member not in indexed:
+                    indexed.add(member)
+                    members.append(member)
+        return members
+
+    async def _get_conversation_index_members(
+        self, user_id: str | None = None
+    ) -> list[str]:
+        """Get the `{user_id}:{conversation_id}` members of the global conversation
+        index, or the `{conversation_id}` ones of the index of user_id."""
+        if user_id is None:
+            return await self._get_index_members(
+                _REDIS_CONVERSATION_INDEX_KEY, 'ohcnv:'
+            )
+        return await self._get_index_members(
+            self._get_redis_conversation_index_key(user_id),
+            self._get_redis_conversation_key(user_id, ''),
+        )
+
+    async def _get_connection_index_members(
+        self, user_id: str | None = None
+    ) -> list[str]:
+        """Get the `{user_id}:{conversation_id}:{connection_id}` members of the
+        global connection index, or the `{conversation_id}:{connection_id}` ones of
+        the index of user_id."""
+        if user_id is None:
+            return await self._get_index_members(_REDIS_CONNECTION_INDEX_KEY, 'ohcnct:')
+        return await self._get_index_members(
+            self._get_redis_connection_index_key(user_id), f'ohcnct:{user_id}:'
+        )
+
+    async def _get_remote_conversation_user_ids(self) -> dict[str, str]:
+        """Get a mapping of the running conversation ids to their user ids."""
+        result = {}
+        for member in await self._get_conversation_index_members():
+            user_id, conversation_id = member.split(':')
+            result[conversation_id] = user_id
+        return result
+
     async def _get_event_store(self, sid, user_id) -> EventStoreABC | None:
         session = self._local_agent_loops_by_sid.get(sid)
         if session:
@@ -271,16 +391,14 @@ class ClusteredConversationManager(StandaloneConversationManager):
         if filter_to_sids is not None and not filter_to_sids:
             return set()
         if user_id:
-            pattern = self._get_redis_conversation_key(user_id, '*')
+            conversation_ids = await self._get_conversation_index_members(user_id)
         else:
-            pattern = self._get_redis_conversation_key('*', '*')
-        redis = self._get_redis_client()
-        result = set()
-        async for key in redis.scan_iter(pattern):
-            conversation_id = key.decode().split(':')[2]
-            if filter_to_sids is None or conversation_id in filter_to_sids:
-                result.add(conversation_id)
-        return result
+            conversation_ids = list(await self._get_remote_conversation_user_ids())
+        return {
+            conversation_id
+            for conversation_id in conversation_ids
+            if filter_to_sids is None or conversation_id in filter_to_sids
+        }
 
     async def get_connections(
         self, user_id: str | None = None, filter_to_sids: set[str] | None = None
@@ -301,15 +419,15 @@ class ClusteredConversationManager(StandaloneConversationManager):
         if filter_to_sids is not None and not filter_to_sids:
             return {}
         if user_id:
-            pattern = self._get_redis_connection_key(user_id, '*', '*')
+            members = await self._get_connection_index_members(user_id)
         else:
-            pattern = self._get_redis_connection_key('*', '*', '*')
-        redis = self._get_redis_client()
+            members = [
+                member.split(':', 1)[1]
+                for member in await self._get_connection_index_members()
+            ]
         result = {}
-        async for key in redis.scan_iter(pattern):
-            parts = key.decode().split(':')
-            conversation_id = parts[2]
-            connection_id = parts[3]
+        for member in members:
+            conversation_id, connection_id = member.split(':')
             if filter_to_sids is None or conversation_id in filter_to_sids:
                 result[connection_id] = conversation_id
         return result
@@ -398,7 +516,20 @@ class ClusteredConversationManager(StandaloneConversationManager):
         # If we can set the key in redis then no other worker is running this conversation
         redis = self._get_redis_client()
         key = self._get_redis_conversation_key(user_id, sid)  # type: ignore
-        created = await redis.set(key, 1, nx=True, ex=_REDIS_ENTRY_TIMEOUT_SECONDS)
+        start_conversation = self._get_redis_script(_START_CONVERSATION_SCRIPT)
+        created = await start_conversation(
+            keys=[
+                key,
+                _REDIS_CONVERSATION_INDEX_KEY,
+                self._get_redis_conversation_index_key(user_id),
+            ],
+            args=[
+                _REDIS_ENTRY_TIMEOUT_SECONDS,
+                time.time() + _REDIS_ENTRY_TIMEOUT_SECONDS,
+                f'{user_id}:{sid}',
+                sid,
+            ],
+        )
         if created:
             await self._start_agent_loop(
                 sid, settings, user_id, initial_user_msg, replay_json
@@ -437,21 +568,19 @@ class ClusteredConversationManager(StandaloneConversationManager):
         """Refresh all entries in Redis to maintain conversation state across the cluster.
 
         This method:
-        1. Scans Redis for all conversation keys to build a mapping of conversation IDs to user IDs
+        1. Reads the conversation index to build a mapping of conversation IDs to user IDs
         2. Updates Redis entries for all local conversations to prevent them from expiring
         3. Updates Redis entries for all local connections to prevent them from expiring
+        4. Sweeps the expired entries from the indexes
 
         This is critical for maintaining the distributed state and allowing other servers
         to detect when a server has gone down unexpectedly.
         """
         redis = self._get_redis_client()
 
-        # Build a mapping of conversation_id -> user_id from existing Redis keys
-        pattern = self._get_redis_conversation_key('*', '*')
-        conversation_user_ids = {}
-        async for key in redis.scan_iter(pattern):
-            parts = key.decode().split(':')
-            conversation_user_ids[parts[2]] = parts[1]
+        # Build a mapping of conversation_id -> user_id from the conversation index
+        conversation_user_ids = await self._get_remote_conversation_user_ids()
+        expires_at = time.time() + _REDIS_ENTRY_TIMEOUT_SECONDS
 
         pipe = redis.pipeline()
 
@@ -464,6 +593,14 @@ class ClusteredConversationManager(StandaloneConversationManager):
                     1,
                     ex=_REDIS_ENTRY_TIMEOUT_SECONDS,
                 )
+                await pipe.zadd(
+                    _REDIS_CONVERSATION_INDEX_KEY,
+                    {f'{session.user_id}:{sid}': expires_at},
+                )
+                await pipe.zadd(
+                    self._get_redis_conversation_index_key(session.user_id),
+                    {sid: expires_at},
+                )
 
         # Then, update all local connections
         for (
@@ -479,10 +616,28 @@ class ClusteredConversationManager(StandaloneConversationManager):
                     1,
                     ex=_REDIS_ENTRY_TIMEOUT_SECONDS,
                 )
+                await pipe.zadd(
+                    _REDIS_CONNECTION_INDEX_KEY,
+                    {f'{user_id}:{conversation_id}:{connection_id}': expires_at},
+                )
+                await pipe.zadd(
+                    self._get_redis_connection_index_key(user_id),
+                    {f'{conversation_id}:{connection_id}': expires_at},
+                )
 
         # Execute all commands in the pipeline
         await pipe.execute()
 
+        sweep_indexes = self._get_redis_script(_SWEEP_INDEXES_SCRIPT)
+        await sweep_indexes(
+            keys=[_REDIS_CONVERSATION_INDEX_KEY, _REDIS_CONNECTION_INDEX_KEY],
+            args=[
+                time.time(),
+                f'{_REDIS_CONVERSATION_INDEX_KEY}:',
+                f'{_REDIS_CONNECTION_INDEX_KEY}:',
+            ],
+        )
+
     async def _disconnect_from_stopped(self):
         """
         Handle connections to conversations that have stopped unexpectedly.
@@ -504,12 +659,7 @@ class ClusteredConversationManager(StandaloneConversationManager):
             return
 
         # Get the list of sessions which are actually running
-        redis = self._get_redis_client()
-        pattern = self._get_redis_conversation_key('*', '*')
-        running_remote = set()
-        async for key in redis.scan_iter(pattern):
-            parts = key.decode().split(':')
-            running_remote.add(parts[2])
+        running_remote = await self._get_running_agent_loops_remotely()
 
         # Get the list of connections locally where the remote agentloop has died.
         stopped_conversation_ids = connected_to_remote_sids - running_remote
@@ -523,25 +673,27 @@ class ClusteredConversationManager(StandaloneConversationManager):
                 logger.warning(
                     f'local_connection_to_stopped_conversation:{connection_id}:{conversation_id}'
                 )
-                # Look up the user_id from the database
-                async with a_session_maker() as session:
-                    result = await session.execute(
-                        select(StoredConversationMetadataSaas).where(
-                            StoredConversationMetadataSaas.conversation_id
-                            == conversation_id
-                        )
-                    )
-                    conversation_metadata_saas = result.scalars().first()
-                    user_id = (
-                        str(conversation_metadata_saas.user_id)
-                        if conversation_metadata_saas
-                        else None
-                    )
+                user_id = await self._get_conversation_user_id(conversation_id)
                 # Handle the stopped conversation asynchronously
                 asyncio.create_task(
                     self._handle_remote_conversation_stopped(user_id, connection_id)  # type: ignore
                 )
 
+    async def _get_conversation_user_id(self, conversation_id: str) -> str | None:
+        """Look up the user_id of a conversation from the database."""
+        async with a_session_maker() as session:
+            result = await session.execute(
+                select(StoredConversationMetadataSaas).where(
+                    StoredConversationMetadataSaas.conversation_id == conversation_id
+                )
+            )
+            conversation_metadata_saas = result.scalars().first()
+            return (
+                str(conversation_metadata_saas.user_id)
+                if conversation_metadata_saas
+                else None
+            )
+
     async def _close_disconnected(self):
         async with self._conversations_lock:
             # Create a list of items to process to avoid modifying dict during iteration
@@ -614,10 +766,10 @@ class ClusteredConversationManager(StandaloneConversationManager):
 
     async def _close_session(self, sid: str):
         logger.info(f'_close_session:{sid}')
-        redis = self._get_redis_client()
 
-        # Keys to delete from redis
+        # Keys to delete from redis, and their members of the global and user indexes
         to_delete = []
+        to_unindex: list[tuple[str, str, str]] = []
 
         # Remove connections
         connection_ids_to_remove = list(
@@ -627,12 +779,25 @@ class ClusteredConversationManager(StandaloneConversationManager):
         )
 
         if connection_ids_to_remove:
-            pattern = self._get_redis_connection_key('*', sid, '*')
-            async for key in redis.scan_iter(pattern):
-                parts = key.decode().split(':')
-                connection_id = parts[3]
-                if connection_id in connection_ids_to_remove:
-                    to_delete.append(key)
+            # The connection entries are keyed by the user of the conversation
+            local_session = self._local_agent_loops_by_sid.get(sid)
+            user_id = (
+                str(local_session.user_id)
+                if local_session
+                else await self._get_conversation_user_id(sid)
+            )
+            if user_id:
+                for connection_id in connection_ids_to_remove:
+                    to_delete.append(
+                        self._get_redis_connection_key(user_id, sid, connection_id)
+                    )
+                    to_unindex.append(
+                        (
+                            _REDIS_CONNECTION_INDEX_KEY,
+                            self._get_redis_connection_index_key(user_id),
+                            f'{user_id}:{sid}:{connection_id}',
+                        )
+                    )
 
             logger.info(f'removing connections: {connection_ids_to_remove}')
             for connection_id in connection_ids_to_remove:
@@ -644,11 +809,18 @@ class ClusteredConversationManager(StandaloneConversationManager):
         if not session:
             logger.info(f'no_session_to_close:{sid}')
             if to_delete:
-                redis.delete(*to_delete)
+                await self._delete_indexed_keys(to_delete, to_unindex)
             return
 
         to_delete.append(self._get_redis_conversation_key(session.user_id, sid))
-        await redis.delete(*to_delete)
+        to_unindex.append(
+            (
+                _REDIS_CONVERSATION_INDEX_KEY,
+                self._get_redis_conversation_index_key(session.user_id),
+                f'{session.user_id}:{sid}',
+            )
+        )
+        await self._delete_indexed_keys(to_delete, to_unindex)
         try:
             redis_client = self._get_redis_client()
             if redis_client:
@@ -668,19 +840,35 @@ class ClusteredConversationManager(StandaloneConversationManager):
             )
 
         await session.close()
+        await self._metadata_writer.flush(sid)
         logger.info(f'closed_session:{session.sid}')
 
+    async def _delete_indexed_keys(
+        self, keys: list[str], members: list[tuple[str, str, str]]
+    ) -> None:
+        """Delete keys along with their (global index, user index, member) entries."""
+        redis = self._get_redis_client()
+        pipe = redis.pipeline()
+        await pipe.delete(*keys)
+        for global_index_key, user_index_key, member in members:
+            await pipe.zrem(global_index_key, member)
+            await pipe.zrem(user_index_key, member.split(':', 1)[1])
+        await pipe.execute()
+
     async def get_agent_loop_info(self, user_id=None, filter_to_sids=None):
         # conversation_ids = await self.get_running_agent_loops(user_id=user_id, filter_to_sids=filter_to_sids)
-        redis = self._get_redis_client()
         results = []
         if user_id:
-            pattern = self._get_redis_conversation_key(user_id, '*')
+            conversation_user_ids = {
+                conversation_id: str(user_id)
+                for conversation_id in await self._get_conversation_index_members(
+                    user_id
+                )
+            }
         else:
-            pattern = self._get_redis_conversation_key('*', '*')
+            conversation_user_ids = await self._get_remote_conversation_user_ids()
 
-        async for key in redis.scan_iter(pattern):
-            uid, conversation_id = key.decode().split(':')[1:]
+        for conversation_id, uid in conversation_user_ids.items():
             if filter_to_sids is None or conversation_id in filter_to_sids:
                 results.append(
                     AgentLoopInfo(
@@ -803,3 +991,7 @@ class ClusteredConversationManager(StandaloneConversationManager):
 
     def get_local_session(self, sid: str) -> Session:
         return self._local_agent_loops_by_sid[sid]
+
+
+def _to_str(value: str | bytes) -> str:
+    return value.decode() if isinstance(value, bytes) else value
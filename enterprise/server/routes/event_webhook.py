@@ -15,6 +15,8 @@ from fastapi import (
 from pydantic import BaseModel
 from server.logger import logger
 from server.utils.conversation_callback_utils import (
+    delete_agent_state,
+    is_agent_state_path,
     process_event,
     update_agent_state,
     update_conversation_metadata,
@@ -60,7 +62,15 @@ async def _process_batch_operations_background(
 
     for batch_op in batch_ops:
         try:
-            if batch_op.method != BatchMethod.POST:
+            # Updates to certain paths in the nested runtime are ignored
+            if batch_op.path in {'settings.json', 'secrets.json'}:
+                continue
+
+            conversation_id, subpath = _parse_conversation_id_and_subpath(batch_op.path)
+
+            # Deletes are only mirrored for the agent state, whose journal
+            # removes deltas once a snapshot replaces them
+            if batch_op.method != BatchMethod.POST and not is_agent_state_path(subpath):
                 # Log unhandled methods for future implementation
                 logger.info(
                     'invalid_operation_in_batch_webhook',
@@ -71,12 +81,6 @@ async def _process_batch_operations_background(
                 )
                 continue
 
-            # Updates to certain paths in the nested runtime are ignored
-            if batch_op.path in {'settings.json', 'secrets.json'}:
-                continue
-
-            conversation_id, subpath = _parse_conversation_id_and_subpath(batch_op.path)
-
             # If the conversation id changes, then we must recheck the session_api_key
             if conversation_id != prev_conversation_id:
                 user_id = _get_user_id(conversation_id)
@@ -103,8 +107,13 @@ async def _process_batch_operations_background(
                 )
                 continue
 
-            if subpath == 'agent_state.pkl':
-                update_agent_state(user_id, conversation_id, batch_op.get_content())
+            if is_agent_state_path(subpath):
+                if batch_op.method == BatchMethod.DELETE:
+                    delete_agent_state(user_id, conversation_id, subpath)
+                else:
+                    update_agent_state(
+                        user_id, conversation_id, batch_op.get_content(), subpath
+                    )
                 continue
 
             if subpath == 'conversation_stats.pkl':
@@ -186,9 +195,9 @@ async def on_write(
     if session_api_key != x_session_api_key:
         return Response(status_code=status.HTTP_403_FORBIDDEN)
 
-    if subpath == 'agent_state.pkl':
+    if is_agent_state_path(subpath):
         content = await request.body()
-        update_agent_state(user_id, conversation_id, content)
+        update_agent_state(user_id, conversation_id, content, subpath)
         return Response(status_code=status.HTTP_200_OK)
 
     try:
@@ -220,6 +229,19 @@ async def on_write(
 
 @event_webhook_router.delete('/{path:path}')
 async def on_delete(path: str, x_session_api_key: Annotated[str | None, Header()]):
+    """Handle deleting agent state files, ignoring deletes of other paths"""
+    if not path.startswith('sessions/'):
+        return Response(status_code=status.HTTP_200_OK)
+    conversation_id, subpath = _parse_conversation_id_and_subpath(path)
+    if not is_agent_state_path(subpath):
+        return Response(status_code=status.HTTP_200_OK)
+
+    user_id = _get_user_id(conversation_id)
+    session_api_key = await _get_session_api_key(user_id, conversation_id)
+    if session_api_key != x_session_api_key:
+        return Response(status_code=status.HTTP_403_FORBIDDEN)
+
+    delete_agent_state(user_id, conversation_id, subpath)
     return Response(status_code=status.HTTP_200_OK)
 
 
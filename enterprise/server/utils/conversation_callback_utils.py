@@ -23,7 +23,6 @@ from openhands.server.services.conversation_stats import ConversationStats
 from openhands.storage import get_file_store
 from openhands.storage.files import FileStore
 from openhands.storage.locations import (
-    get_conversation_agent_state_filename,
     get_conversation_dir,
 )
 from openhands.utils.async_utils import call_sync_from_async
@@ -261,7 +260,16 @@ def update_active_working_seconds(
         )
 
 
-def update_agent_state(user_id: str, conversation_id: str, content: bytes):
+def is_agent_state_path(subpath: str) -> bool:
+    """Whether the subpath is the pickled agent state or a file of its journal."""
+    return subpath == 'agent_state.pkl' or (
+        subpath.startswith('agent_state/') and subpath != 'agent_state/'
+    )
+
+
+def update_agent_state(
+    user_id: str, conversation_id: str, content: bytes, subpath: str = 'agent_state.pkl'
+):
     """
     Update agent state file for a conversation.
 
@@ -269,19 +277,42 @@ def update_agent_state(user_id: str, conversation_id: str, content: bytes):
         user_id: The user ID associated with the conversation
         conversation_id: The conversation ID
         content: The agent state content as bytes
+        subpath: The agent state subpath, either the pickled state or a journal file
     """
     logger.debug(
         'update_agent_state',
         extra={
             'user_id': user_id,
             'conversation_id': conversation_id,
+            'subpath': subpath,
             'content_size': len(content),
         },
     )
-    write_path = get_conversation_agent_state_filename(conversation_id, user_id)
+    write_path = get_conversation_dir(conversation_id, user_id) + subpath
     file_store.write(write_path, content)
 
 
+def delete_agent_state(user_id: str, conversation_id: str, subpath: str):
+    """
+    Delete an agent state file for a conversation, such as a journal delta
+    replaced by a snapshot or the pickled state replaced by the journal.
+
+    Args:
+        user_id: The user ID associated with the conversation
+        conversation_id: The conversation ID
+        subpath: The agent state subpath
+    """
+    logger.debug(
+        'delete_agent_state',
+        extra={
+            'user_id': user_id,
+            'conversation_id': conversation_id,
+            'subpath': subpath,
+        },
+    )
+    file_store.delete(get_conversation_dir(conversation_id, user_id) + subpath)
+
+
 def update_conversation_stats(user_id: str, conversation_id: str, content: bytes):
     existing_convo_stats = ConversationStats(
         file_store=file_store, conversation_id=conversation_id, user_id=user_id
@@ -5,6 +5,7 @@ import string
 from dataclasses import dataclass
 from datetime import UTC, datetime
 
+from server.auth.auth_cache import auth_cache
 from sqlalchemy import select, update
 from storage.api_key import ApiKey
 from storage.database import a_session_maker
@@ -13,6 +14,13 @@ from storage.user_store import UserStore
 from openhands.core.logger import openhands_logger as logger
 
 
+@dataclass
+class ValidatedApiKey:
+    user_id: str
+    # Timezone aware, None if the key never expires
+    expires_at: datetime | None
+
+
 @dataclass
 class ApiKeyStore:
     API_KEY_PREFIX = 'sk-oh-'
@@ -55,8 +63,9 @@ class ApiKeyStore:
 
         return api_key
 
-    async def validate_api_key(self, api_key: str) -> str | None:
-        """Validate an API key and return the associated user_id if valid."""
+    async def validate_api_key(self, api_key: str) -> ValidatedApiKey | None:
+        """Validate an API key and return the associated user_id and the key's
+        expiration if valid."""
         now = datetime.now(UTC)
 
         async with a_session_maker() as session:
@@ -67,6 +76,7 @@ class ApiKeyStore:
                 return None
 
             # Check if the key has expired
+            expires_at = None
             if key_record.expires_at:
                 # Handle timezone-naive datetime from database by assuming it's UTC
                 expires_at = key_record.expires_at
@@ -85,7 +95,7 @@ class ApiKeyStore:
             )
             await session.commit()
 
-            return key_record.user_id
+            return ValidatedApiKey(user_id=key_record.user_id, expires_at=expires_at)
 
     async def delete_api_key(self, api_key: str) -> bool:
         """Delete an API key by the key value."""
@@ -98,6 +108,7 @@ class ApiKeyStore:
 
             await session.delete(key_record)
             await session.commit()
+            await auth_cache.invalidate_api_key(key_record.key)
 
             return True
 
@@ -112,6 +123,7 @@ class ApiKeyStore:
 
             await session.delete(key_record)
             await session.commit()
+            await auth_cache.invalidate_api_key(key_record.key)
 
             return True
 
@@ -172,6 +184,7 @@ class ApiKeyStore:
 
             await session.delete(key_record)
             await session.commit()
+            await auth_cache.invalidate_api_key(key_record.key)
 
             return True
 
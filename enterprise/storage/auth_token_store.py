@@ -4,6 +4,7 @@ import time
 from dataclasses import dataclass
 from typing import Awaitable, Callable, Dict
 
+from server.auth.auth_cache import auth_cache
 from server.auth.auth_error import TokenRefreshError
 from sqlalchemy import select, text, update
 from sqlalchemy.exc import OperationalError
@@ -98,6 +99,7 @@ class AuthTokenStore:
                     session.add(token_record)
 
             await session.commit()  # Commit after transaction block
+        await auth_cache.invalidate_provider_tokens(self.keycloak_user_id)
 
     async def load_tokens(
         self,
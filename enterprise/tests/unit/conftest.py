@@ -3,6 +3,7 @@ from datetime import datetime
 from uuid import UUID
 
 import pytest
+from server.auth.auth_cache import auth_cache
 from server.auth.token_manager import KeycloakUserInfo
 from server.constants import ORG_SETTINGS_VERSION
 from server.verified_models.verified_model_service import (
@@ -37,6 +38,14 @@ from storage.stripe_customer import StripeCustomer
 from storage.user import User
 
 
+@pytest.fixture(autouse=True)
+def clear_auth_cache():
+    """Credentials cached by one test must not authenticate requests in another."""
+    auth_cache.clear()
+    yield
+    auth_cache.clear()
+
+
 @pytest.fixture
 def create_keycloak_user_info():
     """Fixture that returns a factory function to create KeycloakUserInfo models.
@@ -24,6 +24,12 @@ from server.utils.conversation_callback_utils import (
 from storage.stored_conversation_metadata import StoredConversationMetadata
 
 from openhands.events.observation.agent import AgentStateChangedObservation
+from openhands.storage.memory import InMemoryFileStore
+
+AGENT_STATE_DIR = (
+    'users/5594c7b6-f959-4b81-92e9-b09c206f5081/conversations/'
+    'mock-conversation-id/agent_state/'
+)
 
 
 class TestParseConversationIdAndSubpath:
@@ -344,6 +350,40 @@ class TestOnDelete:
         result = await on_delete('any/path', 'any-api-key')
         assert result.status_code == status.HTTP_200_OK
 
+    @pytest.mark.asyncio
+    async def test_on_delete_agent_state_file(
+        self, session_maker_with_minimal_fixtures
+    ):
+        """Test that deleting a journal delta deletes the stored copy."""
+        file_store = InMemoryFileStore()
+        file_store.write(AGENT_STATE_DIR + 'snapshot.json', '{}')
+        file_store.write(AGENT_STATE_DIR + 'delta-00000001.json', '{}')
+
+        with patch(
+            'server.routes.event_webhook.session_maker',
+            session_maker_with_minimal_fixtures,
+        ), patch(
+            'server.routes.event_webhook._get_session_api_key'
+        ) as mock_get_api_key, patch(
+            'server.utils.conversation_callback_utils.file_store', file_store
+        ):
+            mock_get_api_key.return_value = 'correct-api-key'
+
+            result = await on_delete(
+                'sessions/mock-conversation-id/agent_state/delta-00000001.json',
+                'wrong-api-key',
+            )
+            assert result.status_code == status.HTTP_403_FORBIDDEN
+
+            result = await on_delete(
+                'sessions/mock-conversation-id/agent_state/delta-00000001.json',
+                'correct-api-key',
+            )
+            assert result.status_code == status.HTTP_200_OK
+            assert file_store.list(AGENT_STATE_DIR) == [
+                AGENT_STATE_DIR + 'snapshot.json'
+            ]
+
 
 class TestOnWrite:
     """Test the on_write endpoint."""
@@ -412,6 +452,35 @@ class TestOnWrite:
             assert result.status_code == status.HTTP_200_OK
             mock_file_store.write.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_on_write_agent_state_file(
+        self, mock_request, session_maker_with_minimal_fixtures
+    ):
+        """Test that files of the agent state journal are stored."""
+        mock_request.body = AsyncMock(return_value=b'{"version": 1}')
+        file_store = InMemoryFileStore()
+
+        with patch(
+            'server.routes.event_webhook.session_maker',
+            session_maker_with_minimal_fixtures,
+        ), patch(
+            'server.routes.event_webhook._get_session_api_key'
+        ) as mock_get_api_key, patch(
+            'server.utils.conversation_callback_utils.file_store', file_store
+        ):
+            mock_get_api_key.return_value = 'correct-api-key'
+
+            result = await on_write(
+                'sessions/mock-conversation-id/agent_state/snapshot.json',
+                mock_request,
+                'correct-api-key',
+            )
+
+            assert result.status_code == status.HTTP_200_OK
+            assert file_store.read(AGENT_STATE_DIR + 'snapshot.json') == (
+                '{"version": 1}'
+            )
+
     @pytest.mark.asyncio
     async def test_on_write_invalid_api_key(
         self, mock_request, session_maker_with_minimal_fixtures
@@ -645,6 +714,56 @@ class TestProcessBatchOperationsBackground:
             # Verify file_store.write was called
             mock_file_store.write.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_process_batch_operations_agent_state_journal(
+        self, session_maker_with_minimal_fixtures
+    ):
+        """Test that journal writes are stored and replaced deltas deleted."""
+        file_store = InMemoryFileStore()
+        file_store.write(AGENT_STATE_DIR + 'delta-00000001.json', '{"seq": 1}')
+        file_store.write(AGENT_STATE_DIR + 'delta-00000002.json', '{"seq": 2}')
+        batch_ops = [
+            BatchOperation(
+                method=BatchMethod.POST,
+                path='sessions/mock-conversation-id/agent_state/snapshot.json',
+                content='{"seq": 3}',
+            ),
+            BatchOperation(
+                method=BatchMethod.POST,
+                path='sessions/mock-conversation-id/agent_state/metrics.json',
+                content='{"accumulated_cost": 1.0}',
+            ),
+            BatchOperation(
+                method=BatchMethod.DELETE,
+                path='sessions/mock-conversation-id/agent_state/delta-00000001.json',
+            ),
+            BatchOperation(
+                method=BatchMethod.DELETE,
+                path='sessions/mock-conversation-id/agent_state/delta-00000002.json',
+            ),
+        ]
+
+        with patch(
+            'server.routes.event_webhook.session_maker',
+            session_maker_with_minimal_fixtures,
+        ), patch(
+            'server.routes.event_webhook._get_session_api_key'
+        ) as mock_get_api_key, patch(
+            'server.utils.conversation_callback_utils.file_store', file_store
+        ), patch('server.routes.event_webhook.logger') as mock_logger:
+            mock_get_api_key.return_value = 'correct-api-key'
+
+            await _process_batch_operations_background(batch_ops, 'correct-api-key')
+
+            assert sorted(file_store.list(AGENT_STATE_DIR)) == [
+                AGENT_STATE_DIR + 'metrics.json',
+                AGENT_STATE_DIR + 'snapshot.json',
+            ]
+            assert file_store.read(AGENT_STATE_DIR + 'snapshot.json') == '{"seq": 3}'
+            mock_logger.info.assert_not_called()
+            mock_logger.warning.assert_not_called()
+            mock_logger.error.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_process_batch_operations_auth_failure_continues(
         self, session_maker_with_minimal_fixtures
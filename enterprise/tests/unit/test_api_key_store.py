@@ -110,7 +110,8 @@ async def test_validate_api_key_valid(api_key_store, async_session_maker):
         result = await api_key_store.validate_api_key(api_key_value)
 
     # Verify
-    assert result == user_id
+    assert result.user_id == user_id
+    assert result.expires_at is None
 
 
 @pytest.mark.asyncio
@@ -197,7 +198,9 @@ async def test_validate_api_key_valid_timezone_naive(
         result = await api_key_store.validate_api_key(api_key_value)
 
     # Verify
-    assert result == user_id
+    assert result.user_id == user_id
+    assert result.expires_at.tzinfo is not None
+    assert result.expires_at > datetime.now(UTC)
 
 
 @pytest.mark.asyncio
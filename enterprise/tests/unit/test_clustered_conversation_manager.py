@@ -1,6 +1,7 @@
 import asyncio
 import contextlib
 import json
+from fnmatch import fnmatch
 import time
 from dataclasses import dataclass
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -27,20 +28,21 @@ class GetMessageMock:
         return {'data': json.dumps(self.message)}
 
 
-class AsyncIteratorMock:
-    def __init__(self, items):
-        self.items = items
-
-    def __aiter__(self):
-        return self
-
-    async def __anext__(self):
-        if not self.items:
-            raise StopAsyncIteration
-        return self.items.pop(0)
+def get_index_members(keys: list[str]) -> dict[str, list[bytes]]:
+    """Build the Redis index sorted sets which would reference the given keys."""
+    indexes: dict[str, list[bytes]] = {}
+    for key in keys:
+        prefix, user_id, member = key.split(':', 2)
+        indexes.setdefault(f'{prefix}_index', []).append(
+            f'{user_id}:{member}'.encode()
+        )
+        indexes.setdefault(f'{prefix}_index:{user_id}', []).append(member.encode())
+    return indexes
 
 
-def get_mock_sio(get_message: GetMessageMock | None = None, scan_keys=None):
+def get_mock_sio(
+    get_message: GetMessageMock | None = None, redis_keys=None, unindexed_keys=None
+):
     sio = MagicMock()
     sio.enter_room = AsyncMock()
     sio.disconnect = AsyncMock()  # Add mock for disconnect method
@@ -51,23 +53,44 @@ def get_mock_sio(get_message: GetMessageMock | None = None, scan_keys=None):
     redis_mock.get = AsyncMock(return_value=None)
     redis_mock.set = AsyncMock()
     redis_mock.delete = AsyncMock()
+    # Scripts return 1, so conversations are started locally by default
+    redis_mock.script = AsyncMock(return_value=1)
+    redis_mock.register_script = MagicMock(return_value=redis_mock.script)
 
     # Create a pipeline mock
     pipeline_mock = MagicMock()
     pipeline_mock.set = AsyncMock()
+    pipeline_mock.zadd = AsyncMock()
+    pipeline_mock.zrem = AsyncMock()
+    pipeline_mock.delete = AsyncMock()
     pipeline_mock.execute = AsyncMock()
     redis_mock.pipeline = MagicMock(return_value=pipeline_mock)
 
-    # Mock scan_iter to return the specified keys
-    if scan_keys is not None:
-        # Convert keys to bytes as Redis returns bytes
-        encoded_keys = [
-            key.encode() if isinstance(key, str) else key for key in scan_keys
-        ]
-        # Create a proper async iterator mock
-        async_iter = AsyncIteratorMock(encoded_keys)
-        # Use the async iterator directly as the scan_iter method
-        redis_mock.scan_iter = MagicMock(return_value=async_iter)
+    # Mock the index sorted sets to reference the specified keys
+    indexes = get_index_members(
+        [key.decode() if isinstance(key, bytes) else key for key in redis_keys or []]
+    )
+
+    async def zrangebyscore(key, min, max):
+        return indexes.get(key, [])
+
+    redis_mock.zrangebyscore = AsyncMock(side_effect=zrangebyscore)
+
+    # Keys written by servers which don't index them are only found by scanning
+    scanned_keys = [
+        key.encode() if isinstance(key, str) else key
+        for key in (redis_keys or []) + (unindexed_keys or [])
+    ]
+
+    def scan_iter(match=None, **kwargs):
+        async def keys():
+            for key in scanned_keys:
+                if match is None or fnmatch(key.decode(), match):
+                    yield key
+
+        return keys()
+
+    redis_mock.scan_iter = MagicMock(side_effect=scan_iter)
 
     # Create a pubsub mock
     pubsub = AsyncMock()
@@ -82,8 +105,8 @@ def get_mock_sio(get_message: GetMessageMock | None = None, scan_keys=None):
 
 @pytest.mark.asyncio
 async def test_session_not_running_in_cluster():
-    # Create a mock SIO with empty scan results (no running sessions)
-    sio = get_mock_sio(scan_keys=[])
+    # Create a mock SIO with no Redis keys (no running sessions)
+    sio = get_mock_sio(redis_keys=[])
 
     async with ClusteredConversationManager(
         sio, OpenHandsConfig(), InMemoryFileStore(), MonitoringListener()
@@ -92,15 +115,16 @@ async def test_session_not_running_in_cluster():
             filter_to_sids={'non-existant-session'}
         )
         assert result == set()
-        # Verify scan_iter was called with the correct pattern
-        sio.manager.redis.scan_iter.assert_called_once()
+        # Verify the global conversation index was read
+        sio.manager.redis.zrangebyscore.assert_called_once()
+        assert sio.manager.redis.zrangebyscore.call_args[0][0] == 'ohcnv_index'
 
 
 @pytest.mark.asyncio
 async def test_get_running_agent_loops_remotely():
-    # Create a mock SIO with scan results for 'existing-session'
+    # Create a mock SIO with Redis keys for 'existing-session'
     # The key format is 'ohcnv:{user_id}:{conversation_id}'
-    sio = get_mock_sio(scan_keys=[b'ohcnv:1:existing-session'])
+    sio = get_mock_sio(redis_keys=[b'ohcnv:1:existing-session'])
 
     async with ClusteredConversationManager(
         sio, OpenHandsConfig(), InMemoryFileStore(), MonitoringListener()
@@ -109,8 +133,35 @@ async def test_get_running_agent_loops_remotely():
             1, {'existing-session'}
         )
         assert result == {'existing-session'}
-        # Verify scan_iter was called with the correct pattern
-        sio.manager.redis.scan_iter.assert_called_once()
+        # Verify the conversation index of the user was read
+        sio.manager.redis.zrangebyscore.assert_called_once()
+        assert sio.manager.redis.zrangebyscore.call_args[0][0] == 'ohcnv_index:1'
+
+
+@pytest.mark.asyncio
+async def test_get_running_agent_loops_remotely_scan_fallback():
+    """Test that conversations of servers which don't index them are found."""
+    sio = get_mock_sio(
+        redis_keys=[b'ohcnv:1:indexed-session'],
+        unindexed_keys=[b'ohcnv:1:legacy-session', b'ohcnv:2:other-session'],
+    )
+
+    async with ClusteredConversationManager(
+        sio, OpenHandsConfig(), InMemoryFileStore(), MonitoringListener()
+    ) as conversation_manager:
+        # Only the index is read by default
+        result = await conversation_manager._get_running_agent_loops_remotely()
+        assert result == {'indexed-session'}
+        sio.manager.redis.scan_iter.assert_not_called()
+
+        with patch(
+            'server.clustered_conversation_manager._REDIS_INDEX_SCAN_FALLBACK', True
+        ):
+            result = await conversation_manager._get_running_agent_loops_remotely()
+            assert result == {'indexed-session', 'legacy-session', 'other-session'}
+
+            result = await conversation_manager._get_running_agent_loops_remotely(1)
+            assert result == {'indexed-session', 'legacy-session'}
 
 
 @pytest.mark.asyncio
@@ -121,7 +172,7 @@ async def test_init_new_local_session():
     session_instance.user_id = '1'  # Add user_id for Redis key creation
     mock_session = MagicMock()
     mock_session.return_value = session_instance
-    sio = get_mock_sio(scan_keys=[])
+    sio = get_mock_sio(redis_keys=[])
     get_running_agent_loops_mock = AsyncMock()
     get_running_agent_loops_mock.return_value = set()
     with (
@@ -159,7 +210,7 @@ async def test_join_local_session():
     session_instance.user_id = None  # Add user_id for Redis key creation
     mock_session = MagicMock()
     mock_session.return_value = session_instance
-    sio = get_mock_sio(scan_keys=[])
+    sio = get_mock_sio(redis_keys=[])
     get_running_agent_loops_mock = AsyncMock()
     get_running_agent_loops_mock.return_value = set()
     with (
@@ -200,12 +251,12 @@ async def test_join_cluster_session():
     mock_session = MagicMock()
     mock_session.return_value = session_instance
 
-    # Create a mock SIO with scan results for 'new-session-id'
-    sio = get_mock_sio(scan_keys=[b'ohcnv:1:new-session-id'])
+    # Create a mock SIO with Redis keys for 'new-session-id'
+    sio = get_mock_sio(redis_keys=[b'ohcnv:1:new-session-id'])
 
-    # Mock the Redis set method to return False (key already exists)
+    # Mock the start script to return 0 (key already exists)
     # This simulates that the conversation is already running on another server
-    sio.manager.redis.set.return_value = False
+    sio.manager.redis.script.return_value = 0
 
     # Mock the _get_event_store method to return a mock event store
     mock_event_store = MagicMock()
@@ -249,7 +300,7 @@ async def test_add_to_local_event_stream():
     session_instance.user_id = '1'  # Add user_id for Redis key creation
     mock_session = MagicMock()
     mock_session.return_value = session_instance
-    sio = get_mock_sio(scan_keys=[])
+    sio = get_mock_sio(redis_keys=[])
     get_running_agent_loops_mock = AsyncMock()
     get_running_agent_loops_mock.return_value = set()
     with (
@@ -289,12 +340,12 @@ async def test_add_to_cluster_event_stream():
     mock_session = MagicMock()
     mock_session.return_value = session_instance
 
-    # Create a mock SIO with scan results for 'new-session-id'
-    sio = get_mock_sio(scan_keys=[b'ohcnv:1:new-session-id'])
+    # Create a mock SIO with Redis keys for 'new-session-id'
+    sio = get_mock_sio(redis_keys=[b'ohcnv:1:new-session-id'])
 
-    # Mock the Redis set method to return False (key already exists)
+    # Mock the start script to return 0 (key already exists)
     # This simulates that the conversation is already running on another server
-    sio.manager.redis.set.return_value = False
+    sio.manager.redis.script.return_value = 0
 
     with (
         patch(
@@ -325,7 +376,7 @@ async def test_add_to_cluster_event_stream():
 
 @pytest.mark.asyncio
 async def test_cleanup_session_connections():
-    sio = get_mock_sio(scan_keys=[])
+    sio = get_mock_sio(redis_keys=[])
     with (
         patch(
             'server.clustered_conversation_manager.ClusteredConversationManager._redis_subscribe',
@@ -344,8 +395,28 @@ async def test_cleanup_session_connections():
                 }
             )
 
+            conversation_manager._get_conversation_user_id = AsyncMock(
+                return_value='user1'
+            )
+
             await conversation_manager._close_session('session1')
 
+            # Verify the entries of the connections to session1 were removed
+            conversation_manager._get_conversation_user_id.assert_awaited_once_with(
+                'session1'
+            )
+            pipe = sio.manager.redis.pipeline.return_value
+            assert set(pipe.delete.call_args.args) == {
+                'ohcnct:user1:session1:conn1',
+                'ohcnct:user1:session1:conn2',
+            }
+            pipe.zrem.assert_any_await('ohcnct_index', 'user1:session1:conn1')
+            pipe.zrem.assert_any_await('ohcnct_index:user1', 'session1:conn1')
+            assert all(
+                call.args[0] != 'ohcnct_index'
+                for call in sio.manager.redis.zrangebyscore.call_args_list
+            )
+
             # Verify disconnect was called for each connection to session1
             assert sio.disconnect.await_count == 2
             sio.disconnect.assert_any_await('conn1')
@@ -366,7 +437,7 @@ async def test_cleanup_session_connections():
 @pytest.mark.asyncio
 async def test_disconnect_from_stopped_no_remote_connections():
     """Test _disconnect_from_stopped when there are no remote connections."""
-    sio = get_mock_sio(scan_keys=[])
+    sio = get_mock_sio(redis_keys=[])
     with (
         patch(
             'server.clustered_conversation_manager.ClusteredConversationManager._redis_subscribe',
@@ -396,9 +467,9 @@ async def test_disconnect_from_stopped_no_remote_connections():
 @pytest.mark.asyncio
 async def test_disconnect_from_stopped_with_running_remote():
     """Test _disconnect_from_stopped when remote sessions are still running."""
-    # Create a mock SIO with scan results for remote sessions
+    # Create a mock SIO with Redis keys for remote sessions
     sio = get_mock_sio(
-        scan_keys=[b'ohcnv:1:remote_session1', b'ohcnv:1:remote_session2']
+        redis_keys=[b'ohcnv:1:remote_session1', b'ohcnv:1:remote_session2']
     )
     get_running_agent_loops_remotely_mock = AsyncMock()
     get_running_agent_loops_remotely_mock.return_value = {
@@ -442,8 +513,8 @@ async def test_disconnect_from_stopped_with_running_remote():
 @pytest.mark.asyncio
 async def test_disconnect_from_stopped_with_stopped_remote():
     """Test _disconnect_from_stopped when some remote sessions have stopped."""
-    # Create a mock SIO with scan results for only remote_session1
-    sio = get_mock_sio(scan_keys=[b'ohcnv:user1:remote_session1'])
+    # Create a mock SIO with Redis keys for only remote_session1
+    sio = get_mock_sio(redis_keys=[b'ohcnv:user1:remote_session1'])
 
     # Mock the async database session
     mock_user = MagicMock()
@@ -515,7 +586,7 @@ async def test_disconnect_from_stopped_with_stopped_remote():
 @pytest.mark.asyncio
 async def test_close_disconnected_detached_conversations():
     """Test _close_disconnected for detached conversations."""
-    sio = get_mock_sio(scan_keys=[])
+    sio = get_mock_sio(redis_keys=[])
 
     with (
         patch(
@@ -548,7 +619,7 @@ async def test_close_disconnected_detached_conversations():
 @pytest.mark.asyncio
 async def test_close_disconnected_inactive_sessions():
     """Test _close_disconnected for inactive sessions."""
-    sio = get_mock_sio(scan_keys=[])
+    sio = get_mock_sio(redis_keys=[])
     get_connections_mock = AsyncMock()
     get_connections_mock.return_value = {}  # No connections
     get_connections_remotely_mock = AsyncMock()
@@ -620,7 +691,7 @@ async def test_close_disconnected_inactive_sessions():
 @pytest.mark.asyncio
 async def test_close_disconnected_with_connections():
     """Test _close_disconnected when sessions have connections."""
-    sio = get_mock_sio(scan_keys=[])
+    sio = get_mock_sio(redis_keys=[])
 
     # Mock local connections
     get_connections_mock = AsyncMock()
@@ -701,7 +772,7 @@ async def test_close_disconnected_with_connections():
 @pytest.mark.asyncio
 async def test_cleanup_stale_integration():
     """Test the integration of _cleanup_stale with the new methods."""
-    sio = get_mock_sio(scan_keys=[])
+    sio = get_mock_sio(redis_keys=[])
 
     disconnect_from_stopped_mock = AsyncMock()
     close_disconnected_mock = AsyncMock()
@@ -738,3 +809,49 @@ async def test_cleanup_stale_integration():
             # The exact number of calls may vary due to timing, so we check for at least 1
             assert disconnect_from_stopped_mock.await_count >= 1
             assert close_disconnected_mock.await_count >= 1
+
+
+@pytest.mark.asyncio
+async def test_update_state_in_redis_maintains_indexes():
+    """Test that refreshing local entries also refreshes their index members."""
+    sio = get_mock_sio(redis_keys=[b'ohcnv:user1:remote_session1'])
+
+    with patch(
+        'server.clustered_conversation_manager.ClusteredConversationManager._redis_subscribe',
+        AsyncMock(),
+    ):
+        async with ClusteredConversationManager(
+            sio, OpenHandsConfig(), InMemoryFileStore(), MonitoringListener()
+        ) as conversation_manager:
+            local_session = MagicMock()
+            local_session.user_id = 'user2'
+            conversation_manager._local_agent_loops_by_sid['local_session1'] = (
+                local_session
+            )
+            conversation_manager._local_connection_id_to_session_id['conn1'] = (
+                'remote_session1'
+            )
+            pipe = sio.manager.redis.pipeline.return_value
+            pipe.zadd.reset_mock()
+            sio.manager.redis.script.reset_mock()
+
+            await conversation_manager._update_state_in_redis()
+
+            indexed = {call.args[0]: call.args[1] for call in pipe.zadd.call_args_list}
+            assert set(indexed) == {
+                'ohcnv_index',
+                'ohcnv_index:user2',
+                'ohcnct_index',
+                'ohcnct_index:user1',
+            }
+            assert 'user2:local_session1' in indexed['ohcnv_index']
+            assert 'local_session1' in indexed['ohcnv_index:user2']
+            assert 'user1:remote_session1:conn1' in indexed['ohcnct_index']
+            assert 'remote_session1:conn1' in indexed['ohcnct_index:user1']
+
+            # Expired index members are swept
+            sio.manager.redis.script.assert_awaited_once()
+            assert sio.manager.redis.script.call_args.kwargs['keys'] == [
+                'ohcnv_index',
+                'ohcnct_index',
+            ]
@@ -1,10 +1,12 @@
 import time
+from datetime import UTC, datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import jwt
 import pytest
 from fastapi import Request
 from pydantic import SecretStr
+from server.auth.auth_cache import auth_cache
 from server.auth.auth_error import (
     AuthError,
     BearerTokenError,
@@ -19,6 +21,8 @@ from server.auth.saas_user_auth import (
     saas_user_auth_from_signed_token,
 )
 
+from storage.api_key_store import ValidatedApiKey
+
 from openhands.integrations.provider import ProviderToken, ProviderType
 
 
@@ -370,7 +374,9 @@ async def test_saas_user_auth_from_bearer_success():
         patch('server.auth.saas_user_auth.token_manager') as mock_token_manager,
     ):
         mock_api_key_store = MagicMock()
-        mock_api_key_store.validate_api_key = AsyncMock(return_value='test_user_id')
+        mock_api_key_store.validate_api_key = AsyncMock(
+            return_value=ValidatedApiKey(user_id='test_user_id', expires_at=None)
+        )
         mock_api_key_store_cls.get_instance.return_value = mock_api_key_store
 
         mock_token_manager.load_offline_token = AsyncMock(return_value=offline_token)
@@ -428,6 +434,146 @@ async def test_saas_user_auth_from_bearer_exception():
             await saas_user_auth_from_bearer(mock_request)
 
 
+@pytest.mark.asyncio
+async def test_saas_user_auth_from_bearer_cached():
+    """Test that repeated requests with an API key reuse the cached authentication."""
+    mock_request = MagicMock()
+    mock_request.headers = {'Authorization': 'Bearer test_api_key'}
+    offline_token = jwt.encode(
+        {'sub': 'test_user_id', 'exp': int(time.time()) + 3600},
+        'secret',
+        algorithm='HS256',
+    )
+    tokens = create_mock_jwt_tokens('test_user_id')
+
+    with (
+        patch('server.auth.saas_user_auth.ApiKeyStore') as mock_api_key_store_cls,
+        patch('server.auth.saas_user_auth.token_manager') as mock_token_manager,
+    ):
+        mock_api_key_store = MagicMock()
+        mock_api_key_store.validate_api_key = AsyncMock(
+            return_value=ValidatedApiKey(user_id='test_user_id', expires_at=None)
+        )
+        mock_api_key_store_cls.get_instance.return_value = mock_api_key_store
+        mock_token_manager.load_offline_token = AsyncMock(return_value=offline_token)
+        mock_token_manager.refresh = AsyncMock(return_value=tokens)
+
+        first = await saas_user_auth_from_bearer(mock_request)
+        second = await saas_user_auth_from_bearer(mock_request)
+
+        assert second.user_id == 'test_user_id'
+        assert second.email == 'test@example.com'
+        assert second.access_token == first.access_token
+        assert second.access_token.get_secret_value() == tokens['access_token']
+        mock_api_key_store.validate_api_key.assert_called_once()
+        mock_token_manager.load_offline_token.assert_called_once()
+        mock_token_manager.refresh.assert_called_once()
+
+        await auth_cache.invalidate_api_key('test_api_key')
+        await saas_user_auth_from_bearer(mock_request)
+
+        assert mock_api_key_store.validate_api_key.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_saas_user_auth_from_bearer_not_cached_when_token_expiring():
+    """Test that an access token about to expire is not cached."""
+    mock_request = MagicMock()
+    mock_request.headers = {'Authorization': 'Bearer test_api_key'}
+    offline_token = jwt.encode(
+        {'sub': 'test_user_id', 'exp': int(time.time()) + 3600},
+        'secret',
+        algorithm='HS256',
+    )
+
+    with (
+        patch('server.auth.saas_user_auth.ApiKeyStore') as mock_api_key_store_cls,
+        patch('server.auth.saas_user_auth.token_manager') as mock_token_manager,
+    ):
+        mock_api_key_store = MagicMock()
+        mock_api_key_store.validate_api_key = AsyncMock(
+            return_value=ValidatedApiKey(user_id='test_user_id', expires_at=None)
+        )
+        mock_api_key_store_cls.get_instance.return_value = mock_api_key_store
+        mock_token_manager.load_offline_token = AsyncMock(return_value=offline_token)
+        mock_token_manager.refresh = AsyncMock(
+            return_value=create_mock_jwt_tokens('test_user_id', exp_offset=30)
+        )
+
+        await saas_user_auth_from_bearer(mock_request)
+        await saas_user_auth_from_bearer(mock_request)
+
+        assert mock_token_manager.refresh.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_saas_user_auth_from_bearer_cache_ends_when_key_expires():
+    """Test that an API key is not served from the cache after it expires."""
+    mock_request = MagicMock()
+    mock_request.headers = {'Authorization': 'Bearer test_api_key'}
+    offline_token = jwt.encode(
+        {'sub': 'test_user_id', 'exp': int(time.time()) + 3600},
+        'secret',
+        algorithm='HS256',
+    )
+    key_expires_at = datetime.now(UTC) + timedelta(seconds=30)
+
+    with (
+        patch('server.auth.saas_user_auth.ApiKeyStore') as mock_api_key_store_cls,
+        patch('server.auth.saas_user_auth.token_manager') as mock_token_manager,
+    ):
+        mock_api_key_store = MagicMock()
+        mock_api_key_store.validate_api_key = AsyncMock(
+            return_value=ValidatedApiKey(
+                user_id='test_user_id', expires_at=key_expires_at
+            )
+        )
+        mock_api_key_store_cls.get_instance.return_value = mock_api_key_store
+        mock_token_manager.load_offline_token = AsyncMock(return_value=offline_token)
+        mock_token_manager.refresh = AsyncMock(
+            return_value=create_mock_jwt_tokens('test_user_id')
+        )
+
+        await saas_user_auth_from_bearer(mock_request)
+        await saas_user_auth_from_bearer(mock_request)
+        mock_api_key_store.validate_api_key.assert_called_once()
+
+        with patch(
+            'server.auth.auth_cache.time.time',
+            return_value=key_expires_at.timestamp() + 1,
+        ):
+            mock_api_key_store.validate_api_key.return_value = None
+            assert await saas_user_auth_from_bearer(mock_request) is None
+
+        assert mock_api_key_store.validate_api_key.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_get_provider_tokens_from_auth_cache(mock_token_manager):
+    """Test that get_provider_tokens uses cached tokens without the database."""
+    await auth_cache.set_provider_tokens(
+        'test_user_id', {'github': 'cached_github_token'}, time.time() + 3600
+    )
+    user_auth = SaasUserAuth(
+        user_id='test_user_id',
+        refresh_token=SecretStr('refresh_token'),
+        access_token=SecretStr(create_mock_jwt_tokens()['access_token']),
+    )
+
+    with (
+        patch.object(SaasUserAuth, 'get_secrets', AsyncMock(return_value=None)),
+        patch('server.auth.saas_user_auth.a_session_maker') as mock_session_maker,
+    ):
+        result = await user_auth.get_provider_tokens()
+
+    assert result[ProviderType.GITHUB].token.get_secret_value() == 'cached_github_token'
+    mock_session_maker.assert_not_called()
+    mock_token_manager.get_idp_token.assert_not_called()
+
+    await auth_cache.invalidate_user('test_user_id')
+    assert await auth_cache.get_provider_tokens('test_user_id') is None
+
+
 @pytest.mark.asyncio
 async def test_saas_user_auth_from_cookie_success(mock_config):
     """Test successful authentication from cookie."""
@@ -106,6 +106,20 @@ class AppConversationInfoService(ABC):
             conversation_id: The ID of the conversation to update
         """
 
+    async def process_stats_events(
+        self,
+        events: list[ConversationStateUpdateEvent],
+        conversation_id: UUID,
+    ) -> None:
+        """Process several stats events of a conversation, in order.
+
+        Args:
+            events: ConversationStateUpdateEvents with key='stats'
+            conversation_id: The ID of the conversation to update
+        """
+        for event in events:
+            await self.process_stats_event(event, conversation_id)
+
 
 class AppConversationInfoServiceInjector(
     DiscriminatedUnionMixin, Injector[AppConversationInfoService], ABC
@@ -363,11 +363,20 @@ class SQLAppConversationInfoService(AppConversationInfoService):
             conversation_id: The ID of the conversation to update
             stats: ConversationStats object containing usage_to_metrics data from stats event
         """
+        await self._update_conversation_statistics(conversation_id, [stats])
+
+    async def _update_conversation_statistics(
+        self, conversation_id: UUID, stats_list: list[ConversationStats]
+    ) -> None:
+        """Apply stats in order to the stored conversation with a single commit."""
         # Extract agent metrics from usage_to_metrics
-        usage_to_metrics = stats.usage_to_metrics
-        agent_metrics = usage_to_metrics.get('agent')
+        agent_metrics_list = [
+            stats.usage_to_metrics['agent']
+            for stats in stats_list
+            if stats.usage_to_metrics.get('agent')
+        ]
 
-        if not agent_metrics:
+        if not agent_metrics_list:
             logger.debug(
                 'No agent metrics found in stats for conversation %s', conversation_id
             )
@@ -388,6 +397,16 @@ class SQLAppConversationInfoService(AppConversationInfoService):
             )
             return
 
+        for agent_metrics in agent_metrics_list:
+            self._apply_agent_metrics(stored, agent_metrics)
+
+        # Update last_updated_at timestamp
+        stored.last_updated_at = utc_now()
+
+        await self.db_session.commit()
+
+    @staticmethod
+    def _apply_agent_metrics(stored: StoredConversationMetadata, agent_metrics):
         # Extract accumulated_cost and max_budget_per_task from Metrics object
         accumulated_cost = agent_metrics.accumulated_cost
         max_budget_per_task = agent_metrics.max_budget_per_task
@@ -431,10 +450,31 @@ class SQLAppConversationInfoService(AppConversationInfoService):
         if per_turn_token is not None:
             stored.per_turn_token = per_turn_token
 
-        # Update last_updated_at timestamp
-        stored.last_updated_at = utc_now()
-
-        await self.db_session.commit()
+    @staticmethod
+    def _parse_stats_event(
+        event: ConversationStateUpdateEvent,
+    ) -> ConversationStats | None:
+        # Parse event value into ConversationStats model for type safety
+        # event.value can be a dict (from JSON deserialization) or a ConversationStats object
+        event_value = event.value
+        conversation_stats: ConversationStats | None = None
+
+        if isinstance(event_value, ConversationStats):
+            # Already a ConversationStats object
+            conversation_stats = event_value
+        elif isinstance(event_value, dict):
+            # Parse dict into ConversationStats model
+            # This validates the structure and ensures type safety
+            conversation_stats = ConversationStats.model_validate(event_value)
+        elif hasattr(event_value, 'usage_to_metrics'):
+            # Handle objects with usage_to_metrics attribute (e.g., from tests)
+            # Convert to dict first, then validate
+            stats_dict = {'usage_to_metrics': event_value.usage_to_metrics}
+            conversation_stats = ConversationStats.model_validate(stats_dict)
+
+        if conversation_stats and conversation_stats.usage_to_metrics:
+            return conversation_stats
+        return None
 
     async def process_stats_event(
         self,
@@ -448,25 +488,8 @@ class SQLAppConversationInfoService(AppConversationInfoService):
             conversation_id: The ID of the conversation to update
         """
         try:
-            # Parse event value into ConversationStats model for type safety
-            # event.value can be a dict (from JSON deserialization) or a ConversationStats object
-            event_value = event.value
-            conversation_stats: ConversationStats | None = None
-
-            if isinstance(event_value, ConversationStats):
-                # Already a ConversationStats object
-                conversation_stats = event_value
-            elif isinstance(event_value, dict):
-                # Parse dict into ConversationStats model
-                # This validates the structure and ensures type safety
-                conversation_stats = ConversationStats.model_validate(event_value)
-            elif hasattr(event_value, 'usage_to_metrics'):
-                # Handle objects with usage_to_metrics attribute (e.g., from tests)
-                # Convert to dict first, then validate
-                stats_dict = {'usage_to_metrics': event_value.usage_to_metrics}
-                conversation_stats = ConversationStats.model_validate(stats_dict)
-
-            if conversation_stats and conversation_stats.usage_to_metrics:
+            conversation_stats = self._parse_stats_event(event)
+            if conversation_stats:
                 # Pass ConversationStats object directly for type safety
                 await self.update_conversation_statistics(
                     conversation_id, conversation_stats
@@ -478,6 +501,31 @@ class SQLAppConversationInfoService(AppConversationInfoService):
                 stack_info=True,
             )
 
+    async def process_stats_events(
+        self,
+        events: list[ConversationStateUpdateEvent],
+        conversation_id: UUID,
+    ) -> None:
+        """Process several stats events with a single query and commit.
+
+        Stats values are running totals, so applying them in order to one row gives
+        the same result as processing them one at a time.
+        """
+        try:
+            stats_list = [
+                stats
+                for stats in (self._parse_stats_event(event) for event in events)
+                if stats
+            ]
+            if stats_list:
+                await self._update_conversation_statistics(conversation_id, stats_list)
+        except Exception:
+            logger.exception(
+                'Error updating conversation statistics for conversation %s',
+                conversation_id,
+                stack_info=True,
+            )
+
     async def _secure_select(self):
         query = select(StoredConversationMetadata).where(
             StoredConversationMetadata.conversation_version == 'V1'
@@ -105,6 +105,19 @@ class AppServerConfig(OpenHandsModel):
         default_factory=get_openhands_provider_base_url,
         description='Base URL for the OpenHands provider',
     )
+    webhook_event_flush_delay: float = Field(
+        default=0.02,
+        description='Seconds webhook event requests wait for others to the same '
+        'conversation before their events are written in one batch',
+    )
+    webhook_max_batch_events: int = Field(
+        default=500,
+        description='Webhook event batches are written immediately at this size',
+    )
+    webhook_max_pending_events: int = Field(
+        default=10_000,
+        description='Webhook event requests wait while this many events are pending',
+    )
     # Dependency Injection Injectors
     event: EventServiceInjector | None = None
     event_callback: EventCallbackServiceInjector | None = None
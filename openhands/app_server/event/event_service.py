@@ -47,6 +47,12 @@ class EventService(ABC):
     async def save_event(self, conversation_id: UUID, event: Event):
         """Save an event. Internal method intended not be part of the REST api."""
 
+    async def save_events(self, conversation_id: UUID, events: list[Event]):
+        """Save several events of a conversation. Internal method intended not be part of the REST api."""
+        await asyncio.gather(
+            *[self.save_event(conversation_id, event) for event in events]
+        )
+
     async def batch_get_events(
         self, conversation_id: UUID, event_ids: list[UUID]
     ) -> list[Event | None]:
@@ -1,12 +1,14 @@
 import asyncio
+import logging
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from uuid import UUID
 
+from pydantic import BaseModel
+
 from openhands.agent_server.models import EventPage, EventSortOrder
-from openhands.agent_server.sockets import page_iterator
 from openhands.app_server.app_conversation.app_conversation_info_service import (
     AppConversationInfoService,
 )
@@ -17,6 +19,20 @@ from openhands.app_server.event.event_service import EventService
 from openhands.app_server.event_callback.event_callback_models import EventKind
 from openhands.sdk import Event
 
+_logger = logging.getLogger(__name__)
+
+# Sidecar file in each conversation directory listing the events it contains
+EVENT_INDEX_FILENAME = 'event_index.jsonl'
+
+
+class EventIndexEntry(BaseModel):
+    """Summary of a stored event, enough to filter, sort and page without loading it."""
+
+    id: str
+    kind: str
+    timestamp: str
+    size: int
+
 
 @dataclass
 class EventServiceBase(EventService, ABC):
@@ -36,13 +52,25 @@ class EventServiceBase(EventService, ABC):
         """Get the event at the path given."""
 
     @abstractmethod
-    def _store_event(self, path: Path, event: Event):
-        """Store the event given at the path given."""
+    def _store_event(self, path: Path, event: Event) -> int:
+        """Store the event given at the path given, returning the size in bytes."""
+
+    def _store_events(self, paths_and_events: list[tuple[Path, Event]]) -> list[int]:
+        """Store several events, returning their sizes in bytes."""
+        return [self._store_event(path, event) for path, event in paths_and_events]
 
     @abstractmethod
     def _search_paths(self, prefix: Path) -> list[Path]:
         """Search paths."""
 
+    @abstractmethod
+    def _load_index(self, path: Path) -> str | None:
+        """Get the content of the event index at the path given, or None if not found."""
+
+    @abstractmethod
+    def _append_index(self, path: Path, content: str):
+        """Append lines to the event index at the path given."""
+
     async def get_conversation_path(self, conversation_id: UUID) -> Path:
         """Get a path for a conversation. Ensure user_id is included if possible."""
         path = self.prefix
@@ -81,27 +109,18 @@ class EventServiceBase(EventService, ABC):
         page_id: str | None = None,
         limit: int = 100,
     ) -> EventPage:
-        """Search events matching the given filters."""
-        loop = asyncio.get_running_loop()
-        prefix = await self.get_conversation_path(conversation_id)
-        paths = await loop.run_in_executor(None, self._search_paths, prefix)
-        events = await asyncio.gather(
-            *[loop.run_in_executor(None, self._load_event, path) for path in paths]
+        """Search events matching the given filters.
+
+        Filtering, sorting and paging use the event index, so only the events in
+        the requested page are loaded.
+        """
+        conversation_path = await self.get_conversation_path(conversation_id)
+        entries = await self._search_index(
+            conversation_path, kind__eq, timestamp__gte, timestamp__lt
         )
-        items = []
-        for event in events:
-            if not event:
-                continue
-            if kind__eq and event.kind != kind__eq:
-                continue
-            if timestamp__gte and event.timestamp < timestamp__gte:
-                continue
-            if timestamp__lt and event.timestamp >= timestamp__lt:
-                continue
-            items.append(event)
 
         if sort_order:
-            items.sort(
+            entries.sort(
                 key=lambda e: e.timestamp,
                 reverse=(sort_order == EventSortOrder.TIMESTAMP_DESC),
             )
@@ -110,11 +129,21 @@ class EventServiceBase(EventService, ABC):
         next_page_id = None
         if page_id:
             start_offset = int(page_id)
-            paths = paths[start_offset:]
-        if len(paths) > limit:
-            paths = paths[:limit]
+            entries = entries[start_offset:]
+        if len(entries) > limit:
+            entries = entries[:limit]
             next_page_id = str(start_offset + limit)
 
+        loop = asyncio.get_running_loop()
+        events = await asyncio.gather(
+            *[
+                loop.run_in_executor(
+                    None, self._load_event, conversation_path / f'{entry.id}.json'
+                )
+                for entry in entries
+            ]
+        )
+        items = [event for event in events if event]
         return EventPage(items=items, next_page_id=next_page_id)
 
     async def count_events(
@@ -125,37 +154,135 @@ class EventServiceBase(EventService, ABC):
         timestamp__lt: datetime | None = None,
     ) -> int:
         """Count events matching the given filters."""
-        # If we are not filtering, we can simply count the paths
-        if not (kind__eq or timestamp__gte or timestamp__lt):
-            conversation_path = await self.get_conversation_path(conversation_id)
-            result = await self._count_events_no_filter(conversation_path)
-            return result
-
-        events = page_iterator(
-            self.search_events,
-            conversation_id=conversation_id,
-            kind__eq=kind__eq,
-            timestamp__gte=timestamp__gte,
-            timestamp__lt=timestamp__lt,
+        conversation_path = await self.get_conversation_path(conversation_id)
+        entries = await self._search_index(
+            conversation_path, kind__eq, timestamp__gte, timestamp__lt
         )
-        result = sum(1 for event in events)
-        return result
+        return len(entries)
+
+    async def _search_index(
+        self,
+        conversation_path: Path,
+        kind__eq: EventKind | None,
+        timestamp__gte: datetime | None,
+        timestamp__lt: datetime | None,
+    ) -> list[EventIndexEntry]:
+        entries = await self._load_index_entries(conversation_path)
+        results = []
+        for entry in entries:
+            if kind__eq and entry.kind != kind__eq:
+                continue
+            if timestamp__gte or timestamp__lt:
+                timestamp = datetime.fromisoformat(entry.timestamp)
+                if timestamp__gte and timestamp < timestamp__gte:
+                    continue
+                if timestamp__lt and timestamp >= timestamp__lt:
+                    continue
+            results.append(entry)
+        return results
+
+    async def _load_index_entries(
+        self, conversation_path: Path
+    ) -> list[EventIndexEntry]:
+        """Load the index entries of all events in the conversation.
+
+        Events missing from the index (e.g. stored before the index existed, or
+        whose index entry could not be written) are loaded once and added to the
+        index.
+        """
+        loop = asyncio.get_running_loop()
+        index_path = conversation_path / EVENT_INDEX_FILENAME
+        paths, content = await asyncio.gather(
+            loop.run_in_executor(None, self._search_paths, conversation_path),
+            loop.run_in_executor(None, self._load_index, index_path),
+        )
+        event_paths = {
+            path.stem: path
+            for path in paths
+            if path.name != EVENT_INDEX_FILENAME and path.suffix == '.json'
+        }
+
+        entries: dict[str, EventIndexEntry] = {}
+        for line in (content or '').splitlines():
+            if not line:
+                continue
+            entry = EventIndexEntry.model_validate_json(line)
+            if entry.id in event_paths:
+                entries[entry.id] = entry
 
-    async def _count_events_no_filter(self, conversation_path: Path) -> int:
-        paths = page_iterator(self._search_paths, conversation_path)
-        result = 0
-        async for _ in paths:
-            result += 1
-        return result
+        missing = [path for id, path in event_paths.items() if id not in entries]
+        if missing:
+            events = await asyncio.gather(
+                *[
+                    loop.run_in_executor(None, self._load_event, path)
+                    for path in missing
+                ]
+            )
+            new_entries = [
+                self._create_index_entry(path.stem, event, len(event.model_dump_json()))
+                for path, event in zip(missing, events)
+                if event
+            ]
+            if new_entries:
+                await self._add_index_entries(index_path, new_entries)
+            for entry in new_entries:
+                entries[entry.id] = entry
+
+        return list(entries.values())
+
+    async def _add_index_entries(
+        self, index_path: Path, entries: list[EventIndexEntry]
+    ):
+        """Add entries to the event index. The index is only a sidecar, so a
+        failure is logged rather than raised: events without an entry are indexed
+        again on the next search."""
+        content = ''.join(entry.model_dump_json() + '\n' for entry in entries)
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self._append_index, index_path, content)
+        except Exception:
+            _logger.exception(f'Error updating event index {index_path}')
+
+    @staticmethod
+    def _create_index_entry(id_hex: str, event: Event, size: int) -> EventIndexEntry:
+        return EventIndexEntry(
+            id=id_hex, kind=event.kind, timestamp=event.timestamp, size=size
+        )
 
     async def save_event(self, conversation_id: UUID, event: Event):
         if isinstance(event.id, str):
             id_hex = event.id.replace('-', '')
         else:
             id_hex = event.id.hex
-        path = (await self.get_conversation_path(conversation_id)) / f'{id_hex}.json'
+        conversation_path = await self.get_conversation_path(conversation_id)
+        path = conversation_path / f'{id_hex}.json'
         loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, self._store_event, path, event)
+        size = await loop.run_in_executor(None, self._store_event, path, event)
+        entry = self._create_index_entry(id_hex, event, size)
+        await self._add_index_entries(conversation_path / EVENT_INDEX_FILENAME, [entry])
+
+    async def save_events(self, conversation_id: UUID, events: list[Event]):
+        if not events:
+            return
+        conversation_path = await self.get_conversation_path(conversation_id)
+        id_hexes = [
+            event.id.replace('-', '') if isinstance(event.id, str) else event.id.hex
+            for event in events
+        ]
+        loop = asyncio.get_running_loop()
+        sizes = await loop.run_in_executor(
+            None,
+            self._store_events,
+            [
+                (conversation_path / f'{id_hex}.json', event)
+                for id_hex, event in zip(id_hexes, events)
+            ],
+        )
+        entries = [
+            self._create_index_entry(id_hex, event, size)
+            for id_hex, event, size in zip(id_hexes, events, sizes)
+        ]
+        await self._add_index_entries(conversation_path / EVENT_INDEX_FILENAME, entries)
 
     async def batch_get_events(
         self, conversation_id: UUID, event_ids: list[UUID]
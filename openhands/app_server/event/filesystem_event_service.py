@@ -29,10 +29,23 @@ class FilesystemEventService(EventServiceBase):
             _logger.exception('Error reading event', stack_info=True)
             return None
 
-    def _store_event(self, path: Path, event: Event):
+    def _store_event(self, path: Path, event: Event) -> int:
         path.parent.mkdir(parents=True, exist_ok=True)
-        content = event.model_dump_json(indent=2)
+        content = event.model_dump_json()
         path.write_text(content)
+        return len(content)
+
+    def _store_events(self, paths_and_events: list[tuple[Path, Event]]) -> list[int]:
+        created_dirs = set()
+        sizes = []
+        for path, event in paths_and_events:
+            if path.parent not in created_dirs:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                created_dirs.add(path.parent)
+            content = event.model_dump_json()
+            path.write_text(content)
+            sizes.append(len(content))
+        return sizes
 
     def _search_paths(self, prefix: Path, page_id: str | None = None) -> list[Path]:
         search_path = f'{prefix}/*'
@@ -40,6 +53,17 @@ class FilesystemEventService(EventServiceBase):
         paths = [Path(file) for file in files]
         return paths
 
+    def _load_index(self, path: Path) -> str | None:
+        try:
+            return path.read_text()
+        except FileNotFoundError:
+            return None
+
+    def _append_index(self, path: Path, content: str):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open('a') as f:
+            f.write(content)
+
 
 class FilesystemEventServiceInjector(EventServiceInjector):
     async def inject(
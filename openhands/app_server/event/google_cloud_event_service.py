@@ -1,14 +1,17 @@
 """Google Cloud Storage-based EventService implementation."""
 
-import json
 import logging
+import time
 from dataclasses import dataclass
+from io import BytesIO
 from pathlib import Path
-from typing import AsyncGenerator, Iterator
+from typing import AsyncGenerator, Iterable, Iterator
+from uuid import uuid4
 
 from fastapi import Request
 from google.api_core.exceptions import NotFound
 from google.cloud import storage
+from google.cloud.storage import transfer_manager
 from google.cloud.storage.blob import Blob
 from google.cloud.storage.bucket import Bucket
 from google.cloud.storage.client import Client
@@ -21,6 +24,9 @@ from openhands.sdk import Event
 
 _logger = logging.getLogger(__name__)
 
+# Number of event index shards at which loading the index merges them into one
+INDEX_COMPACTION_THRESHOLD = 16
+
 
 @dataclass
 class GoogleCloudEventService(EventServiceBase):
@@ -42,12 +48,26 @@ class GoogleCloudEventService(EventServiceBase):
             _logger.exception(f'Error reading event from {path}')
             return None
 
-    def _store_event(self, path: Path, event: Event):
+    def _store_event(self, path: Path, event: Event) -> int:
         """Store the event given at the path given."""
         blob: Blob = self.bucket.blob(str(path))
-        data = event.model_dump(mode='json')
+        content = event.model_dump_json()
         with blob.open('w') as f:
-            f.write(json.dumps(data, indent=2))
+            f.write(content)
+        return len(content)
+
+    def _store_events(self, paths_and_events: list[tuple[Path, Event]]) -> list[int]:
+        """Store several events, uploading them concurrently."""
+        contents = [event.model_dump_json() for _, event in paths_and_events]
+        transfer_manager.upload_many(
+            [
+                (BytesIO(content.encode('utf-8')), self.bucket.blob(str(path)))
+                for (path, _), content in zip(paths_and_events, contents)
+            ],
+            worker_type=transfer_manager.THREAD,
+            raise_exception=True,
+        )
+        return [len(content) for content in contents]
 
     def _search_paths(self, prefix: Path, page_id: str | None = None) -> list[Path]:
         """Search paths."""
@@ -57,6 +77,58 @@ class GoogleCloudEventService(EventServiceBase):
         paths = list(Path(blob.name) for blob in blobs)
         return paths
 
+    def _load_index(self, path: Path) -> str | None:
+        """Get the content of the event index at the path given.
+
+        GCS objects cannot be appended to, and a single object only supports
+        about one update per second, so each write to the index is stored as a
+        separate shard under a prefix named after it. Once there are enough of
+        them, the shards read are merged into one and deleted.
+        """
+        blobs: list[Blob] = list(
+            self.bucket.list_blobs(prefix=_index_shard_prefix(path))
+        )
+        if not blobs:
+            return None
+        buffers = [BytesIO() for _ in blobs]
+        results = transfer_manager.download_many(
+            list(zip(blobs, buffers)), worker_type=transfer_manager.THREAD
+        )
+        # A shard may have been merged and deleted by a concurrent search. Events
+        # whose entries are missing as a result are indexed again by the caller.
+        loaded = [
+            (blob, buffer.getvalue().decode('utf-8'))
+            for blob, buffer, result in zip(blobs, buffers, results)
+            if not isinstance(result, Exception)
+        ]
+        content = ''.join(dict.fromkeys(_lines(c for _, c in loaded)))
+        if len(loaded) >= INDEX_COMPACTION_THRESHOLD:
+            try:
+                self._append_index(path, content)
+                self.bucket.delete_blobs(
+                    [blob for blob, _ in loaded], on_error=lambda blob: None
+                )
+            except Exception:
+                _logger.exception(f'Error compacting event index {path}')
+        return content
+
+    def _append_index(self, path: Path, content: str):
+        """Append lines to the event index at the path given by adding a shard."""
+        name = f'{time.time_ns():020d}-{uuid4().hex}.jsonl'
+        blob: Blob = self.bucket.blob(_index_shard_prefix(path) + name)
+        blob.upload_from_string(content)
+
+
+def _index_shard_prefix(path: Path) -> str:
+    return f'{path.with_suffix("")}/'
+
+
+def _lines(contents: Iterable[str]) -> Iterator[str]:
+    for content in contents:
+        for line in content.splitlines():
+            if line:
+                yield line + '\n'
+
 
 class GoogleCloudEventServiceInjector(EventServiceInjector):
     bucket_name: str
@@ -61,6 +61,13 @@ class EventCallbackService(ABC):
     async def execute_callbacks(self, conversation_id: UUID, event: Event) -> None:
         """Execute any applicable callbacks for the event and store the results."""
 
+    async def batch_execute_callbacks(
+        self, conversation_id: UUID, events: list[Event]
+    ) -> None:
+        """Execute any applicable callbacks for each event in order."""
+        for event in events:
+            await self.execute_callbacks(conversation_id, event)
+
 
 class EventCallbackServiceInjector(
     DiscriminatedUnionMixin, Injector[EventCallbackService], ABC
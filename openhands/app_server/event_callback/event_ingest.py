@@ -0,0 +1,225 @@
+"""Batching stage for events posted to the webhook router.
+
+Sandboxes post events to the app server as they occur, so a busy conversation
+produces many small requests. Rather than saving each request's events and
+committing its stats separately, requests for the same conversation that arrive
+within `flush_delay` seconds are coalesced into one batch: the first request of a
+batch waits for the others, then writes all events with a single bulk save and
+collapses the batch's stats events into one statistics update.
+
+Requests only return once their batch has been written, so a successful webhook
+response still means the events are stored. If the first request is cancelled
+before the batch is written, the requests which joined it retry in a new batch.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field, replace
+from uuid import UUID
+
+from openhands.app_server.app_conversation.app_conversation_info_service import (
+    AppConversationInfoService,
+)
+from openhands.app_server.event.event_service import EventService
+from openhands.sdk import Event
+from openhands.sdk.event import ConversationStateUpdateEvent
+
+_logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EventIngestMetrics:
+    """Counters describing the batching and back-pressure of the ingest stage."""
+
+    pending_events: int = 0
+    max_pending_events: int = 0
+    batches_flushed: int = 0
+    events_flushed: int = 0
+    requests_coalesced: int = 0
+    stats_updates_collapsed: int = 0
+    backpressure_waits: int = 0
+    last_flush_seconds: float = 0.0
+    max_flush_seconds: float = 0.0
+
+
+class _BatchCancelledError(RuntimeError):
+    """The request flushing a batch was cancelled before it was written."""
+
+
+@dataclass
+class _PendingBatch:
+    events: list[Event] = field(default_factory=list)
+    full: asyncio.Event = field(default_factory=asyncio.Event)
+    done: asyncio.Future = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+
+
+@dataclass
+class EventIngestBuffer:
+    """Coalesces webhook events per conversation into bulk writes.
+
+    Args:
+        flush_delay: Seconds the first request of a batch waits for others to join.
+        max_batch_events: A batch is flushed immediately once it reaches this size.
+        max_pending_events: Requests wait before joining a batch while this many
+            events are pending across all conversations.
+    """
+
+    flush_delay: float = 0.02
+    max_batch_events: int = 500
+    max_pending_events: int = 10_000
+    metrics: EventIngestMetrics = field(default_factory=EventIngestMetrics)
+    _batches: dict[UUID, _PendingBatch] = field(default_factory=dict)
+    _capacity_waiters: list[asyncio.Future] = field(default_factory=list)
+
+    def get_metrics(self) -> EventIngestMetrics:
+        return replace(self.metrics)
+
+    async def ingest(
+        self,
+        conversation_id: UUID,
+        events: list[Event],
+        event_service: EventService,
+        app_conversation_info_service: AppConversationInfoService,
+    ) -> None:
+        """Store the events given, returning once the batch containing them is written."""
+        if not events:
+            return
+        await self._reserve(len(events))
+        try:
+            batch = self._batches.get(conversation_id)
+            while batch is not None:
+                self.metrics.requests_coalesced += 1
+                batch.events.extend(events)
+                if len(batch.events) >= self.max_batch_events:
+                    batch.full.set()
+                try:
+                    await asyncio.shield(batch.done)
+                    return
+                except _BatchCancelledError:
+                    # Join the batch of another request which retries, or lead one.
+                    # Events saved by the cancelled flush are saved again, which
+                    # overwrites them.
+                    batch = self._batches.get(conversation_id)
+
+            batch = _PendingBatch(events=list(events))
+            self._batches[conversation_id] = batch
+            try:
+                if len(batch.events) < self.max_batch_events:
+                    await asyncio.wait_for(batch.full.wait(), self.flush_delay)
+            except asyncio.TimeoutError:
+                pass
+            except BaseException as e:
+                # Requests which joined this batch must not wait forever
+                self._fail(batch, e)
+                raise
+            finally:
+                # Later requests start a new batch
+                self._batches.pop(conversation_id, None)
+            await self._flush(
+                conversation_id, batch, event_service, app_conversation_info_service
+            )
+        finally:
+            self._release(len(events))
+
+    @staticmethod
+    def _fail(batch: _PendingBatch, error: BaseException):
+        if not batch.done.done():
+            if not isinstance(error, Exception):
+                error = _BatchCancelledError(
+                    'Event batch was cancelled before being written'
+                )
+            batch.done.set_exception(error)
+            # Mark retrieved so a batch nobody else joined does not log a warning
+            batch.done.exception()
+
+    async def _flush(
+        self,
+        conversation_id: UUID,
+        batch: _PendingBatch,
+        event_service: EventService,
+        app_conversation_info_service: AppConversationInfoService,
+    ):
+        start = time.monotonic()
+        try:
+            await event_service.save_events(conversation_id, batch.events)
+            stats_events = [
+                event
+                for event in batch.events
+                if isinstance(event, ConversationStateUpdateEvent)
+                and event.key == 'stats'
+            ]
+            if stats_events:
+                self.metrics.stats_updates_collapsed += len(stats_events) - 1
+                await app_conversation_info_service.process_stats_events(
+                    stats_events, conversation_id
+                )
+        except BaseException as e:
+            self._fail(batch, e)
+            raise
+        else:
+            batch.done.set_result(None)
+        finally:
+            elapsed = time.monotonic() - start
+            self.metrics.batches_flushed += 1
+            self.metrics.events_flushed += len(batch.events)
+            self.metrics.last_flush_seconds = elapsed
+            self.metrics.max_flush_seconds = max(
+                self.metrics.max_flush_seconds, elapsed
+            )
+
+    async def _reserve(self, num_events: int):
+        if self.metrics.pending_events >= self.max_pending_events:
+            self.metrics.backpressure_waits += 1
+            _logger.warning(
+                'Event ingest backpressure: %s events pending',
+                self.metrics.pending_events,
+            )
+            while self.metrics.pending_events >= self.max_pending_events:
+                waiter = asyncio.get_running_loop().create_future()
+                self._capacity_waiters.append(waiter)
+                try:
+                    await waiter
+                finally:
+                    if waiter in self._capacity_waiters:
+                        self._capacity_waiters.remove(waiter)
+        self.metrics.pending_events += num_events
+        self.metrics.max_pending_events = max(
+            self.metrics.max_pending_events, self.metrics.pending_events
+        )
+
+    def _release(self, num_events: int):
+        self.metrics.pending_events -= num_events
+        waiters = self._capacity_waiters
+        self._capacity_waiters = []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+
+_event_ingest_buffer: EventIngestBuffer | None = None
+
+
+def get_event_ingest_buffer() -> EventIngestBuffer:
+    """Get the ingest buffer shared by all webhook requests in this process."""
+    global _event_ingest_buffer
+    if _event_ingest_buffer is None:
+        from openhands.app_server.config import get_global_config
+
+        config = get_global_config()
+        _event_ingest_buffer = EventIngestBuffer(
+            flush_delay=config.webhook_event_flush_delay,
+            max_batch_events=config.webhook_max_batch_events,
+            max_pending_events=config.webhook_max_pending_events,
+        )
+    return _event_ingest_buffer
+
+
+def get_event_ingest_metrics() -> EventIngestMetrics:
+    """Get the metrics of the ingest buffer, without creating it if no webhook
+    request has used it yet."""
+    if _event_ingest_buffer is None:
+        return EventIngestMetrics()
+    return _event_ingest_buffer.get_metrics()
@@ -5,11 +5,14 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from dataclasses import dataclass
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from typing import AsyncGenerator
 from uuid import UUID, uuid4
 
 from fastapi import Request
+from pydantic import Field
 from sqlalchemy import UUID as SQLUUID
 from sqlalchemy import Column, Enum, String, and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -68,11 +71,73 @@ class StoredEventCallbackResult(Base):  # type: ignore
     created_at = Column(UtcDateTime, server_default=func.now(), index=True)
 
 
+@dataclass
+class EventCallbackSubscriptionIndex:
+    """In-process cache of the active callbacks subscribed to each conversation.
+
+    Entries map an event kind (None for callbacks on all kinds) to the stored
+    callbacks for that kind, including callbacks not bound to any conversation.
+    Changes made through this process invalidate the affected entries and bump
+    the generation. Changes made by other processes are only seen once entries
+    expire after their ttl, so events processed meanwhile miss them.
+    """
+
+    max_conversations: int = 1024
+    generation: int = 0
+    _entries: OrderedDict[UUID, tuple[float, dict[str | None, list[EventCallback]]]] = (
+        field(default_factory=OrderedDict)
+    )
+
+    def get(
+        self, conversation_id: UUID
+    ) -> dict[str | None, list[EventCallback]] | None:
+        entry = self._entries.get(conversation_id)
+        if entry is None:
+            return None
+        expires_at, subscriptions = entry
+        if expires_at <= time.monotonic():
+            del self._entries[conversation_id]
+            return None
+        self._entries.move_to_end(conversation_id)
+        return subscriptions
+
+    def put(
+        self,
+        conversation_id: UUID,
+        subscriptions: dict[str | None, list[EventCallback]],
+        generation: int,
+        ttl: float,
+    ):
+        # Skip results loaded before an invalidation, as they may be stale
+        if generation != self.generation:
+            return
+        self._entries[conversation_id] = (time.monotonic() + ttl, subscriptions)
+        self._entries.move_to_end(conversation_id)
+        while len(self._entries) > self.max_conversations:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, conversation_id: UUID | None):
+        """Drop entries for a conversation, or all entries for global callbacks."""
+        self.generation += 1
+        if conversation_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(conversation_id, None)
+
+
+_subscription_index = EventCallbackSubscriptionIndex()
+
+
 @dataclass
 class SQLEventCallbackService(EventCallbackService):
     """SQL implementation of EventCallbackService."""
 
     db_session: AsyncSession
+    subscription_index: EventCallbackSubscriptionIndex = field(
+        default_factory=lambda: _subscription_index
+    )
+    # Subscriptions are only cached when positive
+    subscription_cache_ttl: float = 0.0
 
     async def create_event_callback(
         self, request: CreateEventCallbackRequest
@@ -89,6 +154,7 @@ class SQLEventCallbackService(EventCallbackService):
         stored_callback = StoredEventCallback(**event_callback.model_dump())
         self.db_session.add(stored_callback)
         await self.db_session.commit()
+        self._invalidate_subscriptions(event_callback.conversation_id)
         await self.db_session.refresh(stored_callback)
         return EventCallback.model_validate(row2dict(stored_callback))
 
@@ -112,6 +178,7 @@ class SQLEventCallbackService(EventCallbackService):
 
         await self.db_session.delete(stored_callback)
         await self.db_session.commit()
+        self._invalidate_subscriptions(stored_callback.conversation_id)
         return True
 
     async def search_event_callbacks(
@@ -182,18 +249,70 @@ class SQLEventCallbackService(EventCallbackService):
         event_callback.updated_at = utc_now()
         stored_callback = StoredEventCallback(**event_callback.model_dump())
         await self.db_session.merge(stored_callback)
+        self._invalidate_subscriptions(event_callback.conversation_id)
         return event_callback
 
     async def execute_callbacks(self, conversation_id: UUID, event: Event) -> None:
+        await self.batch_execute_callbacks(conversation_id, [event])
+
+    async def batch_execute_callbacks(
+        self, conversation_id: UUID, events: list[Event]
+    ) -> None:
+        """Execute callbacks for events in order, with one lookup and one commit."""
+        index = self.subscription_index
+        generation = index.generation
+        subscriptions = await self._get_subscriptions(conversation_id)
+        callbacks: dict[UUID, EventCallback] = {}
+        snapshots: dict[UUID, dict] = {}
+        for event in events:
+            # Callbacks created or changed in this process while handling earlier
+            # events apply to the later ones
+            if index.generation != generation:
+                generation = index.generation
+                subscriptions = await self._get_subscriptions(conversation_id)
+            matched = []
+            for subscription in (
+                *subscriptions.get(event.kind, ()),
+                *subscriptions.get(None, ()),
+            ):
+                callback = callbacks.get(subscription.id)
+                if callback is None:
+                    # Processors may change the callback, so never use the cached one
+                    callback = subscription.model_copy(deep=True)
+                    callbacks[callback.id] = callback
+                    snapshots[callback.id] = callback.model_dump()
+                # Callbacks may have disabled themselves for an earlier event
+                if callback.status == EventCallbackStatus.ACTIVE:
+                    matched.append(callback)
+            await asyncio.gather(
+                *[
+                    self.execute_callback(conversation_id, callback, event)
+                    for callback in matched
+                ]
+            )
+
+        if callbacks:
+            # Persist only the callbacks which changed themselves
+            for callback in callbacks.values():
+                if callback.model_dump() != snapshots[callback.id]:
+                    await self.save_event_callback(callback)
+            await self.db_session.commit()
+
+    async def _get_subscriptions(
+        self, conversation_id: UUID
+    ) -> dict[str | None, list[EventCallback]]:
+        """Get the active callbacks for a conversation, keyed by event kind."""
+        index = self.subscription_index
+        use_cache = self.subscription_cache_ttl > 0
+        if use_cache:
+            cached = index.get(conversation_id)
+            if cached is not None:
+                return cached
+        generation = index.generation
+
         query = (
             select(StoredEventCallback)
             .where(StoredEventCallback.status == EventCallbackStatus.ACTIVE)
-            .where(
-                or_(
-                    StoredEventCallback.event_kind == event.kind,
-                    StoredEventCallback.event_kind.is_(None),
-                )
-            )
             .where(
                 or_(
                     StoredEventCallback.conversation_id == conversation_id,
@@ -202,22 +321,20 @@ class SQLEventCallbackService(EventCallbackService):
             )
         )
         result = await self.db_session.execute(query)
-        stored_callbacks = result.scalars().all()
-        if stored_callbacks:
-            callbacks = [
-                EventCallback.model_validate(row2dict(cb)) for cb in stored_callbacks
-            ]
-            await asyncio.gather(
-                *[
-                    self.execute_callback(conversation_id, callback, event)
-                    for callback in callbacks
-                ]
+        subscriptions: dict[str | None, list[EventCallback]] = {}
+        for stored_callback in result.scalars():
+            subscriptions.setdefault(stored_callback.event_kind, []).append(
+                EventCallback.model_validate(row2dict(stored_callback))
             )
 
-            # Persist any new changes callbacks may have made to itself
-            for callback in callbacks:
-                await self.save_event_callback(callback)
-            await self.db_session.commit()
+        if use_cache:
+            index.put(
+                conversation_id, subscriptions, generation, self.subscription_cache_ttl
+            )
+        return subscriptions
+
+    def _invalidate_subscriptions(self, conversation_id: UUID | None):
+        self.subscription_index.invalidate(conversation_id)
 
     async def execute_callback(
         self, conversation_id: UUID, callback: EventCallback, event: Event
@@ -244,10 +361,24 @@ class SQLEventCallbackService(EventCallbackService):
 
 
 class SQLEventCallbackServiceInjector(EventCallbackServiceInjector):
+    subscription_cache_ttl: float = Field(
+        default=0.0,
+        description=(
+            'Seconds to cache the callbacks subscribed to a conversation in each '
+            'process. Callbacks created, changed or deleted through other processes '
+            'are not seen for up to this long, so events processed meanwhile may '
+            'permanently miss them. Only enable it when that is acceptable, e.g. '
+            'with a single replica. 0 disables caching.'
+        ),
+    )
+
     async def inject(
         self, state: InjectorState, request: Request | None = None
     ) -> AsyncGenerator[EventCallbackService, None]:
         from openhands.app_server.config import get_db_session
 
         async with get_db_session(state) as db_session:
-            yield SQLEventCallbackService(db_session=db_session)
+            yield SQLEventCallbackService(
+                db_session=db_session,
+                subscription_cache_ttl=self.subscription_cache_ttl,
+            )
@@ -28,6 +28,7 @@ from openhands.app_server.config import (
 )
 from openhands.app_server.errors import AuthError
 from openhands.app_server.event.event_service import EventService
+from openhands.app_server.event_callback.event_ingest import get_event_ingest_buffer
 from openhands.app_server.sandbox.sandbox_models import SandboxInfo
 from openhands.app_server.sandbox.sandbox_service import SandboxService
 from openhands.app_server.services.injector import InjectorState
@@ -41,7 +42,6 @@ from openhands.app_server.user.specifiy_user_context import (
 from openhands.app_server.user.user_context import UserContext
 from openhands.integrations.provider import ProviderType
 from openhands.sdk import ConversationExecutionStatus, Event
-from openhands.sdk.event import ConversationStateUpdateEvent
 from openhands.server.user_auth.default_user_auth import DefaultUserAuth
 from openhands.server.user_auth.user_auth import (
     get_for_user as get_user_auth_for_user,
@@ -149,18 +149,11 @@ async def on_event(
     )
 
     try:
-        # Save events...
-        await asyncio.gather(
-            *[event_service.save_event(conversation_id, event) for event in events]
+        # Save events and process stats events, batched with concurrent requests
+        await get_event_ingest_buffer().ingest(
+            conversation_id, events, event_service, app_conversation_info_service
         )
 
-        # Process stats events for V1 conversations
-        for event in events:
-            if isinstance(event, ConversationStateUpdateEvent) and event.key == 'stats':
-                await app_conversation_info_service.process_stats_event(
-                    event, conversation_id
-                )
-
         asyncio.create_task(
             _run_callbacks_in_bg_and_close(
                 conversation_id, app_conversation_info.created_by_user_id, events
@@ -219,9 +212,8 @@ async def _run_callbacks_in_bg_and_close(
     setattr(state, USER_CONTEXT_ATTR, SpecifyUserContext(user_id=user_id))
 
     async with get_event_callback_service(state) as event_callback_service:
-        # We don't use asynio.gather here because callbacks must be run in sequence.
-        for event in events:
-            await event_callback_service.execute_callbacks(conversation_id, event)
+        # Callbacks are run for each event in sequence
+        await event_callback_service.batch_execute_callbacks(conversation_id, events)
 
 
 def _import_all_tools():
@@ -10,7 +10,7 @@ from __future__ import annotations
 import base64
 import os
 import pickle
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from enum import Enum
 from typing import Any
 
@@ -19,6 +19,11 @@ from openhands.controller.state.control_flags import (
     BudgetControlFlag,
     IterationControlFlag,
 )
+from openhands.controller.state.state_journal import (
+    LAZY_FIELDS,
+    UNSAVED_FIELDS,
+    StateJournal,
+)
 from openhands.core.logger import openhands_logger as logger
 from openhands.core.schema import AgentState
 from openhands.events.action import (
@@ -27,10 +32,13 @@ from openhands.events.action import (
 from openhands.events.action.agent import AgentFinishAction
 from openhands.events.event import Event, EventSource
 from openhands.llm.metrics import Metrics
-from openhands.memory.view import View
+from openhands.memory.view import View, ViewBuilder
 from openhands.server.services.conversation_stats import ConversationStats
 from openhands.storage.files import FileStore
-from openhands.storage.locations import get_conversation_agent_state_filename
+from openhands.storage.locations import (
+    get_conversation_agent_state_dir,
+    get_conversation_agent_state_filename,
+)
 
 RESUMABLE_STATES = [
     AgentState.RUNNING,
@@ -70,8 +78,8 @@ class State:
       - the last error encountered
 
     - Data for saving and restoring the agent:
-      - save to and restore from a session
-      - serialize with pickle and base64
+      - save to and restore from a session, as a journal of the changed fields
+      - restore the pickled states of earlier versions
 
     - Save / restore data about message history
       - start and end IDs for events in agent's history
@@ -129,29 +137,44 @@ class State:
     def save_to_session(
         self, sid: str, file_store: FileStore, user_id: str | None
     ) -> None:
-        conversation_stats = self.conversation_stats
-        self.conversation_stats = None  # Don't save conversation stats, handles itself
+        """Save the fields of the state which changed since the last save to its journal."""
+        journal = self.__dict__.get('_journal')
+        if (
+            journal is None
+            or journal.file_store is not file_store
+            or journal.dir != get_conversation_agent_state_dir(sid, user_id)
+        ):
+            # A new journal starts with a snapshot, which needs every lazy field
+            self._load_lazy_fields()
+            journal = StateJournal(file_store, sid, user_id)
+            self._journal = journal
 
-        pickled = pickle.dumps(self)
         logger.debug(f'Saving state to session {sid}:{self.agent_state}')
-        encoded = base64.b64encode(pickled).decode('utf-8')
         try:
-            file_store.write(
-                get_conversation_agent_state_filename(sid, user_id), encoded
+            journal.save(
+                {
+                    f.name: self.__dict__[f.name]
+                    for f in fields(self)
+                    if f.name not in UNSAVED_FIELDS and f.name in self.__dict__
+                }
             )
+        except Exception as e:
+            logger.error(f'Failed to save state to session: {e}')
+            raise e
 
-            # see if state is in the old directory on saas/remote use cases and delete it.
+        # Remove the pickled state of earlier versions, which would otherwise be
+        # restored if the journal were removed. Only once per journal.
+        if not journal.removed_legacy_files:
+            filenames = [get_conversation_agent_state_filename(sid, user_id)]
             if user_id:
-                filename = get_conversation_agent_state_filename(sid)
+                # see if state is in the old directory on saas/remote use cases
+                filenames.append(get_conversation_agent_state_filename(sid))
+            for filename in filenames:
                 try:
                     file_store.delete(filename)
                 except Exception:
                     pass
-        except Exception as e:
-            logger.error(f'Failed to save state to session: {e}')
-            raise e
-
-        self.conversation_stats = conversation_stats  # restore reference
+            journal.removed_legacy_files = True
 
     @staticmethod
     def restore_from_session(
@@ -160,23 +183,9 @@ class State:
         """Restores the state from the previously saved session."""
         state: State
         try:
-            encoded = file_store.read(
-                get_conversation_agent_state_filename(sid, user_id)
-            )
-            pickled = base64.b64decode(encoded)
-            state = pickle.loads(pickled)
+            state = State._restore_from_journal(sid, file_store, user_id)
         except FileNotFoundError:
-            # if user_id is provided, we are in a saas/remote use case
-            # and we need to check if the state is in the old directory.
-            if user_id:
-                filename = get_conversation_agent_state_filename(sid)
-                encoded = file_store.read(filename)
-                pickled = base64.b64decode(encoded)
-                state = pickle.loads(pickled)
-            else:
-                raise FileNotFoundError(
-                    f'Could not restore state from session file for sid: {sid}'
-                )
+            state = State._restore_from_pickle(sid, file_store, user_id)
         except Exception as e:
             logger.debug(f'Could not restore state from session: {e}')
             raise e
@@ -195,15 +204,71 @@ class State:
 
         return state
 
+    @staticmethod
+    def _restore_from_journal(
+        sid: str, file_store: FileStore, user_id: str | None
+    ) -> 'State':
+        journal = StateJournal(file_store, sid, user_id)
+        restored = journal.restore()
+        # Fields of other versions are ignored, and missing ones keep their defaults
+        init_fields = {f.name for f in fields(State) if f.init}
+        state = State(
+            **{name: value for name, value in restored.items() if name in init_fields}
+        )
+        for name in LAZY_FIELDS:
+            if journal.has_lazy_field(name):
+                # Loaded by __getattr__ when first used
+                del state.__dict__[name]
+        state._journal = journal
+        return state
+
+    @staticmethod
+    def _restore_from_pickle(
+        sid: str, file_store: FileStore, user_id: str | None
+    ) -> 'State':
+        """Restores the state saved by versions before the journal."""
+        try:
+            encoded = file_store.read(
+                get_conversation_agent_state_filename(sid, user_id)
+            )
+        except FileNotFoundError:
+            # if user_id is provided, we are in a saas/remote use case
+            # and we need to check if the state is in the old directory.
+            if not user_id:
+                raise FileNotFoundError(
+                    f'Could not restore state from session file for sid: {sid}'
+                )
+            encoded = file_store.read(get_conversation_agent_state_filename(sid))
+        return pickle.loads(base64.b64decode(encoded))
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes which are not set, such as lazy fields not yet
+        # loaded from the journal
+        journal = self.__dict__.get('_journal')
+        if name in LAZY_FIELDS and journal is not None:
+            value = journal.load_lazy_field(name)
+            self.__dict__[name] = value
+            return value
+        raise AttributeError(
+            f'{type(self).__name__!r} object has no attribute {name!r}'
+        )
+
+    def _load_lazy_fields(self) -> None:
+        for name in LAZY_FIELDS:
+            getattr(self, name)
+
     def __getstate__(self) -> dict:
         # don't pickle history, it will be restored from the event stream
+        self._load_lazy_fields()
         state = self.__dict__.copy()
+        state.pop('_journal', None)
         state['history'] = []
 
         # Remove any view caching attributes. They'll be rebuilt frmo the
         # history after that gets reloaded.
         state.pop('_history_checksum', None)
         state.pop('_view', None)
+        state.pop('_view_builder', None)
 
         # Remove deprecated fields before pickling
         state.pop('iteration', None)
@@ -304,15 +369,10 @@ class State:
 
     @property
     def view(self) -> View:
-        # Compute a simple checksum from the history to see if we can re-use any
-        # cached view.
-        history_checksum = len(self.history)
-        old_history_checksum = getattr(self, '_history_checksum', -1)
-
-        # If the history has changed, we need to re-create the view and update
-        # the caching.
-        if history_checksum != old_history_checksum:
-            self._history_checksum = history_checksum
-            self._view = View.from_events(self.history)
-
-        return self._view
+        # The builder only applies events appended since the last call, and
+        # rebuilds the view if the history was replaced.
+        view_builder = getattr(self, '_view_builder', None)
+        if view_builder is None:
+            view_builder = ViewBuilder()
+            self._view_builder = view_builder
+        return view_builder.update(self.history)
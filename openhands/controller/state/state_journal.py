@@ -0,0 +1,373 @@
+# IMPORTANT: LEGACY V0 CODE - Deprecated since version 1.0.0, scheduled for removal April 1, 2026
+# This file is part of the legacy (V0) implementation of OpenHands and will be removed soon as we complete the migration to V1.
+# OpenHands V1 uses the Software Agent SDK for the agentic core and runs a new application server. Please refer to:
+#   - V1 agentic core (SDK): https://github.com/OpenHands/software-agent-sdk
+#   - V1 application server (in this repo): openhands/app_server/
+# Unless you are working on deprecation, please avoid extending this legacy file and consult the V1 codepaths above.
+# Tag: Legacy-V0
+"""Journal of the state of an agent, saved as JSON records in the file store.
+
+Every SNAPSHOT_INTERVAL saves a snapshot of all the fields of the state is
+written, and on the saves in between a delta record of only the fields which
+changed, so a save is a small write rather than the whole state. The rarely used
+LAZY_FIELDS are written to files of their own when they change, and are only
+read when first used after a restore. The metrics, whose lists of entries grow
+with every call, are likewise written in full only with a snapshot, and in
+between as deltas of their totals and the entries added since.
+
+Values JSON can't represent are pickled, and fields the reading version doesn't
+know of are ignored, while fields it has but the journal lacks keep their
+defaults.
+"""
+
+from __future__ import annotations
+
+import base64
+import dataclasses
+import json
+import os
+import pickle
+import re
+from enum import Enum
+from typing import Any
+
+from openhands.controller.state.control_flags import (
+    BudgetControlFlag,
+    ControlFlag,
+    IterationControlFlag,
+)
+from openhands.core.logger import openhands_logger as logger
+from openhands.core.schema import AgentState
+from openhands.llm.metrics import ENTRY_KINDS, Metrics
+from openhands.storage.files import FileStore
+from openhands.storage.locations import get_conversation_agent_state_dir
+
+JOURNAL_VERSION = 1
+SNAPSHOT_INTERVAL = 50
+SNAPSHOT_FILENAME = 'snapshot.json'
+DELTA_FILENAME_PATTERN = re.compile(r'delta-(\d+)\.json')
+METRICS_DELTA_FILENAME_PATTERN = re.compile(r'metrics-delta-(\d+)\.json')
+# Fields written to files of their own, and read when first used after a restore.
+# State.__getattr__ loads them, so they must not have class level defaults.
+LAZY_FIELDS = ('metrics', 'extra_data')
+# Fields which are not journaled: the history is restored from the event stream,
+# conversation stats save themselves, and the rest are deprecated
+UNSAVED_FIELDS = (
+    'history',
+    'conversation_stats',
+    'iteration',
+    'local_iteration',
+    'max_iterations',
+    'traffic_control_state',
+    'local_metrics',
+    'delegates',
+)
+_CONTROL_FLAG_TYPES: dict[str, type[ControlFlag]] = {
+    cls.__name__: cls for cls in (IterationControlFlag, BudgetControlFlag)
+}
+_ENUM_FIELD_TYPES: dict[str, type[Enum]] = {
+    'agent_state': AgentState,
+    'resume_state': AgentState,
+}
+
+
+def encode_value(value: Any) -> Any:
+    """Encode a field value as JSON, pickling what JSON can't represent."""
+    if isinstance(value, Metrics):
+        return {'__metrics__': value.to_dict()}
+    if isinstance(value, ControlFlag):
+        return {
+            '__control_flag__': type(value).__name__,
+            'fields': dataclasses.asdict(value),
+        }
+    if isinstance(value, Enum):
+        return value.value
+    try:
+        json.dumps(value)
+        return value
+    except (TypeError, ValueError):
+        return {'__pickle__': base64.b64encode(pickle.dumps(value)).decode('ascii')}
+
+
+def decode_value(name: str, value: Any) -> Any:
+    if isinstance(value, dict):
+        if '__metrics__' in value:
+            return Metrics.from_dict(value['__metrics__'])
+        if '__control_flag__' in value:
+            return _CONTROL_FLAG_TYPES[value['__control_flag__']](**value['fields'])
+        if '__pickle__' in value:
+            return pickle.loads(base64.b64decode(value['__pickle__']))
+    if name in _ENUM_FIELD_TYPES and value is not None:
+        return _ENUM_FIELD_TYPES[name](value)
+    return value
+
+
+class StateJournal:
+    """Writes the journal of the state of a conversation, and reads it back.
+
+    The journal remembers what it last wrote or read, so a save only writes the
+    fields which changed since.
+    """
+
+    def __init__(
+        self,
+        file_store: FileStore,
+        sid: str,
+        user_id: str | None,
+        snapshot_interval: int | None = None,
+    ) -> None:
+        self.file_store = file_store
+        self.dir = get_conversation_agent_state_dir(sid, user_id)
+        self.snapshot_interval = snapshot_interval or SNAPSHOT_INTERVAL
+        # The sequence number of the last record, None until one is read or written
+        self._seq: int | None = None
+        self._deltas: list[str] = []
+        # The lazy fields which have a file
+        self._lazy_fields: set[str] = set()
+        # The JSON last written or read of each field, except the metrics
+        self._written: dict[str, str] = {}
+        # The metrics last written or read, with their entry counts and the JSON
+        # of their totals then, and the sequence numbers of their records
+        self._metrics: Metrics | None = None
+        self._metrics_counts: dict[str, int] = {}
+        self._metrics_totals: str | None = None
+        self._metrics_seq: int | None = None
+        self._metrics_deltas: list[str] = []
+        self._found_metrics_deltas: list[tuple[int, str]] = []
+        # Whether the pickled state of earlier versions was removed
+        self.removed_legacy_files = False
+
+    def save(self, fields: dict[str, Any]) -> None:
+        """Write the fields which changed since the last save.
+
+        Lazy fields missing from `fields` were never loaded, so are unchanged.
+        """
+        snapshot = self._seq is None or len(self._deltas) >= self.snapshot_interval
+        if 'metrics' in fields:
+            self._save_metrics(fields['metrics'], snapshot)
+        encoded = {
+            name: json.dumps(encode_value(value), sort_keys=True)
+            for name, value in fields.items()
+            if name != 'metrics'
+        }
+        changed = {
+            name: value
+            for name, value in encoded.items()
+            if self._written.get(name) != value
+        }
+        for name in LAZY_FIELDS:
+            if name in changed:
+                self.file_store.write(self._lazy_field_path(name), changed[name])
+                self._lazy_fields.add(name)
+
+        if snapshot:
+            self._write_snapshot(
+                {
+                    name: value
+                    for name, value in encoded.items()
+                    if name not in LAZY_FIELDS
+                }
+            )
+        else:
+            changed_fields = {
+                name: value
+                for name, value in changed.items()
+                if name not in LAZY_FIELDS
+            }
+            if changed_fields:
+                assert self._seq is not None
+                self._seq += 1
+                path = f'{self.dir}delta-{self._seq:08d}.json'
+                self.file_store.write(path, self._record(changed_fields, self._seq))
+                self._deltas.append(path)
+        self._written.update(changed)
+
+    def restore(self) -> dict[str, Any]:
+        """Read the fields of the state back, except for the lazy ones.
+
+        Raises FileNotFoundError if there is no journal.
+        """
+        snapshot = json.loads(self.file_store.read(self.dir + SNAPSHOT_FILENAME))
+        self._check_version(snapshot)
+        fields = snapshot['fields']
+        seq = snapshot['seq']
+        paths = self._list()
+        deltas = [
+            (delta_seq, path)
+            for delta_seq, path in self._find_deltas(paths)
+            if delta_seq > seq
+        ]
+        contents = self.file_store.read_many([path for _, path in deltas])
+        for (delta_seq, path), content in zip(deltas, contents):
+            if content is None:
+                continue
+            delta = json.loads(content)
+            self._check_version(delta)
+            fields.update(delta['fields'])
+            seq = delta_seq
+            self._deltas.append(path)
+        self._seq = seq
+        self._lazy_fields = {
+            name for name in LAZY_FIELDS if self._lazy_field_path(name) in paths
+        }
+        self._found_metrics_deltas = self._find_deltas(
+            paths, METRICS_DELTA_FILENAME_PATTERN
+        )
+        self._written = {
+            name: json.dumps(value, sort_keys=True) for name, value in fields.items()
+        }
+        return {name: decode_value(name, value) for name, value in fields.items()}
+
+    def has_lazy_field(self, name: str) -> bool:
+        """Whether the restored journal has a value of the lazy field."""
+        return name in self._lazy_fields
+
+    def load_lazy_field(self, name: str) -> Any:
+        if name == 'metrics':
+            return self._load_metrics()
+        content = self.file_store.read(self._lazy_field_path(name))
+        self._written[name] = content
+        return decode_value(name, json.loads(content))
+
+    def _save_metrics(self, metrics: Metrics, snapshot: bool) -> None:
+        counts = {kind: metrics.entry_count(kind) for kind in ENTRY_KINDS}
+        # Entries can only be appended to the metrics last written, and while
+        # none were removed
+        if self._metrics is metrics and all(
+            counts[kind] >= self._metrics_counts.get(kind, 0) for kind in ENTRY_KINDS
+        ):
+            delta = metrics.to_delta_dict(self._metrics_counts)
+            totals = self._encode_metrics_totals(delta)
+            if counts == self._metrics_counts and totals == self._metrics_totals:
+                return
+            if not snapshot and len(self._metrics_deltas) < self.snapshot_interval:
+                assert self._metrics_seq is not None
+                self._metrics_seq += 1
+                path = f'{self.dir}metrics-delta-{self._metrics_seq:08d}.json'
+                self.file_store.write(
+                    path,
+                    self._record(
+                        {'metrics': json.dumps(delta, sort_keys=True)},
+                        self._metrics_seq,
+                    ),
+                )
+                self._metrics_deltas.append(path)
+                self._metrics_counts = counts
+                self._metrics_totals = totals
+                return
+
+        stale_deltas = self._metrics_deltas
+        if self._metrics_seq is None:
+            # The metrics must follow any deltas left by an earlier journal
+            found = self._find_deltas(self._list(), METRICS_DELTA_FILENAME_PATTERN)
+            stale_deltas = [path for _, path in found]
+            self._metrics_seq = found[-1][0] if found else 0
+        self.file_store.write(
+            self._lazy_field_path('metrics'),
+            self._record(
+                {'metrics': json.dumps(encode_value(metrics), sort_keys=True)},
+                self._metrics_seq,
+            ),
+        )
+        self._lazy_fields.add('metrics')
+        self._metrics = metrics
+        self._metrics_counts = counts
+        self._metrics_totals = self._encode_metrics_totals(
+            metrics.to_delta_dict(counts)
+        )
+        self._metrics_deltas = []
+        self._delete_stale(stale_deltas)
+
+    def _load_metrics(self) -> Metrics:
+        record = json.loads(self.file_store.read(self._lazy_field_path('metrics')))
+        self._check_version(record)
+        metrics = decode_value('metrics', record['fields']['metrics'])
+        seq = record['seq']
+        deltas = [
+            (delta_seq, path)
+            for delta_seq, path in self._found_metrics_deltas
+            if delta_seq > seq
+        ]
+        contents = self.file_store.read_many([path for _, path in deltas])
+        for (delta_seq, path), content in zip(deltas, contents):
+            if content is None:
+                continue
+            delta = json.loads(content)
+            self._check_version(delta)
+            metrics.apply_delta_dict(delta['fields']['metrics'])
+            seq = delta_seq
+            self._metrics_deltas.append(path)
+        self._metrics = metrics
+        self._metrics_seq = seq
+        self._metrics_counts = {kind: metrics.entry_count(kind) for kind in ENTRY_KINDS}
+        self._metrics_totals = self._encode_metrics_totals(
+            metrics.to_delta_dict(self._metrics_counts)
+        )
+        return metrics
+
+    @staticmethod
+    def _encode_metrics_totals(delta: dict) -> str:
+        return json.dumps(
+            {name: value for name, value in delta.items() if name not in ENTRY_KINDS},
+            sort_keys=True,
+        )
+
+    def _write_snapshot(self, fields: dict[str, str]) -> None:
+        stale_deltas = self._deltas
+        if self._seq is None:
+            # The snapshot must follow any deltas left by an earlier journal
+            found = self._find_deltas(self._list())
+            stale_deltas = [path for _, path in found]
+            self._seq = found[-1][0] if found else -1
+        self._seq += 1
+        self.file_store.write(
+            self.dir + SNAPSHOT_FILENAME, self._record(fields, self._seq)
+        )
+        self._deltas = []
+        self._delete_stale(stale_deltas)
+
+    def _delete_stale(self, paths: list[str]) -> None:
+        # Deltas before what replaced them are ignored, so removing them is only
+        # tidying
+        for path in paths:
+            try:
+                self.file_store.delete(path)
+            except Exception as e:
+                logger.debug(f'Failed to delete state journal delta {path}: {e}')
+
+    @staticmethod
+    def _record(fields: dict[str, str], seq: int) -> str:
+        encoded_fields = ', '.join(
+            f'{json.dumps(name)}: {value}' for name, value in fields.items()
+        )
+        return (
+            f'{{"version": {JOURNAL_VERSION}, "seq": {seq}, '
+            f'"fields": {{{encoded_fields}}}}}'
+        )
+
+    def _list(self) -> list[str]:
+        try:
+            return self.file_store.list(self.dir)
+        except FileNotFoundError:
+            return []
+
+    @staticmethod
+    def _find_deltas(
+        paths: list[str], pattern: re.Pattern = DELTA_FILENAME_PATTERN
+    ) -> list[tuple[int, str]]:
+        deltas = []
+        for path in paths:
+            match = pattern.fullmatch(os.path.basename(path))
+            if match:
+                deltas.append((int(match.group(1)), path))
+        return sorted(deltas)
+
+    def _lazy_field_path(self, name: str) -> str:
+        return f'{self.dir}{name}.json'
+
+    @staticmethod
+    def _check_version(record: dict) -> None:
+        if record.get('version', 0) > JOURNAL_VERSION:
+            raise ValueError(
+                f'State journal version {record["version"]} is newer than the supported version {JOURNAL_VERSION}'
+            )
@@ -55,6 +55,7 @@ class LLMConfig(BaseModel):
         safety_settings: Safety settings for models that support them (like Mistral AI and Gemini).
         for_routing: Whether this LLM is used for routing. This is set to True for models used in conjunction with the main LLM in the model routing feature.
         completion_kwargs: Custom kwargs to pass to litellm.completion.
+        metrics_max_entries: Keep only this many of the most recent cost, latency and token usage entries in the metrics, with running totals and quantiles of the rest. None keeps them all.
     """
 
     model: str = Field(default='claude-opus-4-5-20251101')
@@ -108,6 +109,7 @@ class LLMConfig(BaseModel):
         default=None,
         description='Custom kwargs to pass to litellm.completion',
     )
+    metrics_max_entries: int | None = Field(default=None, gt=0)
 
     model_config = ConfigDict(extra='forbid')
 
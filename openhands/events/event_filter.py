@@ -77,13 +77,16 @@ class EventFilter:
 
         # Text search in event content if query provided
         if self.query:
-            event_dict = event_to_dict(event)
-            event_str = json.dumps(event_dict).lower()
-            if self.query.lower() not in event_str:
+            if self.query.lower() not in self.searchable_text(event):
                 return False
 
         return True
 
+    @staticmethod
+    def searchable_text(event: Event) -> str:
+        """The lowercase text of an event that `query` is matched against."""
+        return json.dumps(event_to_dict(event)).lower()
+
     def exclude(self, event: Event) -> bool:
         """Determine if an event should be excluded based on the filter criteria.
 
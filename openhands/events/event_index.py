@@ -0,0 +1,111 @@
+"""In-memory inverted index used to answer `EventFilter.query` searches.
+
+`EventFilter` matches a query as a case-insensitive substring of an event's JSON.
+The index maps each word (maximal run of word characters) of that JSON to the ids
+of the events containing it. A query substring constrains the words of a matching
+event: words wholly inside the query must appear exactly, while the words at
+either end of the query may be cut off, so they need only end with / start with
+(or, for a single word query, contain) the query's words. The ids satisfying all
+these constraints are a superset of the matches, and are verified with
+`EventFilter.include`.
+"""
+
+import os
+import re
+import threading
+from array import array
+from typing import Iterable
+
+from openhands.events.event import Event
+from openhands.events.event_filter import EventFilter
+
+_WORD_PATTERN = re.compile(r'\w+')
+# Maximum number of (word, event id) pairs an index holds
+MAX_POSTINGS = int(os.getenv('EVENT_SEARCH_INDEX_MAX_POSTINGS', '1000000'))
+
+
+class EventSearchIndex:
+    """Maps words to the ids of the events containing them.
+
+    Events are indexed from `start_id` as they are added. They may be added out of
+    order, but only the ids below `end_id`, up to which all events are indexed,
+    are narrowed down by `candidate_ids`. Once the index holds `max_postings`
+    event ids it stops growing, and later events are scanned instead.
+    """
+
+    def __init__(self, start_id: int, max_postings: int = MAX_POSTINGS):
+        self.start_id = start_id
+        self.end_id = start_id
+        self.max_postings = max_postings
+        self.full = False
+        self._num_postings = 0
+        # Ids above end_id which are already indexed
+        self._indexed_ahead: set[int] = set()
+        self._postings: dict[str, array] = {}
+        self._lock = threading.Lock()
+
+    def add(self, event: Event) -> None:
+        if self.full or event.id < self.start_id:
+            return
+        words = set(_WORD_PATTERN.findall(EventFilter.searchable_text(event)))
+        with self._lock:
+            if self.full or event.id < self.end_id or event.id in self._indexed_ahead:
+                return
+            if self._num_postings + len(words) > self.max_postings:
+                self.full = True
+                self._indexed_ahead.clear()
+                return
+            for word in words:
+                postings = self._postings.get(word)
+                if postings is None:
+                    postings = self._postings[word] = array('q')
+                postings.append(event.id)
+            self._num_postings += len(words)
+            self._indexed_ahead.add(event.id)
+            while self.end_id in self._indexed_ahead:
+                self._indexed_ahead.remove(self.end_id)
+                self.end_id += 1
+
+    def candidates(self, query: str) -> set[int] | None:
+        """Get the ids of indexed events which may contain the query.
+
+        Returns None if the query has no words, and so cannot be narrowed down.
+        """
+        query = query.lower()
+        matches = list(_WORD_PATTERN.finditer(query))
+        if not matches:
+            return None
+        result: set[int] | None = None
+        with self._lock:
+            for match in matches:
+                word = match.group()
+                open_start = match.start() == 0
+                open_end = match.end() == len(query)
+                ids = self._ids_for(word, open_start, open_end)
+                result = ids if result is None else result & ids
+                if not result:
+                    break
+        return result
+
+    def candidate_ids(self, query: str, ids: Iterable[int]) -> Iterable[int]:
+        """Filter `ids` down to those which are not indexed or may contain the query."""
+        candidates = self.candidates(query)
+        if candidates is None:
+            return ids
+        start_id, end_id = self.start_id, self.end_id
+        return (id for id in ids if id in candidates or id < start_id or id >= end_id)
+
+    def _ids_for(self, word: str, open_start: bool, open_end: bool) -> set[int]:
+        if not open_start and not open_end:
+            return set(self._postings.get(word, ()))
+        ids: set[int] = set()
+        for indexed_word, postings in self._postings.items():
+            if open_start and open_end:
+                matched = word in indexed_word
+            elif open_start:
+                matched = indexed_word.endswith(word)
+            else:
+                matched = indexed_word.startswith(word)
+            if matched:
+                ids.update(postings)
+        return ids
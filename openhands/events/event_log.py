@@ -0,0 +1,350 @@
+"""Segmented, append-only storage for conversation events.
+
+Instead of one file per event plus a second copy in ``event_cache`` pages, events
+are appended as compact JSON lines to fixed-size segments under ``event_log/``:
+
+    event_log/{start}-{end}.jsonl  one event per line for ids start .. end - 1
+    event_log/{start}-{end}.idx    fixed-width byte offset of each line
+
+Because an event's segment and line are derived from its id, and index entries are
+fixed width, a single event can be located with two seeks on a local file store.
+Other file stores have no partial reads or appends, so the open segment is
+rewritten on each append and whole segments are read (and cached once sealed) on
+lookup. That makes each append cost as much as the open segment, so event stores
+only start segmented logs on local file stores.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import BinaryIO
+
+from openhands.core.logger import openhands_logger as logger
+from openhands.storage.files import FileStore
+from openhands.storage.local import LocalFileStore
+from openhands.storage.locations import get_conversation_event_log_dir
+
+DEFAULT_SEGMENT_SIZE = 1000
+DEFAULT_FSYNC_INTERVAL = 32
+
+# 12 digit zero padded byte offset followed by a newline
+_INDEX_ENTRY_WIDTH = 13
+_MAX_CACHED_SEGMENTS = 4
+# Placeholder for ids that have no event (e.g. gaps in a migrated conversation)
+_MISSING_EVENT_LINE = 'null\n'
+
+
+class SegmentedEventLog:
+    """Append-only JSONL segments with a fixed-width offset index per segment.
+
+    The segment size of an existing log is taken from its segment names, so
+    `segment_size` only applies to logs that have not been written yet. Local
+    stores are fsynced every `fsync_interval` appends and when a segment is sealed.
+    """
+
+    def __init__(
+        self,
+        sid: str,
+        file_store: FileStore,
+        user_id: str | None = None,
+        segment_size: int = DEFAULT_SEGMENT_SIZE,
+        fsync_interval: int = DEFAULT_FSYNC_INTERVAL,
+    ):
+        self.sid = sid
+        self.file_store = file_store
+        self.user_id = user_id
+        self.segment_size = segment_size
+        self.fsync_interval = fsync_interval
+        self.log_dir = get_conversation_event_log_dir(sid, user_id)
+        self._local = isinstance(file_store, LocalFileStore)
+        self._lock = threading.Lock()
+        self._segment_cache: OrderedDict[int, list[str]] = OrderedDict()
+
+        # State of the open (last) segment, loaded lazily on first use
+        self._tail_start: int | None = None
+        self._tail_count = 0
+        self._tail_size = 0
+        self._writing = False
+        # Only used for non local stores, which rewrite the open segment on append
+        self._tail_lines: list[str] = []
+        self._tail_index: list[str] = []
+        # Only used for local stores
+        self._data_file: BinaryIO | None = None
+        self._index_file: BinaryIO | None = None
+        self._unsynced = 0
+
+    @property
+    def appends_in_place(self) -> bool:
+        """Whether appends write only the new event, rather than the open segment."""
+        return self._local
+
+    def exists(self) -> bool:
+        try:
+            return bool(self.file_store.list(self.log_dir))
+        except FileNotFoundError:
+            return False
+
+    def segment_start(self, id: int) -> int:
+        with self._lock:
+            self._load_layout()
+        return id - id % self.segment_size
+
+    def next_id(self) -> int:
+        with self._lock:
+            self._load_layout()
+            assert self._tail_start is not None
+            return self._tail_start + self._tail_count
+
+    def append(self, id: int, event_json: str) -> None:
+        """Append a serialized event. Ids must be appended in increasing order."""
+        with self._lock:
+            self._append(id, event_json)
+            if not self._local:
+                self._write_tail()
+
+    def append_many(self, events: list[tuple[int, str]]) -> None:
+        """Append several serialized events, writing each segment once."""
+        with self._lock:
+            for id, event_json in events:
+                self._append(id, event_json)
+            if self._local:
+                self._sync()
+            else:
+                self._write_tail()
+
+    def read_event(self, id: int) -> dict:
+        start = self.segment_start(id)
+        local_index = id - start
+        line: str | None
+        if self._local:
+            line = self._read_line_local(start, local_index)
+        else:
+            with self._lock:
+                lines = self._read_segment_lines(start)
+            line = lines[local_index] if local_index < len(lines) else None
+        data = json.loads(line) if line else None
+        if data is None:
+            raise FileNotFoundError(f'Event {id} not found in {self.log_dir}')
+        return data
+
+    def read_segment(self, start: int) -> list[dict | None]:
+        """Read all events of the segment beginning at `start`. Missing ids are None."""
+        with self._lock:
+            self._load_layout()
+            lines = self._read_segment_lines(start)
+        return [json.loads(line) for line in lines]
+
+    def flush(self) -> None:
+        with self._lock:
+            self._sync()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_tail_files()
+
+    def _data_path(self, start: int) -> str:
+        return f'{self.log_dir}{start}-{start + self.segment_size}.jsonl'
+
+    def _index_path(self, start: int) -> str:
+        return f'{self.log_dir}{start}-{start + self.segment_size}.idx'
+
+    def _list_segments(self) -> list[tuple[int, int]]:
+        try:
+            paths = self.file_store.list(self.log_dir)
+        except FileNotFoundError:
+            return []
+        segments = set()
+        for path in paths:
+            name = path.rstrip('/').split('/')[-1]
+            if not name.endswith('.idx'):
+                continue
+            try:
+                start, end = name.removesuffix('.idx').split('-')
+                segments.add((int(start), int(end)))
+            except ValueError:
+                logger.warning(f'Unexpected file in event log: {path}')
+        return sorted(segments)
+
+    def _load_layout(self) -> None:
+        """Find the open segment and count its committed events, without modifying anything."""
+        if self._tail_start is not None:
+            return
+        segments = self._list_segments()
+        if not segments:
+            self._tail_start = 0
+            return
+        start, end = segments[-1]
+        self.segment_size = end - start
+        if self._local:
+            index_path = self._full_path(self._index_path(start))
+            self._tail_count = os.path.getsize(index_path) // _INDEX_ENTRY_WIDTH
+        else:
+            self._tail_lines = self._read_segment_lines(start)
+            for line in self._tail_lines:
+                self._tail_index.append(f'{self._tail_size:012d}\n')
+                self._tail_size += len(line.encode('utf-8'))
+            self._tail_count = len(self._tail_lines)
+        self._tail_start = start
+        if self._tail_count >= self.segment_size:
+            self._seal_tail()
+
+    def _prepare_for_append(self) -> None:
+        self._load_layout()
+        if self._writing:
+            return
+        self._writing = True
+        if self._local and self._tail_count:
+            self._recover_local_tail()
+
+    def _recover_local_tail(self) -> None:
+        """Drop a torn final write left in the open segment by a crashed writer."""
+        assert self._tail_start is not None
+        data_path = self._full_path(self._data_path(self._tail_start))
+        index_path = self._full_path(self._index_path(self._tail_start))
+        count = self._tail_count
+        with open(index_path, 'rb') as f:
+            f.seek((count - 1) * _INDEX_ENTRY_WIDTH)
+            last_offset = int(f.read(_INDEX_ENTRY_WIDTH))
+        with open(data_path, 'rb') as f:
+            f.seek(last_offset)
+            last_line = f.readline()
+        if last_line.endswith(b'\n'):
+            size = last_offset + len(last_line)
+        else:
+            count -= 1
+            size = last_offset
+        if os.path.getsize(data_path) != size:
+            logger.warning(
+                f'Truncating partially written event log segment: {data_path}',
+                extra={'session_id': self.sid, 'user_id': self.user_id},
+            )
+            os.truncate(data_path, size)
+        os.truncate(index_path, count * _INDEX_ENTRY_WIDTH)
+        self._tail_count = count
+        self._tail_size = size
+
+    def _append(self, id: int, event_json: str) -> None:
+        self._prepare_for_append()
+        assert self._tail_start is not None
+        next_id = self._tail_start + self._tail_count
+        if id < next_id:
+            raise ValueError(
+                f'Event {id} is already in the event log (next id is {next_id})'
+            )
+        for _ in range(id - next_id):
+            self._append_line(_MISSING_EVENT_LINE)
+        self._append_line(event_json + '\n')
+
+    def _append_line(self, line: str) -> None:
+        if self._tail_count >= self.segment_size:
+            if not self._local:
+                self._write_tail()
+            self._seal_tail()
+        entry = f'{self._tail_size:012d}\n'
+        encoded = line.encode('utf-8')
+        if self._local:
+            if self._data_file is None or self._index_file is None:
+                self._open_tail_files()
+            assert self._data_file is not None and self._index_file is not None
+            # Data first, so that an index entry never points past the data file
+            self._data_file.write(encoded)
+            self._data_file.flush()
+            self._index_file.write(entry.encode('utf-8'))
+            self._index_file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_interval:
+                self._sync()
+        else:
+            self._tail_lines.append(line)
+            self._tail_index.append(entry)
+        self._tail_count += 1
+        self._tail_size += len(encoded)
+
+    def _write_tail(self) -> None:
+        assert self._tail_start is not None
+        if not self._tail_lines:
+            return
+        self.file_store.write(
+            self._data_path(self._tail_start), ''.join(self._tail_lines)
+        )
+        self.file_store.write(
+            self._index_path(self._tail_start), ''.join(self._tail_index)
+        )
+
+    def _seal_tail(self) -> None:
+        assert self._tail_start is not None
+        self._close_tail_files()
+        self._tail_start += self.segment_size
+        self._tail_count = 0
+        self._tail_size = 0
+        self._tail_lines = []
+        self._tail_index = []
+
+    def _full_path(self, path: str) -> str:
+        assert isinstance(self.file_store, LocalFileStore)
+        return self.file_store.get_full_path(path)
+
+    def _open_tail_files(self) -> None:
+        assert self._tail_start is not None
+        data_path = self._full_path(self._data_path(self._tail_start))
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        self._data_file = open(data_path, 'ab')
+        self._index_file = open(
+            self._full_path(self._index_path(self._tail_start)), 'ab'
+        )
+
+    def _sync(self) -> None:
+        if self._unsynced == 0:
+            return
+        for f in (self._data_file, self._index_file):
+            if f is not None:
+                f.flush()
+                os.fsync(f.fileno())
+        self._unsynced = 0
+
+    def _close_tail_files(self) -> None:
+        self._sync()
+        for f in (self._data_file, self._index_file):
+            if f is not None:
+                f.close()
+        self._data_file = None
+        self._index_file = None
+
+    def _read_line_local(self, start: int, local_index: int) -> str | None:
+        try:
+            with open(self._full_path(self._index_path(start)), 'rb') as f:
+                f.seek(local_index * _INDEX_ENTRY_WIDTH)
+                entry = f.read(_INDEX_ENTRY_WIDTH)
+            if len(entry) < _INDEX_ENTRY_WIDTH:
+                return None
+            with open(self._full_path(self._data_path(start)), 'rb') as f:
+                f.seek(int(entry))
+                line = f.readline()
+        except FileNotFoundError:
+            return None
+        if not line.endswith(b'\n'):
+            return None
+        return line.decode('utf-8')
+
+    def _read_segment_lines(self, start: int) -> list[str]:
+        if self._writing and start == self._tail_start and not self._local:
+            return list(self._tail_lines)
+        lines = self._segment_cache.get(start)
+        if lines is not None:
+            self._segment_cache.move_to_end(start)
+            return lines
+        try:
+            index = self.file_store.read(self._index_path(start))
+            content = self.file_store.read(self._data_path(start))
+        except FileNotFoundError:
+            return []
+        # Only lines with a complete index entry are committed
+        count = len(index) // _INDEX_ENTRY_WIDTH
+        lines = [line + '\n' for line in content.split('\n')[:count]]
+        if len(lines) == self.segment_size:
+            # Sealed segments never change, so they are safe to cache
+            self._segment_cache[start] = lines
+            if len(self._segment_cache) > _MAX_CACHED_SEGMENTS:
+                self._segment_cache.popitem(last=False)
+        return lines
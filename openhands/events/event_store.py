@@ -1,12 +1,16 @@
 import json
+import os
 from dataclasses import dataclass
+from itertools import groupby
 from typing import Iterable
 
 from openhands.core.logger import openhands_logger as logger
 from openhands.events.event import Event, EventSource
 from openhands.events.event_filter import EventFilter
+from openhands.events.event_index import EventSearchIndex
+from openhands.events.event_log import DEFAULT_SEGMENT_SIZE, SegmentedEventLog
 from openhands.events.event_store_abc import EventStoreABC
-from openhands.events.serialization.event import event_from_dict
+from openhands.events.serialization.event import event_from_dict, event_to_dict
 from openhands.storage.files import FileStore
 from openhands.storage.locations import (
     get_conversation_dir,
@@ -15,10 +19,16 @@ from openhands.storage.locations import (
 )
 from openhands.utils.shutdown_listener import should_continue
 
+# Whether conversations with no stored events yet use the segmented event log
+SEGMENTED_EVENT_LOG_DEFAULT = os.getenv('EVENT_LOG_SEGMENTED', 'false').lower() in (
+    'true',
+    '1',
+)
+
 
 @dataclass(frozen=True)
 class _CachePage:
-    events: list[dict] | None
+    events: list[dict | None] | None
     start: int
     end: int
 
@@ -29,26 +39,40 @@ class _CachePage:
             return False
         return True
 
+    def has_event(self, global_index: int) -> bool:
+        if not self.events or not self.covers(global_index):
+            return False
+        return self.events[global_index - self.start] is not None
+
     def get_event(self, global_index: int) -> Event | None:
         # If there was not actually a cached page, return None
-        if not self.events:
+        if not self.events or not self.covers(global_index):
             return None
         local_index = global_index - self.start
-        return event_from_dict(self.events[local_index])
-
-
-_DUMMY_PAGE = _CachePage(None, 1, -1)
+        data = self.events[local_index]
+        if data is None:
+            return None
+        return event_from_dict(data)
 
 
 @dataclass
 class EventStore(EventStoreABC):
-    """A stored list of events backing a conversation"""
+    """A stored list of events backing a conversation
+
+    Events are stored either one file per event (plus cache pages), or in a
+    SegmentedEventLog. `use_segmented_log=None` detects the layout from storage,
+    falling back to SEGMENTED_EVENT_LOG_DEFAULT for conversations without events.
+    New segmented logs are only started on local file stores.
+    """
 
     sid: str
     file_store: FileStore
     user_id: str | None
     cache_size: int = 25
+    use_segmented_log: bool | None = None
     _cur_id: int | None = None  # Private field to cache the calculated value
+    _event_log: SegmentedEventLog | None = None
+    _search_index: EventSearchIndex | None = None
 
     @property
     def cur_id(self) -> int:
@@ -62,8 +86,46 @@ class EventStore(EventStoreABC):
         """Setter for cur_id to allow updates."""
         self._cur_id = value
 
+    def _get_event_log(self) -> SegmentedEventLog | None:
+        if self._event_log is not None or self.use_segmented_log is False:
+            return self._event_log
+        event_log = SegmentedEventLog(self.sid, self.file_store, self.user_id)
+        if self.use_segmented_log is None:
+            if event_log.exists():
+                self.use_segmented_log = True
+            elif self._has_legacy_events():
+                self.use_segmented_log = False
+            else:
+                self.use_segmented_log = (
+                    SEGMENTED_EVENT_LOG_DEFAULT and event_log.appends_in_place
+                )
+        elif (
+            self.use_segmented_log
+            and not event_log.appends_in_place
+            and not event_log.exists()
+        ):
+            logger.warning(
+                f'Not starting a segmented event log for {self.sid}: '
+                f'{type(self.file_store).__name__} cannot append in place'
+            )
+            self.use_segmented_log = False
+        if self.use_segmented_log:
+            self._event_log = event_log
+        return self._event_log
+
+    def _has_legacy_events(self) -> bool:
+        try:
+            events_dir = get_conversation_events_dir(self.sid, self.user_id)
+            return bool(self.file_store.list(events_dir))
+        except FileNotFoundError:
+            return False
+
     def _calculate_cur_id(self) -> int:
         """Calculate the current event ID based on file system content."""
+        event_log = self._get_event_log()
+        if event_log is not None:
+            return event_log.next_id()
+
         events = []
         try:
             events_dir = get_conversation_events_dir(self.sid, self.user_id)
@@ -115,27 +177,52 @@ class EventStore(EventStoreABC):
         else:
             step = 1
 
-        cache_page = _DUMMY_PAGE
+        indices: Iterable[int] = range(start_id, end_id, step)
+        if filter is not None and filter.query and self._search_index is not None:
+            # Only load events which may match the query
+            indices = self._search_index.candidate_ids(filter.query, indices)
+
+        event_log = self._get_event_log()
         num_results = 0
-        for index in range(start_id, end_id, step):
+        for _, page_group in groupby(indices, key=self._get_page_start):
+            page_indices = list(page_group)
             if not should_continue():
                 return
-            if not cache_page.covers(index):
-                cache_page = self._load_cache_page_for_index(index)
-            event = cache_page.get_event(index)
-            if event is None:
-                try:
-                    event = self.get_event(index)
-                except FileNotFoundError:
-                    event = None
-            if event:
-                if not filter or filter.include(event):
-                    yield event
-                    num_results += 1
-                    if limit and limit <= num_results:
-                        return
+            cache_page = self._load_cache_page_for_index(page_indices[0])
+            read_ahead: dict[int, Event] = {}
+            for position, index in enumerate(page_indices):
+                if not should_continue():
+                    return
+                event = cache_page.get_event(index)
+                if event is None and event_log is None:
+                    if index not in read_ahead:
+                        # Read this and the following uncached events of the page
+                        # at once, but no more than could still be returned
+                        uncached = [
+                            i
+                            for i in page_indices[position:]
+                            if not cache_page.has_event(i)
+                        ]
+                        if limit:
+                            uncached = uncached[: limit - num_results]
+                        read_ahead = self._read_events(uncached)
+                    event = read_ahead.get(index)
+                elif event is None:
+                    try:
+                        event = self.get_event(index)
+                    except FileNotFoundError:
+                        event = None
+                if event:
+                    if not filter or filter.include(event):
+                        yield event
+                        num_results += 1
+                        if limit and limit <= num_results:
+                            return
 
     def get_event(self, id: int) -> Event:
+        event_log = self._get_event_log()
+        if event_log is not None:
+            return event_from_dict(event_log.read_event(id))
         filename = self._get_filename_for_id(id, self.user_id)
         content = self.file_store.read(filename)
         data = json.loads(content)
@@ -158,6 +245,16 @@ class EventStore(EventStoreABC):
     def _get_filename_for_cache(self, start: int, end: int) -> str:
         return f'{get_conversation_dir(self.sid, self.user_id)}event_cache/{start}-{end}.json'
 
+    def _read_events(self, ids: list[int]) -> dict[int, Event]:
+        """Read the files of the events given concurrently, skipping missing events."""
+        filenames = [self._get_filename_for_id(id, self.user_id) for id in ids]
+        contents = self.file_store.read_many(filenames)
+        return {
+            id: event_from_dict(json.loads(content))
+            for id, content in zip(ids, contents)
+            if content is not None
+        }
+
     def _load_cache_page(self, start: int, end: int) -> _CachePage:
         """Read a page from the cache. Reading individual events is slow when there are a lot of them, so we use pages."""
         cache_filename = self._get_filename_for_cache(start, end)
@@ -169,7 +266,21 @@ class EventStore(EventStoreABC):
         page = _CachePage(events, start, end)
         return page
 
+    def _get_page_start(self, index: int) -> int:
+        event_log = self._get_event_log()
+        if event_log is not None:
+            return event_log.segment_start(index)
+        return index - index % self.cache_size
+
     def _load_cache_page_for_index(self, index: int) -> _CachePage:
+        event_log = self._get_event_log()
+        if event_log is not None:
+            # Segments double as cache pages
+            start = event_log.segment_start(index)
+            events = event_log.read_segment(start)
+            if not events:
+                return _CachePage(None, start, start + event_log.segment_size)
+            return _CachePage(events, start, start + len(events))
         offset = index % self.cache_size
         index -= offset
         return self._load_cache_page(index, index + self.cache_size)
@@ -181,3 +292,47 @@ class EventStore(EventStoreABC):
         except ValueError:
             logger.warning(f'get id from filename ({filename}) failed.')
             return -1
+
+
+def migrate_to_segmented_log(
+    sid: str,
+    file_store: FileStore,
+    user_id: str | None = None,
+    segment_size: int = DEFAULT_SEGMENT_SIZE,
+    remove_legacy_files: bool = True,
+) -> int:
+    """Compact a conversation stored as one file per event into a segmented event log.
+
+    Only local file stores are supported. Legacy event files and cache pages are only removed once every event has been
+    written to the log. Returns the number of events migrated.
+    """
+    event_log = SegmentedEventLog(sid, file_store, user_id, segment_size=segment_size)
+    if not event_log.appends_in_place:
+        raise ValueError(
+            f'Segmented event logs need a local file store, not '
+            f'{type(file_store).__name__}'
+        )
+    if event_log.exists():
+        logger.info(f'Conversation {sid} already uses a segmented event log')
+        return 0
+    legacy_store = EventStore(sid, file_store, user_id, use_segmented_log=False)
+    batch: list[tuple[int, str]] = []
+    num_events = 0
+    for event in legacy_store.search_events():
+        data = event_to_dict(event)
+        batch.append((data['id'], json.dumps(data)))
+        if len(batch) >= segment_size:
+            event_log.append_many(batch)
+            num_events += len(batch)
+            batch = []
+    if batch:
+        event_log.append_many(batch)
+        num_events += len(batch)
+    event_log.close()
+
+    if remove_legacy_files:
+        conversation_dir = get_conversation_dir(sid, user_id)
+        file_store.delete(get_conversation_events_dir(sid, user_id))
+        file_store.delete(f'{conversation_dir}event_cache/')
+    logger.info(f'Migrated {num_events} events of conversation {sid} to segments')
+    return num_events
@@ -0,0 +1,76 @@
+import re
+from typing import Any, Iterable
+
+SECRET_PLACEHOLDER = '<secret_hidden>'
+
+# Fields that should not have secrets replaced (only at top level - system metadata)
+TOP_LEVEL_PROTECTED_FIELDS = frozenset(
+    {
+        'timestamp',
+        'id',
+        'source',
+        'cause',
+        'action',
+        'observation',
+        'message',
+    }
+)
+
+
+class SecretRedactor:
+    """Replaces secret values in serialized events with a placeholder.
+
+    Short strings are redacted with a single regex matching all secrets, which
+    avoids a Python level loop over the secrets for each field. CPython's regex
+    engine tries every alternative at every position though, while `str.replace`
+    uses a fast substring search, so longer strings are searched for each secret
+    in turn. Strings shorter than the shortest secret are skipped entirely.
+    """
+
+    def __init__(self, secrets: Iterable[str] = ()):
+        # Longest first, so that a secret containing another is hidden whole
+        self.secrets = sorted(
+            {secret for secret in secrets if secret}, key=len, reverse=True
+        )
+        self._min_length = len(self.secrets[-1]) if self.secrets else 0
+        # Measured crossover between one regex pass and a search per secret
+        self._regex_max_length = 4 * len(self.secrets)
+        self._pattern = re.compile('|'.join(re.escape(s) for s in self.secrets))
+        # Replacing one secret at a time would hide parts of the placeholders
+        # inserted for earlier secrets, so such secrets are always replaced by regex
+        self._always_regex = any(
+            secret in SECRET_PLACEHOLDER for secret in self.secrets
+        )
+
+    def redact(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Replace secrets in the string values of `data`, including nested dicts
+        and lists. Top level system fields are left unchanged."""
+        if not self.secrets:
+            return data
+        return self._redact_dict(data, is_top_level=True)
+
+    def redact_text(self, text: str) -> str:
+        if len(text) < self._min_length:
+            return text
+        if self._always_regex or len(text) <= self._regex_max_length:
+            return self._pattern.sub(SECRET_PLACEHOLDER, text)
+        for secret in self.secrets:
+            text = text.replace(secret, SECRET_PLACEHOLDER)
+        return text
+
+    def _redact_dict(self, data: dict[str, Any], is_top_level: bool) -> dict[str, Any]:
+        for key, value in data.items():
+            if is_top_level and key in TOP_LEVEL_PROTECTED_FIELDS:
+                continue
+            data[key] = self._redact_value(value)
+        return data
+
+    def _redact_value(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return self.redact_text(value)
+        if isinstance(value, dict):
+            return self._redact_dict(value, is_top_level=False)
+        if isinstance(value, list):
+            for i, item in enumerate(value):
+                value[i] = self._redact_value(item)
+        return value
@@ -1,6 +1,8 @@
 import asyncio
+import os
 import queue
 import threading
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from enum import Enum
@@ -9,7 +11,10 @@ from typing import Any, Callable
 
 from openhands.core.logger import openhands_logger as logger
 from openhands.events.event import Event, EventSource
+from openhands.events.event_index import EventSearchIndex
+from openhands.events.event_log import SegmentedEventLog
 from openhands.events.event_store import EventStore
+from openhands.events.secret_redaction import SecretRedactor
 from openhands.events.serialization.event import event_from_dict, event_to_dict
 from openhands.io import json
 from openhands.storage import FileStore
@@ -19,6 +24,12 @@ from openhands.storage.locations import (
 from openhands.utils.async_utils import call_sync_from_async
 from openhands.utils.shutdown_listener import should_continue
 
+# Whether event streams index the events added to them for EventFilter.query searches
+EVENT_SEARCH_INDEX_DEFAULT = os.getenv('EVENT_SEARCH_INDEX', 'false').lower() in (
+    'true',
+    '1',
+)
+
 
 class EventStreamSubscriber(str, Enum):
     AGENT_CONTROLLER = 'agent_controller'
@@ -53,8 +64,18 @@ class EventStream(EventStore):
     _thread_loops: dict[str, dict[str, asyncio.AbstractEventLoop]]
     _write_page_cache: list[dict]
 
-    def __init__(self, sid: str, file_store: FileStore, user_id: str | None = None):
-        super().__init__(sid, file_store, user_id)
+    def __init__(
+        self,
+        sid: str,
+        file_store: FileStore,
+        user_id: str | None = None,
+        use_segmented_log: bool | None = None,
+        use_search_index: bool | None = None,
+    ):
+        super().__init__(sid, file_store, user_id, use_segmented_log=use_segmented_log)
+        if use_search_index is None:
+            use_search_index = EVENT_SEARCH_INDEX_DEFAULT
+        self.use_search_index = use_search_index
         self._stop_flag = threading.Event()
         self._queue: queue.Queue[Event] = queue.Queue()
         self._thread_pools = {}
@@ -66,7 +87,11 @@ class EventStream(EventStore):
         self._subscribers = {}
         self._lock = threading.Lock()
         self.secrets = {}
+        self._secret_redactor: SecretRedactor | None = None
+        self._secret_redactor_key: tuple[str, ...] = ()
         self._write_page_cache = []
+        self._event_log_writes: deque[tuple[int, dict]] = deque()
+        self._event_log_write_lock = threading.Lock()
 
     def _init_thread_loop(self, subscriber_id: str, callback_id: str) -> None:
         loop = asyncio.new_event_loop()
@@ -90,6 +115,9 @@ class EventStream(EventStore):
         while not self._queue.empty():
             self._queue.get()
 
+        if self._event_log is not None:
+            self._event_log.close()
+
     def _clean_up_subscriber(self, subscriber_id: str, callback_id: str) -> None:
         if subscriber_id not in self._subscribers:
             logger.warning(f'Subscriber not found during cleanup: {subscriber_id}')
@@ -167,6 +195,7 @@ class EventStream(EventStore):
             )
         event._timestamp = datetime.now().isoformat()
         event._source = source  # type: ignore [attr-defined]
+        event_log = self._get_event_log()
         with self._lock:
             event._id = self.cur_id  # type: ignore [attr-defined]
             self.cur_id += 1
@@ -177,13 +206,25 @@ class EventStream(EventStore):
             data = event_to_dict(event)
             data = self._replace_secrets(data)
             event = event_from_dict(data)
-            current_write_page.append(data)
 
-            # If the page is full, create a new page for future events / other threads to use
-            if len(current_write_page) == self.cache_size:
-                self._write_page_cache = []
+            if self.use_search_index and self._search_index is None:
+                # Events already stored are not indexed, and are scanned instead
+                self._search_index = EventSearchIndex(start_id=event.id)
+
+            if event_log is not None:
+                # Segments are positional, so events are queued in id order here
+                # and appended in that order once the lock is released
+                self._event_log_writes.append((event.id, data))
+            else:
+                current_write_page.append(data)
 
-        if event.id is not None:
+                # If the page is full, create a new page for future events / other threads to use
+                if len(current_write_page) == self.cache_size:
+                    self._write_page_cache = []
+
+        if event_log is not None:
+            self._write_event_log(event_log)
+        elif event.id is not None:
             # Write the event to the store - this can take some time
             event_json = json.dumps(data)
             filename = self._get_filename_for_id(event.id, self.user_id)
@@ -200,8 +241,21 @@ class EventStream(EventStore):
 
             # Store the cache page last - if it is not present during reads then it will simply be bypassed.
             self._store_cache_page(current_write_page)
+        if self._search_index is not None:
+            self._search_index.add(event)
         self._queue.put(event)
 
+    def _write_event_log(self, event_log: SegmentedEventLog) -> None:
+        """Append the queued events to the event log - this can take some time.
+
+        Whichever thread holds the write lock appends the events queued by the
+        others too, so each event is written by the time its add_event returns.
+        """
+        with self._event_log_write_lock:
+            while self._event_log_writes:
+                id, data = self._event_log_writes.popleft()
+                event_log.append(id, json.dumps(data))
+
     def _store_cache_page(self, current_write_page: list[dict]):
         """Store a page in the cache. Reading individual events is slow when there are a lot of them, so we use pages."""
         if len(current_write_page) < self.cache_size:
@@ -218,30 +272,13 @@ class EventStream(EventStore):
     def update_secrets(self, secrets: dict[str, str]) -> None:
         self.secrets.update(secrets)
 
-    def _replace_secrets(
-        self, data: dict[str, Any], is_top_level: bool = True
-    ) -> dict[str, Any]:
-        # Fields that should not have secrets replaced (only at top level - system metadata)
-        TOP_LEVEL_PROTECTED_FIELDS = {
-            'timestamp',
-            'id',
-            'source',
-            'cause',
-            'action',
-            'observation',
-            'message',
-        }
-
-        for key in data:
-            if is_top_level and key in TOP_LEVEL_PROTECTED_FIELDS:
-                # Skip secret replacement for protected system fields at top level only
-                continue
-            elif isinstance(data[key], dict):
-                data[key] = self._replace_secrets(data[key], is_top_level=False)
-            elif isinstance(data[key], str):
-                for secret in self.secrets.values():
-                    data[key] = data[key].replace(secret, '<secret_hidden>')
-        return data
+    def _replace_secrets(self, data: dict[str, Any]) -> dict[str, Any]:
+        # Rebuild the redactor whenever the secrets change
+        secrets = tuple(self.secrets.values())
+        if self._secret_redactor is None or self._secret_redactor_key != secrets:
+            self._secret_redactor = SecretRedactor(secrets)
+            self._secret_redactor_key = secrets
+        return self._secret_redactor.redact(data)
 
     def _run_queue_loop(self) -> None:
         self._queue_loop = asyncio.new_event_loop()
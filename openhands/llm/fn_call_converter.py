@@ -14,10 +14,14 @@ We follow format from: https://docs.litellm.ai/docs/completion/function_call
 """
 
 import copy
+import itertools
 import json
 import re
 import sys
-from typing import Iterable
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator
 
 from litellm import ChatCompletionToolParam
 
@@ -478,150 +482,274 @@ def convert_tools_to_description(tools: list[dict]) -> str:
     return ret
 
 
-def convert_fncall_messages_to_non_fncall_messages(
-    messages: list[dict],
+def _convert_fncall_message(
+    message: dict,
     tools: list[ChatCompletionToolParam],
-    add_in_context_learning_example: bool = True,
-) -> list[dict]:
-    """Convert function calling messages to non-function calling messages."""
-    messages = copy.deepcopy(messages)
-
-    formatted_tools = convert_tools_to_description(tools)
-    system_prompt_suffix = SYSTEM_PROMPT_SUFFIX_TEMPLATE.format(
-        description=formatted_tools
-    )
-
-    converted_messages = []
-    first_user_message_encountered = False
-    for message in messages:
-        role = message['role']
-        content = message['content']
+    system_prompt_suffix: str,
+    add_in_context_learning_example: bool,
+) -> dict:
+    """Convert one function calling message to a non-function calling message.
 
-        # 1. SYSTEM MESSAGES
-        # append system prompt suffix to content
-        if role == 'system':
-            if isinstance(content, str):
-                content += system_prompt_suffix
-            elif isinstance(content, list):
-                if content and content[-1]['type'] == 'text':
-                    content[-1]['text'] += system_prompt_suffix
-                else:
-                    content.append({'type': 'text', 'text': system_prompt_suffix})
+    `add_in_context_learning_example` adds the example to the message if it is a
+    user message, so callers pass it for the first user message only.
+    """
+    message = copy.deepcopy(message)
+    role = message['role']
+    content = message['content']
+
+    # 1. SYSTEM MESSAGES
+    # append system prompt suffix to content
+    if role == 'system':
+        if isinstance(content, str):
+            content += system_prompt_suffix
+        elif isinstance(content, list):
+            if content and content[-1]['type'] == 'text':
+                content[-1]['text'] += system_prompt_suffix
             else:
-                raise FunctionCallConversionError(
-                    f'Unexpected content type {type(content)}. Expected str or list. Content: {content}'
-                )
-            converted_messages.append({'role': 'system', 'content': content})
-
-        # 2. USER MESSAGES (no change)
-        elif role == 'user':
-            # Add in-context learning example for the first user message
-            if not first_user_message_encountered and add_in_context_learning_example:
-                first_user_message_encountered = True
-
-                # Generate example based on available tools
-                example = IN_CONTEXT_LEARNING_EXAMPLE_PREFIX(tools)
-
-                # Add example if we have any tools
-                if example:
-                    # add in-context learning example
-                    if isinstance(content, str):
-                        content = example + content + IN_CONTEXT_LEARNING_EXAMPLE_SUFFIX
-                    elif isinstance(content, list):
-                        if content and content[0]['type'] == 'text':
-                            content[0]['text'] = (
-                                example
-                                + content[0]['text']
-                                + IN_CONTEXT_LEARNING_EXAMPLE_SUFFIX
-                            )
-                        else:
-                            content = (
-                                [
-                                    {
-                                        'type': 'text',
-                                        'text': example,
-                                    }
-                                ]
-                                + content
-                                + [
-                                    {
-                                        'type': 'text',
-                                        'text': IN_CONTEXT_LEARNING_EXAMPLE_SUFFIX,
-                                    }
-                                ]
-                            )
-                    else:
-                        raise FunctionCallConversionError(
-                            f'Unexpected content type {type(content)}. Expected str or list. Content: {content}'
-                        )
-            converted_messages.append(
-                {
-                    'role': 'user',
-                    'content': content,
-                }
+                content.append({'type': 'text', 'text': system_prompt_suffix})
+        else:
+            raise FunctionCallConversionError(
+                f'Unexpected content type {type(content)}. Expected str or list. Content: {content}'
             )
-
-        # 3. ASSISTANT MESSAGES
-        # - 3.1 no change if no function call
-        # - 3.2 change if function call
-        elif role == 'assistant':
-            if 'tool_calls' in message and message['tool_calls'] is not None:
-                if len(message['tool_calls']) != 1:
-                    raise FunctionCallConversionError(
-                        f'Expected exactly one tool call in the message. More than one tool call is not supported. But got {len(message["tool_calls"])} tool calls. Content: {content}'
-                    )
-                try:
-                    tool_content = convert_tool_call_to_string(message['tool_calls'][0])
-                except FunctionCallConversionError as e:
-                    raise FunctionCallConversionError(
-                        f'Failed to convert tool call to string.\nCurrent tool call: {message["tool_calls"][0]}.\nRaw messages: {json.dumps(messages, indent=2)}'
-                    ) from e
+        return {'role': 'system', 'content': content}
+
+    # 2. USER MESSAGES (no change)
+    elif role == 'user':
+        # Add in-context learning example for the first user message
+        if add_in_context_learning_example:
+            # Generate example based on available tools
+            example = IN_CONTEXT_LEARNING_EXAMPLE_PREFIX(tools)
+
+            # Add example if we have any tools
+            if example:
+                # add in-context learning example
                 if isinstance(content, str):
-                    content += '\n\n' + tool_content
-                    content = content.lstrip()
+                    content = example + content + IN_CONTEXT_LEARNING_EXAMPLE_SUFFIX
                 elif isinstance(content, list):
-                    if content and content[-1]['type'] == 'text':
-                        content[-1]['text'] += '\n\n' + tool_content
-                        content[-1]['text'] = content[-1]['text'].lstrip()
+                    if content and content[0]['type'] == 'text':
+                        content[0]['text'] = (
+                            example
+                            + content[0]['text']
+                            + IN_CONTEXT_LEARNING_EXAMPLE_SUFFIX
+                        )
                     else:
-                        content.append({'type': 'text', 'text': tool_content})
+                        content = (
+                            [
+                                {
+                                    'type': 'text',
+                                    'text': example,
+                                }
+                            ]
+                            + content
+                            + [
+                                {
+                                    'type': 'text',
+                                    'text': IN_CONTEXT_LEARNING_EXAMPLE_SUFFIX,
+                                }
+                            ]
+                        )
                 else:
                     raise FunctionCallConversionError(
                         f'Unexpected content type {type(content)}. Expected str or list. Content: {content}'
                     )
-            converted_messages.append({'role': 'assistant', 'content': content})
+        return {
+            'role': 'user',
+            'content': content,
+        }
 
-        # 4. TOOL MESSAGES (tool outputs)
-        elif role == 'tool':
-            # Convert tool result as user message
-            tool_name = message.get('name', 'function')
-            prefix = f'EXECUTION RESULT of [{tool_name}]:\n'
-            # and omit "tool_call_id" AND "name"
+    # 3. ASSISTANT MESSAGES
+    # - 3.1 no change if no function call
+    # - 3.2 change if function call
+    elif role == 'assistant':
+        if 'tool_calls' in message and message['tool_calls'] is not None:
+            if len(message['tool_calls']) != 1:
+                raise FunctionCallConversionError(
+                    f'Expected exactly one tool call in the message. More than one tool call is not supported. But got {len(message["tool_calls"])} tool calls. Content: {content}'
+                )
+            try:
+                tool_content = convert_tool_call_to_string(message['tool_calls'][0])
+            except FunctionCallConversionError as e:
+                raise FunctionCallConversionError(
+                    f'Failed to convert tool call to string.\nCurrent tool call: {message["tool_calls"][0]}.\nRaw message: {json.dumps(message, indent=2)}'
+                ) from e
             if isinstance(content, str):
-                content = prefix + content
+                content += '\n\n' + tool_content
+                content = content.lstrip()
             elif isinstance(content, list):
-                if content and (
-                    first_text_content := next(
-                        (c for c in content if c['type'] == 'text'), None
-                    )
-                ):
-                    first_text_content['text'] = prefix + first_text_content['text']
+                if content and content[-1]['type'] == 'text':
+                    content[-1]['text'] += '\n\n' + tool_content
+                    content[-1]['text'] = content[-1]['text'].lstrip()
                 else:
-                    content = [{'type': 'text', 'text': prefix}] + content
+                    content.append({'type': 'text', 'text': tool_content})
             else:
                 raise FunctionCallConversionError(
                     f'Unexpected content type {type(content)}. Expected str or list. Content: {content}'
                 )
-            if 'cache_control' in message:
-                content[-1]['cache_control'] = {'type': 'ephemeral'}
-            converted_messages.append({'role': 'user', 'content': content})
+        return {'role': 'assistant', 'content': content}
+
+    # 4. TOOL MESSAGES (tool outputs)
+    elif role == 'tool':
+        # Convert tool result as user message
+        tool_name = message.get('name', 'function')
+        prefix = f'EXECUTION RESULT of [{tool_name}]:\n'
+        # and omit "tool_call_id" AND "name"
+        if isinstance(content, str):
+            content = prefix + content
+        elif isinstance(content, list):
+            if content and (
+                first_text_content := next(
+                    (c for c in content if c['type'] == 'text'), None
+                )
+            ):
+                first_text_content['text'] = prefix + first_text_content['text']
+            else:
+                content = [{'type': 'text', 'text': prefix}] + content
         else:
             raise FunctionCallConversionError(
-                f'Unexpected role {role}. Expected system, user, assistant or tool.'
+                f'Unexpected content type {type(content)}. Expected str or list. Content: {content}'
+            )
+        if 'cache_control' in message:
+            content[-1]['cache_control'] = {'type': 'ephemeral'}
+        return {'role': 'user', 'content': content}
+    else:
+        raise FunctionCallConversionError(
+            f'Unexpected role {role}. Expected system, user, assistant or tool.'
+        )
+
+
+def convert_fncall_messages_to_non_fncall_messages(
+    messages: list[dict],
+    tools: list[ChatCompletionToolParam],
+    add_in_context_learning_example: bool = True,
+) -> list[dict]:
+    """Convert function calling messages to non-function calling messages."""
+    formatted_tools = convert_tools_to_description(tools)
+    system_prompt_suffix = SYSTEM_PROMPT_SUFFIX_TEMPLATE.format(
+        description=formatted_tools
+    )
+
+    converted_messages = []
+    first_user_message_encountered = False
+    for message in messages:
+        is_first_user_message = (
+            message['role'] == 'user' and not first_user_message_encountered
+        )
+        converted_messages.append(
+            _convert_fncall_message(
+                message,
+                tools,
+                system_prompt_suffix,
+                add_in_context_learning_example and is_first_user_message,
             )
+        )
+        if is_first_user_message:
+            first_user_message_encountered = True
     return converted_messages
 
 
+def _copy_message(message: dict) -> dict:
+    """Copy a message and its content list, sharing the (immutable) strings."""
+    message = dict(message)
+    if isinstance(message.get('content'), list):
+        message['content'] = [dict(item) for item in message['content']]
+    return message
+
+
+@dataclass
+class NonFncallMessageCache:
+    """Converts function calling messages to non-function calling messages, reusing
+    the conversions of messages seen before.
+
+    A converted message is keyed by the message and the cache entry of the
+    messages before it, which starts from the tools and whether the in-context
+    learning example is added. A conversation which grows by appending messages
+    therefore only converts the new ones, while any change to an earlier message
+    misses the cache from that message on. Keys are compared in full on a hit,
+    so there are no hash collisions to worry about. Least recently used entries
+    are evicted past `max_size`.
+    """
+
+    max_size: int = 10_000
+    # key -> (entry id, converted message, first user message encountered)
+    _entries: OrderedDict[tuple, tuple[int, dict | None, bool]] = field(
+        default_factory=OrderedDict
+    )
+    _entry_ids: Iterator[int] = field(default_factory=itertools.count)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def convert(
+        self,
+        messages: list[dict],
+        tools: list[ChatCompletionToolParam],
+        add_in_context_learning_example: bool = True,
+    ) -> list[dict]:
+        """Same as `convert_fncall_messages_to_non_fncall_messages`."""
+        root_key = (None, _freeze(tools), add_in_context_learning_example)
+        root = self._get(root_key) or self._add(root_key, None, False)
+        prefix_id = root[0]
+        system_prompt_suffix = None
+        first_user_message_encountered = False
+        converted_messages = []
+        for message in messages:
+            key = (prefix_id, _freeze(message))
+            entry = self._get(key)
+            if entry is None:
+                if system_prompt_suffix is None:
+                    system_prompt_suffix = SYSTEM_PROMPT_SUFFIX_TEMPLATE.format(
+                        description=convert_tools_to_description(tools)
+                    )
+                is_first_user_message = (
+                    message['role'] == 'user' and not first_user_message_encountered
+                )
+                entry = self._add(
+                    key,
+                    _convert_fncall_message(
+                        message,
+                        tools,
+                        system_prompt_suffix,
+                        add_in_context_learning_example and is_first_user_message,
+                    ),
+                    first_user_message_encountered or is_first_user_message,
+                )
+            prefix_id, converted, first_user_message_encountered = entry
+            # Only the root entry has no converted message
+            assert converted is not None
+            # Copied so callers can't change the cached conversion
+            converted_messages.append(_copy_message(converted))
+        return converted_messages
+
+    def _get(self, key: tuple) -> tuple[int, dict | None, bool] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _add(
+        self, key: tuple, converted: dict | None, first_user_message_encountered: bool
+    ) -> tuple[int, dict | None, bool]:
+        entry = (next(self._entry_ids), converted, first_user_message_encountered)
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return entry
+
+
+def _freeze(value: Any) -> Any:
+    """A hashable value which is equal for equal JSON like values."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, list):
+        return ('__list__',) + tuple(_freeze(item) for item in value)
+    if isinstance(value, bool):
+        # Otherwise equal to 1 and 0
+        return ('__bool__', value)
+    if isinstance(value, (str, int, float)) or value is None:
+        return value
+    return repr(value)
+
+
 def _extract_and_validate_params(
     matching_tool: dict, param_matches: Iterable[re.Match], fn_name: str
 ) -> dict:
@@ -727,6 +855,105 @@ def _normalize_parameter_tags(fn_body: str) -> str:
     )
 
 
+def _convert_non_fncall_assistant_message(
+    message: dict,
+    tools: list[ChatCompletionToolParam],
+    tool_call_id: str,
+) -> dict | None:
+    """Parse the function call of a non-function calling assistant message.
+
+    The content of `message` may be changed. Returns None if it has no function call.
+    """
+    content = message['content'] or ''  # handle cases where content is None
+    if isinstance(content, str):
+        content = _fix_stopword(content)
+        fn_match = re.search(FN_REGEX_PATTERN, content, re.DOTALL)
+    elif isinstance(content, list):
+        if content and content[-1]['type'] == 'text':
+            content[-1]['text'] = _fix_stopword(content[-1]['text'])
+            fn_match = re.search(FN_REGEX_PATTERN, content[-1]['text'], re.DOTALL)
+        else:
+            fn_match = None
+        fn_match_exists = any(
+            item.get('type') == 'text'
+            and re.search(FN_REGEX_PATTERN, item['text'], re.DOTALL)
+            for item in content
+        )
+        if fn_match_exists and not fn_match:
+            raise FunctionCallConversionError(
+                f'Expecting function call in the LAST index of content list. But got content={content}'
+            )
+    else:
+        raise FunctionCallConversionError(
+            f'Unexpected content type {type(content)}. Expected str or list. Content: {content}'
+        )
+
+    if not fn_match:
+        return None
+
+    fn_name = fn_match.group(1)
+    fn_body = _normalize_parameter_tags(fn_match.group(2))
+    matching_tool = next(
+        (
+            tool['function']
+            for tool in tools
+            if tool['type'] == 'function' and tool['function']['name'] == fn_name
+        ),
+        None,
+    )
+    # Validate function exists in tools
+    if not matching_tool:
+        raise FunctionCallValidationError(
+            f"Function '{fn_name}' not found in available tools: {[tool['function']['name'] for tool in tools if tool['type'] == 'function']}"
+        )
+
+    # Parse parameters
+    param_matches = re.finditer(FN_PARAM_REGEX_PATTERN, fn_body, re.DOTALL)
+    params = _extract_and_validate_params(matching_tool, param_matches, fn_name)
+
+    tool_call = {
+        'index': 1,  # always 1 because we only support **one tool call per message**
+        'id': tool_call_id,
+        'type': 'function',
+        'function': {'name': fn_name, 'arguments': json.dumps(params)},
+    }
+
+    # Remove the function call part from content
+    if isinstance(content, list):
+        assert content and content[-1]['type'] == 'text'
+        content[-1]['text'] = content[-1]['text'].split('<function=')[0].strip()
+    elif isinstance(content, str):
+        content = content.split('<function=')[0].strip()
+    else:
+        raise FunctionCallConversionError(
+            f'Unexpected content type {type(content)}. Expected str or list. Content: {content}'
+        )
+
+    return {'role': 'assistant', 'content': content, 'tool_calls': [tool_call]}
+
+
+def convert_non_fncall_response_to_fncall_message(
+    message: Any,
+    tools: list[ChatCompletionToolParam],
+    tool_call_counter: int = 1,
+) -> Any:
+    """Convert a non-function calling response message back to function calling.
+
+    Unlike `convert_non_fncall_messages_to_fncall_messages`, only the response is
+    parsed, so its tool call id is numbered by `tool_call_counter`: one more than
+    the number of function calls in the messages before it.
+    """
+    message = copy.deepcopy(message)
+    if message['role'] != 'assistant':
+        raise FunctionCallConversionError(
+            f'Unexpected role {message["role"]}. Expected assistant for a response.'
+        )
+    converted = _convert_non_fncall_assistant_message(
+        message, tools, f'toolu_{tool_call_counter:02d}'
+    )
+    return message if converted is None else converted
+
+
 def convert_non_fncall_messages_to_fncall_messages(
     messages: list[dict],
     tools: list[ChatCompletionToolParam],
@@ -847,81 +1074,12 @@ def convert_non_fncall_messages_to_fncall_messages(
 
         # Handle assistant messages
         elif role == 'assistant':
-            if isinstance(content, str):
-                content = _fix_stopword(content)
-                fn_match = re.search(FN_REGEX_PATTERN, content, re.DOTALL)
-            elif isinstance(content, list):
-                if content and content[-1]['type'] == 'text':
-                    content[-1]['text'] = _fix_stopword(content[-1]['text'])
-                    fn_match = re.search(
-                        FN_REGEX_PATTERN, content[-1]['text'], re.DOTALL
-                    )
-                else:
-                    fn_match = None
-                fn_match_exists = any(
-                    item.get('type') == 'text'
-                    and re.search(FN_REGEX_PATTERN, item['text'], re.DOTALL)
-                    for item in content
-                )
-                if fn_match_exists and not fn_match:
-                    raise FunctionCallConversionError(
-                        f'Expecting function call in the LAST index of content list. But got content={content}'
-                    )
-            else:
-                raise FunctionCallConversionError(
-                    f'Unexpected content type {type(content)}. Expected str or list. Content: {content}'
-                )
-
-            if fn_match:
-                fn_name = fn_match.group(1)
-                fn_body = _normalize_parameter_tags(fn_match.group(2))
-                matching_tool = next(
-                    (
-                        tool['function']
-                        for tool in tools
-                        if tool['type'] == 'function'
-                        and tool['function']['name'] == fn_name
-                    ),
-                    None,
-                )
-                # Validate function exists in tools
-                if not matching_tool:
-                    raise FunctionCallValidationError(
-                        f"Function '{fn_name}' not found in available tools: {[tool['function']['name'] for tool in tools if tool['type'] == 'function']}"
-                    )
-
-                # Parse parameters
-                param_matches = re.finditer(FN_PARAM_REGEX_PATTERN, fn_body, re.DOTALL)
-                params = _extract_and_validate_params(
-                    matching_tool, param_matches, fn_name
-                )
-
-                # Create tool call with unique ID
-                tool_call_id = f'toolu_{tool_call_counter:02d}'
-                tool_call = {
-                    'index': 1,  # always 1 because we only support **one tool call per message**
-                    'id': tool_call_id,
-                    'type': 'function',
-                    'function': {'name': fn_name, 'arguments': json.dumps(params)},
-                }
+            converted = _convert_non_fncall_assistant_message(
+                message, tools, f'toolu_{tool_call_counter:02d}'
+            )
+            if converted is not None:
                 tool_call_counter += 1  # Increment counter
-
-                # Remove the function call part from content
-                if isinstance(content, list):
-                    assert content and content[-1]['type'] == 'text'
-                    content[-1]['text'] = (
-                        content[-1]['text'].split('<function=')[0].strip()
-                    )
-                elif isinstance(content, str):
-                    content = content.split('<function=')[0].strip()
-                else:
-                    raise FunctionCallConversionError(
-                        f'Unexpected content type {type(content)}. Expected str or list. Content: {content}'
-                    )
-
-                converted_messages.append(
-                    {'role': 'assistant', 'content': content, 'tool_calls': [tool_call]}
-                )
+                converted_messages.append(converted)
             else:
                 # No function call, keep message as is
                 converted_messages.append(message)
@@ -42,10 +42,11 @@ from openhands.core.message import Message
 from openhands.llm.debug_mixin import DebugMixin
 from openhands.llm.fn_call_converter import (
     STOP_WORDS,
-    convert_fncall_messages_to_non_fncall_messages,
-    convert_non_fncall_messages_to_fncall_messages,
+    NonFncallMessageCache,
+    convert_non_fncall_response_to_fncall_message,
 )
 from openhands.llm.retry_mixin import RetryMixin
+from openhands.llm.token_count_cache import TokenCountCache
 
 __all__ = ['LLM']
 
@@ -88,12 +89,22 @@ class LLM(RetryMixin, DebugMixin):
         self.config: LLMConfig = copy.deepcopy(config)
         self.service_id = service_id
         self.metrics: Metrics = (
-            metrics if metrics is not None else Metrics(model_name=config.model)
+            metrics
+            if metrics is not None
+            else Metrics(
+                model_name=config.model, max_entries=config.metrics_max_entries
+            )
         )
 
         self.model_info: ModelInfo | None = None
         self._function_calling_active: bool = False
         self.retry_listener = retry_listener
+        # Conversions of the messages of previous completions, when function
+        # calling is mocked via prompting
+        self._non_fncall_message_cache = NonFncallMessageCache()
+        # Token counts of single messages, and of no messages
+        self._token_count_cache = TokenCountCache()
+        self._empty_token_count: int | None = None
         if self.config.log_completions:
             if self.config.log_completions_folder is None:
                 raise RuntimeError(
@@ -283,8 +294,12 @@ class LLM(RetryMixin, DebugMixin):
             kwargs['messages'] = messages
 
             # handle conversion of to non-function calling messages if needed
-            original_fncall_messages = copy.deepcopy(messages)
+            original_fncall_messages = messages
+            if self.config.log_completions:
+                original_fncall_messages = copy.deepcopy(messages)
             mock_fncall_tools = None
+            # the number of function calls before the response, to number its own
+            fncall_count = 0
             # if the agent or caller has defined tools, and we mock via prompting, convert the messages
             if mock_function_calling and 'tools' in kwargs:
                 add_in_context_learning_example = True
@@ -294,7 +309,12 @@ class LLM(RetryMixin, DebugMixin):
                 ):
                     add_in_context_learning_example = False
 
-                messages = convert_fncall_messages_to_non_fncall_messages(
+                fncall_count = sum(
+                    1
+                    for message in messages
+                    if message['role'] == 'assistant' and message.get('tool_calls')
+                )
+                messages = self._non_fncall_message_cache.convert(
                     messages,
                     kwargs['tools'],
                     add_in_context_learning_example=add_in_context_learning_example,
@@ -359,7 +379,9 @@ class LLM(RetryMixin, DebugMixin):
             response_id = resp.get('id', 'unknown')
             self.metrics.add_response_latency(latency, response_id)
 
-            non_fncall_response = copy.deepcopy(resp)
+            non_fncall_response = resp
+            if self.config.log_completions and mock_function_calling:
+                non_fncall_response = copy.deepcopy(resp)
 
             # if we mocked function calling, and we have tools, convert the response back to function calling format
             if mock_function_calling and mock_fncall_tools is not None:
@@ -370,13 +392,13 @@ class LLM(RetryMixin, DebugMixin):
                     )
 
                 non_fncall_response_message = resp.choices[0].message
-                # messages is already a list with proper typing from line 223
-                fn_call_messages_with_response = (
-                    convert_non_fncall_messages_to_fncall_messages(
-                        messages + [non_fncall_response_message], mock_fncall_tools
+                fn_call_response_message = (
+                    convert_non_fncall_response_to_fncall_message(
+                        non_fncall_response_message,
+                        mock_fncall_tools,
+                        tool_call_counter=fncall_count + 1,
                     )
                 )
-                fn_call_response_message = fn_call_messages_with_response[-1]
                 if not isinstance(fn_call_response_message, LiteLLMMessage):
                     fn_call_response_message = LiteLLMMessage(
                         **fn_call_response_message
@@ -699,12 +721,57 @@ class LLM(RetryMixin, DebugMixin):
     def get_token_count(self, messages: list[dict] | list[Message]) -> int:
         """Get the number of tokens in a list of messages. Use dicts for better token counting.
 
+        Each message is counted on its own, and these counts are cached, so
+        counting a conversation again after it grew only tokenizes the new
+        messages.
+
         Args:
             messages (list): A list of messages, either as a list of dicts or as a list of Message objects.
 
         Returns:
             int: The number of tokens.
         """
+        messages = self._format_messages_for_token_count(messages)
+        try:
+            counts = self._get_single_message_token_counts(messages)
+            # Each single message count includes the tokens the reply is primed
+            # with, which the messages share
+            if len(messages) == 1:
+                return counts[0]
+            return sum(counts) - (len(messages) - 1) * self._get_empty_token_count()
+        except Exception as e:
+            self._log_token_count_error(e)
+            return 0
+
+    def get_message_token_counts(
+        self, messages: list[dict] | list[Message]
+    ) -> list[int]:
+        """Get the number of tokens each message adds to a list of messages.
+
+        get_token_count of the messages is the sum of these plus get_token_count([]).
+        The counts of messages counted before are cached, so candidate lists of
+        messages sharing a prefix only tokenize the messages which differ.
+
+        Args:
+            messages (list): A list of messages, either as a list of dicts or as a list of Message objects.
+
+        Returns:
+            list[int]: The number of tokens of each message, all 0 if they can't be counted.
+        """
+        messages = self._format_messages_for_token_count(messages)
+        try:
+            empty_count = self._get_empty_token_count()
+            return [
+                count - empty_count
+                for count in self._get_single_message_token_counts(messages)
+            ]
+        except Exception as e:
+            self._log_token_count_error(e)
+            return [0] * len(messages)
+
+    def _format_messages_for_token_count(
+        self, messages: list[dict] | list[Message]
+    ) -> list[dict]:
         # attempt to convert Message objects to dicts, litellm expects dicts
         if (
             isinstance(messages, list)
@@ -722,29 +789,43 @@ class LLM(RetryMixin, DebugMixin):
             # We've already asserted that messages is a list of Message objects
             # Use explicit typing to satisfy mypy
             messages_typed: list[Message] = messages  # type: ignore
-            messages = self.format_messages_for_llm(messages_typed)
+            return self.format_messages_for_llm(messages_typed)
+        return cast(list[dict], messages)
 
-        # try to get the token count with the default litellm tokenizers
+    def _count_tokens(self, messages: list[dict]) -> int:
+        # get the token count with the default litellm tokenizers
         # or the custom tokenizer if set for this LLM configuration
-        try:
-            return int(
-                litellm.token_counter(
-                    model=self.config.model,
-                    messages=messages,
-                    custom_tokenizer=self.tokenizer,
-                )
+        return int(
+            litellm.token_counter(
+                model=self.config.model,
+                messages=messages,
+                custom_tokenizer=self.tokenizer,
             )
-        except Exception as e:
-            # limit logspam in case token count is not supported
-            logger.error(
-                f'Error getting token count for\n model {self.config.model}\n{e}'
-                + (
-                    f'\ncustom_tokenizer: {self.config.custom_tokenizer}'
-                    if self.config.custom_tokenizer is not None
-                    else ''
-                )
+        )
+
+    def _get_single_message_token_counts(self, messages: list[dict]) -> list[int]:
+        """Get the token count of each message as the only one, as cached."""
+        return self._token_count_cache.get_counts(
+            (self.config.model, self.config.custom_tokenizer),
+            messages,
+            lambda message: self._count_tokens([message]),
+        )
+
+    def _get_empty_token_count(self) -> int:
+        if self._empty_token_count is None:
+            self._empty_token_count = self._count_tokens([])
+        return self._empty_token_count
+
+    def _log_token_count_error(self, e: Exception) -> None:
+        # limit logspam in case token count is not supported
+        logger.error(
+            f'Error getting token count for\n model {self.config.model}\n{e}'
+            + (
+                f'\ncustom_tokenizer: {self.config.custom_tokenizer}'
+                if self.config.custom_tokenizer is not None
+                else ''
             )
-            return 0
+        )
 
     def _is_local(self) -> bool:
         """Determines if the system is using a locally running LLM.
@@ -6,10 +6,26 @@
 # Unless you are working on deprecation, please avoid extending this legacy file and consult the V1 codepaths above.
 # Tag: Legacy-V0
 import copy
+import math
 import time
+from array import array
+from collections import deque
+from typing import Iterable, MutableSequence, TypeVar
 
 from pydantic import BaseModel, Field
 
+# Quantiles of compact metrics are within this relative error of the exact ones
+SKETCH_RELATIVE_ACCURACY = 0.01
+# With the accuracy above, enough to cover 1ms to 10 days, or 1 to 10^17 tokens
+SKETCH_MAX_BUCKETS = 2048
+# The quantiles reported by compact metrics
+REPORTED_QUANTILES = (0.5, 0.9, 0.99)
+# The values compact metrics keep sketches of
+SKETCHED_VALUES = ('latency', 'prompt_tokens', 'completion_tokens')
+ENTRY_KINDS = ('costs', 'response_latencies', 'token_usages')
+
+T = TypeVar('T')
+
 
 class Cost(BaseModel):
     model: str
@@ -51,6 +67,121 @@ class TokenUsage(BaseModel):
         )
 
 
+class QuantileSketch:
+    """Streaming quantile sketch with a relative error guarantee (DDSketch).
+
+    Positive values are counted in buckets whose bounds grow geometrically, so a
+    quantile is within `relative_accuracy` of the exact one, while at most
+    `max_buckets` counts are kept however many values are added. Past that, the
+    lowest buckets are collapsed, which only makes the lowest quantiles less
+    accurate. Sketches with the same accuracy can be merged, and an earlier state
+    of a sketch can be subtracted from it.
+    """
+
+    def __init__(
+        self,
+        relative_accuracy: float = SKETCH_RELATIVE_ACCURACY,
+        max_buckets: int = SKETCH_MAX_BUCKETS,
+    ) -> None:
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.count = 0
+        self.sum = 0.0
+        # The number of values which are zero or less
+        self.zero_count = 0
+        self._counts = array('q')
+        # The bucket index of _counts[0]
+        self._offset = 0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        if value <= 0:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / math.log(self.gamma))
+        self._ensure_bucket(index)
+        self._counts[max(index - self._offset, 0)] += 1
+
+    def quantile(self, q: float) -> float | None:
+        """The value at quantile `q` (0 to 1) of those added, None if none were."""
+        if self.count <= 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for i, count in enumerate(self._counts):
+            seen += count
+            if seen > rank:
+                # The middle of the bucket, relative to its bounds
+                return 2 * self.gamma ** (i + self._offset) / (self.gamma + 1)
+        return (
+            2 * self.gamma ** (len(self._counts) - 1 + self._offset) / (self.gamma + 1)
+        )
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        self._add_counts(other, 1)
+
+    def to_dict(self) -> dict:
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'max_buckets': self.max_buckets,
+            'count': self.count,
+            'sum': self.sum,
+            'zero_count': self.zero_count,
+            'offset': self._offset,
+            'counts': self._counts.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'QuantileSketch':
+        sketch = cls(data['relative_accuracy'], data['max_buckets'])
+        sketch.count = data['count']
+        sketch.sum = data['sum']
+        sketch.zero_count = data['zero_count']
+        sketch._offset = data['offset']
+        sketch._counts = array('q', data['counts'])
+        return sketch
+
+    def subtract(self, baseline: 'QuantileSketch') -> 'QuantileSketch':
+        """The sketch of the values added since the `baseline` copy of this sketch."""
+        result = copy.deepcopy(self)
+        result._add_counts(baseline, -1)
+        return result
+
+    def _add_counts(self, other: 'QuantileSketch', sign: int) -> None:
+        if other.gamma != self.gamma:
+            raise ValueError('Cannot combine sketches with different accuracies')
+        self.count = max(self.count + sign * other.count, 0)
+        self.sum += sign * other.sum
+        self.zero_count = max(self.zero_count + sign * other.zero_count, 0)
+        if other._counts:
+            self._ensure_bucket(other._offset)
+            self._ensure_bucket(other._offset + len(other._counts) - 1)
+        for i, count in enumerate(other._counts):
+            j = max(i + other._offset - self._offset, 0)
+            self._counts[j] = max(self._counts[j] + sign * count, 0)
+
+    def _ensure_bucket(self, index: int) -> None:
+        if not self._counts:
+            self._offset = index
+            self._counts.append(0)
+        elif index < self._offset:
+            self._counts[0:0] = array('q', [0]) * (self._offset - index)
+            self._offset = index
+        elif index >= self._offset + len(self._counts):
+            self._counts.extend(
+                array('q', [0]) * (index - self._offset - len(self._counts) + 1)
+            )
+        excess = len(self._counts) - self.max_buckets
+        if excess > 0:
+            self._counts[excess] += sum(self._counts[:excess])
+            del self._counts[:excess]
+            self._offset += excess
+
+
 class Metrics:
     """Metrics class can record various metrics during running and evaluation.
     We track:
@@ -58,15 +189,33 @@ class Metrics:
       - max_budget_per_task (budget limit)
       - A list of ResponseLatency
       - A list of TokenUsage (one per call).
+
+    With `max_entries` set, the metrics are compact: only the most recent
+    `max_entries` of each list are kept, along with the number of entries ever
+    added and quantile sketches of the latencies and token counts, so their size
+    stays the same however many calls are made.
     """
 
-    def __init__(self, model_name: str = 'default') -> None:
+    # Defaults for metrics which are not compact, or were pickled before
+    _max_entries: int | None = None
+    _entry_counts: dict[str, int] | None = None
+    _sketches: dict[str, QuantileSketch] | None = None
+
+    def __init__(
+        self, model_name: str = 'default', max_entries: int | None = None
+    ) -> None:
         self._accumulated_cost: float = 0.0
         self._max_budget_per_task: float | None = None
-        self._costs: list[Cost] = []
-        self._response_latencies: list[ResponseLatency] = []
+        self._max_entries = max_entries
+        if max_entries is not None:
+            self._entry_counts = {kind: 0 for kind in ENTRY_KINDS}
+            self._sketches = {name: QuantileSketch() for name in SKETCHED_VALUES}
+        self._costs: MutableSequence[Cost] = self._new_entries([])
+        self._response_latencies: MutableSequence[ResponseLatency] = self._new_entries(
+            []
+        )
         self.model_name = model_name
-        self._token_usages: list[TokenUsage] = []
+        self._token_usages: MutableSequence[TokenUsage] = self._new_entries([])
         self._accumulated_token_usage: TokenUsage = TokenUsage(
             model=model_name,
             prompt_tokens=0,
@@ -96,28 +245,64 @@ class Metrics:
         self._max_budget_per_task = value
 
     @property
-    def costs(self) -> list[Cost]:
+    def is_compact(self) -> bool:
+        return self._max_entries is not None
+
+    @property
+    def costs(self) -> MutableSequence[Cost]:
         return self._costs
 
     @property
-    def response_latencies(self) -> list[ResponseLatency]:
+    def response_latencies(self) -> MutableSequence[ResponseLatency]:
         if not hasattr(self, '_response_latencies'):
             self._response_latencies = []
         return self._response_latencies
 
     @response_latencies.setter
-    def response_latencies(self, value: list[ResponseLatency]) -> None:
-        self._response_latencies = value
+    def response_latencies(self, value: Iterable[ResponseLatency]) -> None:
+        self._response_latencies = self._new_entries(value)
+        self._reset_entry_count('response_latencies')
 
     @property
-    def token_usages(self) -> list[TokenUsage]:
+    def token_usages(self) -> MutableSequence[TokenUsage]:
         if not hasattr(self, '_token_usages'):
             self._token_usages = []
         return self._token_usages
 
     @token_usages.setter
-    def token_usages(self, value: list[TokenUsage]) -> None:
-        self._token_usages = value
+    def token_usages(self, value: Iterable[TokenUsage]) -> None:
+        self._token_usages = self._new_entries(value)
+        self._reset_entry_count('token_usages')
+
+    def entry_count(self, kind: str) -> int:
+        """The number of entries of `kind` ever added, which compact metrics may
+        no longer all have.
+        """
+        if self._entry_counts is None:
+            return len(getattr(self, kind))
+        return self._entry_counts[kind]
+
+    def quantile(self, name: str, q: float) -> float | None:
+        """The quantile `q` of a value in SKETCHED_VALUES, for compact metrics."""
+        if self._sketches is None:
+            raise ValueError('Quantiles are only kept by compact metrics')
+        return self._sketches[name].quantile(q)
+
+    def _new_entries(self, entries: Iterable[T]) -> MutableSequence[T]:
+        if self._max_entries is None:
+            return list(entries)
+        return deque(entries, maxlen=self._max_entries)
+
+    def _reset_entry_count(self, kind: str) -> None:
+        if self._entry_counts is not None:
+            self._entry_counts[kind] = len(getattr(self, kind))
+
+    def _count_entry(self, kind: str, **values: float) -> None:
+        if self._entry_counts is not None:
+            self._entry_counts[kind] += 1
+        if self._sketches is not None:
+            for name, value in values.items():
+                self._sketches[name].add(value)
 
     @property
     def accumulated_token_usage(self) -> TokenUsage:
@@ -139,13 +324,16 @@ class Metrics:
             raise ValueError('Added cost cannot be negative.')
         self._accumulated_cost += value
         self._costs.append(Cost(cost=value, model=self.model_name))
+        self._count_entry('costs')
 
     def add_response_latency(self, value: float, response_id: str) -> None:
+        latency = max(0.0, value)
         self._response_latencies.append(
             ResponseLatency(
-                latency=max(0.0, value), model=self.model_name, response_id=response_id
+                latency=latency, model=self.model_name, response_id=response_id
             )
         )
+        self._count_entry('response_latencies', latency=latency)
 
     def add_token_usage(
         self,
@@ -171,6 +359,11 @@ class Metrics:
             response_id=response_id,
         )
         self._token_usages.append(usage)
+        self._count_entry(
+            'token_usages',
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+        )
 
         # Update accumulated token usage using the __add__ operator
         self._accumulated_token_usage = self.accumulated_token_usage + TokenUsage(
@@ -192,10 +385,25 @@ class Metrics:
         if self._max_budget_per_task is None and other.max_budget_per_task is not None:
             self._max_budget_per_task = other.max_budget_per_task
 
-        self._costs += other._costs
+        if self._entry_counts is not None:
+            for kind in ENTRY_KINDS:
+                self._entry_counts[kind] += other.entry_count(kind)
+        if self._sketches is not None:
+            if other._sketches is not None:
+                for name, sketch in self._sketches.items():
+                    sketch.merge(other._sketches[name])
+            else:
+                for latency in other.response_latencies:
+                    self._sketches['latency'].add(latency.latency)
+                for usage in other.token_usages:
+                    self._sketches['prompt_tokens'].add(usage.prompt_tokens)
+                    self._sketches['completion_tokens'].add(usage.completion_tokens)
+
+        # extend in place, so compact metrics keep only their most recent entries
+        self._costs.extend(other._costs)
         # use the property so older picked objects that lack the field won't crash
-        self.token_usages += other.token_usages
-        self.response_latencies += other.response_latencies
+        self.token_usages.extend(other.token_usages)
+        self.response_latencies.extend(other.response_latencies)
 
         # Merge accumulated token usage using the __add__ operator
         self._accumulated_token_usage = (
@@ -203,8 +411,12 @@ class Metrics:
         )
 
     def get(self) -> dict:
-        """Return the metrics in a dictionary."""
-        return {
+        """Return the metrics in a dictionary.
+
+        Compact metrics also return the number of entries ever added of each list,
+        and the REPORTED_QUANTILES of the SKETCHED_VALUES.
+        """
+        metrics = {
             'accumulated_cost': self._accumulated_cost,
             'max_budget_per_task': self._max_budget_per_task,
             'accumulated_token_usage': self.accumulated_token_usage.model_dump(),
@@ -214,6 +426,99 @@ class Metrics:
             ],
             'token_usages': [usage.model_dump() for usage in self._token_usages],
         }
+        if self._entry_counts is not None:
+            metrics['entry_counts'] = dict(self._entry_counts)
+        if self._sketches is not None:
+            metrics['quantiles'] = {
+                name: {
+                    f'p{round(q * 100)}': sketch.quantile(q) for q in REPORTED_QUANTILES
+                }
+                for name, sketch in self._sketches.items()
+            }
+        return metrics
+
+    def to_dict(self) -> dict:
+        """Return the metrics in a dictionary `from_dict` restores them from."""
+        data = self.get()
+        data.pop('quantiles', None)
+        data['model_name'] = self.model_name
+        data['max_entries'] = self._max_entries
+        if self._sketches is not None:
+            data['sketches'] = {
+                name: sketch.to_dict() for name, sketch in self._sketches.items()
+            }
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Metrics':
+        metrics = cls(data.get('model_name', 'default'), data.get('max_entries'))
+        metrics._accumulated_cost = data.get('accumulated_cost', 0.0)
+        metrics._max_budget_per_task = data.get('max_budget_per_task')
+        if 'accumulated_token_usage' in data:
+            metrics._accumulated_token_usage = TokenUsage(
+                **data['accumulated_token_usage']
+            )
+        metrics._costs = metrics._new_entries(
+            Cost(**cost) for cost in data.get('costs', [])
+        )
+        metrics._response_latencies = metrics._new_entries(
+            ResponseLatency(**latency) for latency in data.get('response_latencies', [])
+        )
+        metrics._token_usages = metrics._new_entries(
+            TokenUsage(**usage) for usage in data.get('token_usages', [])
+        )
+        if metrics._entry_counts is not None:
+            for kind in ENTRY_KINDS:
+                metrics._entry_counts[kind] = data.get('entry_counts', {}).get(
+                    kind, len(getattr(metrics, kind))
+                )
+        if metrics._sketches is not None and 'sketches' in data:
+            metrics._sketches = {
+                name: QuantileSketch.from_dict(sketch)
+                for name, sketch in data['sketches'].items()
+            }
+        return metrics
+
+    def to_delta_dict(self, entry_counts: dict[str, int]) -> dict:
+        """Return the totals of the metrics and the entries added since they had
+        the `entry_counts`, which `apply_delta_dict` brings the earlier metrics up
+        to date with. Unlike `to_dict`, its size doesn't grow with the entries.
+        """
+        data: dict = {
+            'accumulated_cost': self._accumulated_cost,
+            'max_budget_per_task': self._max_budget_per_task,
+            'accumulated_token_usage': self.accumulated_token_usage.model_dump(),
+        }
+        for kind in ENTRY_KINDS:
+            entries = getattr(self, kind)
+            num_added = self.entry_count(kind) - entry_counts.get(kind, 0)
+            start = len(entries) - min(max(num_added, 0), len(entries))
+            data[kind] = [entries[i].model_dump() for i in range(start, len(entries))]
+        if self._entry_counts is not None:
+            data['entry_counts'] = dict(self._entry_counts)
+        if self._sketches is not None:
+            data['sketches'] = {
+                name: sketch.to_dict() for name, sketch in self._sketches.items()
+            }
+        return data
+
+    def apply_delta_dict(self, data: dict) -> None:
+        """Bring the metrics up to date with a dictionary of `to_delta_dict`."""
+        self._accumulated_cost = data['accumulated_cost']
+        self._max_budget_per_task = data['max_budget_per_task']
+        self._accumulated_token_usage = TokenUsage(**data['accumulated_token_usage'])
+        self._costs.extend(Cost(**cost) for cost in data['costs'])
+        self._response_latencies.extend(
+            ResponseLatency(**latency) for latency in data['response_latencies']
+        )
+        self._token_usages.extend(TokenUsage(**usage) for usage in data['token_usages'])
+        if self._entry_counts is not None and 'entry_counts' in data:
+            self._entry_counts.update(data['entry_counts'])
+        if self._sketches is not None and 'sketches' in data:
+            self._sketches = {
+                name: QuantileSketch.from_dict(sketch)
+                for name, sketch in data['sketches'].items()
+            }
 
     def log(self) -> str:
         """Log the metrics."""
@@ -224,7 +529,9 @@ class Metrics:
         return logs
 
     def copy(self) -> 'Metrics':
-        """Create a deep copy of the Metrics object."""
+        """Create a deep copy of the Metrics object, which is of a bounded size for
+        compact metrics.
+        """
         return copy.deepcopy(self)
 
     def diff(self, baseline: 'Metrics') -> 'Metrics':
@@ -238,27 +545,56 @@ class Metrics:
         Returns:
             A new Metrics object containing only the differences since the baseline
         """
-        result = Metrics(self.model_name)
+        result = Metrics(self.model_name, self._max_entries)
 
         # Calculate cost difference
         result._accumulated_cost = self._accumulated_cost - baseline._accumulated_cost
 
-        # Include only costs that were added after the baseline
-        if baseline._costs:
-            last_baseline_timestamp = baseline._costs[-1].timestamp
-            result._costs = [
-                cost for cost in self._costs if cost.timestamp > last_baseline_timestamp
-            ]
+        if self.is_compact:
+            # Include only the entries counted after the baseline, as far as they
+            # were kept
+            for kind in ENTRY_KINDS:
+                num_added = max(self.entry_count(kind) - baseline.entry_count(kind), 0)
+                entries = getattr(self, kind)
+                setattr(
+                    result,
+                    f'_{kind}',
+                    result._new_entries(
+                        list(entries)[max(len(entries) - num_added, 0) :]
+                        if num_added
+                        else []
+                    ),
+                )
+                assert result._entry_counts is not None
+                result._entry_counts[kind] = num_added
+            if self._sketches is not None:
+                result._sketches = {
+                    name: sketch.subtract(baseline._sketches[name])
+                    if baseline._sketches is not None
+                    else copy.deepcopy(sketch)
+                    for name, sketch in self._sketches.items()
+                }
         else:
-            result._costs = self._costs.copy()
-
-        # Include only response latencies that were added after the baseline
-        result._response_latencies = self._response_latencies[
-            len(baseline._response_latencies) :
-        ]
+            # Include only costs that were added after the baseline
+            if baseline._costs:
+                last_baseline_timestamp = baseline._costs[-1].timestamp
+                result._costs = [
+                    cost
+                    for cost in self._costs
+                    if cost.timestamp > last_baseline_timestamp
+                ]
+            else:
+                result._costs = list(self._costs)
+
+            # Include only response latencies that were added after the baseline
+            result._response_latencies = list(self._response_latencies)[
+                len(baseline._response_latencies) :
+            ]
 
-        # Include only token usages that were added after the baseline
-        result._token_usages = self._token_usages[len(baseline._token_usages) :]
+            # Include only token usages that were added after the baseline
+            result._token_usages = list(self._token_usages)[
+                len(baseline._token_usages) :
+            ]
 
         # Calculate accumulated token usage difference
         base_usage = baseline.accumulated_token_usage
@@ -0,0 +1,62 @@
+# IMPORTANT: LEGACY V0 CODE - Deprecated since version 1.0.0, scheduled for removal April 1, 2026
+# This file is part of the legacy (V0) implementation of OpenHands and will be removed soon as we complete the migration to V1.
+# OpenHands V1 uses the Software Agent SDK for the agentic core and runs a new application server. Please refer to:
+#   - V1 agentic core (SDK): https://github.com/OpenHands/software-agent-sdk
+#   - V1 application server (in this repo): openhands/app_server/
+# Unless you are working on deprecation, please avoid extending this legacy file and consult the V1 codepaths above.
+# Tag: Legacy-V0
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+# The number of message token counts kept by each cache
+TOKEN_COUNT_CACHE_SIZE = 20_000
+
+
+def message_digest(message: dict[str, Any]) -> bytes:
+    """A digest of the content of a message, equal for equal messages."""
+    return hashlib.blake2b(
+        json.dumps(message, sort_keys=True, default=str).encode(), digest_size=16
+    ).digest()
+
+
+class TokenCountCache:
+    """Least recently used cache of the token counts of single messages.
+
+    Counts are keyed by the tokenizer and a digest of the message, so the
+    messages of a growing conversation are only tokenized once.
+    """
+
+    def __init__(self, max_size: int = TOKEN_COUNT_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self._counts: OrderedDict[tuple[Hashable, bytes], int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_counts(
+        self,
+        tokenizer_key: Hashable,
+        messages: list[dict[str, Any]],
+        count: Callable[[dict[str, Any]], int],
+    ) -> list[int]:
+        """Get the token count of each message, calling `count` for those not cached."""
+        counts = []
+        for message in messages:
+            key = (tokenizer_key, message_digest(message))
+            with self._lock:
+                num_tokens = self._counts.get(key)
+                if num_tokens is not None:
+                    self._counts.move_to_end(key)
+            if num_tokens is None:
+                num_tokens = count(message)
+                with self._lock:
+                    self._counts[key] = num_tokens
+                    while len(self._counts) > self.max_size:
+                        self._counts.popitem(last=False)
+            counts.append(num_tokens)
+        return counts
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
@@ -1,3 +1,4 @@
+from dataclasses import dataclass, field
 from typing import Generator
 
 from litellm import ModelResponse
@@ -54,12 +55,42 @@ from openhands.utils.prompt import (
 )
 
 
+@dataclass
+class _ConversionCheckpoint:
+    """State of converting a list of events to messages, used to resume conversion
+    when more events are appended to the list."""
+
+    # The options which affect how events are converted
+    options: tuple
+    events: list[Event] = field(default_factory=list)
+    messages: list[Message] = field(default_factory=list)
+    pending_tool_call_action_messages: dict[str, Message] = field(default_factory=dict)
+    tool_call_id_to_message: dict[str, Message] = field(default_factory=dict)
+
+    def is_prefix_of(self, events: list[Event], options: tuple) -> bool:
+        if options != self.options or len(events) < len(self.events):
+            return False
+        for converted, event in zip(self.events, events):
+            if converted is event:
+                continue
+            if (
+                event.id == Event.INVALID_ID
+                or converted.id != event.id
+                or type(converted) is not type(event)
+            ) and converted != event:
+                return False
+        return True
+
+
 class ConversationMemory:
     """Processes event history into a coherent conversation for the agent."""
 
     def __init__(self, config: AgentConfig, prompt_manager: PromptManager):
         self.agent_config = config
         self.prompt_manager = prompt_manager
+        # Events converted by the last call to process_events, so that only events
+        # appended since then need converting
+        self._checkpoint: _ConversionCheckpoint | None = None
 
     @staticmethod
     def _is_valid_image_url(url: str | None) -> bool:
@@ -94,7 +125,9 @@ class ConversationMemory:
                 in the prompt to the LLM. Larger observations are truncated.
             vision_is_active: Whether vision is active in the LLM. If True, image URLs will be included.
         """
-        events = condensed_history
+        # Copied, as the events of a view are shared with its builder and the
+        # checks below may insert into them
+        events = list(condensed_history)
         # Default to empty set if not provided
         if forgotten_event_ids is None:
             forgotten_event_ids = set()
@@ -108,71 +141,100 @@ class ConversationMemory:
         # log visual browsing status
         logger.debug(f'Visual browsing: {self.agent_config.enable_som_visual_browsing}')
 
-        # Initialize empty messages list
-        messages = []
-
-        # Process regular events
-        pending_tool_call_action_messages: dict[str, Message] = {}
-        tool_call_id_to_message: dict[str, Message] = {}
+        # Resume from the last call if its events are a prefix of these. Otherwise
+        # (e.g. after a condensation changed the view) convert from the start.
+        options = (
+            max_message_chars,
+            vision_is_active,
+            self.agent_config.enable_som_visual_browsing,
+        )
+        checkpoint = self._checkpoint
+        if checkpoint is None or not checkpoint.is_prefix_of(events, options):
+            checkpoint = _ConversionCheckpoint(options=options)
+        # Discard the checkpoint if conversion fails part way through
+        self._checkpoint = None
 
-        for i, event in enumerate(events):
-            # create a regular message from an event
-            if isinstance(event, Action):
-                messages_to_add = self._process_action(
-                    action=event,
-                    pending_tool_call_action_messages=pending_tool_call_action_messages,
-                    vision_is_active=vision_is_active,
-                )
-            elif isinstance(event, Observation):
-                messages_to_add = self._process_observation(
-                    obs=event,
-                    tool_call_id_to_message=tool_call_id_to_message,
-                    max_message_chars=max_message_chars,
-                    vision_is_active=vision_is_active,
-                    enable_som_visual_browsing=self.agent_config.enable_som_visual_browsing,
-                    current_index=i,
-                    events=events,
-                )
-            else:
-                raise ValueError(f'Unknown event type: {type(event)}')
-
-            # Check pending tool call action messages and see if they are complete
-            _response_ids_to_remove = []
-            for (
-                response_id,
-                pending_message,
-            ) in pending_tool_call_action_messages.items():
-                assert pending_message.tool_calls is not None, (
-                    'Tool calls should NOT be None when function calling is enabled & the message is considered pending tool call. '
-                    f'Pending message: {pending_message}'
-                )
-                if all(
-                    tool_call.id in tool_call_id_to_message
-                    for tool_call in pending_message.tool_calls
-                ):
-                    # If complete:
-                    # -- 1. Add the message that **initiated** the tool calls
-                    messages_to_add.append(pending_message)
-                    # -- 2. Add the tool calls **results***
-                    for tool_call in pending_message.tool_calls:
-                        messages_to_add.append(tool_call_id_to_message[tool_call.id])
-                        tool_call_id_to_message.pop(tool_call.id)
-                    _response_ids_to_remove.append(response_id)
-            # Cleanup the processed pending tool messages
-            for response_id in _response_ids_to_remove:
-                pending_tool_call_action_messages.pop(response_id)
-
-            messages += messages_to_add
+        for i in range(len(checkpoint.events), len(events)):
+            self._process_event(checkpoint, events, i)
+        checkpoint.events = list(events)
+        self._checkpoint = checkpoint
 
         # Apply final filtering so that the messages in context don't have unmatched tool calls
         # and tool responses, for example
-        messages = list(ConversationMemory._filter_unmatched_tool_calls(messages))
+        messages = list(
+            ConversationMemory._filter_unmatched_tool_calls(checkpoint.messages)
+        )
+
+        # Callers modify the messages returned (e.g. to apply prompt caching), so
+        # copy them to keep the checkpoint unchanged
+        messages = [
+            message.model_copy(
+                update={'content': [item.model_copy() for item in message.content]}
+            )
+            for message in messages
+        ]
 
         # Apply final formatting
         messages = self._apply_user_message_formatting(messages)
 
         return messages
 
+    def _process_event(
+        self, checkpoint: _ConversionCheckpoint, events: list[Event], i: int
+    ) -> None:
+        """Converts the event at index i, adding any completed messages to the checkpoint."""
+        event = events[i]
+        pending_tool_call_action_messages = checkpoint.pending_tool_call_action_messages
+        tool_call_id_to_message = checkpoint.tool_call_id_to_message
+
+        # create a regular message from an event
+        if isinstance(event, Action):
+            messages_to_add = self._process_action(
+                action=event,
+                pending_tool_call_action_messages=pending_tool_call_action_messages,
+                vision_is_active=checkpoint.options[1],
+            )
+        elif isinstance(event, Observation):
+            messages_to_add = self._process_observation(
+                obs=event,
+                tool_call_id_to_message=tool_call_id_to_message,
+                max_message_chars=checkpoint.options[0],
+                vision_is_active=checkpoint.options[1],
+                enable_som_visual_browsing=checkpoint.options[2],
+                current_index=i,
+                events=events,
+            )
+        else:
+            raise ValueError(f'Unknown event type: {type(event)}')
+
+        # Check pending tool call action messages and see if they are complete
+        _response_ids_to_remove = []
+        for (
+            response_id,
+            pending_message,
+        ) in pending_tool_call_action_messages.items():
+            assert pending_message.tool_calls is not None, (
+                'Tool calls should NOT be None when function calling is enabled & the message is considered pending tool call. '
+                f'Pending message: {pending_message}'
+            )
+            if all(
+                tool_call.id in tool_call_id_to_message
+                for tool_call in pending_message.tool_calls
+            ):
+                # If complete:
+                # -- 1. Add the message that **initiated** the tool calls
+                messages_to_add.append(pending_message)
+                # -- 2. Add the tool calls **results***
+                for tool_call in pending_message.tool_calls:
+                    messages_to_add.append(tool_call_id_to_message[tool_call.id])
+                    tool_call_id_to_message.pop(tool_call.id)
+                _response_ids_to_remove.append(response_id)
+        # Cleanup the processed pending tool messages
+        for response_id in _response_ids_to_remove:
+            pending_tool_call_action_messages.pop(response_id)
+
+        checkpoint.messages += messages_to_add
+
     def _apply_user_message_formatting(self, messages: list[Message]) -> list[Message]:
         """Applies formatting rules, such as adding newlines between consecutive user messages."""
         formatted_messages = []
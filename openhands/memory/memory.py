@@ -23,6 +23,7 @@ from openhands.microagent import (
     RepoMicroagent,
     load_microagents_from_dir,
 )
+from openhands.microagent.trigger_index import TriggerIndex
 from openhands.runtime.base import Runtime
 from openhands.runtime.runtime_status import RuntimeStatus
 from openhands.utils.prompt import (
@@ -71,6 +72,7 @@ class Memory:
         # Additional placeholders to store user workspace microagents
         self.repo_microagents = {}
         self.knowledge_microagents = {}
+        self._trigger_index = TriggerIndex([])
 
         # Store repository / runtime info to send them to the templating later
         self.repository_info: RepositoryInfo | None = None
@@ -83,6 +85,7 @@ class Memory:
 
         # Load user microagents from ~/.openhands/microagents/
         self._load_user_microagents()
+        self._update_trigger_index()
 
     def on_event(self, event: Event):
         """Handle an event from the event stream."""
@@ -256,19 +259,23 @@ class Memory:
             return recalled_content
 
         # Search for microagent triggers in the query
-        for name, microagent in self.knowledge_microagents.items():
-            trigger = microagent.match_trigger(query)
-            if trigger:
-                logger.info("Microagent '%s' triggered by keyword '%s'", name, trigger)
-                recalled_content.append(
-                    MicroagentKnowledge(
-                        name=microagent.name,
-                        trigger=trigger,
-                        content=microagent.content,
-                    )
+        for microagent, trigger in self._trigger_index.match(query):
+            logger.info(
+                "Microagent '%s' triggered by keyword '%s'", microagent.name, trigger
+            )
+            recalled_content.append(
+                MicroagentKnowledge(
+                    name=microagent.name,
+                    trigger=trigger,
+                    content=microagent.content,
                 )
+            )
         return recalled_content
 
+    def _update_trigger_index(self) -> None:
+        """Rebuild the trigger index after knowledge microagents were loaded."""
+        self._trigger_index = TriggerIndex(self.knowledge_microagents.values())
+
     def load_user_workspace_microagents(
         self, user_microagents: list[BaseMicroagent]
     ) -> None:
@@ -284,6 +291,7 @@ class Memory:
                 self.knowledge_microagents[user_microagent.name] = user_microagent
             elif isinstance(user_microagent, RepoMicroagent):
                 self.repo_microagents[user_microagent.name] = user_microagent
+        self._update_trigger_index()
 
     def _load_global_microagents(self) -> None:
         """Loads microagents from the global microagents_dir"""
@@ -94,3 +94,93 @@ class View(BaseModel):
             unhandled_condensation_request=unhandled_condensation_request,
             forgotten_event_ids=forgotten_event_ids,
         )
+
+
+class ViewBuilder:
+    """Maintains the view of a growing list of events incrementally.
+
+    `View.from_events` rescans the whole history, which makes rebuilding the view
+    after every agent step linear in the length of the conversation. This builder
+    applies only the events appended since the last call, and produces the same
+    view as `View.from_events`. If the list is replaced or shrinks, the view is
+    rebuilt from scratch.
+
+    Views share their events and forgotten ids with the builder, which extends
+    them in place on later updates, so a view is only valid until the next update.
+    """
+
+    def __init__(self) -> None:
+        self._reset(None)
+
+    def _reset(self, source: list[Event] | None) -> None:
+        self._source = source
+        self._num_applied = 0
+        self._last_applied: Event | None = None
+        self._kept_events: list[Event] = []
+        self._forgotten_event_ids: set[int] = set()
+        self._summary: AgentCondensationObservation | None = None
+        self._summary_offset: int | None = None
+        self._unhandled_condensation_request = False
+        # The kept events with the summary inserted, None when they need rebuilding
+        self._view_events: list[Event] | None = None
+        self._view: View | None = None
+
+    def update(self, events: list[Event]) -> View:
+        """Get the view of `events`, which are usually the previous events plus new ones."""
+        if (
+            events is not self._source
+            or len(events) < self._num_applied
+            or (
+                self._num_applied
+                and events[self._num_applied - 1] is not self._last_applied
+            )
+        ):
+            self._reset(events)
+        if self._view is not None and len(events) == self._num_applied:
+            return self._view
+
+        num_kept = len(self._kept_events)
+        for event in events[self._num_applied :]:
+            self._apply(event)
+        self._num_applied = len(events)
+        self._last_applied = events[-1] if events else None
+
+        if (
+            self._view_events is None
+            # Until enough events are kept, the summary moves as they are added
+            or (self._summary_offset is not None and self._summary_offset > num_kept)
+        ):
+            self._view_events = list(self._kept_events)
+            if self._summary is not None and self._summary_offset is not None:
+                self._view_events.insert(self._summary_offset, self._summary)
+        else:
+            self._view_events.extend(self._kept_events[num_kept:])
+        # The events were validated when they were created
+        self._view = View.model_construct(
+            events=self._view_events,
+            unhandled_condensation_request=self._unhandled_condensation_request,
+            forgotten_event_ids=self._forgotten_event_ids,
+        )
+        return self._view
+
+    def _apply(self, event: Event) -> None:
+        if isinstance(event, CondensationAction):
+            forgotten = set(event.forgotten)
+            forgotten.add(event.id)
+            new_ids = forgotten - self._forgotten_event_ids
+            self._forgotten_event_ids |= new_ids
+            if new_ids:
+                self._kept_events = [
+                    kept for kept in self._kept_events if kept.id not in new_ids
+                ]
+            if event.summary is not None and event.summary_offset is not None:
+                logger.info(f'Inserting summary at offset {event.summary_offset}')
+                self._summary = AgentCondensationObservation(content=event.summary)
+                self._summary_offset = event.summary_offset
+            self._unhandled_condensation_request = False
+            self._view_events = None
+        elif isinstance(event, CondensationRequestAction):
+            self._forgotten_event_ids.add(event.id)
+            self._unhandled_condensation_request = True
+        elif event.id not in self._forgotten_event_ids:
+            self._kept_events.append(event)
@@ -2,6 +2,7 @@ from .microagent import (
     BaseMicroagent,
     KnowledgeMicroagent,
     RepoMicroagent,
+    clear_microagent_cache,
     load_microagents_from_dir,
 )
 from .types import MicroagentMetadata, MicroagentType
@@ -12,5 +13,6 @@ __all__ = [
     'RepoMicroagent',
     'MicroagentMetadata',
     'MicroagentType',
+    'clear_microagent_cache',
     'load_microagents_from_dir',
 ]
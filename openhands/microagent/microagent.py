@@ -1,6 +1,8 @@
 import io
 import re
-from itertools import chain
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import ClassVar, Union
 
@@ -13,6 +15,17 @@ from openhands.core.exceptions import (
 from openhands.core.logger import openhands_logger as logger
 from openhands.microagent.types import InputMetadata, MicroagentMetadata, MicroagentType
 
+# Maximum number of parsed microagent files kept in the process wide cache
+MICROAGENT_CACHE_SIZE = 2000
+# Directories with at least this many files not in the cache are parsed in parallel
+PARALLEL_LOAD_MIN_FILES = 8
+_LOAD_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix='microagent-load')
+_cache_lock = threading.Lock()
+# (file, microagent_dir) -> (mtime in ns, size, parsed microagent)
+_microagent_cache: OrderedDict[tuple[Path, Path], tuple[int, int, 'BaseMicroagent']] = (
+    OrderedDict()
+)
+
 
 class BaseMicroagent(BaseModel):
     """Base class for all microagents."""
@@ -274,15 +287,75 @@ class TaskMicroagent(KnowledgeMicroagent):
         return self.metadata.inputs
 
 
+def clear_microagent_cache(microagent_dir: Union[str, Path, None] = None) -> None:
+    """Remove the cached microagents of a directory, or of all directories."""
+    with _cache_lock:
+        if microagent_dir is None:
+            _microagent_cache.clear()
+            return
+        microagent_dir = Path(microagent_dir)
+        for key in [key for key in _microagent_cache if key[1] == microagent_dir]:
+            del _microagent_cache[key]
+
+
+def _load_cached(file: Path, microagent_dir: Path) -> BaseMicroagent:
+    """Load a microagent file, reusing the parsed microagent if the file's
+    modification time and size are unchanged since it was parsed."""
+    stat = file.stat()
+    key = (file, microagent_dir)
+    with _cache_lock:
+        cached = _microagent_cache.get(key)
+        if cached is not None:
+            _microagent_cache.move_to_end(key)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        agent = cached[2]
+    else:
+        agent = BaseMicroagent.load(file, microagent_dir)
+        with _cache_lock:
+            _microagent_cache[key] = (stat.st_mtime_ns, stat.st_size, agent)
+            _microagent_cache.move_to_end(key)
+            while len(_microagent_cache) > MICROAGENT_CACHE_SIZE:
+                _microagent_cache.popitem(last=False)
+    # Callers own the microagents they load, so the cached one is never shared
+    return agent.model_copy(deep=True)
+
+
+def _load_file(
+    file: Path, microagent_dir: Path, use_cache: bool
+) -> BaseMicroagent | Exception:
+    try:
+        if use_cache:
+            return _load_cached(file, microagent_dir)
+        return BaseMicroagent.load(file, microagent_dir)
+    except Exception as e:
+        return e
+
+
+def _remove_deleted_files(microagent_dir: Path, files: list[Path]) -> None:
+    existing = set(files)
+    with _cache_lock:
+        for key in [
+            key
+            for key in _microagent_cache
+            if key[1] == microagent_dir and key[0] not in existing
+        ]:
+            del _microagent_cache[key]
+
+
 def load_microagents_from_dir(
     microagent_dir: Union[str, Path],
+    use_cache: bool = True,
 ) -> tuple[dict[str, RepoMicroagent], dict[str, KnowledgeMicroagent]]:
     """Load all microagents from the given directory.
 
     Note, legacy repo instructions will not be loaded here.
 
+    Parsed files are cached for the process, keyed by path, modification time and
+    size, so loading a directory again only parses the files which changed.
+
     Args:
         microagent_dir: Path to the microagents directory (e.g. .openhands/microagents)
+        use_cache: Whether to use the cache, which temporary directories shouldn't
 
     Returns:
         Tuple of (repo_agents, knowledge_agents) dictionaries
@@ -316,23 +389,40 @@ def load_microagents_from_dir(
     if microagent_dir.exists():
         md_files = [f for f in microagent_dir.rglob('*.md') if f.name != 'README.md']
 
-    # Process all files in one loop
-    for file in chain(special_files, md_files):
-        try:
-            agent = BaseMicroagent.load(file, microagent_dir)
-            if isinstance(agent, RepoMicroagent):
-                repo_agents[agent.name] = agent
-            elif isinstance(agent, KnowledgeMicroagent):
-                # Both KnowledgeMicroagent and TaskMicroagent go into knowledge_agents
-                knowledge_agents[agent.name] = agent
-        except MicroagentValidationError as e:
+    files = [*special_files, *md_files]
+    if use_cache:
+        _remove_deleted_files(microagent_dir, files)
+        with _cache_lock:
+            uncached = sum(
+                1 for file in files if (file, microagent_dir) not in _microagent_cache
+            )
+    else:
+        uncached = len(files)
+
+    # Parse the files in parallel on a cold start, keeping their order
+    if uncached >= PARALLEL_LOAD_MIN_FILES:
+        results = list(
+            _LOAD_EXECUTOR.map(
+                lambda file: _load_file(file, microagent_dir, use_cache), files
+            )
+        )
+    else:
+        results = [_load_file(file, microagent_dir, use_cache) for file in files]
+
+    for file, result in zip(files, results):
+        if isinstance(result, MicroagentValidationError):
             # For validation errors, include the original exception
-            error_msg = f'Error loading microagent from {file}: {str(e)}'
-            raise MicroagentValidationError(error_msg) from e
-        except Exception as e:
+            error_msg = f'Error loading microagent from {file}: {str(result)}'
+            raise MicroagentValidationError(error_msg) from result
+        if isinstance(result, Exception):
             # For other errors, wrap in a ValueError with detailed message
-            error_msg = f'Error loading microagent from {file}: {str(e)}'
-            raise ValueError(error_msg) from e
+            error_msg = f'Error loading microagent from {file}: {str(result)}'
+            raise ValueError(error_msg) from result
+        if isinstance(result, RepoMicroagent):
+            repo_agents[result.name] = result
+        elif isinstance(result, KnowledgeMicroagent):
+            # Both KnowledgeMicroagent and TaskMicroagent go into knowledge_agents
+            knowledge_agents[result.name] = result
 
     logger.debug(
         f'Loaded {len(repo_agents) + len(knowledge_agents)} microagents: '
@@ -0,0 +1,95 @@
+import re
+from typing import Any, Iterable
+
+from openhands.microagent.microagent import KnowledgeMicroagent
+
+# Marks the end of a trigger in a trie node
+_END = ''
+
+
+class TriggerIndex:
+    """Finds the knowledge microagents triggered by a message in a single pass.
+
+    The lowercased triggers of all microagents are compiled into one regex shaped
+    like a trie, so the regex engine follows a single branch at each position of
+    the message rather than trying every trigger in turn. A lookahead makes it
+    report the longest trigger starting at each position; the shorter triggers
+    it starts with are found through the trie.
+
+    Matches are the same as calling `KnowledgeMicroagent.match_trigger` on each
+    microagent in order.
+    """
+
+    def __init__(self, microagents: Iterable[KnowledgeMicroagent]):
+        self.microagents = list(microagents)
+        # Lowercased trigger -> (microagent position, trigger position) of its uses
+        self._uses: dict[str, list[tuple[int, int]]] = {}
+        for agent_pos, microagent in enumerate(self.microagents):
+            for trigger_pos, trigger in enumerate(microagent.triggers):
+                self._uses.setdefault(trigger.lower(), []).append(
+                    (agent_pos, trigger_pos)
+                )
+
+        trie: dict[str, Any] = {}
+        for trigger in self._uses:
+            node = trie
+            for char in trigger:
+                node = node.setdefault(char, {})
+            node[_END] = {}
+        # The triggers each trigger starts with, including itself
+        self._prefixes: dict[str, list[str]] = {
+            trigger: self._find_prefixes(trie, trigger) for trigger in self._uses
+        }
+        # An empty trigger is contained in every message, but isn't a match, so
+        # it hides the triggers of its microagent which come after it
+        self._always = [_END] if _END in self._uses else []
+        body = _trie_pattern(trie)
+        self._pattern = re.compile(f'(?=({body}))') if body else None
+
+    def match(self, message: str) -> list[tuple[KnowledgeMicroagent, str]]:
+        """Return the triggered microagents, each with the first of its triggers
+        contained in the message, in the order the microagents were given."""
+        matched = set(self._always)
+        if self._pattern is not None:
+            longest = {m.group(1) for m in self._pattern.finditer(message.lower())}
+            for trigger in longest:
+                matched.update(self._prefixes[trigger])
+
+        first_trigger: dict[int, int] = {}
+        for trigger in matched:
+            for agent_pos, trigger_pos in self._uses[trigger]:
+                if trigger_pos < first_trigger.get(agent_pos, trigger_pos + 1):
+                    first_trigger[agent_pos] = trigger_pos
+        matches = []
+        for agent_pos in sorted(first_trigger):
+            microagent = self.microagents[agent_pos]
+            trigger = microagent.triggers[first_trigger[agent_pos]]
+            if trigger:
+                matches.append((microagent, trigger))
+        return matches
+
+    @staticmethod
+    def _find_prefixes(trie: dict[str, Any], trigger: str) -> list[str]:
+        prefixes = []
+        node = trie
+        for i, char in enumerate(trigger):
+            node = node[char]
+            if _END in node:
+                prefixes.append(trigger[: i + 1])
+        return prefixes
+
+
+def _trie_pattern(node: dict[str, Any]) -> str:
+    """Build a regex matching the longest path from the trie node to a trigger end."""
+    branches = [
+        re.escape(char) + _trie_pattern(child)
+        for char, child in sorted(node.items())
+        if char != _END
+    ]
+    if not branches:
+        return ''
+    if len(branches) == 1 and _END not in node:
+        return branches[0]
+    group = f'(?:{"|".join(branches)})'
+    # A greedy optional group prefers the longer triggers continuing this node
+    return f'{group}?' if _END in node else group
@@ -13,30 +13,30 @@ NOTE: this will be executed inside the docker sandbox.
 
 import argparse
 import asyncio
-import base64
+import gzip
+import io
 import json
 import mimetypes
 import os
 import shutil
 import sys
-import tempfile
 import time
 from contextlib import asynccontextmanager
 from pathlib import Path
-from zipfile import ZipFile
 
+import anyio
 import puremagic
 from binaryornot.check import is_binary
 from fastapi import Depends, FastAPI, HTTPException, Request, UploadFile
+from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.security import APIKeyHeader
 from openhands_aci.editor.editor import OHEditor
 from openhands_aci.editor.exceptions import ToolError
 from openhands_aci.editor.results import ToolResult
 from openhands_aci.utils.diff import get_diff
 from pydantic import BaseModel
-from starlette.background import BackgroundTask
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from uvicorn import run
 
@@ -74,8 +74,24 @@ from openhands.runtime.file_viewer_server import start_file_viewer_server
 from openhands.runtime.mcp.proxy import MCPProxyManager
 from openhands.runtime.plugins import ALL_PLUGINS, JupyterPlugin, Plugin, VSCodePlugin
 from openhands.runtime.utils import find_available_tcp_port
+from openhands.runtime.utils.archive import (
+    ARCHIVE_MEDIA_TYPES,
+    CHUNK_SIZE,
+    STREAMING_ARCHIVE_FORMATS,
+    ChunkReader,
+    check_archive_format,
+    extract_archive,
+    hash_matching_files,
+    iter_archive,
+    walk_files,
+)
 from openhands.runtime.utils.bash import BashSession
-from openhands.runtime.utils.files import insert_lines, read_lines
+from openhands.runtime.utils.files import (
+    MAX_DATA_URL_FILE_SIZE,
+    encode_file_as_data_url,
+    insert_lines,
+    read_file_lines,
+)
 from openhands.runtime.utils.memory_monitor import MemoryMonitor
 from openhands.runtime.utils.runtime_init import init_user_and_working_directory
 from openhands.runtime.utils.system_stats import (
@@ -95,6 +111,8 @@ class ActionRequest(BaseModel):
 ROOT_GID = 0
 
 SESSION_API_KEY = os.environ.get('SESSION_API_KEY')
+# Observations larger than this are sent gzip compressed to clients accepting it
+COMPRESS_OBSERVATION_MIN_SIZE = 64 * 1024
 api_key_header = APIKeyHeader(name='X-Session-API-Key', auto_error=False)
 
 
@@ -104,6 +122,23 @@ def verify_api_key(api_key: str = Depends(api_key_header)):
     return api_key
 
 
+async def _observation_response(request: Request, observation: dict) -> Response:
+    """Encode the observation, compressing large ones such as long command output."""
+    response = JSONResponse(content=jsonable_encoder(observation))
+    if len(response.body) >= COMPRESS_OBSERVATION_MIN_SIZE and (
+        'gzip' in request.headers.get('accept-encoding', '')
+    ):
+        content = await call_sync_from_async(
+            gzip.compress, bytes(response.body), compresslevel=1
+        )
+        return Response(
+            content=content,
+            media_type='application/json',
+            headers={'Content-Encoding': 'gzip', 'Vary': 'Accept-Encoding'},
+        )
+    return response
+
+
 def _execute_file_editor(
     editor: OHEditor,
     command: str,
@@ -170,6 +205,42 @@ def _execute_file_editor(
     return result.output, (result.old_content, result.new_content)
 
 
+# Extensions of files read as data URLs, with the MIME type used when none is guessed
+_DATA_URL_DEFAULT_MIME_TYPES = {
+    **dict.fromkeys(('.png', '.jpg', '.jpeg', '.bmp', '.gif'), 'image/png'),
+    '.pdf': 'application/pdf',
+    **dict.fromkeys(('.mp4', '.webm', '.ogg'), 'video/mp4'),
+}
+
+
+def _get_data_url_default_mime_type(filepath: str) -> str | None:
+    lower_filepath = filepath.lower()
+    for extension, mime_type in _DATA_URL_DEFAULT_MIME_TYPES.items():
+        if lower_filepath.endswith(extension):
+            return mime_type
+    return None
+
+
+async def _extract_request_body(
+    request: Request, dest: str, archive_format: str
+) -> None:
+    """Extract the archive in a request body while it is received."""
+    chunks = request.stream()
+
+    async def next_chunk() -> bytes | None:
+        try:
+            return await chunks.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    def read_chunk() -> bytes | None:
+        # Runs in the extracting thread, waiting on the event loop for a chunk
+        return anyio.from_thread.run(next_chunk)
+
+    reader = io.BufferedReader(ChunkReader(read_chunk), CHUNK_SIZE)
+    await anyio.to_thread.run_sync(extract_archive, reader, dest, archive_format)
+
+
 class ActionExecutor:
     """ActionExecutor is running inside docker sandbox.
     It is responsible for executing actions received from OpenHands backend and producing observations.
@@ -472,35 +543,21 @@ class ActionExecutor:
         working_dir = self.bash_session.cwd
         filepath = self._resolve_path(action.path, working_dir)
         try:
-            if filepath.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.gif')):
-                with open(filepath, 'rb') as file:
-                    image_data = file.read()
-                    encoded_image = base64.b64encode(image_data).decode('utf-8')
-                    mime_type, _ = mimetypes.guess_type(filepath)
-                    if mime_type is None:
-                        mime_type = 'image/png'  # default to PNG if mime type cannot be determined
-                    encoded_image = f'data:{mime_type};base64,{encoded_image}'
-
-                return FileReadObservation(path=filepath, content=encoded_image)
-            elif filepath.lower().endswith('.pdf'):
-                with open(filepath, 'rb') as file:
-                    pdf_data = file.read()
-                    encoded_pdf = base64.b64encode(pdf_data).decode('utf-8')
-                    encoded_pdf = f'data:application/pdf;base64,{encoded_pdf}'
-                return FileReadObservation(path=filepath, content=encoded_pdf)
-            elif filepath.lower().endswith(('.mp4', '.webm', '.ogg')):
-                with open(filepath, 'rb') as file:
-                    video_data = file.read()
-                    encoded_video = base64.b64encode(video_data).decode('utf-8')
-                    mime_type, _ = mimetypes.guess_type(filepath)
-                    if mime_type is None:
-                        mime_type = 'video/mp4'  # default to MP4 if MIME type cannot be determined
-                    encoded_video = f'data:{mime_type};base64,{encoded_video}'
-
-                return FileReadObservation(path=filepath, content=encoded_video)
-
-            with open(filepath, 'r', encoding='utf-8') as file:
-                lines = read_lines(file.readlines(), action.start, action.end)
+            default_mime_type = _get_data_url_default_mime_type(filepath)
+            if default_mime_type is not None:
+                file_size = os.path.getsize(filepath)
+                if file_size > MAX_DATA_URL_FILE_SIZE:
+                    return ErrorObservation(
+                        f'File is too large to read ({file_size} bytes, the limit is '
+                        f'{MAX_DATA_URL_FILE_SIZE} bytes): {filepath}'
+                    )
+                mime_type, _ = mimetypes.guess_type(filepath)
+                encoded = encode_file_as_data_url(
+                    filepath, mime_type or default_mime_type
+                )
+                return FileReadObservation(path=filepath, content=encoded)
+
+            lines = read_file_lines(filepath, action.start, action.end)
         except FileNotFoundError:
             return ErrorObservation(
                 f'File not found: {filepath}. Your current working directory is {working_dir}.'
@@ -819,7 +876,7 @@ if __name__ == '__main__':
         return response
 
     @app.post('/execute_action')
-    async def execute_action(action_request: ActionRequest):
+    async def execute_action(action_request: ActionRequest, request: Request):
         assert client is not None
         try:
             action = event_from_dict(action_request.action)
@@ -827,7 +884,7 @@ if __name__ == '__main__':
                 raise HTTPException(status_code=400, detail='Invalid action type')
             client.last_execution_time = time.time()
             observation = await client.run_action(action)
-            return event_to_dict(observation)
+            return await _observation_response(request, event_to_dict(observation))
         except Exception as e:
             logger.exception(f'Error while running /execute_action: {str(e)}')
             raise HTTPException(
@@ -890,11 +947,29 @@ if __name__ == '__main__':
             },
         )
 
+    @app.post('/upload_manifest')
+    async def upload_manifest(request: Request):
+        """Hash the files under a destination whose sizes match those given.
+
+        Clients upload only the files whose hashes differ from their own.
+        """
+        request_dict = await request.json()
+        destination = request_dict.get('destination', '')
+        files = request_dict.get('files') or {}
+        if not os.path.isabs(destination):
+            raise HTTPException(
+                status_code=400, detail='Destination must be an absolute path'
+            )
+        hashes = await call_sync_from_async(hash_matching_files, destination, files)
+        return JSONResponse(content=hashes)
+
     @app.post('/upload_file')
     async def upload_file(
-        file: UploadFile,
+        request: Request,
+        file: UploadFile | None = None,
         destination: str = '/',
         recursive: bool = False,
+        archive_format: str | None = None,
     ):
         assert client is not None
 
@@ -909,6 +984,22 @@ if __name__ == '__main__':
             if not os.path.exists(full_dest_path):
                 os.makedirs(full_dest_path, exist_ok=True)
 
+            if archive_format in STREAMING_ARCHIVE_FORMATS:
+                # The request body is the archive, extracted as it arrives
+                await _extract_request_body(request, full_dest_path, archive_format)
+                logger.debug(f'Extracted {archive_format} upload to {destination}')
+                return JSONResponse(
+                    content={
+                        'destination': destination,
+                        'recursive': recursive,
+                        'archive_format': archive_format,
+                    },
+                    status_code=200,
+                )
+
+            if file is None or file.filename is None:
+                raise HTTPException(status_code=400, detail='No file uploaded')
+
             if recursive or file.filename.endswith('.zip'):
                 # For recursive uploads, we expect a zip file
                 if not file.filename.endswith('.zip'):
@@ -947,7 +1038,7 @@ if __name__ == '__main__':
             raise HTTPException(status_code=500, detail=str(e))
 
     @app.get('/download_files')
-    def download_file(path: str):
+    def download_file(path: str, archive_format: str = 'zip'):
         logger.debug('Downloading files')
         try:
             if not os.path.isabs(path):
@@ -958,20 +1049,14 @@ if __name__ == '__main__':
             if not os.path.exists(path):
                 raise HTTPException(status_code=404, detail='File not found')
 
-            with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as temp_zip:
-                with ZipFile(temp_zip, 'w') as zipf:
-                    for root, _, files in os.walk(path):
-                        for file in files:
-                            file_path = os.path.join(root, file)
-                            zipf.write(
-                                file_path, arcname=os.path.relpath(file_path, path)
-                            )
-                return FileResponse(
-                    path=temp_zip.name,
-                    media_type='application/zip',
-                    filename=f'{os.path.basename(path)}.zip',
-                    background=BackgroundTask(lambda: os.unlink(temp_zip.name)),
-                )
+            check_archive_format(archive_format)
+            # The archive is built while it is sent, so nothing is written to disk
+            filename = f'{os.path.basename(path)}.{archive_format}'
+            return StreamingResponse(
+                iter_archive(walk_files(path), archive_format),
+                media_type=ARCHIVE_MEDIA_TYPES[archive_format],
+                headers={'Content-Disposition': f'attachment; filename="{filename}"'},
+            )
 
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
@@ -728,7 +728,10 @@ fi
                 zip_file.extractall(microagent_folder)
 
             zip_path.unlink()
-            repo_agents, knowledge_agents = load_microagents_from_dir(microagent_folder)
+            # The temporary folder is never loaded again, so isn't cached
+            repo_agents, knowledge_agents = load_microagents_from_dir(
+                microagent_folder, use_cache=False
+            )
 
             self.log(
                 'info',
@@ -10,7 +10,6 @@ import tempfile
 import threading
 from pathlib import Path
 from typing import Any
-from zipfile import ZipFile
 
 import httpcore
 import httpx
@@ -53,6 +52,13 @@ from openhands.integrations.provider import PROVIDER_TOKEN_TYPE
 from openhands.llm.llm_registry import LLMRegistry
 from openhands.runtime.base import Runtime
 from openhands.runtime.plugins import PluginRequirement
+from openhands.runtime.utils.archive import (
+    ARCHIVE_MEDIA_TYPES,
+    ArchiveStream,
+    file_sha256,
+    iter_archive,
+    walk_files,
+)
 from openhands.runtime.utils.request import send_request
 from openhands.runtime.utils.system_stats import update_last_execution_time
 from openhands.utils.http_session import HttpSession
@@ -72,6 +78,13 @@ class ActionExecutionClient(Runtime):
     for interacting with the HTTP server defined in action_execution_server.py.
     """
 
+    # Archive format directories are uploaded in
+    COPY_ARCHIVE_FORMAT = 'tar'
+    # Whether to skip uploading files the sandbox already has
+    COPY_SKIP_UNCHANGED = True
+    # Cleared once the action server turns down a streamed archive upload
+    _streaming_upload_supported = True
+
     def __init__(
         self,
         config: OpenHandsConfig,
@@ -196,71 +209,100 @@ class ActionExecutionClient(Runtime):
         if not os.path.exists(host_src):
             raise FileNotFoundError(f'Source file {host_src} does not exist')
 
-        temp_zip_path: str | None = None  # Define temp_zip_path outside the try block
-
-        try:
-            params = {'destination': sandbox_dest, 'recursive': str(recursive).lower()}
-            file_to_upload = None
-            upload_data = {}
+        if recursive:
+            self._copy_dir_to(host_src, sandbox_dest)
+            return
 
-            if recursive:
-                # Create and write the zip file inside the try block
-                with tempfile.NamedTemporaryFile(
-                    suffix='.zip', delete=False
-                ) as temp_zip:
-                    temp_zip_path = temp_zip.name
-
-                try:
-                    with ZipFile(temp_zip_path, 'w') as zipf:
-                        for root, _, files in os.walk(host_src):
-                            for file in files:
-                                file_path = os.path.join(root, file)
-                                arcname = os.path.relpath(
-                                    file_path, os.path.dirname(host_src)
-                                )
-                                zipf.write(file_path, arcname)
+        params = {'destination': sandbox_dest, 'recursive': 'false'}
+        with open(host_src, 'rb') as file_to_upload:
+            response = self._send_action_server_request(
+                'POST',
+                f'{self.action_execution_server_url}/upload_file',
+                files={'file': file_to_upload},
+                params=params,
+                timeout=300,
+            )
+        self.log(
+            'debug',
+            f'Copy completed: host:{host_src} -> runtime:{sandbox_dest}. Response: {response.text}',
+        )
 
-                    self.log(
-                        'debug',
-                        f'Opening temporary zip file for upload: {temp_zip_path}',
-                    )
-                    file_to_upload = open(temp_zip_path, 'rb')
-                    upload_data = {'file': file_to_upload}
-                except Exception as e:
-                    # Ensure temp file is cleaned up if zipping fails
-                    if temp_zip_path and os.path.exists(temp_zip_path):
-                        os.unlink(temp_zip_path)
-                    raise e  # Re-raise the exception after cleanup attempt
-            else:
-                file_to_upload = open(host_src, 'rb')
-                upload_data = {'file': file_to_upload}
+    def _copy_dir_to(self, host_src: str, sandbox_dest: str) -> None:
+        """Upload a directory as an archive streamed while the files are read."""
+        files = list(walk_files(host_src, os.path.dirname(host_src) or '.'))
+        num_files = len(files)
+        if self.COPY_SKIP_UNCHANGED:
+            files = self._skip_unchanged_files(files, sandbox_dest)
 
-            params = {'destination': sandbox_dest, 'recursive': str(recursive).lower()}
+        archive_format = self.COPY_ARCHIVE_FORMAT
+        if archive_format == 'zip' or not self._streaming_upload_supported:
+            response = self._upload_zip(files, sandbox_dest)
+        else:
+            params = {
+                'destination': sandbox_dest,
+                'recursive': 'true',
+                'archive_format': archive_format,
+            }
+            try:
+                response = self._send_action_server_request(
+                    'POST',
+                    f'{self.action_execution_server_url}/upload_file',
+                    content=ArchiveStream(files, archive_format),
+                    headers={'Content-Type': ARCHIVE_MEDIA_TYPES[archive_format]},
+                    params=params,
+                    timeout=300,
+                )
+            except httpx.HTTPStatusError as e:
+                if not 400 <= e.response.status_code < 500:
+                    raise
+                # Servers predating streamed archives require a zip file upload
+                self.log('debug', f'Uploading a zip file, no {archive_format}: {e}')
+                self._streaming_upload_supported = False
+                response = self._upload_zip(files, sandbox_dest)
+        self.log(
+            'debug',
+            f'Copy completed: host:{host_src} -> runtime:{sandbox_dest}, '
+            f'{len(files)} of {num_files} files uploaded. Response: {response.text}',
+        )
 
-            response = self._send_action_server_request(
+    def _upload_zip(
+        self, files: list[tuple[str, str]], sandbox_dest: str
+    ) -> httpx.Response:
+        """Upload files as a zip file, which every action server accepts."""
+        with tempfile.TemporaryFile() as zip_file:
+            for chunk in iter_archive(files, 'zip'):
+                zip_file.write(chunk)
+            zip_file.seek(0)
+            return self._send_action_server_request(
                 'POST',
                 f'{self.action_execution_server_url}/upload_file',
-                files=upload_data,
-                params=params,
+                files={'file': ('upload.zip', zip_file, ARCHIVE_MEDIA_TYPES['zip'])},
+                params={'destination': sandbox_dest, 'recursive': 'true'},
                 timeout=300,
             )
-            self.log(
-                'debug',
-                f'Copy completed: host:{host_src} -> runtime:{sandbox_dest}. Response: {response.text}',
+
+    def _skip_unchanged_files(
+        self, files: list[tuple[str, str]], sandbox_dest: str
+    ) -> list[tuple[str, str]]:
+        """Drop the files whose copies under sandbox_dest have the same hash."""
+        sizes = {arcname: os.path.getsize(path) for path, arcname in files}
+        try:
+            response = self._send_action_server_request(
+                'POST',
+                f'{self.action_execution_server_url}/upload_manifest',
+                json={'destination': sandbox_dest, 'files': sizes},
+                timeout=300,
             )
-        finally:
-            if file_to_upload:
-                file_to_upload.close()
-
-            # Cleanup the temporary zip file if it was created
-            if temp_zip_path and os.path.exists(temp_zip_path):
-                try:
-                    os.unlink(temp_zip_path)
-                except Exception as e:
-                    self.log(
-                        'error',
-                        f'Failed to delete temporary zip file {temp_zip_path}: {e}',
-                    )
+            remote_hashes = response.json()
+        except httpx.HTTPStatusError as e:
+            self.log('debug', f'Uploading all files, no upload manifest: {e}')
+            return files
+        return [
+            (path, arcname)
+            for path, arcname in files
+            if arcname not in remote_hashes
+            or remote_hashes[arcname] != file_sha256(path)
+        ]
 
     def get_vscode_token(self) -> str:
         if self.vscode_enabled and self.runtime_initialized:
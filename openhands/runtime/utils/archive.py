@@ -0,0 +1,226 @@
+# IMPORTANT: LEGACY V0 CODE - Deprecated since version 1.0.0, scheduled for removal April 1, 2026
+# This file is part of the legacy (V0) implementation of OpenHands and will be removed soon as we complete the migration to V1.
+# OpenHands V1 uses the Software Agent SDK for the agentic core and runs a new application server. Please refer to:
+#   - V1 agentic core (SDK): https://github.com/OpenHands/software-agent-sdk
+#   - V1 application server (in this repo): openhands/app_server/
+# Unless you are working on deprecation, please avoid extending this legacy file and consult the V1 codepaths above.
+# Tag: Legacy-V0
+"""Streaming archives for copying directories between the host and the sandbox.
+
+Archives are produced a chunk at a time while the files are read, and tar
+archives are extracted while they are received, so neither side writes the
+archive to disk or holds it in memory.
+"""
+
+import hashlib
+import io
+import os
+import stat
+import tarfile
+import zipfile
+from dataclasses import dataclass
+from typing import IO, Callable, Iterable, Iterator, Mapping
+
+try:
+    import zstandard
+
+    HAS_ZSTANDARD = True
+except ImportError:
+    HAS_ZSTANDARD = False
+
+ARCHIVE_FORMATS = ('zip', 'tar', 'tar.zst')
+# Formats which can be extracted while they are received
+STREAMING_ARCHIVE_FORMATS = ('tar', 'tar.zst')
+ARCHIVE_MEDIA_TYPES = {
+    'zip': 'application/zip',
+    'tar': 'application/x-tar',
+    'tar.zst': 'application/zstd',
+}
+CHUNK_SIZE = 256 * 1024
+
+
+def check_archive_format(archive_format: str) -> None:
+    if archive_format not in ARCHIVE_FORMATS:
+        raise ValueError(f'Unsupported archive format: {archive_format}')
+    if archive_format == 'tar.zst' and not HAS_ZSTANDARD:
+        raise ValueError('The zstandard package is required for tar.zst archives')
+
+
+def walk_files(root: str, relative_to: str | None = None) -> Iterator[tuple[str, str]]:
+    """Yield the path and archive name of every file below `root`.
+
+    Archive names are relative to `relative_to`, which defaults to `root`.
+    """
+    relative_to = root if relative_to is None else relative_to
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            yield path, os.path.relpath(path, relative_to).replace(os.sep, '/')
+
+
+def file_sha256(path: str) -> str:
+    with open(path, 'rb') as file:
+        return hashlib.file_digest(file, 'sha256').hexdigest()
+
+
+def hash_matching_files(root: str, sizes: Mapping[str, int]) -> dict[str, str]:
+    """Hash the files below `root` which exist with the size given for them.
+
+    Used to build a manifest of the files an upload can skip, without hashing
+    files whose size already tells they changed.
+    """
+    root = os.path.abspath(root)
+    hashes = {}
+    for name, size in sizes.items():
+        path = os.path.abspath(os.path.join(root, name))
+        if not path.startswith(root + os.sep):
+            continue
+        try:
+            st = os.stat(path)
+            if stat.S_ISREG(st.st_mode) and st.st_size == size:
+                hashes[name] = file_sha256(path)
+        except OSError:
+            continue
+    return hashes
+
+
+class _ChunkWriter(io.RawIOBase):
+    """Unseekable file which collects what is written until it is taken."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:  # type: ignore[override]
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _read_chunks(path: str, size: int | None = None) -> Iterator[bytes]:
+    """Read a file in chunks, stopping after `size` bytes if given."""
+    remaining = size
+    with open(path, 'rb') as file:
+        while remaining is None or remaining > 0:
+            chunk_size = CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining)
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+    if remaining:
+        # The file shrank since its header was written
+        yield tarfile.NUL * remaining
+
+
+def _iter_tar(files: Iterable[tuple[str, str]]) -> Iterator[bytes]:
+    for path, arcname in files:
+        st = os.stat(path)
+        info = tarfile.TarInfo(arcname)
+        info.size = st.st_size
+        info.mtime = int(st.st_mtime)
+        info.mode = stat.S_IMODE(st.st_mode)
+        yield info.tobuf(tarfile.PAX_FORMAT)
+        yield from _read_chunks(path, info.size)
+        remainder = info.size % tarfile.BLOCKSIZE
+        if remainder:
+            yield tarfile.NUL * (tarfile.BLOCKSIZE - remainder)
+    yield tarfile.NUL * (tarfile.BLOCKSIZE * 2)
+
+
+def _iter_zip(files: Iterable[tuple[str, str]]) -> Iterator[bytes]:
+    writer = _ChunkWriter()
+    with zipfile.ZipFile(writer, 'w') as zipf:
+        for path, arcname in files:
+            zinfo = zipfile.ZipInfo.from_file(path, arcname)
+            with zipf.open(zinfo, 'w') as dest:
+                for chunk in _read_chunks(path):
+                    dest.write(chunk)
+                    yield writer.take()
+            yield writer.take()
+    yield writer.take()
+
+
+def iter_archive(
+    files: Iterable[tuple[str, str]], archive_format: str = 'tar'
+) -> Iterator[bytes]:
+    """Yield an archive of `files`, given as (path, archive name) pairs."""
+    check_archive_format(archive_format)
+    if archive_format == 'zip':
+        chunks = _iter_zip(files)
+    else:
+        chunks = _iter_tar(files)
+    if archive_format == 'tar.zst':
+        compressor = zstandard.ZstdCompressor().compressobj()
+        chunks = (compressor.compress(chunk) for chunk in chunks)
+        chunks = _chain_flush(chunks, compressor.flush)
+    for chunk in chunks:
+        if chunk:
+            yield chunk
+
+
+def _chain_flush(
+    chunks: Iterator[bytes], flush: Callable[[], bytes]
+) -> Iterator[bytes]:
+    yield from chunks
+    yield flush()
+
+
+@dataclass
+class ArchiveStream:
+    """Request body which streams an archive of `files`.
+
+    Each iteration produces the archive from the start, so a request with this
+    body can be retried.
+    """
+
+    files: list[tuple[str, str]]
+    archive_format: str = 'tar'
+
+    def __iter__(self) -> Iterator[bytes]:
+        return iter_archive(self.files, self.archive_format)
+
+
+class ChunkReader(io.RawIOBase):
+    """File which reads the chunks returned by `read_chunk`, None ending them."""
+
+    def __init__(self, read_chunk: Callable[[], bytes | None]) -> None:
+        self._read_chunk = read_chunk
+        self._pending = memoryview(b'')
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:  # type: ignore[override]
+        while not self._pending:
+            if self._eof:
+                return 0
+            chunk = self._read_chunk()
+            if chunk is None:
+                self._eof = True
+                return 0
+            self._pending = memoryview(chunk)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def extract_archive(fileobj: IO[bytes], dest: str, archive_format: str) -> None:
+    """Extract a tar archive while reading it from `fileobj`."""
+    check_archive_format(archive_format)
+    if archive_format not in STREAMING_ARCHIVE_FORMATS:
+        raise ValueError(f'{archive_format} archives cannot be extracted as a stream')
+    if archive_format == 'tar.zst':
+        fileobj = zstandard.ZstdDecompressor().stream_reader(fileobj)
+    with tarfile.open(fileobj=fileobj, mode='r|') as tar:
+        # The data filter refuses members outside dest and special files
+        tar.extractall(dest, filter='data')
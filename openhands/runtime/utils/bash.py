@@ -5,8 +5,11 @@
 #   - V1 application server (in this repo): openhands/app_server/
 # Unless you are working on deprecation, please avoid extending this legacy file and consult the V1 codepaths above.
 # Tag: Legacy-V0
+import json
 import os
 import re
+import shlex
+import tempfile
 import time
 import uuid
 from enum import Enum
@@ -19,6 +22,7 @@ from openhands.core.logger import openhands_logger as logger
 from openhands.events.action import CmdRunAction
 from openhands.events.observation import ErrorObservation
 from openhands.events.observation.commands import (
+    CMD_OUTPUT_METADATA_PS1_REGEX,
     CMD_OUTPUT_PS1_END,
     CmdOutputMetadata,
     CmdOutputObservation,
@@ -184,6 +188,21 @@ class BashCommandStatus(Enum):
     HARD_TIMEOUT = 'hard_timeout'
 
 
+# Marks the end of every prompt printed by the shell
+_PS1_END_BYTES = CMD_OUTPUT_PS1_END.strip().encode()
+
+
+def _has_ps1_prompt(content: str) -> bool:
+    """Check for a prompt printed with PS1, rather than e.g. a command setting PS1."""
+    for match in CMD_OUTPUT_METADATA_PS1_REGEX.finditer(content):
+        try:
+            json.loads(match.group(1).strip())
+            return True
+        except json.JSONDecodeError:
+            continue
+    return False
+
+
 def _remove_command_prefix(command_output: str, command: str) -> str:
     return command_output.lstrip().removeprefix(command.lstrip()).lstrip()
 
@@ -191,6 +210,16 @@ def _remove_command_prefix(command_output: str, command: str) -> str:
 class BashSession:
     POLL_INTERVAL = 0.5
     HISTORY_LIMIT = 10_000
+    # Whether to stream the pane's output to a file, which is checked for new
+    # output every STREAM_POLL_INTERVAL. The pane is then only captured once a
+    # prompt is printed, or if there was no output for POLL_INTERVAL. Otherwise the
+    # pane is captured every POLL_INTERVAL.
+    STREAM_OUTPUT = True
+    STREAM_POLL_INTERVAL = 0.005
+    # The stream file is emptied once this much output was read from it
+    STREAM_MAX_BYTES = 16 * 1024 * 1024
+    # How long to wait for the shell to start and print its first prompt
+    STARTUP_TIMEOUT = 10.0
     PS1 = CmdOutputMetadata.to_ps1_prompt()
 
     def __init__(
@@ -250,12 +279,13 @@ class BashSession:
         self.pane = self.window.active_pane
         logger.debug(f'pane: {self.pane}; history_limit: {self.session.history_limit}')
         _initial_window.kill()
+        self._start_output_stream()
 
         # Configure bash to use simple PS1 and disable PS2
         self.pane.send_keys(
             f'export PROMPT_COMMAND=\'export PS1="{self.PS1}"\'; export PS2=""'
         )
-        time.sleep(0.1)  # Wait for command to take effect
+        self._wait_for_first_prompt()
         self._clear_screen()
 
         # Store the last command for interactive input handling
@@ -268,6 +298,69 @@ class BashSession:
         self._cwd = os.path.abspath(self.work_dir)
         self._initialized = True
 
+    def _start_output_stream(self) -> None:
+        """Stream everything the pane prints to a file, to wait on new output."""
+        self._output_stream = None
+        self._output_tail = b''
+        if not self.STREAM_OUTPUT:
+            return
+        fd, self._output_stream_path = tempfile.mkstemp(
+            prefix='openhands-bash-', suffix='.out'
+        )
+        os.close(fd)
+        result = self.pane.cmd(
+            'pipe-pane', '-o', f'cat >> {shlex.quote(self._output_stream_path)}'
+        )
+        if result.stderr:
+            logger.warning(
+                f'Could not stream bash output, polling the pane instead: {result.stderr}'
+            )
+            os.remove(self._output_stream_path)
+            return
+        self._output_stream = open(self._output_stream_path, 'rb')
+
+    def _wait_for_first_prompt(self) -> None:
+        """Wait for the shell to start and print a prompt using PS1."""
+        deadline = time.time() + self.STARTUP_TIMEOUT
+        while not _has_ps1_prompt(self._get_pane_content()):
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                logger.warning('Timed out waiting for the bash prompt')
+                return
+            if self._output_stream is None:
+                time.sleep(min(0.1, remaining))
+            else:
+                self._wait_for_output(min(self.POLL_INTERVAL, remaining))
+
+    def _drain_output(self) -> None:
+        """Discard the output streamed so far."""
+        if self._output_stream is not None:
+            self._output_stream.read()
+            self._output_tail = b''
+
+    def _wait_for_output(self, timeout: float) -> tuple[bool, bool]:
+        """Wait until the pane prints something, for up to `timeout` seconds.
+
+        Returns whether there was new output, and whether it completed a prompt.
+        """
+        assert self._output_stream is not None
+        deadline = time.time() + timeout
+        while True:
+            data = self._output_stream.read()
+            if data:
+                if self._output_stream.tell() > self.STREAM_MAX_BYTES:
+                    # Output written since the read above is lost, so a prompt may
+                    # be missed. The pane is then captured once output stops.
+                    os.truncate(self._output_stream_path, 0)
+                    self._output_stream.seek(0)
+                # Keep enough of the end to find a marker split between reads
+                data = self._output_tail + data
+                self._output_tail = data[-len(_PS1_END_BYTES) :]
+                return True, _PS1_END_BYTES in data
+            if time.time() >= deadline:
+                return False, False
+            time.sleep(self.STREAM_POLL_INTERVAL)
+
     def __del__(self) -> None:
         """Ensure the session is closed when the object is destroyed."""
         self.close()
@@ -289,6 +382,9 @@ class BashSession:
             return
         self.session.kill()
         self._closed = True
+        if self._output_stream is not None:
+            self._output_stream.close()
+            os.remove(self._output_stream_path)
 
     @property
     def cwd(self) -> str:
@@ -302,8 +398,16 @@ class BashSession:
 
     def _clear_screen(self) -> None:
         """Clear the tmux pane screen and history."""
+        self._drain_output()
         self.pane.send_keys('C-l', enter=False)
-        time.sleep(0.1)
+        if self._output_stream is None:
+            time.sleep(0.1)
+        else:
+            # The shell reprints the prompt once the screen is cleared
+            deadline = time.time() + 0.1
+            while time.time() < deadline:
+                if self._wait_for_output(deadline - time.time())[1]:
+                    break
         self.pane.cmd('clear-history')
 
     def _get_command_output(
@@ -539,6 +643,7 @@ class BashSession:
             )
 
         # Get initial state before sending command
+        self._drain_output()
         initial_pane_output = self._get_pane_content()
         initial_ps1_matches = CmdOutputMetadata.matches_ps1_metadata(
             initial_pane_output
@@ -614,41 +719,47 @@ class BashSession:
                 )
 
         # Loop until the command completes or times out
+        # Whether to capture the pane, rather than only having streamed new output
+        capture_pane = True
         while should_continue():
-            _start_time = time.time()
-            logger.debug(f'GETTING PANE CONTENT at {_start_time}')
-            cur_pane_output = self._get_pane_content()
-            logger.debug(
-                f'PANE CONTENT GOT after {time.time() - _start_time:.2f} seconds'
-            )
-            cur_pane_lines = cur_pane_output.split('\n')
-            if len(cur_pane_lines) <= 20:
-                logger.debug('PANE_CONTENT: {cur_pane_output}')
+            if capture_pane:
+                _start_time = time.time()
+                logger.debug(f'GETTING PANE CONTENT at {_start_time}')
+                cur_pane_output = self._get_pane_content()
+                logger.debug(
+                    f'PANE CONTENT GOT after {time.time() - _start_time:.2f} seconds'
+                )
+                cur_pane_lines = cur_pane_output.split('\n')
+                if len(cur_pane_lines) <= 20:
+                    logger.debug('PANE_CONTENT: {cur_pane_output}')
+                else:
+                    logger.debug(f'BEGIN OF PANE CONTENT: {cur_pane_lines[:10]}')
+                    logger.debug(f'END OF PANE CONTENT: {cur_pane_lines[-10:]}')
+                ps1_matches = CmdOutputMetadata.matches_ps1_metadata(cur_pane_output)
+                current_ps1_count = len(ps1_matches)
+
+                if cur_pane_output != last_pane_output:
+                    last_pane_output = cur_pane_output
+                    last_change_time = time.time()
+                    logger.debug(f'CONTENT UPDATED DETECTED at {last_change_time}')
+
+                # 1) Execution completed:
+                # Condition 1: A new prompt has appeared since the command started.
+                # Condition 2: The prompt count hasn't increased (potentially because the initial one scrolled off),
+                # BUT the *current* visible pane ends with a prompt, indicating completion.
+                if (
+                    current_ps1_count > initial_ps1_count
+                    or cur_pane_output.rstrip().endswith(CMD_OUTPUT_PS1_END.rstrip())
+                ):
+                    return self._handle_completed_command(
+                        command,
+                        pane_content=cur_pane_output,
+                        ps1_matches=ps1_matches,
+                        hidden=getattr(action, 'hidden', False),
+                    )
             else:
-                logger.debug(f'BEGIN OF PANE CONTENT: {cur_pane_lines[:10]}')
-                logger.debug(f'END OF PANE CONTENT: {cur_pane_lines[-10:]}')
-            ps1_matches = CmdOutputMetadata.matches_ps1_metadata(cur_pane_output)
-            current_ps1_count = len(ps1_matches)
-
-            if cur_pane_output != last_pane_output:
-                last_pane_output = cur_pane_output
+                # New output was streamed, but no prompt, so the command is running
                 last_change_time = time.time()
-                logger.debug(f'CONTENT UPDATED DETECTED at {last_change_time}')
-
-            # 1) Execution completed:
-            # Condition 1: A new prompt has appeared since the command started.
-            # Condition 2: The prompt count hasn't increased (potentially because the initial one scrolled off),
-            # BUT the *current* visible pane ends with a prompt, indicating completion.
-            if (
-                current_ps1_count > initial_ps1_count
-                or cur_pane_output.rstrip().endswith(CMD_OUTPUT_PS1_END.rstrip())
-            ):
-                return self._handle_completed_command(
-                    command,
-                    pane_content=cur_pane_output,
-                    ps1_matches=ps1_matches,
-                    hidden=getattr(action, 'hidden', False),
-                )
 
             # Timeout checks should only trigger if a new prompt hasn't appeared yet.
 
@@ -675,6 +786,10 @@ class BashSession:
                 f'CHECKING HARD TIMEOUT ({action.timeout}s): elapsed {elapsed_time:.2f}'
             )
             if action.timeout and elapsed_time >= action.timeout:
+                if not capture_pane:
+                    # Check the current pane for completion before timing out
+                    capture_pane = True
+                    continue
                 logger.debug('Hard timeout triggered.')
                 return self._handle_hard_timeout_command(
                     command,
@@ -683,6 +798,10 @@ class BashSession:
                     timeout=action.timeout,
                 )
 
-            logger.debug(f'SLEEPING for {self.POLL_INTERVAL} seconds for next poll')
-            time.sleep(self.POLL_INTERVAL)
+            if self._output_stream is None:
+                logger.debug(f'SLEEPING for {self.POLL_INTERVAL} seconds for next poll')
+                time.sleep(self.POLL_INTERVAL)
+            else:
+                changed, prompt_printed = self._wait_for_output(self.POLL_INTERVAL)
+                capture_pane = prompt_printed or not changed
         raise RuntimeError('Bash session was likely interrupted...')
@@ -5,8 +5,15 @@
 #   - V1 application server (in this repo): openhands/app_server/
 # Unless you are working on deprecation, please avoid extending this legacy file and consult the V1 codepaths above.
 # Tag: Legacy-V0
+import base64
+import bisect
+import io
 import os
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
+from typing import Iterable
 
 from openhands.events.observation import (
     ErrorObservation,
@@ -75,6 +82,148 @@ def read_lines(all_lines: list[str], start: int = 0, end: int = -1) -> list[str]
         return all_lines[begin:end]
 
 
+# Files at least this large get a line offset index, so reads can seek close to
+# the lines requested rather than scanning every line before them
+LINE_INDEX_MIN_FILE_SIZE = 8 * 1024 * 1024
+# Bytes between the checkpoints of a line offset index
+LINE_INDEX_CHECKPOINT_BYTES = 1024 * 1024
+LINE_INDEX_CACHE_SIZE = 16
+# Largest file encoded as a data URL, e.g. when reading an image or video
+MAX_DATA_URL_FILE_SIZE = 32 * 1024 * 1024
+# Bytes encoded at a time, a multiple of 3 so the encoded chunks can be joined
+_BASE64_CHUNK_SIZE = 3 * 256 * 1024
+
+
+@dataclass
+class LineOffsetIndex:
+    """The number of lines in a file, and byte offsets at which lines start.
+
+    Lines are counted as in text mode: '\n', '\r\n' and '\r' all end a line.
+    """
+
+    num_lines: int
+    # (line number, byte offset) pairs, in order, starting with (0, 0)
+    checkpoints: list[tuple[int, int]]
+
+    @classmethod
+    def build(cls, path: str) -> 'LineOffsetIndex':
+        num_lines = 0
+        offset = 0
+        checkpoints = [(0, 0)]
+        prev_ended_with_cr = False
+        last_byte = b''
+        with open(path, 'rb') as file:
+            while chunk := file.read(LINE_INDEX_CHECKPOINT_BYTES):
+                num_lf = chunk.count(b'\n')
+                num_cr = chunk.count(b'\r')
+                num_crlf = chunk.count(b'\r\n')
+                if prev_ended_with_cr and chunk.startswith(b'\n'):
+                    num_crlf += 1
+                # A line starts after the last '\n' of the chunk
+                pos = chunk.rfind(b'\n')
+                if pos >= 0:
+                    num_cr_before = num_cr - chunk.count(b'\r', pos + 1)
+                    checkpoints.append(
+                        (
+                            num_lines + num_lf + num_cr_before - num_crlf,
+                            offset + pos + 1,
+                        )
+                    )
+                num_lines += num_lf + num_cr - num_crlf
+                prev_ended_with_cr = chunk.endswith(b'\r')
+                last_byte = chunk[-1:]
+                offset += len(chunk)
+        if last_byte not in (b'', b'\n', b'\r'):
+            num_lines += 1  # The last line has no line ending
+        return cls(num_lines, checkpoints)
+
+    def checkpoint_for(self, line: int) -> tuple[int, int]:
+        """Get the last checkpoint at or before the line given."""
+        i = bisect.bisect_right(self.checkpoints, line, key=lambda c: c[0])
+        return self.checkpoints[max(i - 1, 0)]
+
+
+_line_index_cache: OrderedDict[str, tuple[int, int, LineOffsetIndex]] = OrderedDict()
+
+
+def get_line_offset_index(path: str) -> LineOffsetIndex:
+    """Get the line offset index of a file, built again if the file changed."""
+    stat = os.stat(path)
+    cached = _line_index_cache.get(path)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        _line_index_cache.move_to_end(path)
+        return cached[2]
+    index = LineOffsetIndex.build(path)
+    _line_index_cache[path] = (stat.st_mtime_ns, stat.st_size, index)
+    _line_index_cache.move_to_end(path)
+    while len(_line_index_cache) > LINE_INDEX_CACHE_SIZE:
+        _line_index_cache.popitem(last=False)
+    return index
+
+
+def read_lines_streaming(
+    lines: Iterable[str], start: int = 0, end: int = -1
+) -> list[str]:
+    """Equivalent to `read_lines(list(lines), start, end)`, but only holds the
+    lines returned, and stops reading once they are known."""
+    start = max(start, 0)
+    if end == -1:
+        return list(islice(lines, start, None))
+    end = max(end, 0)
+    stop = max(start + 1, end)
+    window: list[str] = []
+    last_lines: deque[str] = deque(maxlen=2)
+    num_lines = 0
+    for i, line in enumerate(lines):
+        num_lines = i + 1
+        if start <= i < stop:
+            window.append(line)
+        last_lines.append(line)
+        # Seeing the line after `start` proves the window starts at `start`
+        if i >= max(start + 1, end - 1):
+            return window
+    if num_lines >= start + 2:
+        return window
+    # read_lines shows the last lines when asked for lines past the end
+    begin = max(0, num_lines - 2)
+    return list(last_lines)[: max(begin + 1, min(end, num_lines)) - begin]
+
+
+def read_file_lines(path: str, start: int = 0, end: int = -1) -> list[str]:
+    """Read lines of a utf-8 text file, as `read_lines(file.readlines(), start, end)`.
+
+    Only the lines returned are held in memory. In large files, reading starts at
+    the closest checkpoint of the file's line offset index.
+    """
+    if start <= 0 or os.path.getsize(path) < LINE_INDEX_MIN_FILE_SIZE:
+        with open(path, 'r', encoding='utf-8') as file:
+            return read_lines_streaming(file, start, end)
+
+    index = get_line_offset_index(path)
+    num_lines = index.num_lines
+    start = min(start, num_lines)
+    if end == -1:
+        begin, stop = start, num_lines
+    else:
+        end = min(max(end, 0), num_lines)
+        begin = max(0, min(start, num_lines - 2))
+        stop = max(begin + 1, end)
+    line, offset = index.checkpoint_for(begin)
+    with open(path, 'rb') as raw:
+        raw.seek(offset)
+        with io.TextIOWrapper(raw, encoding='utf-8') as file:
+            return list(islice(file, begin - line, stop - line))
+
+
+def encode_file_as_data_url(path: str, mime_type: str) -> str:
+    """Encode a file as a base64 data URL, a chunk at a time."""
+    parts = [f'data:{mime_type};base64,']
+    with open(path, 'rb') as file:
+        while chunk := file.read(_BASE64_CHUNK_SIZE):
+            parts.append(base64.b64encode(chunk).decode('ascii'))
+    return ''.join(parts)
+
+
 async def read_file(
     path: str,
     workdir: str,
@@ -93,8 +242,7 @@ async def read_file(
         )
 
     try:
-        with open(whole_path, 'r', encoding='utf-8') as file:
-            lines = read_lines(file.readlines(), start, end)
+        lines = read_file_lines(str(whole_path), start, end)
     except FileNotFoundError:
         return ErrorObservation(f'File not found: {path}')
     except UnicodeDecodeError:
@@ -15,6 +15,7 @@ import json
 import os
 import subprocess
 from pathlib import Path
+from typing import Callable
 
 
 def run(cmd: str, cwd: str) -> str:
@@ -30,7 +31,21 @@ def run(cmd: str, cwd: str) -> str:
     return byte_content.decode().strip()
 
 
-def get_valid_ref(repo_dir: str) -> str | None:
+def get_default_branch(repo_dir: str) -> str | None:
+    try:
+        return (
+            run('git --no-pager remote show origin | grep "HEAD branch"', repo_dir)
+            .split()[-1]
+            .strip()
+        )
+    except RuntimeError:
+        return None
+
+
+def get_valid_ref(
+    repo_dir: str,
+    get_default_branch: Callable[[str], str | None] = get_default_branch,
+) -> str | None:
     refs = []
     try:
         current_branch = run('git --no-pager rev-parse --abbrev-ref HEAD', repo_dir)
@@ -38,18 +53,12 @@ def get_valid_ref(repo_dir: str) -> str | None:
     except RuntimeError:
         pass
 
-    try:
-        default_branch = (
-            run('git --no-pager remote show origin | grep "HEAD branch"', repo_dir)
-            .split()[-1]
-            .strip()
-        )
+    default_branch = get_default_branch(repo_dir)
+    if default_branch:
         ref_non_default_branch = f'$(git --no-pager merge-base HEAD "$(git --no-pager rev-parse --abbrev-ref origin/{default_branch})")'
         ref_default_branch = f'origin/{default_branch}'
         refs.append(ref_non_default_branch)
         refs.append(ref_default_branch)
-    except RuntimeError:
-        pass
 
     # compares with empty tree
     ref_new_repo = (
@@ -69,10 +78,12 @@ def get_valid_ref(repo_dir: str) -> str | None:
     return None
 
 
-def get_changes_in_repo(repo_dir: str) -> list[dict[str, str]]:
+def get_changes_in_repo(
+    repo_dir: str, get_ref: Callable[[str], str | None] = get_valid_ref
+) -> list[dict[str, str]]:
     # Gets the status relative to the origin default branch - not the same as `git status`
 
-    ref = get_valid_ref(repo_dir)
+    ref = get_ref(repo_dir)
     if not ref:
         return []
 
@@ -160,14 +171,16 @@ def get_changes_in_repo(repo_dir: str) -> list[dict[str, str]]:
     return changes
 
 
-def get_git_changes(cwd: str) -> list[dict[str, str]]:
+def get_git_changes(
+    cwd: str, get_ref: Callable[[str], str | None] = get_valid_ref
+) -> list[dict[str, str]]:
     git_dirs = {
         os.path.dirname(f)[2:]
         for f in glob.glob('./*/.git', root_dir=cwd, recursive=True)
     }
 
     # First try the workspace directory
-    changes = get_changes_in_repo(cwd)
+    changes = get_changes_in_repo(cwd, get_ref)
 
     # Filter out any changes which are in one of the git directories
     changes = [
@@ -182,7 +195,7 @@ def get_git_changes(cwd: str) -> list[dict[str, str]]:
 
     # Add changes from git directories
     for git_dir in git_dirs:
-        git_dir_changes = get_changes_in_repo(str(Path(cwd, git_dir)))
+        git_dir_changes = get_changes_in_repo(str(Path(cwd, git_dir)), get_ref)
         for change in git_dir_changes:
             change['path'] = git_dir + '/' + change['path']
             changes.append(change)
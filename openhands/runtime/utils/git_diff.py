@@ -15,6 +15,7 @@ import os
 import subprocess
 import sys
 from pathlib import Path
+from typing import Callable
 
 MAX_FILE_SIZE_FOR_GIT_DIFF = 1024 * 1024  # 1 Mb
 
@@ -81,14 +82,18 @@ def get_valid_ref(repo_dir: str) -> str | None:
     return None
 
 
-def get_git_diff(relative_file_path: str) -> dict[str, str]:
-    path = Path(os.getcwd(), relative_file_path).resolve()
+def get_git_diff(
+    relative_file_path: str,
+    cwd: str | None = None,
+    get_ref: Callable[[str], str | None] = get_valid_ref,
+) -> dict[str, str]:
+    path = Path(cwd or os.getcwd(), relative_file_path).resolve()
     if os.path.getsize(path) > MAX_FILE_SIZE_FOR_GIT_DIFF:
         raise ValueError('file_to_large')
     closest_git_repo = get_closest_git_repo(path)
     if not closest_git_repo:
         raise ValueError('no_repository')
-    current_rev = get_valid_ref(str(closest_git_repo))
+    current_rev = get_ref(str(closest_git_repo))
     try:
         original = run(
             f'git show "{current_rev}:{path.relative_to(closest_git_repo)}"',
@@ -13,10 +13,12 @@ from typing import Callable
 from openhands.core.logger import openhands_logger as logger
 from openhands.runtime.utils import git_changes, git_diff
 
-GIT_CHANGES_CMD = 'python3 /openhands/code/openhands/runtime/utils/git_changes.py'
-GIT_DIFF_CMD = (
-    'python3 /openhands/code/openhands/runtime/utils/git_diff.py "{file_path}"'
+# Asks the git status service in the sandbox, which caches results until the
+# work tree changes. Runtimes without it fall back to uploading the scripts.
+GIT_CHANGES_CMD = (
+    'python3 /openhands/code/openhands/runtime/utils/git_status_daemon.py changes'
 )
+GIT_DIFF_CMD = 'python3 /openhands/code/openhands/runtime/utils/git_status_daemon.py diff "{file_path}"'
 GIT_BRANCH_CMD = 'git branch --show-current'
 
 
@@ -0,0 +1,380 @@
+# IMPORTANT: LEGACY V0 CODE - Deprecated since version 1.0.0, scheduled for removal April 1, 2026
+# This file is part of the legacy (V0) implementation of OpenHands and will be removed soon as we complete the migration to V1.
+# OpenHands V1 uses the Software Agent SDK for the agentic core and runs a new application server. Please refer to:
+#   - V1 agentic core (SDK): https://github.com/OpenHands/software-agent-sdk
+#   - V1 application server (in this repo): openhands/app_server/
+# Unless you are working on deprecation, please avoid extending this legacy file and consult the V1 codepaths above.
+# Tag: Legacy-V0
+#!/usr/bin/env python3
+"""Long lived git status service for the sandbox, and the command line client for it.
+
+    python3 git_status_daemon.py changes       # like git_changes.py
+    python3 git_status_daemon.py diff <file>   # like git_diff.py
+    python3 git_status_daemon.py serve
+
+The client asks the service listening on GIT_STATUS_SOCKET, and starts it if it
+is not running, answering that first request itself. The service watches each
+workspace it is asked about with inotify, and answers from its cache until a file
+in the work tree, HEAD, the index or a ref changes. The default branch of origin,
+which takes a network round trip to find, is cached for DEFAULT_BRANCH_TTL.
+
+NOTE: Since this is run as a script, only the scripts next to it can be imported!
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import json
+import os
+import select
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+if __package__:
+    from openhands.runtime.utils import git_changes, git_diff
+else:
+    import git_changes  # type: ignore[no-redef]
+    import git_diff  # type: ignore[no-redef]
+
+GIT_STATUS_SOCKET = os.environ.get(
+    'OPENHANDS_GIT_STATUS_SOCKET',
+    os.path.join(
+        tempfile.gettempdir(),
+        f'openhands-git-status-{getattr(os, "getuid", int)()}.sock',
+    ),
+)
+# The service exits after this many seconds without a request
+IDLE_TIMEOUT = 30 * 60
+DEFAULT_BRANCH_TTL = 5 * 60
+CLIENT_TIMEOUT = 60
+
+_IN_MODIFY = 0x2
+_IN_ATTRIB = 0x4
+_IN_MOVED_FROM = 0x40
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_DELETE_SELF = 0x400
+_IN_MOVE_SELF = 0x800
+_IN_Q_OVERFLOW = 0x4000
+_IN_ISDIR = 0x40000000
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+)
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class WorkTreeWatcher:
+    """Watches a workspace with inotify, and counts the times it changed.
+
+    Every directory of the work trees below the root is watched, except those
+    git ignores. Inside a .git directory only the directory itself and its refs
+    are watched, which covers HEAD, the index and every ref.
+    """
+
+    def __init__(self, root: str):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._add_watch_fn = libc.inotify_add_watch
+        self._add_watch_fn.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.root = root
+        self.generation = 0
+        self._dirs: dict[int, str] = {}
+        try:
+            self._watch_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+    def _add_watch(self, path: str) -> None:
+        wd = self._add_watch_fn(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error in (errno.ENOENT, errno.ENOTDIR):
+                return  # Removed since it was listed
+            raise OSError(error, f'inotify_add_watch failed for {path}')
+        self._dirs[wd] = path
+
+    def _watch_tree(self, top: str) -> None:
+        ignored: set[str] = set()
+        for dirpath, dirnames, _ in os.walk(top):
+            self._add_watch(dirpath)
+            if os.path.basename(dirpath) == '.git':
+                dirnames[:] = [name for name in dirnames if name == 'refs']
+                continue
+            if '.git' in dirnames:
+                ignored.update(_ignored_dirs(dirpath))
+            dirnames[:] = [
+                name for name in dirnames if os.path.join(dirpath, name) not in ignored
+            ]
+
+    def _is_watched(self, path: str) -> bool:
+        parent, name = os.path.split(path)
+        if os.path.basename(parent) == '.git':
+            return name == 'refs'
+        result = subprocess.run(
+            ['git', 'check-ignore', '-q', name],
+            cwd=parent,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        return result.returncode != 0
+
+    def poll(self) -> int:
+        """Read the pending events, and return the generation of the workspace."""
+        changed = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            changed = True
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(data[offset : offset + length].rstrip(b'\0'))
+                offset += length
+                if mask & _IN_Q_OVERFLOW:
+                    raise OSError(errno.EOVERFLOW, 'inotify event queue overflowed')
+                if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                    path = os.path.join(self._dirs.get(wd, ''), name)
+                    if wd in self._dirs and self._is_watched(path):
+                        self._watch_tree(path)
+        if changed:
+            self.generation += 1
+        return self.generation
+
+
+def _ignored_dirs(repo_dir: str) -> set[str]:
+    result = subprocess.run(
+        [
+            'git',
+            'ls-files',
+            '--others',
+            '--ignored',
+            '--exclude-standard',
+            '--directory',
+            '-z',
+        ],
+        cwd=repo_dir,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    return {
+        os.path.join(repo_dir, os.fsdecode(entry).rstrip('/'))
+        for entry in result.stdout.split(b'\0')
+        if entry.endswith(b'/')
+    }
+
+
+@dataclass
+class _Workspace:
+    watcher: WorkTreeWatcher | None
+    generation: int = -1
+    changes: list[dict[str, str]] | None = None
+    diffs: dict[str, dict[str, str]] = field(default_factory=dict)
+    refs: dict[str, str | None] = field(default_factory=dict)
+
+
+class GitStatusServer:
+    """Answers changes and diff requests, one JSON line each, on a unix socket."""
+
+    def __init__(self, socket_path: str | None = None):
+        self.socket_path = socket_path or GIT_STATUS_SOCKET
+        self._workspaces: dict[str, _Workspace] = {}
+        self._default_branches: dict[str, tuple[float, str | None]] = {}
+        self._closed = False
+
+    def close(self) -> None:
+        self._closed = True
+
+    def _get_default_branch(self, repo_dir: str) -> str | None:
+        cached = self._default_branches.get(repo_dir)
+        if cached is not None and time.monotonic() - cached[0] < DEFAULT_BRANCH_TTL:
+            return cached[1]
+        branch = git_changes.get_default_branch(repo_dir)
+        self._default_branches[repo_dir] = (time.monotonic(), branch)
+        return branch
+
+    def _get_workspace(self, cwd: str) -> _Workspace:
+        workspace = self._workspaces.get(cwd)
+        if workspace is None:
+            try:
+                watcher: WorkTreeWatcher | None = WorkTreeWatcher(cwd)
+            except (OSError, AttributeError):
+                # No inotify, or too many directories to watch, so nothing is cached
+                watcher = None
+            workspace = _Workspace(watcher)
+            self._workspaces[cwd] = workspace
+        if workspace.watcher is None:
+            workspace.changes = None
+            workspace.diffs.clear()
+            workspace.refs.clear()
+            return workspace
+        try:
+            generation = workspace.watcher.poll()
+        except OSError:
+            workspace.watcher.close()
+            del self._workspaces[cwd]
+            return self._get_workspace(cwd)
+        if generation != workspace.generation:
+            workspace.generation = generation
+            workspace.changes = None
+            workspace.diffs.clear()
+            workspace.refs.clear()
+        return workspace
+
+    def handle(self, request: dict[str, Any]) -> Any:
+        cwd = request['cwd']
+        workspace = self._get_workspace(cwd)
+
+        def get_ref(repo_dir: str) -> str | None:
+            if repo_dir not in workspace.refs:
+                workspace.refs[repo_dir] = git_changes.get_valid_ref(
+                    repo_dir, self._get_default_branch
+                )
+            return workspace.refs[repo_dir]
+
+        if request['cmd'] == 'changes':
+            if workspace.changes is None:
+                workspace.changes = git_changes.get_git_changes(cwd, get_ref)
+            return workspace.changes
+        if request['cmd'] == 'diff':
+            path = request['path']
+            if path not in workspace.diffs:
+                workspace.diffs[path] = git_diff.get_git_diff(path, cwd, get_ref)
+            return workspace.diffs[path]
+        raise ValueError(f'unknown_command:{request["cmd"]}')
+
+    def serve_forever(self, idle_timeout: float = IDLE_TIMEOUT) -> None:
+        if _is_serving(self.socket_path):
+            return
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        server.listen()
+        last_request = time.monotonic()
+        try:
+            while not self._closed and time.monotonic() - last_request < idle_timeout:
+                readable, _, _ = select.select([server], [], [], 0.1)
+                if not readable:
+                    continue
+                conn, _ = server.accept()
+                with conn:
+                    self._serve_connection(conn)
+                last_request = time.monotonic()
+        finally:
+            server.close()
+            for workspace in self._workspaces.values():
+                if workspace.watcher is not None:
+                    workspace.watcher.close()
+            try:
+                if os.stat(self.socket_path).st_ino == os.fstat(server.fileno()).st_ino:
+                    os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+    def _serve_connection(self, conn: socket.socket) -> None:
+        conn.settimeout(CLIENT_TIMEOUT)
+        try:
+            request = json.loads(conn.makefile('rb').readline())
+            response = {'result': self.handle(request)}
+        except Exception as e:
+            response = {'error': str(e)}
+        try:
+            conn.sendall(json.dumps(response).encode() + b'\n')
+        except OSError:
+            pass
+
+
+def _is_serving(socket_path: str) -> bool:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+        return True
+    except OSError:
+        return False
+
+
+def send_request(
+    request: dict[str, Any], socket_path: str | None = None
+) -> dict[str, Any]:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(CLIENT_TIMEOUT)
+        sock.connect(socket_path or GIT_STATUS_SOCKET)
+        sock.sendall(json.dumps(request).encode() + b'\n')
+        return json.loads(sock.makefile('rb').readline())
+
+
+def start_server() -> None:
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), 'serve'],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        close_fds=True,
+    )
+
+
+def request_or_handle(request: dict[str, Any]) -> dict[str, Any]:
+    """Ask the service, or answer the request here and start the service."""
+    if hasattr(socket, 'AF_UNIX'):
+        try:
+            return send_request(request)
+        except (OSError, ValueError):
+            start_server()
+    try:
+        if request['cmd'] == 'changes':
+            return {'result': git_changes.get_git_changes(request['cwd'])}
+        return {'result': git_diff.get_git_diff(request['path'], request['cwd'])}
+    except Exception as e:
+        return {'error': str(e)}
+
+
+def main(argv: list[str]) -> int:
+    cmd = argv[1] if len(argv) > 1 else 'changes'
+    if cmd == 'serve':
+        GitStatusServer().serve_forever()
+        return 0
+    if cmd not in ('changes', 'diff'):
+        print(f'unknown_command:{cmd}', file=sys.stderr)
+        return 1
+    request: dict[str, Any] = {'cmd': cmd, 'cwd': os.getcwd()}
+    if cmd == 'diff':
+        request['path'] = argv[-1]
+    response = request_or_handle(request)
+    if 'error' in response:
+        if cmd == 'changes':
+            # Same as git_changes.py
+            print(json.dumps({'error': response['error']}))
+            return 0
+        print(response['error'], file=sys.stderr)
+        return 1
+    print(json.dumps(response['result']))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,147 @@
+# IMPORTANT: LEGACY V0 CODE - Deprecated since version 1.0.0, scheduled for removal April 1, 2026
+# This file is part of the legacy (V0) implementation of OpenHands and will be removed soon as we complete the migration to V1.
+# OpenHands V1 uses the Software Agent SDK for the agentic core and runs a new application server. Please refer to:
+#   - V1 agentic core (SDK): https://github.com/OpenHands/software-agent-sdk
+#   - V1 application server (in this repo): openhands/app_server/
+# Unless you are working on deprecation, please avoid extending this legacy file and consult the V1 codepaths above.
+# Tag: Legacy-V0
+# This module belongs to the old V0 web server. The V1 application server lives under openhands/app_server/.
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from openhands.core.logger import openhands_logger as logger
+from openhands.storage.conversation.conversation_store import ConversationStore
+from openhands.storage.data_models.conversation_metadata import ConversationMetadata
+
+# Seconds an update to the metadata of a conversation may wait before it is written
+METADATA_FLUSH_INTERVAL = 2.0
+# The fields event updates change, which are the only ones written back
+UPDATED_FIELDS = (
+    'last_updated_at',
+    'accumulated_cost',
+    'prompt_tokens',
+    'completion_tokens',
+    'total_tokens',
+    'selected_branch',
+    'title',
+)
+
+
+@dataclass
+class _PendingMetadata:
+    conversation_store: ConversationStore
+    metadata: ConversationMetadata
+    # The stored title when the metadata was read
+    stored_title: str | None
+    changed_fields: set[str] = field(default_factory=set)
+    changed_at: float | None = None
+    flush_task: asyncio.Task | None = None
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+@dataclass
+class ConversationMetadataWriter:
+    """Coalesces the metadata updates of conversations into periodic writes.
+
+    The metadata of a conversation is read once, and updates are made to that copy
+    in memory. The fields they changed are written at most flush_interval after
+    the first of them. Before writing, the metadata is read again and only the
+    changed fields are copied over, so changes made elsewhere are kept. A title
+    changed elsewhere in the meantime wins over one set here.
+
+    on_flush is called after each write with the seconds its oldest update waited.
+    """
+
+    flush_interval: float = METADATA_FLUSH_INTERVAL
+    on_flush: Callable[[float], None] | None = None
+    _pending: dict[str, _PendingMetadata] = field(default_factory=dict)
+
+    async def update(
+        self,
+        conversation_store: ConversationStore,
+        conversation_id: str,
+        update_fn: Callable[[ConversationMetadata], Awaitable[None]],
+    ) -> None:
+        """Apply `update_fn` to the in memory metadata of the conversation."""
+        while True:
+            pending = self._pending.get(conversation_id)
+            if pending is None:
+                metadata = await conversation_store.get_metadata(conversation_id)
+                pending = self._pending.setdefault(
+                    conversation_id,
+                    _PendingMetadata(conversation_store, metadata, metadata.title),
+                )
+            async with pending.lock:
+                if self._pending.get(conversation_id) is not pending:
+                    continue  # Written and dropped while waiting for the lock
+                metadata = pending.metadata
+                before = [getattr(metadata, name) for name in UPDATED_FIELDS]
+                await update_fn(metadata)
+                changed_fields = {
+                    name
+                    for name, value in zip(UPDATED_FIELDS, before)
+                    if getattr(metadata, name) != value
+                }
+                if changed_fields:
+                    pending.changed_fields |= changed_fields
+                    if pending.changed_at is None:
+                        pending.changed_at = time.monotonic()
+                    if pending.flush_task is None:
+                        pending.flush_task = asyncio.create_task(
+                            self._flush_later(conversation_id, pending)
+                        )
+                return
+
+    async def flush(self, conversation_id: str) -> None:
+        """Write the pending updates of a conversation now, and forget its metadata."""
+        pending = self._pending.get(conversation_id)
+        if pending is None:
+            return
+        if pending.flush_task is not None:
+            pending.flush_task.cancel()
+            pending.flush_task = None
+        async with pending.lock:
+            await self._write(conversation_id, pending)
+            if self._pending.get(conversation_id) is pending:
+                del self._pending[conversation_id]
+
+    async def flush_all(self) -> None:
+        for conversation_id in list(self._pending):
+            await self.flush(conversation_id)
+
+    async def _flush_later(self, conversation_id: str, pending: _PendingMetadata):
+        await asyncio.sleep(self.flush_interval)
+        async with pending.lock:
+            pending.flush_task = None
+            await self._write(conversation_id, pending)
+            # Read the metadata again for later updates, rather than keep a copy of
+            # every conversation which was once updated
+            if self._pending.get(conversation_id) is pending:
+                del self._pending[conversation_id]
+
+    async def _write(self, conversation_id: str, pending: _PendingMetadata) -> None:
+        if not pending.changed_fields:
+            return
+        changed_fields = pending.changed_fields
+        changed_at = pending.changed_at or time.monotonic()
+        pending.changed_fields = set()
+        pending.changed_at = None
+        try:
+            stored = await pending.conversation_store.get_metadata(conversation_id)
+            for name in changed_fields:
+                if name == 'title' and stored.title != pending.stored_title:
+                    continue
+                setattr(stored, name, getattr(pending.metadata, name))
+            await pending.conversation_store.save_metadata(stored)
+        except Exception as e:
+            logger.warning(
+                f'Failed to write conversation metadata: {e}',
+                extra={'session_id': conversation_id},
+            )
+            return
+        pending.metadata = stored
+        pending.stored_title = stored.title
+        if self.on_flush is not None:
+            self.on_flush(time.monotonic() - changed_at)
@@ -54,6 +54,7 @@ from openhands.utils.shutdown_listener import should_continue
 from openhands.utils.utils import create_registry_and_conversation_stats
 
 from .conversation_manager import ConversationManager
+from .conversation_metadata_writer import ConversationMetadataWriter
 
 _CLEANUP_INTERVAL = 15
 UPDATED_AT_CALLBACK_ID = 'updated_at_callback_id'
@@ -84,6 +85,12 @@ class StandaloneConversationManager(ConversationManager):
     _cleanup_task: asyncio.Task | None = None
     _conversation_store_class: type[ConversationStore] | None = None
     _loop: asyncio.AbstractEventLoop | None = None
+    _metadata_writer: ConversationMetadataWriter = field(init=False)
+
+    def __post_init__(self):
+        self._metadata_writer = ConversationMetadataWriter(
+            on_flush=self.monitoring_listener.on_conversation_metadata_flush
+        )
 
     async def __aenter__(self):
         # Grab a reference to the main event loop. This is the loop in which `await sio.emit` must be called
@@ -96,6 +103,7 @@ class StandaloneConversationManager(ConversationManager):
         if self._cleanup_task:
             self._cleanup_task.cancel()
             self._cleanup_task = None
+        await self._metadata_writer.flush_all()
         get_runtime_cls(self.config.runtime).teardown(self.config)
 
     async def attach_to_conversation(
@@ -595,6 +603,7 @@ class StandaloneConversationManager(ConversationManager):
 
         logger.info(f'closing_session:{session.sid}', extra={'session_id': sid})
         await session.close()
+        await self._metadata_writer.flush(sid)
         logger.info(f'closed_session:{session.sid}', extra={'session_id': sid})
 
     @classmethod
@@ -648,7 +657,24 @@ class StandaloneConversationManager(ConversationManager):
         event=None,
     ):
         conversation_store = await self._get_conversation_store(user_id)
-        conversation = await conversation_store.get_metadata(conversation_id)
+
+        async def update(conversation: ConversationMetadata):
+            await self._apply_event_to_conversation(
+                conversation, user_id, conversation_id, settings, llm_registry, event
+            )
+
+        # Updates are made in memory and written at most every flush interval
+        await self._metadata_writer.update(conversation_store, conversation_id, update)
+
+    async def _apply_event_to_conversation(
+        self,
+        conversation: ConversationMetadata,
+        user_id: str | None,
+        conversation_id: str,
+        settings: Settings,
+        llm_registry: LLMRegistry,
+        event=None,
+    ):
         conversation.last_updated_at = datetime.now(timezone.utc)
 
         # Update cost/token metrics if event has llm_metrics
@@ -709,8 +735,6 @@ class StandaloneConversationManager(ConversationManager):
             else:
                 conversation.title = default_title
 
-        await conversation_store.save_metadata(conversation)
-
     def _is_git_related_event(self, event) -> bool:
         """
         Determine if an event is related to git operations that could change the branch.
@@ -41,6 +41,12 @@ class MonitoringListener:
         """
         pass
 
+    def on_conversation_metadata_flush(self, lag: float) -> None:
+        """Track a write of coalesced conversation metadata updates.
+        Lag is the time in seconds the oldest of the updates waited to be written.
+        """
+        pass
+
     @classmethod
     def get_instance(
         cls,
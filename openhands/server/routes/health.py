@@ -6,9 +6,14 @@
 # Unless you are working on deprecation, please avoid extending this legacy file and consult the V1 codepaths above.
 # Tag: Legacy-V0
 # This module belongs to the old V0 web server. The V1 application server lives under openhands/app_server/.
+from dataclasses import asdict
+
 from fastapi import FastAPI
 
+from openhands.app_server.event_callback.event_ingest import get_event_ingest_metrics
 from openhands.runtime.utils.system_stats import get_system_info
+from openhands.utils.async_utils import get_bridge_stats
+from openhands.utils.http_session import get_pool_stats
 
 
 def add_health_endpoints(app: FastAPI):
@@ -24,7 +29,12 @@ def add_health_endpoints(app: FastAPI):
 
     @app.get('/server_info')
     async def get_server_info():
-        return get_system_info()
+        return {
+            **get_system_info(),
+            'http_pool': get_pool_stats(),
+            'async_bridge': get_bridge_stats(),
+            'event_ingest': asdict(get_event_ingest_metrics()),
+        }
 
     @app.get('/ready')
     async def ready() -> str:
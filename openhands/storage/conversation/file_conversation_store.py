@@ -19,7 +19,6 @@ from openhands.storage.locations import (
     CONVERSATION_BASE_DIR,
     get_conversation_metadata_filename,
 )
-from openhands.utils.async_utils import call_sync_from_async
 from openhands.utils.search_utils import offset_to_page_id, page_id_to_offset
 
 conversation_metadata_type_adapter = TypeAdapter(ConversationMetadata)
@@ -32,12 +31,14 @@ class FileConversationStore(ConversationStore):
     async def save_metadata(self, metadata: ConversationMetadata) -> None:
         json_str = conversation_metadata_type_adapter.dump_json(metadata)
         path = self.get_conversation_metadata_filename(metadata.conversation_id)
-        await call_sync_from_async(self.file_store.write, path, json_str)
+        await self.file_store.awrite(path, json_str)
 
     async def get_metadata(self, conversation_id: str) -> ConversationMetadata:
         path = self.get_conversation_metadata_filename(conversation_id)
-        json_str = await call_sync_from_async(self.file_store.read, path)
+        json_str = await self.file_store.aread(path)
+        return self._parse_metadata(path, json_str)
 
+    def _parse_metadata(self, path: str, json_str: str) -> ConversationMetadata:
         # Validate the JSON
         json_obj = json.loads(json_str)
         if 'created_at' not in json_obj:
@@ -54,12 +55,12 @@ class FileConversationStore(ConversationStore):
         path = str(
             Path(self.get_conversation_metadata_filename(conversation_id)).parent
         )
-        await call_sync_from_async(self.file_store.delete, path)
+        await self.file_store.adelete(path)
 
     async def exists(self, conversation_id: str) -> bool:
         path = self.get_conversation_metadata_filename(conversation_id)
         try:
-            await call_sync_from_async(self.file_store.read, path)
+            await self.file_store.aread(path)
             return True
         except FileNotFoundError:
             return False
@@ -74,7 +75,7 @@ class FileConversationStore(ConversationStore):
         try:
             conversation_ids = [
                 Path(path).name
-                for path in self.file_store.list(metadata_dir)
+                for path in await self.file_store.alist(metadata_dir)
                 if not Path(path).name.startswith('.')
             ]
         except FileNotFoundError:
@@ -83,9 +84,18 @@ class FileConversationStore(ConversationStore):
         start = page_id_to_offset(page_id)
         end = min(limit + start, num_conversations)
         conversations = []
-        for conversation_id in conversation_ids:
+        # Every conversation is needed for sorting, so read them all at once
+        paths = [
+            self.get_conversation_metadata_filename(conversation_id)
+            for conversation_id in conversation_ids
+        ]
+        # A file which can't be read only skips its conversation
+        json_strs = await self.file_store.aread_many(paths, ignore_errors=True)
+        for conversation_id, path, json_str in zip(conversation_ids, paths, json_strs):
             try:
-                conversations.append(await self.get_metadata(conversation_id))
+                if json_str is None:
+                    raise FileNotFoundError(path)
+                conversations.append(self._parse_metadata(path, json_str))
             except Exception:
                 logger.warning(
                     f'Could not load conversation metadata: {conversation_id}'
@@ -1,7 +1,23 @@
+from __future__ import annotations
+
+import builtins
+import threading
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Mapping
+
+from openhands.utils.async_utils import call_sync_from_async
+
+# Bulk operations run their single object operations on this pool. It is separate
+# from the default executor used by the async methods, so a bulk operation awaited
+# from async code never waits on a pool its own thread belongs to.
+_BULK_EXECUTOR = ThreadPoolExecutor(max_workers=32, thread_name_prefix='file-store')
 
 
 class FileStore:
+    # The most single object operations a bulk operation runs at once
+    max_concurrency: int = 16
+
     @abstractmethod
     def write(self, path: str, contents: str | bytes) -> None:
         pass
@@ -17,3 +33,82 @@ class FileStore:
     @abstractmethod
     def delete(self, path: str) -> None:
         pass
+
+    # Annotations below use builtins.list, as `list` is the method above
+
+    def read_many(
+        self, paths: Iterable[str], ignore_errors: bool = False
+    ) -> builtins.list[str | None]:
+        """Read several files concurrently.
+
+        Returns the contents in the order of `paths`, with None for files which do
+        not exist. Any other error is raised, unless `ignore_errors` is set, in
+        which case None is returned for the files which could not be read.
+        """
+
+        def read(path: str) -> str | None:
+            try:
+                return self.read(path)
+            except FileNotFoundError:
+                return None
+            except Exception:
+                if not ignore_errors:
+                    raise
+                return None
+
+        return self._run_many(read, paths)
+
+    def write_many(self, files: Mapping[str, str | bytes]) -> None:
+        """Write several files concurrently."""
+        self._run_many(lambda item: self.write(*item), files.items())
+
+    def delete_prefix(self, prefix: str) -> None:
+        """Delete the file or directory at `prefix` and everything below it."""
+        self.delete(prefix)
+
+    async def aread(self, path: str) -> str:
+        return await call_sync_from_async(self.read, path)
+
+    async def awrite(self, path: str, contents: str | bytes) -> None:
+        await call_sync_from_async(self.write, path, contents)
+
+    async def alist(self, path: str) -> builtins.list[str]:
+        return await call_sync_from_async(self.list, path)
+
+    async def adelete(self, path: str) -> None:
+        await call_sync_from_async(self.delete, path)
+
+    async def aread_many(
+        self, paths: Iterable[str], ignore_errors: bool = False
+    ) -> builtins.list[str | None]:
+        return await call_sync_from_async(self.read_many, list(paths), ignore_errors)
+
+    async def awrite_many(self, files: Mapping[str, str | bytes]) -> None:
+        await call_sync_from_async(self.write_many, dict(files))
+
+    async def adelete_prefix(self, prefix: str) -> None:
+        await call_sync_from_async(self.delete_prefix, prefix)
+
+    def _run_many(self, fn, items: Iterable) -> builtins.list:
+        items = list(items)
+        if len(items) <= 1 or self.max_concurrency <= 1:
+            return [fn(item) for item in items]
+        # At most max_concurrency workers, each taking the next item when done,
+        # so one bulk operation cannot flood the shared pool
+        results: list = [None] * len(items)
+        indices = iter(range(len(items)))
+        lock = threading.Lock()
+
+        def work() -> None:
+            while True:
+                with lock:
+                    index = next(indices, None)
+                if index is None:
+                    return
+                results[index] = fn(items[index])
+
+        num_workers = min(len(items), self.max_concurrency)
+        futures = [_BULK_EXECUTOR.submit(work) for _ in range(num_workers)]
+        for future in futures:
+            future.result()
+        return results
@@ -8,6 +8,9 @@ from google.cloud.storage.client import Client
 
 from openhands.storage.files import FileStore
 
+# Google recommends batches of no more than 100 requests
+_MAX_BATCH_SIZE = 100
+
 
 class GoogleCloudFileStore(FileStore):
     def __init__(self, bucket_name: str | None = None) -> None:
@@ -68,9 +71,14 @@ class GoogleCloudFileStore(FileStore):
         if path.endswith('/'):
             path = path[:-1]
 
-        # Try to delete any child resources (Assume the path is a directory)
-        for blob in self.bucket.list_blobs(prefix=f'{path}/'):
-            blob.delete()
+        # Try to delete any child resources (Assume the path is a directory),
+        # sending the deletes in batches rather than one request each
+        blobs = list(self.bucket.list_blobs(prefix=f'{path}/'))
+        for i in range(0, len(blobs), _MAX_BATCH_SIZE):
+            # Blobs deleted concurrently by others are not an error
+            with self.storage_client.batch(raise_exception=False):
+                for blob in blobs[i : i + _MAX_BATCH_SIZE]:
+                    blob.delete()
 
         # Next try to delete item as a file
         try:
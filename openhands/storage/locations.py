@@ -18,6 +18,10 @@ def get_conversation_event_filename(
     return f'{get_conversation_events_dir(sid, user_id)}{id}.json'
 
 
+def get_conversation_event_log_dir(sid: str, user_id: str | None = None) -> str:
+    return f'{get_conversation_dir(sid, user_id)}event_log/'
+
+
 def get_conversation_metadata_filename(sid: str, user_id: str | None = None) -> str:
     return f'{get_conversation_dir(sid, user_id)}metadata.json'
 
@@ -30,6 +34,10 @@ def get_conversation_agent_state_filename(sid: str, user_id: str | None = None)
     return f'{get_conversation_dir(sid, user_id)}agent_state.pkl'
 
 
+def get_conversation_agent_state_dir(sid: str, user_id: str | None = None) -> str:
+    return f'{get_conversation_dir(sid, user_id)}agent_state/'
+
+
 def get_conversation_llm_registry_filename(sid: str, user_id: str | None = None) -> str:
     return f'{get_conversation_dir(sid, user_id)}llm_registry.json'
 
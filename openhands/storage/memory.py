@@ -6,6 +6,8 @@ from openhands.storage.files import FileStore
 
 class InMemoryFileStore(FileStore):
     files: dict[str, str]
+    # Nothing to wait on, so bulk operations run one at a time
+    max_concurrency = 1
 
     def __init__(self, files: dict[str, str] | None = None) -> None:
         self.files = {}
@@ -1,11 +1,19 @@
+from __future__ import annotations
+
+import builtins
 import os
-from typing import Any, TypedDict
+from typing import Any, Iterator, TypedDict
 
 import boto3
 import botocore
+from botocore.config import Config
 
 from openhands.storage.files import FileStore
 
+# S3 lists at most this many keys per response, and deletes at most this many
+# keys per delete_objects request
+_MAX_KEYS_PER_REQUEST = 1000
+
 
 class S3ObjectDict(TypedDict):
     Key: str
@@ -15,8 +23,10 @@ class GetObjectOutputDict(TypedDict):
     Body: Any
 
 
-class ListObjectsV2OutputDict(TypedDict):
+class ListObjectsV2OutputDict(TypedDict, total=False):
     Contents: list[S3ObjectDict] | None
+    IsTruncated: bool
+    NextContinuationToken: str
 
 
 class S3FileStore(FileStore):
@@ -34,6 +44,8 @@ class S3FileStore(FileStore):
             aws_secret_access_key=secret_key,
             endpoint_url=endpoint,
             use_ssl=secure,
+            # Enough connections for the concurrent requests of bulk operations
+            config=Config(max_pool_connections=self.max_concurrency),
         )
 
     def write(self, path: str, contents: str | bytes) -> None:
@@ -81,6 +93,17 @@ class S3FileStore(FileStore):
                 f"Error: Failed to read from bucket '{self.bucket}' at path {path}: {e}"
             )
 
+    def iter_keys(self, prefix: str) -> Iterator[str]:
+        """Yield every key starting with `prefix`, one listing page at a time."""
+        kwargs = {'Bucket': self.bucket, 'Prefix': prefix}
+        while True:
+            response: ListObjectsV2OutputDict = self.client.list_objects_v2(**kwargs)
+            for obj in response.get('Contents') or []:
+                yield obj['Key']
+            if not response.get('IsTruncated'):
+                return
+            kwargs['ContinuationToken'] = response['NextContinuationToken']
+
     def list(self, path: str) -> list[str]:
         if not path or path == '/':
             path = ''
@@ -95,14 +118,7 @@ class S3FileStore(FileStore):
         # prefix="foo", delimiter="/"  yields  []  # :(
         results: set[str] = set()
         prefix_len = len(path)
-        response: ListObjectsV2OutputDict = self.client.list_objects_v2(
-            Bucket=self.bucket, Prefix=path
-        )
-        contents = response.get('Contents')
-        if not contents:
-            return []
-        paths = [obj['Key'] for obj in contents]
-        for sub_path in paths:
+        for sub_path in self.iter_keys(path):
             if sub_path == path:
                 continue
             try:
@@ -122,11 +138,12 @@ class S3FileStore(FileStore):
                 path = path[:-1]
 
             # Try to delete any child resources (Assume the path is a directory)
-            response = self.client.list_objects_v2(
-                Bucket=self.bucket, Prefix=f'{path}/'
-            )
-            for content in response.get('Contents') or []:
-                self.client.delete_object(Bucket=self.bucket, Key=content['Key'])
+            keys = list(self.iter_keys(f'{path}/'))
+            batches = [
+                keys[i : i + _MAX_KEYS_PER_REQUEST]
+                for i in range(0, len(keys), _MAX_KEYS_PER_REQUEST)
+            ]
+            self._run_many(self._delete_keys, batches)
 
             # Next try to delete item as a file
             self.client.delete_object(Bucket=self.bucket, Key=path)
@@ -153,6 +170,19 @@ class S3FileStore(FileStore):
                 f"Error: Failed to delete key '{path}' from bucket '{self.bucket}: {e}"
             )
 
+    def _delete_keys(self, keys: builtins.list[str]) -> None:
+        response = self.client.delete_objects(
+            Bucket=self.bucket,
+            Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True},
+        )
+        errors = response.get('Errors')
+        if errors:
+            error = errors[0]
+            raise FileNotFoundError(
+                f"Error: Failed to delete {len(errors)} keys from bucket '{self.bucket}', "
+                f"including '{error.get('Key')}': {error.get('Message')}"
+            )
+
     def _ensure_url_scheme(self, secure: bool, url: str | None) -> str | None:
         if not url:
             return None
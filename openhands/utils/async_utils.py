@@ -1,10 +1,198 @@
 import asyncio
+import contextvars
+import os
+import threading
+import time
 from concurrent import futures
 from concurrent.futures import ThreadPoolExecutor
-from typing import Callable, Coroutine, Iterable
+from typing import Any, Callable, Coroutine, Iterable
 
 GENERAL_TIMEOUT: int = 15
 EXECUTOR = ThreadPoolExecutor()
+# Number of long lived event loops coroutines called from sync code run on
+BRIDGE_LOOPS = int(os.environ.get('OH_ASYNC_BRIDGE_LOOPS', '4'))
+
+# The tasks created by a bridged call and the tasks they create in turn, which are
+# cancelled when the call returns, as asyncio.run would
+_call_tasks: contextvars.ContextVar[list[asyncio.Task] | None] = contextvars.ContextVar(
+    '_call_tasks', default=None
+)
+
+
+def _task_factory(loop: asyncio.AbstractEventLoop, coro: Coroutine, **kwargs):
+    task = asyncio.Task(coro, loop=loop, **kwargs)
+    call_tasks = _call_tasks.get()
+    if call_tasks is not None:
+        call_tasks.append(task)
+    return task
+
+
+class _BridgeLoop:
+    """An event loop running forever in a daemon thread of its own."""
+
+    def __init__(self, index: int):
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_task_factory(_task_factory)
+        self.pending = 0
+        self.thread = threading.Thread(
+            target=self._run, name=f'async-bridge-{index}', daemon=True
+        )
+        self.thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+
+_bridge_lock = threading.Lock()
+_bridge_loops: list[_BridgeLoop] = []
+_bridge_stats: dict[str, float] = {
+    'calls': 0,
+    'fallback_calls': 0,
+    'overhead_seconds': 0.0,
+    'fallback_overhead_seconds': 0.0,
+}
+
+
+def _record_call(fallback: bool, overhead: float) -> None:
+    with _bridge_lock:
+        if fallback:
+            _bridge_stats['fallback_calls'] += 1
+            _bridge_stats['fallback_overhead_seconds'] += overhead
+        else:
+            _bridge_stats['calls'] += 1
+            _bridge_stats['overhead_seconds'] += overhead
+
+
+def _in_bridge_thread() -> bool:
+    return any(b.thread is threading.current_thread() for b in _bridge_loops)
+
+
+def _acquire_bridge_loop() -> _BridgeLoop | None:
+    """Return an idle bridge loop, starting one if there are fewer than BRIDGE_LOOPS.
+
+    A coroutine may block its loop with synchronous code, so calls never queue
+    behind one another on a loop; None is returned when every loop is busy.
+    """
+    with _bridge_lock:
+        for bridge in _bridge_loops:
+            if bridge.pending == 0:
+                bridge.pending += 1
+                return bridge
+        if len(_bridge_loops) < BRIDGE_LOOPS:
+            bridge = _BridgeLoop(len(_bridge_loops))
+            _bridge_loops.append(bridge)
+            bridge.pending += 1
+            return bridge
+    return None
+
+
+def _release_bridge_loop(bridge: _BridgeLoop) -> None:
+    with _bridge_lock:
+        bridge.pending -= 1
+
+
+def submit_coroutine(corofn: Callable, *args, **kwargs) -> futures.Future:
+    """Run a coroutine function from sync code, returning a future of its result.
+
+    The coroutine runs on one of the long lived bridge loops, or on a new event
+    loop in the EXECUTOR when they are all busy. Cancelling the future cancels
+    the coroutine, and tasks it created which are still running when it returns
+    are cancelled, as with asyncio.run.
+    """
+    submitted = time.perf_counter()
+    # A bridge loop calling back into the bridge would wait on itself
+    bridge = None if _in_bridge_thread() else _acquire_bridge_loop()
+
+    async def arun():
+        _record_call(bridge is None, time.perf_counter() - submitted)
+        call_tasks: list[asyncio.Task] = []
+        _call_tasks.set(call_tasks)
+        try:
+            return await corofn(*args, **kwargs)
+        finally:
+            # Let tasks which were just created start, then cancel the rest
+            await asyncio.sleep(0)
+            remaining = [task for task in call_tasks if not task.done()]
+            for task in remaining:
+                task.cancel()
+            if remaining:
+                await asyncio.gather(*remaining, return_exceptions=True)
+
+    if bridge is None:
+
+        def run():
+            loop_for_thread = asyncio.new_event_loop()
+            loop_for_thread.set_task_factory(_task_factory)
+            try:
+                asyncio.set_event_loop(loop_for_thread)
+                return loop_for_thread.run_until_complete(arun())
+            finally:
+                loop_for_thread.run_until_complete(loop_for_thread.shutdown_asyncgens())
+                loop_for_thread.close()
+
+        if getattr(EXECUTOR, '_shutdown', False):
+            future: futures.Future = futures.Future()
+            try:
+                future.set_result(run())
+            except BaseException as e:
+                future.set_exception(e)
+            return future
+        return EXECUTOR.submit(run)
+
+    # As asyncio.run_coroutine_threadsafe, except that the loop is only released
+    # once the coroutine has returned, even when the future was cancelled before
+    loop = bridge.loop
+    future = futures.Future()
+
+    def finish(task: asyncio.Task) -> None:
+        _release_bridge_loop(bridge)
+        try:
+            if task.cancelled():
+                future.cancel()
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+            else:
+                future.set_result(task.result())
+        except futures.InvalidStateError:
+            pass  # The future was cancelled meanwhile
+
+    def start() -> None:
+        task = loop.create_task(arun())
+        task.add_done_callback(finish)
+
+        def cancel_task(_: futures.Future) -> None:
+            if future.cancelled():
+                loop.call_soon_threadsafe(task.cancel)
+
+        future.add_done_callback(cancel_task)
+
+    loop.call_soon_threadsafe(start)
+    return future
+
+
+def get_bridge_stats() -> dict[str, Any]:
+    """Return the load of the bridge loops and the mean overhead of a call.
+
+    The overhead is the time from a call to its coroutine starting. Fallback calls
+    create an event loop of their own, as every call did before the bridge loops.
+    """
+    with _bridge_lock:
+        stats = dict(_bridge_stats)
+        pending = [bridge.pending for bridge in _bridge_loops]
+    return {
+        'loops': len(pending),
+        'pending_calls': sum(pending),
+        'calls': stats['calls'],
+        'fallback_calls': stats['fallback_calls'],
+        'mean_overhead_seconds': stats['overhead_seconds'] / stats['calls']
+        if stats['calls']
+        else 0.0,
+        'mean_fallback_overhead_seconds': stats['fallback_overhead_seconds']
+        / stats['fallback_calls']
+        if stats['fallback_calls']
+        else 0.0,
+    }
 
 
 async def call_sync_from_async(fn: Callable, *args, **kwargs):
@@ -21,32 +209,15 @@ async def call_sync_from_async(fn: Callable, *args, **kwargs):
 def call_async_from_sync(
     corofn: Callable, timeout: float = GENERAL_TIMEOUT, *args, **kwargs
 ):
-    """Shorthand for running a coroutine in the default background thread pool executor
-    and awaiting the result
+    """Shorthand for running a coroutine on a background event loop and waiting for
+    the result
     """
     if corofn is None:
         raise ValueError('corofn is None')
     if not asyncio.iscoroutinefunction(corofn):
         raise ValueError('corofn is not a coroutine function')
 
-    async def arun():
-        coro = corofn(*args, **kwargs)
-        result = await coro
-        return result
-
-    def run():
-        loop_for_thread = asyncio.new_event_loop()
-        try:
-            asyncio.set_event_loop(loop_for_thread)
-            return asyncio.run(arun())
-        finally:
-            loop_for_thread.close()
-
-    if getattr(EXECUTOR, '_shutdown', False):
-        result = run()
-        return result
-
-    future = EXECUTOR.submit(run)
+    future = submit_coroutine(corofn, *args, **kwargs)
     futures.wait([future], timeout=timeout or None)
     result = future.result()
     return result
@@ -56,7 +227,11 @@ async def call_coro_in_bg_thread(
     corofn: Callable, timeout: float = GENERAL_TIMEOUT, *args, **kwargs
 ):
     """Function for running a coroutine in a background thread."""
-    await call_sync_from_async(call_async_from_sync, corofn, timeout, *args, **kwargs)
+    if corofn is None:
+        raise ValueError('corofn is None')
+    if not asyncio.iscoroutinefunction(corofn):
+        raise ValueError('corofn is not a coroutine function')
+    await asyncio.wrap_future(submit_coroutine(corofn, *args, **kwargs))
 
 
 async def wait_all(
@@ -1,15 +1,33 @@
+import os
 import ssl
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from threading import Lock
-from typing import MutableMapping
+from typing import Any, MutableMapping
 
 import httpx
 
 from openhands.core.logger import openhands_logger as logger
 
+# Limits of the connection pool shared by every HttpSession in the process. A
+# server hosting many conversations talks to many sandboxes, so the pool keeps
+# more connections alive, and for longer, than the httpx defaults to avoid new
+# TCP/TLS handshakes after idle periods.
+HTTP_MAX_CONNECTIONS = int(os.environ.get('OH_HTTP_MAX_CONNECTIONS', '400'))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.environ.get('OH_HTTP_MAX_KEEPALIVE_CONNECTIONS', '200')
+)
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get('OH_HTTP_KEEPALIVE_EXPIRY', '90'))
+# Multiplex requests to a host over one HTTP/2 connection. Needs the optional h2
+# package, and hosts which don't support HTTP/2 fall back to HTTP/1.1.
+HTTP2_ENABLED = os.environ.get('OH_HTTP2', 'false').lower() in ('true', '1', 'yes')
+
 _client_lock = Lock()
 _verify_certificates: bool = True
 _client: httpx.Client | None = None
+_stats_lock = Lock()
+_requests_total: int = 0
+_requests_in_flight: int = 0
 
 
 def httpx_verify_option() -> ssl.SSLContext | bool:
@@ -18,8 +36,27 @@ def httpx_verify_option() -> ssl.SSLContext | bool:
     return ssl.create_default_context() if _verify_certificates else False
 
 
+def _http2_available() -> bool:
+    if not HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning('HTTP/2 is enabled but the h2 package is not installed')
+        return False
+    return True
+
+
 def _build_client(verify: bool) -> httpx.Client:
-    return httpx.Client(verify=ssl.create_default_context() if verify else False)
+    return httpx.Client(
+        verify=ssl.create_default_context() if verify else False,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        http2=_http2_available(),
+    )
 
 
 def _get_client() -> httpx.Client:
@@ -31,6 +68,46 @@ def _get_client() -> httpx.Client:
     return _client
 
 
+def _track_request(delta: int) -> None:
+    global _requests_total, _requests_in_flight
+    with _stats_lock:
+        if delta > 0:
+            _requests_total += delta
+        _requests_in_flight += delta
+
+
+def get_pool_stats() -> dict[str, Any]:
+    """Return the utilization of the connection pool shared by the HttpSessions.
+
+    Connections are counted per host, as `active` when serving a request and
+    `idle` when kept alive for the next one.
+    """
+    hosts: dict[str, dict[str, int]] = {}
+    http2_connections = 0
+    client = _client
+    pool = getattr(getattr(client, '_transport', None), '_pool', None)
+    for connection in getattr(pool, 'connections', []):
+        origin = getattr(connection, '_origin', None)
+        host = str(origin) if origin is not None else 'unknown'
+        counts = hosts.setdefault(host, {'active': 0, 'idle': 0})
+        counts['idle' if connection.is_idle() else 'active'] += 1
+        if 'HTTP/2' in connection.info():
+            http2_connections += 1
+    with _stats_lock:
+        requests_total = _requests_total
+        requests_in_flight = _requests_in_flight
+    return {
+        'connections': sum(c['active'] + c['idle'] for c in hosts.values()),
+        'active_connections': sum(c['active'] for c in hosts.values()),
+        'idle_connections': sum(c['idle'] for c in hosts.values()),
+        'http2_connections': http2_connections,
+        'max_connections': HTTP_MAX_CONNECTIONS,
+        'requests_total': requests_total,
+        'requests_in_flight': requests_in_flight,
+        'hosts': hosts,
+    }
+
+
 @dataclass
 class HttpSession:
     """request.Session is reusable after it has been closed. This behavior makes it
@@ -51,8 +128,13 @@ class HttpSession:
         headers = {**self.headers, **headers}
         kwargs['headers'] = headers
         logger.debug(f'HttpSession:request called with args {args} and kwargs {kwargs}')
-        return _get_client().request(*args, **kwargs)
+        _track_request(1)
+        try:
+            return _get_client().request(*args, **kwargs)
+        finally:
+            _track_request(-1)
 
+    @contextmanager
     def stream(self, *args, **kwargs):
         if self._is_closed:
             logger.error(
@@ -62,7 +144,12 @@ class HttpSession:
         headers = kwargs.get('headers') or {}
         headers = {**self.headers, **headers}
         kwargs['headers'] = headers
-        return _get_client().stream(*args, **kwargs)
+        with _get_client().stream(*args, **kwargs) as response:
+            _track_request(1)
+            try:
+                yield response
+            finally:
+                _track_request(-1)
 
     def get(self, *args, **kwargs):
         return self.request('GET', *args, **kwargs)
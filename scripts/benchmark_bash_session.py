@@ -0,0 +1,69 @@
+"""Benchmark of BashSession command round-trip times.
+
+Runs commands in a local tmux backed BashSession, once polling the pane every
+POLL_INTERVAL and once waiting on its streamed output, and reports the median and
+90th percentile time from sending each command to getting its observation.
+
+Usage: python scripts/benchmark_bash_session.py [--repeat N]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from openhands.events.action import CmdRunAction
+from openhands.runtime.utils.bash import BashSession
+
+COMMANDS = {
+    'ls': 'ls',
+    'echo': 'echo hello',
+    'cd': 'cd .. && cd -',
+    '10k lines': 'seq 1 10000',
+    '3 x 0.1s output': 'for i in 1 2 3; do echo $i; sleep 0.1; done',
+}
+
+
+def run(stream_output: bool, repeat: int, work_dir: str) -> dict[str, list[float]]:
+    BashSession.STREAM_OUTPUT = stream_output
+    session = BashSession(work_dir=work_dir)
+    session.initialize()
+    try:
+        session.execute(CmdRunAction('echo warmup'))
+        times: dict[str, list[float]] = {name: [] for name in COMMANDS}
+        for _ in range(repeat):
+            for name, command in COMMANDS.items():
+                start = time.perf_counter()
+                obs = session.execute(CmdRunAction(command))
+                times[name].append(time.perf_counter() - start)
+                assert obs.metadata.exit_code == 0, obs
+        return times
+    finally:
+        session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    # Use a tmux server of our own, even when run inside tmux
+    os.environ.pop('TMUX', None)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        polled = run(False, args.repeat, work_dir)
+        streamed = run(True, args.repeat, work_dir)
+
+    print(f'{args.repeat} runs per command, times in ms (median / p90)')
+    print(f'{"command":<18}{"polling":>18}{"streaming":>18}')
+    for name in COMMANDS:
+        cells = []
+        for times in (polled[name], streamed[name]):
+            median = statistics.median(times) * 1000
+            p90 = statistics.quantiles(times, n=10)[-1] * 1000
+            cells.append(f'{median:.0f} / {p90:.0f}')
+        print(f'{name:<18}{cells[0]:>18}{cells[1]:>18}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Microbenchmark of knowledge microagent recall against the repository's skills.
+
+Compares TriggerIndex with the previous implementation, which called
+match_trigger on every knowledge microagent for every recall. The skills are
+copied with numbered triggers to simulate an organization with many skills.
+
+Usage: python scripts/benchmark_microagent_triggers.py [--copies N] [--repeat N]
+"""
+
+import argparse
+import timeit
+
+from openhands.memory.memory import GLOBAL_MICROAGENTS_DIR
+from openhands.microagent import KnowledgeMicroagent, load_microagents_from_dir
+from openhands.microagent.trigger_index import TriggerIndex
+
+
+def legacy_match(
+    microagents: list[KnowledgeMicroagent], message: str
+) -> list[tuple[KnowledgeMicroagent, str]]:
+    matches = []
+    for microagent in microagents:
+        trigger = microagent.match_trigger(message)
+        if trigger:
+            matches.append((microagent, trigger))
+    return matches
+
+
+def copy_microagents(
+    microagents: list[KnowledgeMicroagent], copies: int
+) -> list[KnowledgeMicroagent]:
+    result = list(microagents)
+    for i in range(1, copies):
+        for microagent in microagents:
+            metadata = microagent.metadata.model_copy(
+                update={'triggers': [f'{t}{i}' for t in microagent.triggers]}
+            )
+            result.append(
+                microagent.model_copy(
+                    update={'name': f'{microagent.name}-{i}', 'metadata': metadata}
+                )
+            )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--copies', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    _, knowledge_agents = load_microagents_from_dir(GLOBAL_MICROAGENTS_DIR)
+    microagents = copy_microagents(list(knowledge_agents.values()), args.copies)
+    triggers = sum(len(m.triggers) for m in microagents)
+    index = TriggerIndex(microagents)
+    cases = {
+        'short message, no trigger': 'Please fix the failing build.',
+        'short message, triggers': 'Open a pull request on github with the docker fix.',
+        '5KB message, no trigger': 'lorem ipsum dolor sit amet ' * 190,
+        '5KB message, triggers': 'lorem ipsum dolor sit amet ' * 190 + ' kubernetes',
+    }
+
+    print(f'{len(microagents)} microagents, {triggers} triggers, {args.repeat} recalls')
+    print(f'{"case":<28}{"legacy (ms)":>14}{"index (ms)":>14}{"speedup":>10}')
+    for name, message in cases.items():
+        assert index.match(message) == legacy_match(microagents, message)
+        legacy = timeit.timeit(
+            lambda message=message: legacy_match(microagents, message),
+            number=args.repeat,
+        )
+        current = timeit.timeit(
+            lambda message=message: index.match(message), number=args.repeat
+        )
+        print(
+            f'{name:<28}{legacy * 1000:>14.2f}{current * 1000:>14.2f}'
+            f'{legacy / current:>9.1f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""Benchmark of S3FileStore listing and deletion for large conversations.
+
+Runs against an in-process stand-in for S3, which pages listings at 1000 keys
+and adds a fixed latency to every request, so the results reflect the number of
+requests made and how many run at once. The keys column counts the keys listed
+or deleted. The previous implementation listed a single page and deleted children
+one request at a time, so it only ever saw the first 1000 keys of a prefix.
+
+Usage: python scripts/benchmark_s3_file_store.py [--keys N] [--latency-ms N]
+"""
+
+import argparse
+import bisect
+import threading
+import time
+from unittest.mock import patch
+
+from openhands.storage.s3 import S3FileStore
+
+
+class StandInS3Client:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.objects: dict[str, bytes] = {}
+        self.num_requests = 0
+        self._lock = threading.Lock()
+        self._sorted_keys: list[str] | None = None
+
+    def _request(self):
+        time.sleep(self.latency)
+        with self._lock:
+            self.num_requests += 1
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes):
+        with self._lock:
+            self.objects[Key] = Body
+            self._sorted_keys = None
+
+    def list_objects_v2(
+        self,
+        Bucket: str,
+        Prefix: str = '',
+        ContinuationToken: str | None = None,
+        MaxKeys: int = 1000,
+    ) -> dict:
+        self._request()
+        with self._lock:
+            if self._sorted_keys is None:
+                self._sorted_keys = sorted(self.objects)
+            start = bisect.bisect_left(self._sorted_keys, Prefix)
+            if ContinuationToken is not None:
+                start = bisect.bisect_right(self._sorted_keys, ContinuationToken)
+            keys = []
+            for key in self._sorted_keys[start:]:
+                if not key.startswith(Prefix):
+                    break
+                if key in self.objects:
+                    keys.append(key)
+                    if len(keys) > MaxKeys:
+                        break
+        response: dict = {'Contents': [{'Key': key} for key in keys[:MaxKeys]]}
+        if len(keys) > MaxKeys:
+            response['IsTruncated'] = True
+            response['NextContinuationToken'] = keys[MaxKeys - 1]
+        return response
+
+    def delete_object(self, Bucket: str, Key: str):
+        self._request()
+        with self._lock:
+            self.objects.pop(Key, None)
+
+    def delete_objects(self, Bucket: str, Delete: dict) -> dict:
+        self._request()
+        with self._lock:
+            for obj in Delete['Objects']:
+                self.objects.pop(obj['Key'], None)
+        return {}
+
+
+def legacy_list(client: StandInS3Client, prefix: str) -> list[str]:
+    response = client.list_objects_v2(Bucket='bench', Prefix=prefix)
+    return [obj['Key'] for obj in response.get('Contents') or []]
+
+
+def legacy_delete(client: StandInS3Client, prefix: str):
+    response = client.list_objects_v2(Bucket='bench', Prefix=prefix)
+    for content in response.get('Contents') or []:
+        client.delete_object(Bucket='bench', Key=content['Key'])
+
+
+def make_store(num_keys: int, latency: float) -> tuple[S3FileStore, StandInS3Client]:
+    client = StandInS3Client(latency)
+    for i in range(num_keys):
+        client.put_object(Bucket='bench', Key=f'sessions/abc/events/{i}.json', Body=b'')
+    with patch('boto3.client', lambda service, **kwargs: client):
+        store = S3FileStore('bench')
+    return store, client
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--keys', type=int, default=50_000)
+    parser.add_argument('--latency-ms', type=float, default=5.0)
+    args = parser.parse_args()
+    latency = args.latency_ms / 1000
+    prefix = 'sessions/abc/events/'
+
+    print(f'{args.keys} keys, {args.latency_ms}ms per request')
+    print(f'{"operation":<18}{"seconds":>10}{"requests":>10}{"keys":>8}')
+
+    def report(name: str, seconds: float, client: StandInS3Client, seen: int):
+        print(f'{name:<18}{seconds:>10.2f}{client.num_requests:>10}{seen:>8}')
+
+    store, client = make_store(args.keys, latency)
+    keys: list[str] = []
+    seconds = timed(lambda: keys.extend(legacy_list(client, prefix)))
+    report('legacy list', seconds, client, len(keys))
+
+    store, client = make_store(args.keys, latency)
+    keys = []
+    seconds = timed(lambda: keys.extend(store.list(prefix)))
+    report('list', seconds, client, len(keys))
+
+    store, client = make_store(args.keys, latency)
+    seconds = timed(lambda: legacy_delete(client, prefix))
+    report('legacy delete', seconds, client, args.keys - len(client.objects))
+
+    store, client = make_store(args.keys, latency)
+    seconds = timed(lambda: store.delete(prefix))
+    report('delete', seconds, client, args.keys - len(client.objects))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Microbenchmark of secret redaction on the EventStream write path.
+
+Compares SecretRedactor with the previous implementation, which called
+str.replace for every secret on every string field of an event.
+
+Usage: python scripts/benchmark_secret_redaction.py [--secrets N] [--repeat N]
+"""
+
+import argparse
+import copy
+import random
+import string
+import timeit
+
+from openhands.events.secret_redaction import (
+    SECRET_PLACEHOLDER,
+    TOP_LEVEL_PROTECTED_FIELDS,
+    SecretRedactor,
+)
+
+
+def legacy_replace_secrets(
+    data: dict, secrets: list[str], is_top_level: bool = True
+) -> dict:
+    for key in data:
+        if is_top_level and key in TOP_LEVEL_PROTECTED_FIELDS:
+            continue
+        elif isinstance(data[key], dict):
+            data[key] = legacy_replace_secrets(data[key], secrets, is_top_level=False)
+        elif isinstance(data[key], str):
+            for secret in secrets:
+                data[key] = data[key].replace(secret, SECRET_PLACEHOLDER)
+    return data
+
+
+def make_event(rng: random.Random, output_size: int, secret: str | None) -> dict:
+    output = ''.join(rng.choices(string.printable, k=output_size))
+    if secret:
+        output += secret
+    return {
+        'id': 1,
+        'timestamp': '2025-07-18T17:01:36.799608',
+        'source': 'agent',
+        'message': 'Command `ls -la` executed with exit code 0.',
+        'observation': 'run',
+        'content': output,
+        'extras': {
+            'command': 'ls -la',
+            'metadata': {
+                'exit_code': 0,
+                'pid': -1,
+                'username': 'openhands',
+                'hostname': 'sandbox',
+                'working_dir': '/workspace',
+                'py_interpreter_path': '/usr/bin/python',
+                'prefix': '',
+                'suffix': '\n[The command completed with exit code 0.]',
+            },
+            'hidden': False,
+        },
+        'success': True,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--secrets', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    secrets = [
+        ''.join(rng.choices(string.ascii_letters + string.digits, k=40))
+        for _ in range(args.secrets)
+    ]
+    redactor = SecretRedactor(secrets)
+    cases = {
+        'small event, no secret': make_event(rng, 100, None),
+        'small event, one secret': make_event(rng, 100, secrets[0]),
+        '30KB output, no secret': make_event(rng, 30_000, None),
+        '30KB output, one secret': make_event(rng, 30_000, secrets[0]),
+    }
+
+    print(f'{args.secrets} secrets, {args.repeat} events per case')
+    print(f'{"case":<28}{"legacy (ms)":>14}{"redactor (ms)":>16}{"speedup":>10}')
+    for name, event in cases.items():
+        expected = legacy_replace_secrets(copy.deepcopy(event), secrets)
+        assert redactor.redact(copy.deepcopy(event)) == expected
+        legacy_events = [copy.deepcopy(event) for _ in range(args.repeat)]
+        legacy = timeit.timeit(
+            lambda events=legacy_events: [
+                legacy_replace_secrets(e, secrets) for e in events
+            ],
+            number=1,
+        )
+        current_events = [copy.deepcopy(event) for _ in range(args.repeat)]
+        current = timeit.timeit(
+            lambda events=current_events: [redactor.redact(e) for e in events],
+            number=1,
+        )
+        print(
+            f'{name:<28}{legacy * 1000:>14.2f}{current * 1000:>16.2f}'
+            f'{legacy / current:>9.1f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
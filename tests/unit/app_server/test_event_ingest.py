@@ -0,0 +1,182 @@
+"""Tests for the EventIngestBuffer used by the webhook router."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+
+from openhands.app_server.event_callback.event_ingest import (
+    EventIngestBuffer,
+    EventIngestMetrics,
+    get_event_ingest_metrics,
+)
+from openhands.sdk.event import ConversationStateUpdateEvent, PauseEvent
+
+
+def _stats_event(cost: float) -> ConversationStateUpdateEvent:
+    return ConversationStateUpdateEvent(
+        key='stats',
+        value={'usage_to_metrics': {'agent': {'accumulated_cost': cost}}},
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_saved_in_one_batch():
+    buffer = EventIngestBuffer(flush_delay=0.05)
+    event_service = AsyncMock()
+    info_service = AsyncMock()
+    conversation_id = uuid4()
+    requests = [[PauseEvent(source='user')], [_stats_event(0.1)], [_stats_event(0.2)]]
+
+    await asyncio.gather(
+        *(
+            buffer.ingest(conversation_id, events, event_service, info_service)
+            for events in requests
+        )
+    )
+
+    event_service.save_events.assert_called_once()
+    saved_id, saved_events = event_service.save_events.call_args.args
+    assert saved_id == conversation_id
+    assert saved_events == [event for events in requests for event in events]
+    info_service.process_stats_events.assert_called_once_with(
+        [requests[1][0], requests[2][0]], conversation_id
+    )
+    metrics = buffer.get_metrics()
+    assert metrics.batches_flushed == 1
+    assert metrics.requests_coalesced == 2
+    assert metrics.stats_updates_collapsed == 1
+    assert metrics.pending_events == 0
+
+
+@pytest.mark.asyncio
+async def test_conversations_are_batched_separately():
+    buffer = EventIngestBuffer(flush_delay=0.01)
+    event_service = AsyncMock()
+    info_service = AsyncMock()
+
+    await asyncio.gather(
+        buffer.ingest(
+            uuid4(), [PauseEvent(source='user')], event_service, info_service
+        ),
+        buffer.ingest(
+            uuid4(), [PauseEvent(source='user')], event_service, info_service
+        ),
+    )
+
+    assert event_service.save_events.call_count == 2
+    info_service.process_stats_events.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_flushed_without_waiting():
+    buffer = EventIngestBuffer(flush_delay=60, max_batch_events=2)
+    event_service = AsyncMock()
+    events = [PauseEvent(source='user'), PauseEvent(source='user')]
+
+    await asyncio.wait_for(
+        buffer.ingest(uuid4(), events, event_service, AsyncMock()), timeout=5
+    )
+
+    event_service.save_events.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_save_failure_is_raised_to_every_request_in_batch():
+    buffer = EventIngestBuffer(flush_delay=0.05)
+    event_service = AsyncMock()
+    event_service.save_events.side_effect = OSError('disk full')
+    conversation_id = uuid4()
+
+    results = await asyncio.gather(
+        buffer.ingest(
+            conversation_id, [PauseEvent(source='user')], event_service, AsyncMock()
+        ),
+        buffer.ingest(
+            conversation_id, [PauseEvent(source='user')], event_service, AsyncMock()
+        ),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, OSError) for result in results)
+    assert buffer.get_metrics().pending_events == 0
+
+
+@pytest.mark.asyncio
+async def test_joined_requests_retry_when_first_request_is_cancelled():
+    buffer = EventIngestBuffer(flush_delay=0.05)
+    event_service = AsyncMock()
+    conversation_id = uuid4()
+    cancelled_events = [PauseEvent(source='user')]
+    joined_events = [[PauseEvent(source='user')], [_stats_event(0.1)]]
+
+    first = asyncio.create_task(
+        buffer.ingest(conversation_id, cancelled_events, event_service, AsyncMock())
+    )
+    await asyncio.sleep(0)
+    joined = [
+        asyncio.create_task(
+            buffer.ingest(conversation_id, events, event_service, AsyncMock())
+        )
+        for events in joined_events
+    ]
+    await asyncio.sleep(0)
+    first.cancel()
+
+    await asyncio.gather(*joined)
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+    # The retried requests were saved together, without the cancelled one
+    event_service.save_events.assert_called_once()
+    _, saved_events = event_service.save_events.call_args.args
+    assert saved_events == [event for events in joined_events for event in events]
+    assert buffer.get_metrics().pending_events == 0
+
+
+@pytest.mark.asyncio
+async def test_requests_wait_while_too_many_events_are_pending():
+    buffer = EventIngestBuffer(flush_delay=0, max_pending_events=1)
+    save_started = asyncio.Event()
+    release_save = asyncio.Event()
+
+    async def slow_save(conversation_id, events):
+        save_started.set()
+        await release_save.wait()
+
+    event_service = AsyncMock()
+    event_service.save_events.side_effect = slow_save
+
+    first = asyncio.create_task(
+        buffer.ingest(uuid4(), [PauseEvent(source='user')], event_service, AsyncMock())
+    )
+    await save_started.wait()
+    second = asyncio.create_task(
+        buffer.ingest(uuid4(), [PauseEvent(source='user')], event_service, AsyncMock())
+    )
+    await asyncio.sleep(0.01)
+    assert not second.done()
+    assert buffer.get_metrics().backpressure_waits == 1
+
+    release_save.set()
+    await asyncio.gather(first, second)
+    assert event_service.save_events.call_count == 2
+    assert buffer.get_metrics().max_pending_events == 1
+
+
+@pytest.mark.asyncio
+async def test_get_event_ingest_metrics():
+    with patch(
+        'openhands.app_server.event_callback.event_ingest._event_ingest_buffer', None
+    ):
+        assert get_event_ingest_metrics() == EventIngestMetrics()
+
+    buffer = EventIngestBuffer(flush_delay=0)
+    await buffer.ingest(uuid4(), [PauseEvent(source='user')], AsyncMock(), AsyncMock())
+    with patch(
+        'openhands.app_server.event_callback.event_ingest._event_ingest_buffer', buffer
+    ):
+        metrics = get_event_ingest_metrics()
+    assert metrics.batches_flushed == 1
+    assert metrics.events_flushed == 1
@@ -5,12 +5,15 @@ focusing on search functionality.
 """
 
 import tempfile
+from datetime import datetime
 from pathlib import Path
+from unittest.mock import patch
 from uuid import uuid4
 
 import pytest
 
 from openhands.agent_server.models import EventPage, EventSortOrder
+from openhands.app_server.event.event_service_base import EVENT_INDEX_FILENAME
 from openhands.app_server.event.filesystem_event_service import FilesystemEventService
 from openhands.sdk.event import PauseEvent, TokenEvent
 
@@ -217,3 +220,100 @@ class TestFilesystemEventServiceIntegration:
 
         result = await service.search_events(conversation_id)
         assert len(result.items) == 3
+
+
+class TestFilesystemEventServiceIndex:
+    """Test cases for the event index used to filter, sort and page events."""
+
+    @pytest.mark.asyncio
+    async def test_search_events_pages_through_results(
+        self, service: FilesystemEventService
+    ):
+        """Test that pages are disjoint and cover all events in order."""
+        conversation_id = uuid4()
+        events = [create_token_event() for _ in range(5)]
+        for event in events:
+            await service.save_event(conversation_id, event)
+
+        first = await service.search_events(conversation_id, limit=2)
+        second = await service.search_events(
+            conversation_id, limit=2, page_id=first.next_page_id
+        )
+        third = await service.search_events(
+            conversation_id, limit=2, page_id=second.next_page_id
+        )
+
+        assert [len(p.items) for p in (first, second, third)] == [2, 2, 1]
+        assert third.next_page_id is None
+        ids = [e.id for p in (first, second, third) for e in p.items]
+        assert ids == [e.id for e in sorted(events, key=lambda e: e.timestamp)]
+
+    @pytest.mark.asyncio
+    async def test_search_events_only_loads_requested_page(
+        self, service: FilesystemEventService
+    ):
+        """Test that events outside the requested page are not loaded."""
+        conversation_id = uuid4()
+        for _ in range(10):
+            await service.save_event(conversation_id, create_token_event())
+
+        with patch.object(
+            service, '_load_event', wraps=service._load_event
+        ) as load_event:
+            result = await service.search_events(conversation_id, limit=3)
+
+        assert len(result.items) == 3
+        assert load_event.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_count_events_with_filter_uses_index(
+        self, service: FilesystemEventService
+    ):
+        """Test that filtered counts do not load event bodies."""
+        conversation_id = uuid4()
+        for _ in range(3):
+            await service.save_event(conversation_id, create_token_event())
+        await service.save_event(conversation_id, create_pause_event())
+
+        with patch.object(service, '_load_event') as load_event:
+            assert await service.count_events(conversation_id) == 4
+            assert (
+                await service.count_events(conversation_id, kind__eq='PauseEvent') == 1
+            )
+            assert (
+                await service.count_events(
+                    conversation_id, timestamp__lt=datetime(2000, 1, 1)
+                )
+                == 0
+            )
+        load_event.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_index_is_rebuilt_for_unindexed_events(
+        self, service: FilesystemEventService
+    ):
+        """Test that events stored without an index entry are indexed on search."""
+        conversation_id = uuid4()
+        for _ in range(2):
+            await service.save_event(conversation_id, create_token_event())
+        conversation_path = await service.get_conversation_path(conversation_id)
+        (conversation_path / EVENT_INDEX_FILENAME).unlink()
+
+        assert await service.count_events(conversation_id) == 2
+        index = (conversation_path / EVENT_INDEX_FILENAME).read_text()
+        assert len(index.splitlines()) == 2
+
+    @pytest.mark.asyncio
+    async def test_save_event_survives_index_failure(
+        self, service: FilesystemEventService
+    ):
+        """Test that a failure to update the index doesn't fail saving the event."""
+        conversation_id = uuid4()
+        event = create_token_event()
+        with patch.object(
+            FilesystemEventService, '_append_index', side_effect=OSError('boom')
+        ):
+            await service.save_event(conversation_id, event)
+
+        # The event is stored and indexed on the next search
+        assert await service.count_events(conversation_id) == 1
@@ -7,9 +7,11 @@ using SQLite as a mock database.
 
 from datetime import datetime, timezone
 from typing import AsyncGenerator
+from unittest.mock import patch
 from uuid import uuid4
 
 import pytest
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import StaticPool
 
@@ -17,12 +19,16 @@ from openhands.app_server.event_callback.event_callback_models import (
     CreateEventCallbackRequest,
     EventCallback,
     EventCallbackProcessor,
+    EventCallbackStatus,
     LoggingCallbackProcessor,
 )
 from openhands.app_server.event_callback.sql_event_callback_service import (
+    EventCallbackSubscriptionIndex,
     SQLEventCallbackService,
+    StoredEventCallbackResult,
 )
 from openhands.app_server.utils.sql_utils import Base
+from openhands.sdk.event import PauseEvent, TokenEvent
 
 
 @pytest.fixture
@@ -653,3 +659,191 @@ class TestSQLEventCallbackService:
         retrieved_callback = await service.get_event_callback(sample_callback.id)
         assert retrieved_callback is not None
         assert retrieved_callback.id == sample_callback.id
+
+
+class DisablingCallbackProcessor(EventCallbackProcessor):
+    """Processor which records events and disables its callback after the first."""
+
+    async def __call__(self, conversation_id, callback, event):
+        _processed_events.append((callback.id, event.id))
+        callback.status = EventCallbackStatus.DISABLED
+        return None
+
+
+class SubscribingCallbackProcessor(EventCallbackProcessor):
+    """Processor which subscribes a disabling callback to its conversation."""
+
+    async def __call__(self, conversation_id, callback, event):
+        callback.status = EventCallbackStatus.DISABLED
+        await _subscribing_service.create_event_callback(
+            CreateEventCallbackRequest(
+                conversation_id=conversation_id,
+                processor=DisablingCallbackProcessor(),
+            )
+        )
+        return None
+
+
+_processed_events: list = []
+_subscribing_service: SQLEventCallbackService
+
+
+@pytest.fixture
+def indexed_service(async_db_session: AsyncSession) -> SQLEventCallbackService:
+    """Create a SQLEventCallbackService with its own subscription index."""
+    _processed_events.clear()
+    return SQLEventCallbackService(
+        db_session=async_db_session,
+        subscription_index=EventCallbackSubscriptionIndex(),
+        subscription_cache_ttl=5.0,
+    )
+
+
+class TestSQLEventCallbackServiceExecution:
+    """Test cases for executing callbacks."""
+
+    async def test_batch_execute_callbacks_single_query_and_commit(
+        self, indexed_service: SQLEventCallbackService
+    ):
+        """Test that a batch of events uses one lookup and one commit."""
+        conversation_id = uuid4()
+        await indexed_service.create_event_callback(
+            CreateEventCallbackRequest(
+                conversation_id=conversation_id, processor=LoggingCallbackProcessor()
+            )
+        )
+        events = [PauseEvent(source='user') for _ in range(3)]
+        session = indexed_service.db_session
+
+        with (
+            patch.object(session, 'execute', wraps=session.execute) as mock_execute,
+            patch.object(session, 'commit', wraps=session.commit) as mock_commit,
+            patch.object(session, 'merge', wraps=session.merge) as mock_merge,
+        ):
+            await indexed_service.batch_execute_callbacks(conversation_id, events)
+            # A second batch is served from the subscription index
+            await indexed_service.batch_execute_callbacks(conversation_id, events)
+
+        assert mock_execute.call_count == 1
+        assert mock_commit.call_count == 2
+        # The logging processor does not change its callback
+        mock_merge.assert_not_called()
+        results = await session.execute(select(StoredEventCallbackResult))
+        assert len(results.scalars().all()) == 6
+
+    async def test_batch_execute_callbacks_filters_by_event_kind(
+        self, indexed_service: SQLEventCallbackService
+    ):
+        """Test that callbacks only run for their event kind."""
+        conversation_id = uuid4()
+        callback = await indexed_service.create_event_callback(
+            CreateEventCallbackRequest(
+                conversation_id=conversation_id,
+                processor=DisablingCallbackProcessor(),
+                event_kind='PauseEvent',
+            )
+        )
+        other_conversation_callback = await indexed_service.create_event_callback(
+            CreateEventCallbackRequest(
+                conversation_id=uuid4(), processor=DisablingCallbackProcessor()
+            )
+        )
+        pause_event = PauseEvent(source='user')
+
+        await indexed_service.batch_execute_callbacks(
+            conversation_id,
+            [TokenEvent(source='agent', prompt_token_ids=[], response_token_ids=[])],
+        )
+        assert _processed_events == []
+
+        await indexed_service.batch_execute_callbacks(conversation_id, [pause_event])
+        assert _processed_events == [(callback.id, pause_event.id)]
+        assert other_conversation_callback.id not in {c for c, _ in _processed_events}
+
+    async def test_callback_disabled_during_batch_is_saved_and_skipped(
+        self, indexed_service: SQLEventCallbackService
+    ):
+        """Test that changes callbacks make to themselves apply within the batch."""
+        conversation_id = uuid4()
+        callback = await indexed_service.create_event_callback(
+            CreateEventCallbackRequest(
+                conversation_id=conversation_id, processor=DisablingCallbackProcessor()
+            )
+        )
+        events = [PauseEvent(source='user') for _ in range(2)]
+
+        await indexed_service.batch_execute_callbacks(conversation_id, events)
+        assert _processed_events == [(callback.id, events[0].id)]
+
+        stored = await indexed_service.get_event_callback(callback.id)
+        assert stored is not None
+        assert stored.status == EventCallbackStatus.DISABLED
+
+        # Saving the callback invalidated the index, so it no longer matches
+        await indexed_service.batch_execute_callbacks(conversation_id, events)
+        assert len(_processed_events) == 1
+
+    async def test_create_invalidates_subscription_index(
+        self, indexed_service: SQLEventCallbackService
+    ):
+        """Test that callbacks created after a lookup are picked up."""
+        conversation_id = uuid4()
+        event = PauseEvent(source='user')
+        await indexed_service.batch_execute_callbacks(conversation_id, [event])
+
+        callback = await indexed_service.create_event_callback(
+            CreateEventCallbackRequest(processor=DisablingCallbackProcessor())
+        )
+        await indexed_service.batch_execute_callbacks(conversation_id, [event])
+
+        assert _processed_events == [(callback.id, event.id)]
+
+    async def test_callback_created_during_batch_applies_to_later_events(
+        self, indexed_service: SQLEventCallbackService
+    ):
+        """Test that a callback created while handling an event sees later ones."""
+        global _subscribing_service
+        _subscribing_service = indexed_service
+        conversation_id = uuid4()
+        await indexed_service.create_event_callback(
+            CreateEventCallbackRequest(
+                conversation_id=conversation_id,
+                processor=SubscribingCallbackProcessor(),
+            )
+        )
+        events = [PauseEvent(source='user') for _ in range(2)]
+
+        await indexed_service.batch_execute_callbacks(conversation_id, events)
+
+        assert [event_id for _, event_id in _processed_events] == [events[1].id]
+
+    async def test_subscriptions_not_cached_by_default(
+        self, service: SQLEventCallbackService
+    ):
+        """Test that each batch looks up its subscriptions unless caching is on."""
+        conversation_id = uuid4()
+        events = [PauseEvent(source='user')]
+        session = service.db_session
+
+        with patch.object(session, 'execute', wraps=session.execute) as mock_execute:
+            await service.batch_execute_callbacks(conversation_id, events)
+            await service.batch_execute_callbacks(conversation_id, events)
+
+        assert mock_execute.call_count == 2
+
+
+def test_subscription_index_expires_entries():
+    """Test that index entries expire and stale loads are not stored."""
+    index = EventCallbackSubscriptionIndex()
+    conversation_id = uuid4()
+
+    index.put(conversation_id, {None: []}, index.generation, ttl=60)
+    assert index.get(conversation_id) == {None: []}
+
+    index.put(conversation_id, {None: []}, index.generation, ttl=0)
+    assert index.get(conversation_id) is None
+
+    generation = index.generation
+    index.invalidate(uuid4())
+    index.put(conversation_id, {None: []}, generation, ttl=60)
+    assert index.get(conversation_id) is None
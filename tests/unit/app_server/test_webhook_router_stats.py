@@ -440,6 +440,45 @@ class TestProcessStatsEvent:
         assert stored.accumulated_cost == original_cost
 
 
+class TestProcessStatsEvents:
+    """Test the batched process_stats_events method."""
+
+    @pytest.mark.asyncio
+    async def test_process_stats_events_applies_latest_totals_with_one_commit(
+        self, service, async_session, v1_conversation_metadata
+    ):
+        """Test that a batch of stats events is collapsed into one commit."""
+        conversation_id, stored = v1_conversation_metadata
+        events = [
+            ConversationStateUpdateEvent(
+                key='stats',
+                value={
+                    'usage_to_metrics': {
+                        'agent': {
+                            'accumulated_cost': cost,
+                            'accumulated_token_usage': {
+                                'prompt_tokens': prompt_tokens,
+                                'completion_tokens': 10,
+                            },
+                        }
+                    }
+                },
+            )
+            for cost, prompt_tokens in ((0.01, 100), (0.02, 200), (0.03, 300))
+        ]
+
+        with patch.object(
+            async_session, 'commit', wraps=async_session.commit
+        ) as mock_commit:
+            await service.process_stats_events(events, conversation_id)
+
+        assert mock_commit.call_count == 1
+        await async_session.refresh(stored)
+        assert stored.accumulated_cost == 0.03
+        assert stored.prompt_tokens == 300
+        assert stored.completion_tokens == 10
+
+
 # ---------------------------------------------------------------------------
 # Integration tests for on_event endpoint
 # ---------------------------------------------------------------------------
@@ -503,20 +542,21 @@ class TestOnEventStatsProcessing:
             mock_app_conversation_info
         )
 
-        # Set up process_stats_event to call update_conversation_statistics
-        async def process_stats_event_side_effect(event, conversation_id):
-            # Simulate what process_stats_event does - call update_conversation_statistics
+        # Set up process_stats_events to call update_conversation_statistics
+        async def process_stats_events_side_effect(events, conversation_id):
+            # Simulate what process_stats_events does - call update_conversation_statistics
             from openhands.sdk.conversation.conversation_stats import ConversationStats
 
-            if isinstance(event.value, dict):
-                stats = ConversationStats.model_validate(event.value)
-                if stats and stats.usage_to_metrics:
-                    await mock_app_conversation_info_service.update_conversation_statistics(
-                        conversation_id, stats
-                    )
+            for event in events:
+                if isinstance(event.value, dict):
+                    stats = ConversationStats.model_validate(event.value)
+                    if stats and stats.usage_to_metrics:
+                        await mock_app_conversation_info_service.update_conversation_statistics(
+                            conversation_id, stats
+                        )
 
-        mock_app_conversation_info_service.process_stats_event.side_effect = (
-            process_stats_event_side_effect
+        mock_app_conversation_info_service.process_stats_events.side_effect = (
+            process_stats_events_side_effect
         )
 
         with (
@@ -540,8 +580,10 @@ class TestOnEventStatsProcessing:
                 event_service=mock_event_service,
             )
 
-            # Verify events were saved
-            assert mock_event_service.save_event.call_count == 2
+            # Verify events were saved in one batch
+            mock_event_service.save_events.assert_called_once_with(
+                conversation_id, events
+            )
 
             # Verify stats event was processed
             mock_app_conversation_info_service.update_conversation_statistics.assert_called_once()
@@ -610,4 +652,5 @@ class TestOnEventStatsProcessing:
             )
 
             # Verify stats update was NOT called
+            mock_app_conversation_info_service.process_stats_events.assert_not_called()
             mock_app_conversation_info_service.update_conversation_statistics.assert_not_called()
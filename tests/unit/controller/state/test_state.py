@@ -1,9 +1,20 @@
+import base64
+import json
+import pickle
 from unittest.mock import patch
 
+import pytest
+
+from openhands.controller.state.control_flags import BudgetControlFlag
 from openhands.controller.state.state import State, TrafficControlState
+from openhands.controller.state.state_journal import SNAPSHOT_FILENAME
 from openhands.core.schema import AgentState
 from openhands.events.event import Event
 from openhands.llm.metrics import Metrics
+from openhands.storage.locations import (
+    get_conversation_agent_state_dir,
+    get_conversation_agent_state_filename,
+)
 from openhands.storage.memory import InMemoryFileStore
 
 
@@ -82,7 +93,10 @@ def test_restore_older_state_version():
     store = InMemoryFileStore()
 
     with patch.object(State, '__getstate__', no_op_getstate):
-        state.save_to_session('test_old_session', store, None)
+        store.write(
+            get_conversation_agent_state_filename('test_old_session'),
+            base64.b64encode(pickle.dumps(state)).decode('utf-8'),
+        )
 
     # Now restore it
     restored_state = State.restore_from_session('test_old_session', store, None)
@@ -123,3 +137,191 @@ def test_save_without_deprecated_fields():
         restored_state.iteration_flag.current_value == 0
     )  # The depreciated attrib was not stored, so it did not override existing values on restore
     assert restored_state.iteration_flag.max_value == 100
+
+
+class CountingFileStore(InMemoryFileStore):
+    def __init__(self):
+        super().__init__()
+        self.writes: list[str] = []
+        self.reads: list[str] = []
+
+    def write(self, path: str, contents: str | bytes) -> None:
+        self.writes.append(path)
+        super().write(path, contents)
+
+    def read(self, path: str) -> str:
+        self.reads.append(path)
+        return super().read(path)
+
+
+def test_state_journal_round_trip():
+    state = State(
+        session_id='sid',
+        budget_flag=BudgetControlFlag(
+            limit_increase_amount=5.0, current_value=1.5, max_value=5.0
+        ),
+        inputs={'task': 'fix the bug'},
+        agent_state=AgentState.PAUSED,
+        extra_data={'condenser_meta': [{'forgotten': [1, 2]}]},
+        metrics=Metrics('model'),
+    )
+    state.metrics.add_cost(0.25)
+    state.iteration_flag.current_value = 7
+    store = InMemoryFileStore()
+
+    state.save_to_session('sid', store, 'user')
+    restored = State.restore_from_session('sid', store, 'user')
+
+    assert restored.session_id == 'sid'
+    assert restored.budget_flag == state.budget_flag
+    assert restored.iteration_flag.current_value == 7
+    assert restored.inputs == {'task': 'fix the bug'}
+    assert restored.resume_state == AgentState.PAUSED
+    assert restored.agent_state == AgentState.LOADING
+    assert restored.extra_data == state.extra_data
+    assert restored.metrics.get() == state.metrics.get()
+    assert restored.history == []
+
+
+def test_state_journal_writes_only_changes():
+    state = State(session_id='sid')
+    store = CountingFileStore()
+    state_dir = get_conversation_agent_state_dir('sid')
+    state.save_to_session('sid', store, None)
+    store.writes.clear()
+
+    state.save_to_session('sid', store, None)
+    assert store.writes == []
+
+    state.iteration_flag.current_value = 1
+    state.save_to_session('sid', store, None)
+    assert store.writes == [f'{state_dir}delta-00000001.json']
+    delta = json.loads(store.read(store.writes[0]))
+    assert list(delta['fields']) == ['iteration_flag']
+
+    state.extra_data['key'] = 'value'
+    state.save_to_session('sid', store, None)
+    assert store.writes[1:] == [f'{state_dir}extra_data.json']
+
+    restored = State.restore_from_session('sid', store, None)
+    assert restored.iteration_flag.current_value == 1
+    assert restored.extra_data == {'key': 'value'}
+
+
+def test_state_journal_lazy_fields():
+    state = State(session_id='sid', extra_data={'key': 'value'})
+    state.metrics.add_cost(1.0)
+    store = CountingFileStore()
+    state_dir = get_conversation_agent_state_dir('sid')
+    state.save_to_session('sid', store, None)
+
+    restored = State.restore_from_session('sid', store, None)
+    assert f'{state_dir}metrics.json' not in store.reads
+    # Saving doesn't need the lazy fields which were not loaded
+    restored.last_error = 'error'
+    restored.save_to_session('sid', store, None)
+    assert f'{state_dir}metrics.json' not in store.reads
+
+    assert restored.metrics.accumulated_cost == 1.0
+    assert store.reads.count(f'{state_dir}metrics.json') == 1
+    assert pickle.loads(pickle.dumps(restored)).extra_data == {'key': 'value'}
+
+
+def test_state_journal_snapshots_replace_deltas():
+    state = State(session_id='sid')
+    store = InMemoryFileStore()
+    state_dir = get_conversation_agent_state_dir('sid')
+    with patch('openhands.controller.state.state_journal.SNAPSHOT_INTERVAL', 3):
+        for i in range(10):
+            state.iteration_flag.current_value = i
+            state.save_to_session('sid', store, None)
+
+    deltas = [path for path in store.list(state_dir) if 'delta-' in path]
+    assert len(deltas) == 1
+    snapshot = json.loads(store.read(state_dir + SNAPSHOT_FILENAME))
+    assert snapshot['seq'] == 8
+    assert (
+        State.restore_from_session('sid', store, None).iteration_flag.current_value == 9
+    )
+
+    # A state restored in another process continues the journal
+    restored = State.restore_from_session('sid', store, None)
+    restored.iteration_flag.current_value = 10
+    restored.save_to_session('sid', store, None)
+    assert (
+        State.restore_from_session('sid', store, None).iteration_flag.current_value
+        == 10
+    )
+
+
+@pytest.mark.parametrize('max_entries', [None, 2])
+def test_state_journal_writes_metrics_deltas(max_entries):
+    state = State(session_id='sid', metrics=Metrics('model', max_entries))
+    store = CountingFileStore()
+    state_dir = get_conversation_agent_state_dir('sid')
+    with patch('openhands.controller.state.state_journal.SNAPSHOT_INTERVAL', 3):
+        state.save_to_session('sid', store, None)
+        store.writes.clear()
+        for i in range(5):
+            state.metrics.add_cost(1.0)
+            state.metrics.add_token_usage(10 * i, 1, 0, 0, 100, f'response-{i}')
+            state.save_to_session('sid', store, None)
+            if i == 1:
+                # Deltas have the totals, but only the new entries
+                delta = json.loads(store.read(store.writes[-1]))['fields']['metrics']
+                assert len(delta['costs']) == 1
+                assert delta['accumulated_cost'] == 2.0
+
+        # The metrics are written in full once there are enough deltas
+        assert store.writes == [
+            f'{state_dir}metrics-delta-00000001.json',
+            f'{state_dir}metrics-delta-00000002.json',
+            f'{state_dir}metrics-delta-00000003.json',
+            f'{state_dir}metrics.json',
+            f'{state_dir}metrics-delta-00000004.json',
+        ]
+        assert [path for path in store.list(state_dir) if 'metrics-' in path] == [
+            f'{state_dir}metrics-delta-00000004.json'
+        ]
+
+        restored = State.restore_from_session('sid', store, None)
+        assert restored.metrics.get() == state.metrics.get()
+
+        # A state restored in another process continues the metrics deltas
+        restored.metrics.add_cost(0.5)
+        restored.save_to_session('sid', store, None)
+        assert f'{state_dir}metrics-delta-00000005.json' in store.writes
+        assert (
+            State.restore_from_session('sid', store, None).metrics.get()
+            == restored.metrics.get()
+        )
+
+
+def test_state_journal_replaces_legacy_pickle():
+    store = InMemoryFileStore()
+    legacy = State(session_id='sid', agent_state=AgentState.RUNNING, last_error='old')
+    store.write(
+        get_conversation_agent_state_filename('sid', 'user'),
+        base64.b64encode(pickle.dumps(legacy)).decode('utf-8'),
+    )
+
+    restored = State.restore_from_session('sid', store, 'user')
+    assert restored.last_error == 'old'
+    assert restored.resume_state == AgentState.RUNNING
+
+    restored.save_to_session('sid', store, 'user')
+    with pytest.raises(FileNotFoundError):
+        store.read(get_conversation_agent_state_filename('sid', 'user'))
+    assert State.restore_from_session('sid', store, 'user').last_error == 'old'
+
+
+def test_state_journal_from_newer_version_is_rejected():
+    store = InMemoryFileStore()
+    State(session_id='sid').save_to_session('sid', store, None)
+    path = get_conversation_agent_state_dir('sid') + SNAPSHOT_FILENAME
+    snapshot = json.loads(store.read(path))
+    snapshot['version'] += 1
+    store.write(path, json.dumps(snapshot))
+
+    with pytest.raises(ValueError):
+        State.restore_from_session('sid', store, None)
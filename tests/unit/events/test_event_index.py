@@ -0,0 +1,131 @@
+import random
+
+import pytest
+from pytest import TempPathFactory
+
+from openhands.events import EventSource, EventStream
+from openhands.events.event_filter import EventFilter
+from openhands.events.event_index import EventSearchIndex
+from openhands.events.observation import NullObservation
+from openhands.storage import get_file_store
+
+
+@pytest.fixture
+def temp_dir(tmp_path_factory: TempPathFactory) -> str:
+    return str(tmp_path_factory.mktemp('test_event_index'))
+
+
+def _search(event_stream: EventStream, query: str) -> list[int]:
+    return [e.id for e in event_stream.search_events(filter=EventFilter(query=query))]
+
+
+def test_candidates_include_every_match():
+    rng = random.Random(0)
+    words = ['alpha', 'beta', 'gamma', 'Delta', 'x_y', '42', 'tab\there', 'a.b']
+    events = []
+    index = EventSearchIndex(start_id=0)
+    for i in range(50):
+        event = NullObservation(' '.join(rng.choices(words, k=5)))
+        event._id = i  # type: ignore [attr-defined]
+        index.add(event)
+        events.append(event)
+
+    for _ in range(200):
+        text = EventFilter.searchable_text(rng.choice(events))
+        start = rng.randrange(len(text))
+        query = text[start : start + rng.randint(1, 12)]
+        expected = {e.id for e in events if EventFilter(query=query).include(e)}
+        candidates = index.candidates(query)
+        assert candidates is None or expected <= candidates
+
+
+def test_candidates_narrow_by_words():
+    index = EventSearchIndex(start_id=0)
+    for i, content in enumerate(['hello world', 'help wanted', 'say hello']):
+        event = NullObservation(content)
+        event._id = i  # type: ignore [attr-defined]
+        index.add(event)
+
+    assert index.candidates('hel') == {0, 1, 2}
+    assert index.candidates('hello w') == {0}
+    assert index.candidates('lo wor') == {0}
+    assert index.candidates('world"') == {0}
+    assert index.candidates('nothing') == set()
+    assert index.candidates(' ') is None
+
+
+def test_index_tracks_events_added_out_of_order():
+    index = EventSearchIndex(start_id=0)
+    events = []
+    for i, content in enumerate(['hello', 'world', 'hello world']):
+        event = NullObservation(content)
+        event._id = i  # type: ignore [attr-defined]
+        events.append(event)
+
+    index.add(events[1])
+    index.add(events[2])
+    assert index.end_id == 0
+    # Events which may not be indexed yet are never excluded
+    assert list(index.candidate_ids('hello', range(3))) == [0, 1, 2]
+
+    index.add(events[0])
+    assert index.end_id == 3
+    assert list(index.candidate_ids('hello', range(3))) == [0, 2]
+
+
+def test_index_stops_growing_at_max_postings():
+    index = EventSearchIndex(start_id=0, max_postings=100)
+    for i in range(50):
+        event = NullObservation(f'word{i}')
+        event._id = i  # type: ignore [attr-defined]
+        index.add(event)
+
+    assert index.full
+    assert 0 < index.end_id < 50
+    # Events past the end of the index are scanned
+    assert 49 in set(index.candidate_ids('word49', range(50)))
+    assert 0 not in set(index.candidate_ids('word49', range(50)))
+
+
+def test_stream_search_uses_index(temp_dir: str, monkeypatch):
+    file_store = get_file_store('local', temp_dir)
+    event_stream = EventStream('abc', file_store, use_search_index=True)
+    for i in range(20):
+        event_stream.add_event(
+            NullObservation(f'obs{i} needle{i % 5}'), EventSource.AGENT
+        )
+
+    checked = []
+    include = EventFilter.include
+
+    def counting_include(self, event):
+        checked.append(event.id)
+        return include(self, event)
+
+    monkeypatch.setattr(EventFilter, 'include', counting_include)
+    assert _search(event_stream, 'needle3') == [3, 8, 13, 18]
+    assert checked == [3, 8, 13, 18]
+    event_stream.close()
+
+
+def test_stream_search_scans_events_stored_before_index(temp_dir: str):
+    file_store = get_file_store('local', temp_dir)
+    event_stream = EventStream('abc', file_store, use_search_index=False)
+    for i in range(5):
+        event_stream.add_event(NullObservation(f'old{i}'), EventSource.AGENT)
+    event_stream.close()
+
+    event_stream = EventStream('abc', file_store, use_search_index=True)
+    for i in range(5):
+        event_stream.add_event(NullObservation(f'new{i}'), EventSource.AGENT)
+
+    assert _search(event_stream, 'old3') == [3]
+    assert _search(event_stream, 'new3') == [8]
+    assert _search(event_stream, 'obs') == list(range(10))
+    assert list(
+        e.id
+        for e in event_stream.search_events(
+            filter=EventFilter(query='new'), reverse=True, limit=2
+        )
+    ) == [9, 8]
+    event_stream.close()
@@ -0,0 +1,177 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from pytest import TempPathFactory
+
+from openhands.events import EventSource, EventStream
+from openhands.events.event_filter import EventFilter
+from openhands.events.event_log import SegmentedEventLog
+from openhands.events.event_store import EventStore, migrate_to_segmented_log
+from openhands.events.observation import NullObservation
+from openhands.storage import get_file_store
+from openhands.storage.locations import (
+    get_conversation_dir,
+    get_conversation_event_log_dir,
+    get_conversation_events_dir,
+)
+from openhands.storage.memory import InMemoryFileStore
+
+
+@pytest.fixture
+def temp_dir(tmp_path_factory: TempPathFactory) -> str:
+    return str(tmp_path_factory.mktemp('test_event_log'))
+
+
+@pytest.fixture
+def file_store(temp_dir: str):
+    return get_file_store('local', temp_dir)
+
+
+def _list(file_store, path: str) -> list[str]:
+    try:
+        return file_store.list(path)
+    except FileNotFoundError:
+        return []
+
+
+def _add_events(event_stream: EventStream, count: int) -> None:
+    for i in range(count):
+        event_stream.add_event(NullObservation(f'obs{i}'), EventSource.AGENT)
+
+
+def test_segmented_stream_round_trip(file_store):
+    event_stream = EventStream('abc', file_store, use_segmented_log=True)
+    _add_events(event_stream, 30)
+
+    events = list(event_stream.search_events())
+    assert [e.id for e in events] == list(range(30))
+    assert event_stream.get_event(17).content == 'obs17'
+    assert list(event_stream.search_events(start_id=5, end_id=8, reverse=True))[
+        0
+    ].content == ('obs8')
+
+    # No per event files or cache pages are written
+    assert _list(file_store, get_conversation_events_dir('abc')) == []
+    assert not any(
+        'event_cache' in path for path in _list(file_store, get_conversation_dir('abc'))
+    )
+    event_stream.close()
+
+
+def test_segmented_stream_spans_segments(file_store):
+    event_stream = EventStream('abc', file_store, use_segmented_log=True)
+    event_stream._get_event_log().segment_size = 4
+    _add_events(event_stream, 10)
+    event_stream.close()
+
+    paths = sorted(file_store.list(get_conversation_event_log_dir('abc')))
+    assert len([p for p in paths if p.endswith('.jsonl')]) == 3
+
+    # A fresh reader detects the layout and resumes at the right id
+    store = EventStore('abc', file_store, None)
+    assert store.cur_id == 10
+    assert [e.content for e in store.search_events(start_id=3, end_id=6)] == [
+        'obs3',
+        'obs4',
+        'obs5',
+        'obs6',
+    ]
+    filtered = list(store.search_events(filter=EventFilter(query='obs9')))
+    assert [e.id for e in filtered] == [9]
+
+
+def test_segmented_stream_resumes_appending(file_store):
+    event_stream = EventStream('abc', file_store, use_segmented_log=True)
+    _add_events(event_stream, 3)
+    event_stream.close()
+
+    event_stream = EventStream('abc', file_store)
+    _add_events(event_stream, 2)
+    assert [e.id for e in event_stream.search_events()] == [0, 1, 2, 3, 4]
+    event_stream.close()
+
+
+def test_segmented_log_not_started_on_non_local_store():
+    file_store = InMemoryFileStore()
+    event_stream = EventStream('abc', file_store, use_segmented_log=True)
+    _add_events(event_stream, 3)
+
+    assert event_stream.use_segmented_log is False
+    assert _list(file_store, get_conversation_event_log_dir('abc')) == []
+    assert len(_list(file_store, get_conversation_events_dir('abc'))) == 3
+    with pytest.raises(ValueError):
+        migrate_to_segmented_log('abc', file_store)
+    event_stream.close()
+
+
+def test_segmented_stream_concurrent_appends(file_store):
+    event_stream = EventStream('abc', file_store, use_segmented_log=True)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(
+            executor.map(
+                lambda i: event_stream.add_event(
+                    NullObservation(f'obs{i}'), EventSource.AGENT
+                ),
+                range(50),
+            )
+        )
+    event_stream.close()
+
+    store = EventStore('abc', file_store, None)
+    assert [e.id for e in store.search_events()] == list(range(50))
+
+
+def test_event_log_rejects_out_of_order_append():
+    event_log = SegmentedEventLog('abc', InMemoryFileStore())
+    event_log.append(0, '{"id": 0}')
+    with pytest.raises(ValueError):
+        event_log.append(0, '{"id": 0}')
+
+
+def test_event_log_gaps_are_missing_events():
+    event_log = SegmentedEventLog('abc', InMemoryFileStore())
+    event_log.append(0, '{"id": 0}')
+    event_log.append(3, '{"id": 3}')
+    assert event_log.next_id() == 4
+    assert event_log.read_event(3) == {'id': 3}
+    with pytest.raises(FileNotFoundError):
+        event_log.read_event(1)
+
+
+def test_local_event_log_recovers_torn_write(temp_dir: str):
+    file_store = get_file_store('local', temp_dir)
+    event_log = SegmentedEventLog('abc', file_store)
+    event_log.append(0, '{"id": 0}')
+    event_log.append(1, '{"id": 1}')
+    event_log.close()
+
+    # Simulate a crash halfway through writing the next event
+    data_path = file_store.get_full_path(f'{event_log.log_dir}0-1000.jsonl')
+    with open(data_path, 'a') as f:
+        f.write('{"id": 2, "trunc')
+
+    event_log = SegmentedEventLog('abc', file_store)
+    assert event_log.next_id() == 2
+    event_log.append(2, '{"id": 2}')
+    assert event_log.read_event(2) == {'id': 2}
+    assert event_log.read_event(1) == {'id': 1}
+    event_log.close()
+    assert os.path.getsize(data_path) == 3 * len('{"id": 0}\n')
+
+
+def test_migrate_to_segmented_log(file_store):
+    event_stream = EventStream('abc', file_store, use_segmented_log=False)
+    _add_events(event_stream, 30)
+    event_stream.close()
+
+    assert migrate_to_segmented_log('abc', file_store, segment_size=8) == 30
+
+    assert _list(file_store, get_conversation_events_dir('abc')) == []
+    store = EventStore('abc', file_store, None)
+    assert store.cur_id == 30
+    assert store.use_segmented_log is True
+    assert [e.content for e in store.search_events()] == [f'obs{i}' for i in range(30)]
+
+    # Migrating again is a no-op
+    assert migrate_to_segmented_log('abc', file_store, segment_size=8) == 0
@@ -3,6 +3,7 @@ import json
 import os
 import time
 from datetime import datetime
+from unittest.mock import patch
 
 import psutil
 import pytest
@@ -739,6 +740,29 @@ def test_cache_page_with_missing_events(temp_dir: str):
         assert len(initial_events) > 0, 'Should retrieve events successfully'
 
 
+def test_uncached_events_read_in_bulk(temp_dir: str):
+    """Test that events without a cache page are read together, up to the limit."""
+    file_store = get_file_store('local', temp_dir)
+    event_stream = EventStream('bulk_read_test', file_store)
+    event_stream.cache_size = 5
+    for i in range(8):
+        event_stream.add_event(NullObservation(f'test{i}'), EventSource.AGENT)
+
+    new_stream = EventStream('bulk_read_test', file_store)
+    new_stream.cache_size = 5
+    with patch.object(file_store, 'read_many', wraps=file_store.read_many) as read_many:
+        events = list(new_stream.search_events())
+        # Events 0-4 come from the cache page, 5-7 are read at once
+        assert [e.content for e in events] == [f'test{i}' for i in range(8)]
+        assert read_many.call_count == 1
+        assert len(read_many.call_args.args[0]) == 3
+
+        read_many.reset_mock()
+        events = list(new_stream.search_events(start_id=5, limit=2))
+        assert [e.content for e in events] == ['test5', 'test6']
+        assert len(read_many.call_args.args[0]) == 2
+
+
 def test_secrets_replaced_in_content(temp_dir: str):
     """Test that secrets are properly replaced in event content."""
     file_store = get_file_store('local', temp_dir)
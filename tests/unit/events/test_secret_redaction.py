@@ -0,0 +1,84 @@
+import random
+import string
+
+from openhands.events.secret_redaction import SECRET_PLACEHOLDER, SecretRedactor
+
+
+def _legacy_replace_secrets(data: dict, secrets: list[str], is_top_level=True) -> dict:
+    """The previous field by field, secret by secret implementation."""
+    for key in data:
+        if is_top_level and key in ('timestamp', 'id', 'source', 'action'):
+            continue
+        elif isinstance(data[key], dict):
+            data[key] = _legacy_replace_secrets(data[key], secrets, False)
+        elif isinstance(data[key], str):
+            for secret in secrets:
+                data[key] = data[key].replace(secret, SECRET_PLACEHOLDER)
+    return data
+
+
+def test_matches_legacy_replacement():
+    rng = random.Random(0)
+    secrets = [
+        ''.join(rng.choices(string.ascii_letters, k=rng.randint(8, 20)))
+        for _ in range(10)
+    ]
+    redactor = SecretRedactor(secrets)
+    for _ in range(100):
+        words = rng.choices(secrets + ['ls', 'echo', '-la', '/tmp'], k=8)
+        data = {
+            'id': 1,
+            'timestamp': '2025-01-01T00:00:00',
+            'source': 'agent',
+            'action': 'run',
+            'args': {'command': ' '.join(words), 'nested': {'value': words[0]}},
+            'content': ''.join(words),
+        }
+        expected = _legacy_replace_secrets(
+            {**data, 'args': {**data['args'], 'nested': dict(data['args']['nested'])}},
+            secrets,
+        )
+        assert redactor.redact(data) == expected
+
+
+def test_redacts_lists_and_escaped_secrets():
+    secrets = ['pa"ss\\word', 'tökén', 'abc123']
+    redactor = SecretRedactor(secrets)
+    data = {
+        'args': {
+            'env': ['X=pa"ss\\word', {'token': 'tökén'}, ['nested abc123']],
+        },
+        'content': 'no secrets here',
+    }
+    assert redactor.redact(data) == {
+        'args': {
+            'env': [
+                f'X={SECRET_PLACEHOLDER}',
+                {'token': SECRET_PLACEHOLDER},
+                [f'nested {SECRET_PLACEHOLDER}'],
+            ],
+        },
+        'content': 'no secrets here',
+    }
+
+
+def test_protected_fields_and_unchanged_data():
+    redactor = SecretRedactor(['18', ''])
+    data = {'timestamp': '2025-07-18', 'content': 'day 18'}
+    assert redactor.redact(data) == {
+        'timestamp': '2025-07-18',
+        'content': f'day {SECRET_PLACEHOLDER}',
+    }
+    untouched = {'content': 'nothing to hide'}
+    assert redactor.redact(untouched) is untouched
+
+
+def test_longer_secrets_and_placeholder_overlap():
+    # A secret containing another is hidden whole
+    assert SecretRedactor(['abc', 'abcdef']).redact_text('xabcdefx') == (
+        f'x{SECRET_PLACEHOLDER}x'
+    )
+    # Secrets which occur in the placeholder do not corrupt earlier placeholders
+    assert SecretRedactor(['hidden', 'token1']).redact_text('token1 hidden') == (
+        f'{SECRET_PLACEHOLDER} {SECRET_PLACEHOLDER}'
+    )
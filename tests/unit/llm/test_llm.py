@@ -3,6 +3,7 @@ import tempfile
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import litellm
 import pytest
 from litellm import PromptTokensDetails
 from litellm.exceptions import (
@@ -859,6 +860,62 @@ def test_get_token_count_error_handling(
     )
 
 
+TOKEN_COUNT_MESSAGES = [
+    {'role': 'system', 'content': 'You are a helpful assistant.'},
+    {'role': 'user', 'content': [{'type': 'text', 'text': 'List the files.'}]},
+    {
+        'role': 'assistant',
+        'content': 'Sure.',
+        'tool_calls': [
+            {
+                'id': 'call_1',
+                'type': 'function',
+                'function': {'name': 'execute_bash', 'arguments': '{"command": "ls"}'},
+            }
+        ],
+    },
+    {
+        'role': 'tool',
+        'tool_call_id': 'call_1',
+        'name': 'execute_bash',
+        'content': 'README.md\nsetup.py',
+    },
+]
+
+
+def test_get_token_count_matches_counting_all_messages(default_config):
+    llm = LLM(default_config, service_id='test-service')
+
+    for i in range(len(TOKEN_COUNT_MESSAGES) + 1):
+        messages = TOKEN_COUNT_MESSAGES[:i]
+        expected = litellm.token_counter(model='gpt-4o', messages=messages)
+        assert llm.get_token_count(messages) == expected
+        assert (
+            sum(llm.get_message_token_counts(messages)) + llm.get_token_count([])
+            == expected
+        )
+
+
+def test_get_token_count_only_counts_new_messages(default_config):
+    llm = LLM(default_config, service_id='test-service')
+    llm.get_token_count(TOKEN_COUNT_MESSAGES[:3])
+
+    with patch(
+        'openhands.llm.llm.litellm.token_counter', wraps=litellm.token_counter
+    ) as token_counter:
+        llm.get_token_count(TOKEN_COUNT_MESSAGES)
+        # A candidate which changes the last message
+        llm.get_message_token_counts(
+            TOKEN_COUNT_MESSAGES[:3] + [{'role': 'user', 'content': 'Go on.'}]
+        )
+
+    counted = [call.kwargs['messages'] for call in token_counter.call_args_list]
+    assert counted == [
+        [TOKEN_COUNT_MESSAGES[3]],
+        [{'role': 'user', 'content': 'Go on.'}],
+    ]
+
+
 @patch('openhands.llm.llm.litellm_completion')
 def test_llm_token_usage(mock_litellm_completion, default_config):
     # This mock response includes usage details with prompt_tokens,
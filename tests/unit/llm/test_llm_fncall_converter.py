@@ -6,14 +6,17 @@ import json
 import pytest
 from litellm import ChatCompletionToolParam
 
+from openhands.llm import fn_call_converter
 from openhands.llm.fn_call_converter import (
     IN_CONTEXT_LEARNING_EXAMPLE_PREFIX,
     IN_CONTEXT_LEARNING_EXAMPLE_SUFFIX,
     TOOL_EXAMPLES,
     FunctionCallConversionError,
+    NonFncallMessageCache,
     convert_fncall_messages_to_non_fncall_messages,
     convert_from_multiple_tool_calls_to_single_tool_call_messages,
     convert_non_fncall_messages_to_fncall_messages,
+    convert_non_fncall_response_to_fncall_message,
     convert_tool_call_to_string,
     convert_tools_to_description,
     get_example_for_tools,
@@ -846,6 +849,97 @@ def test_infer_fncall_on_noncall_model():
     assert converted_fncall_messages[-1] == FNCALL_RESPONSE_MESSAGE
 
 
+@pytest.mark.parametrize('add_in_context_learning_example', [True, False])
+def test_non_fncall_message_cache_matches_full_conversion(
+    add_in_context_learning_example,
+):
+    cache = NonFncallMessageCache()
+    for i in range(1, len(FNCALL_MESSAGES) + 1):
+        messages = copy.deepcopy(FNCALL_MESSAGES[:i])
+        assert cache.convert(
+            messages, FNCALL_TOOLS, add_in_context_learning_example
+        ) == convert_fncall_messages_to_non_fncall_messages(
+            messages, FNCALL_TOOLS, add_in_context_learning_example
+        )
+        assert messages == FNCALL_MESSAGES[:i]
+
+
+def test_non_fncall_message_cache_converts_only_new_messages(monkeypatch):
+    converted_roles = []
+    convert_message = fn_call_converter._convert_fncall_message
+
+    def counting_convert_message(message, *args):
+        converted_roles.append(message['role'])
+        return convert_message(message, *args)
+
+    monkeypatch.setattr(
+        fn_call_converter, '_convert_fncall_message', counting_convert_message
+    )
+    cache = NonFncallMessageCache()
+
+    cache.convert(FNCALL_MESSAGES[:-1], FNCALL_TOOLS)
+    converted_roles.clear()
+    assert cache.convert(FNCALL_MESSAGES, FNCALL_TOOLS) == NON_FNCALL_MESSAGES
+    assert converted_roles == [FNCALL_MESSAGES[-1]['role']]
+
+    # A changed message misses the cache from there on
+    converted_roles.clear()
+    messages = copy.deepcopy(FNCALL_MESSAGES)
+    messages[1]['content'][0]['text'] += 'More details.'
+    cache.convert(messages, FNCALL_TOOLS)
+    assert len(converted_roles) == len(messages) - 1
+
+    # And so do different tools
+    converted_roles.clear()
+    cache.convert(FNCALL_MESSAGES, FNCALL_TOOLS[:1])
+    assert len(converted_roles) == len(FNCALL_MESSAGES)
+
+
+def test_non_fncall_message_cache_is_not_changed_by_callers():
+    cache = NonFncallMessageCache(max_size=3)
+    converted = cache.convert(FNCALL_MESSAGES, FNCALL_TOOLS)
+    for message in converted:
+        message['role'] = 'changed'
+        message['content'][0]['text'] = 'changed'
+
+    assert cache.convert(FNCALL_MESSAGES, FNCALL_TOOLS) == NON_FNCALL_MESSAGES
+    assert len(cache._entries) == 3
+
+
+def test_convert_non_fncall_response_to_fncall_message():
+    tool_call_counter = 1 + sum(
+        1 for message in FNCALL_MESSAGES if message.get('tool_calls')
+    )
+    response = copy.deepcopy(NON_FNCALL_RESPONSE_MESSAGE)
+
+    converted = convert_non_fncall_response_to_fncall_message(
+        response, FNCALL_TOOLS, tool_call_counter
+    )
+
+    assert converted == FNCALL_RESPONSE_MESSAGE
+    assert (
+        converted
+        == (
+            convert_non_fncall_messages_to_fncall_messages(
+                NON_FNCALL_MESSAGES + [NON_FNCALL_RESPONSE_MESSAGE], FNCALL_TOOLS
+            )[-1]
+        )
+    )
+    assert response == NON_FNCALL_RESPONSE_MESSAGE
+
+
+def test_convert_non_fncall_response_without_function_call():
+    response = {'role': 'assistant', 'content': 'The task is done.'}
+
+    assert convert_non_fncall_response_to_fncall_message(response, FNCALL_TOOLS) == (
+        response
+    )
+    with pytest.raises(FunctionCallConversionError):
+        convert_non_fncall_response_to_fncall_message(
+            {'role': 'user', 'content': 'hi'}, FNCALL_TOOLS
+        )
+
+
 def test_convert_from_multiple_tool_calls_to_single_tool_call_messages():
     # Test case with multiple tool calls in one message
     input_messages = [
@@ -0,0 +1,165 @@
+import pickle
+import random
+
+import pytest
+
+from openhands.llm.metrics import (
+    ENTRY_KINDS,
+    SKETCH_RELATIVE_ACCURACY,
+    Metrics,
+    QuantileSketch,
+)
+
+
+def _exact_quantile(values: list[float], q: float) -> float:
+    return sorted(values)[int(q * (len(values) - 1))]
+
+
+def _add_calls(metrics: Metrics, num_calls: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    for i in range(num_calls):
+        metrics.add_cost(0.01)
+        metrics.add_response_latency(rng.lognormvariate(1, 1), f'response-{i}')
+        metrics.add_token_usage(
+            rng.randint(1_000, 100_000), rng.randint(0, 4_000), 0, 0, 200_000, f'r{i}'
+        )
+
+
+@pytest.mark.parametrize('q', [0.01, 0.5, 0.9, 0.99, 1.0])
+def test_sketch_quantiles_are_within_relative_accuracy(q):
+    rng = random.Random(1)
+    values = [rng.lognormvariate(0, 2) for _ in range(20_000)]
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+
+    exact = _exact_quantile(values, q)
+    assert sketch.quantile(q) == pytest.approx(exact, rel=SKETCH_RELATIVE_ACCURACY)
+
+
+def test_sketch_size_is_bounded():
+    sketch = QuantileSketch(max_buckets=300)
+    for exponent in range(-6, 12):
+        for _ in range(10):
+            sketch.add(10.0**exponent)
+
+    assert len(sketch._counts) == 300
+    assert sketch.count == 180
+    # Only the lowest buckets were collapsed
+    assert sketch.quantile(0.9) == pytest.approx(1e10, rel=SKETCH_RELATIVE_ACCURACY)
+    assert sketch.quantile(1.0) == pytest.approx(1e11, rel=SKETCH_RELATIVE_ACCURACY)
+
+
+def test_sketch_merge_and_subtract():
+    values = [0.0] + [float(v) for v in range(1, 1000)]
+    whole = QuantileSketch()
+    first, second = QuantileSketch(), QuantileSketch()
+    for value in values:
+        whole.add(value)
+    for value in values[:400]:
+        first.add(value)
+    for value in values[400:]:
+        second.add(value)
+
+    merged = QuantileSketch()
+    merged.merge(first)
+    merged.merge(second)
+    assert merged._counts == whole._counts
+    assert merged.zero_count == whole.zero_count == 1
+
+    added = whole.subtract(first)
+    assert added.count == second.count
+    assert added.quantile(0.5) == second.quantile(0.5)
+    assert added.quantile(0.0) == pytest.approx(400, rel=SKETCH_RELATIVE_ACCURACY)
+
+
+def test_compact_metrics_keep_totals_and_recent_entries():
+    metrics = Metrics('model', max_entries=50)
+    _add_calls(metrics, 1_000)
+
+    assert metrics.is_compact
+    assert metrics.accumulated_cost == pytest.approx(10.0)
+    assert len(metrics.costs) == len(metrics.token_usages) == 50
+    assert metrics.token_usages[-1].response_id == 'r999'
+    assert metrics.entry_count('token_usages') == 1_000
+    data = metrics.get()
+    assert data['entry_counts'] == {
+        'costs': 1_000,
+        'response_latencies': 1_000,
+        'token_usages': 1_000,
+    }
+    assert set(data['quantiles']['latency']) == {'p50', 'p90', 'p99'}
+    assert metrics.quantile('prompt_tokens', 0.5) == pytest.approx(50_000, rel=0.1)
+
+
+def test_compact_metrics_serialize_to_a_bounded_size():
+    metrics = Metrics('model', max_entries=50)
+    _add_calls(metrics, 1_000)
+    size = len(pickle.dumps(metrics))
+    _add_calls(metrics, 9_000, seed=1)
+
+    restored = pickle.loads(pickle.dumps(metrics))
+    assert len(pickle.dumps(metrics)) < size * 1.1
+    assert restored.get() == metrics.get()
+
+
+@pytest.mark.parametrize('max_entries', [None, 5])
+def test_metrics_delta_dict(max_entries):
+    metrics = Metrics('model', max_entries=max_entries)
+    _add_calls(metrics, 3)
+    earlier = Metrics.from_dict(metrics.to_dict())
+    counts = {kind: metrics.entry_count(kind) for kind in ENTRY_KINDS}
+    _add_calls(metrics, 4, seed=1)
+
+    delta = metrics.to_delta_dict(counts)
+    assert len(delta['costs']) == 4
+    earlier.apply_delta_dict(delta)
+    assert earlier.get() == metrics.get()
+
+
+def test_compact_metrics_diff():
+    metrics = Metrics('model', max_entries=20)
+    _add_calls(metrics, 100)
+    snapshot = metrics.copy()
+    _add_calls(metrics, 5, seed=1)
+
+    diff = metrics.diff(snapshot)
+
+    assert diff.accumulated_cost == pytest.approx(0.05)
+    assert [usage.response_id for usage in diff.token_usages] == [
+        f'r{i}' for i in range(5)
+    ]
+    assert diff.entry_count('response_latencies') == 5
+    assert diff._sketches is not None
+    assert diff._sketches['latency'].count == 5
+
+
+def test_merge_into_compact_metrics():
+    compact = Metrics('model', max_entries=10)
+    full = Metrics('model')
+    _add_calls(compact, 8)
+    _add_calls(full, 8, seed=1)
+
+    compact.merge(full)
+
+    assert len(compact.response_latencies) == 10
+    assert compact.entry_count('response_latencies') == 16
+    assert compact._sketches is not None
+    assert compact._sketches['latency'].count == 16
+
+
+def test_metrics_pickled_before_compact_mode():
+    metrics = Metrics('model')
+    _add_calls(metrics, 3)
+    state = pickle.loads(pickle.dumps(metrics)).__dict__
+    del state['_max_entries']
+
+    restored = Metrics.__new__(Metrics)
+    restored.__dict__.update(state)
+
+    assert not restored.is_compact
+    assert restored.entry_count('costs') == 3
+    restored.add_response_latency(1.0, 'response')
+    assert 'quantiles' not in restored.get()
+    with pytest.raises(ValueError):
+        restored.quantile('latency', 0.5)
@@ -1,6 +1,6 @@
 import os
 import shutil
-from unittest.mock import MagicMock, Mock
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 from litellm import ChatCompletionMessageToolCall
@@ -1717,3 +1717,130 @@ def test_process_events_does_not_reinsert_condensed_initial_message(
         for content in msg.content:
             if hasattr(content, 'text'):
                 assert 'Do task A, B, and C' not in content.text
+
+
+def _incremental_conversation() -> list[Event]:
+    """Create a history with completed and pending tool calls."""
+    system_message = SystemMessageAction(content='System message')
+    system_message._source = EventSource.AGENT
+    user_message = MessageAction(content='Run some commands')
+    user_message._source = EventSource.USER
+    events: list[Event] = [system_message, user_message]
+    for i in range(3):
+        action = CmdRunAction(command=f'echo {i}')
+        action._source = EventSource.AGENT
+        action.tool_call_metadata = _create_mock_tool_call_metadata(
+            f'call_{i}', 'execute_bash', response_id=f'response_{i}'
+        )
+        obs = CmdOutputObservation(content=f'{i}', command=f'echo {i}')
+        obs.tool_call_metadata = _create_mock_tool_call_metadata(
+            f'call_{i}', 'execute_bash', response_id=f'response_{i}'
+        )
+        events += [action, obs]
+    for i, event in enumerate(events):
+        event._id = i
+    return events
+
+
+def _message_texts(messages: list[Message]) -> list[tuple[str, list]]:
+    return [
+        (message.role, [getattr(item, 'text', None) for item in message.content])
+        for message in messages
+    ]
+
+
+def test_process_events_only_converts_appended_events(conversation_memory):
+    """Test that events converted by an earlier call are not converted again."""
+    events = _incremental_conversation()
+    conversation_memory.process_events(
+        condensed_history=events[:5], initial_user_action=events[1]
+    )
+
+    with patch.object(
+        conversation_memory,
+        '_process_event',
+        wraps=conversation_memory._process_event,
+    ) as process_event:
+        messages = conversation_memory.process_events(
+            condensed_history=events, initial_user_action=events[1]
+        )
+
+    assert [call.args[2] for call in process_event.call_args_list] == [5, 6, 7]
+    fresh_memory = ConversationMemory(
+        conversation_memory.agent_config, conversation_memory.prompt_manager
+    )
+    expected = fresh_memory.process_events(
+        condensed_history=events, initial_user_action=events[1]
+    )
+    assert _message_texts(messages) == _message_texts(expected)
+    assert [m.tool_call_id for m in messages] == [m.tool_call_id for m in expected]
+
+
+def test_process_events_reconverts_when_view_changes(conversation_memory):
+    """Test that a changed prefix (e.g. after a condensation) converts from scratch."""
+    events = _incremental_conversation()
+    conversation_memory.process_events(
+        condensed_history=list(events), initial_user_action=events[1]
+    )
+
+    # Forget the first tool call, as a condensation would
+    condensed = events[:2] + events[4:]
+    with patch.object(
+        conversation_memory,
+        '_process_event',
+        wraps=conversation_memory._process_event,
+    ) as process_event:
+        messages = conversation_memory.process_events(
+            condensed_history=condensed, initial_user_action=events[1]
+        )
+
+    assert process_event.call_count == len(condensed)
+    assert all('echo 0' not in str(message) for message in messages)
+
+    # Different conversion options also start from scratch
+    with patch.object(
+        conversation_memory,
+        '_process_event',
+        wraps=conversation_memory._process_event,
+    ) as process_event:
+        conversation_memory.process_events(
+            condensed_history=condensed,
+            initial_user_action=events[1],
+            max_message_chars=10,
+        )
+    assert process_event.call_count == len(condensed)
+
+
+def test_process_events_result_changes_do_not_leak(conversation_memory):
+    """Test that changes callers make to returned messages do not affect later calls."""
+    events = _incremental_conversation()
+    messages = conversation_memory.process_events(
+        condensed_history=events[:5], initial_user_action=events[1]
+    )
+    conversation_memory.apply_prompt_caching(messages)
+    assert any(item.cache_prompt for m in messages for item in m.content)
+
+    messages = conversation_memory.process_events(
+        condensed_history=events, initial_user_action=events[1]
+    )
+    assert not any(item.cache_prompt for m in messages for item in m.content)
+
+
+def test_process_events_does_not_modify_condensed_history(conversation_memory):
+    """Test that the system and initial user messages are not inserted into the
+    events passed in, which may be shared with a view builder."""
+    user_message = MessageAction(content='Hello')
+    user_message._source = EventSource.USER
+    assistant_message = MessageAction(content='Hi there')
+    assistant_message._source = EventSource.AGENT
+    condensed_history = [assistant_message]
+
+    messages = conversation_memory.process_events(
+        condensed_history=condensed_history,
+        initial_user_action=user_message,
+        max_message_chars=None,
+        vision_is_active=False,
+    )
+
+    assert [message.role for message in messages] == ['system', 'user', 'assistant']
+    assert condensed_history == [assistant_message]
@@ -1,8 +1,17 @@
+import json
+import random
+from pathlib import Path
+
+import pytest
+
 from openhands.events.action.agent import CondensationAction, CondensationRequestAction
 from openhands.events.action.message import MessageAction
 from openhands.events.event import Event
 from openhands.events.observation.agent import AgentCondensationObservation
-from openhands.memory.view import View
+from openhands.events.serialization.event import event_from_dict, event_to_dict
+from openhands.memory.view import View, ViewBuilder
+
+TRAJECTORIES_DIR = Path(__file__).parents[2] / 'runtime' / 'trajs'
 
 
 def test_view_preserves_uncondensed_lists() -> None:
@@ -265,3 +274,91 @@ def set_ids(events: list[Event]) -> None:
     """Set the IDs of the events in the list to their index."""
     for i, e in enumerate(events):
         e._id = i  # type: ignore
+
+
+def _recorded_trajectory(name: str) -> list[Event]:
+    with open(TRAJECTORIES_DIR / f'{name}.json') as f:
+        return [event_from_dict(data) for data in json.load(f)]
+
+
+def _with_condensations(events: list[Event], seed: int) -> list[Event]:
+    """Interleave random condensation requests and actions into a trajectory."""
+    rng = random.Random(seed)
+    result: list[Event] = []
+    for event in events * 3:
+        # Copy the event, as ids are reassigned below
+        result.append(event_from_dict(event_to_dict(event)))
+        roll = rng.random()
+        if roll < 0.1:
+            result.append(CondensationRequestAction())
+        elif roll < 0.25:
+            seen = range(len(result))
+            forgotten = rng.sample(seen, k=rng.randint(0, len(seen) // 2))
+            if rng.random() < 0.5:
+                result.append(CondensationAction(forgotten_event_ids=forgotten))
+            else:
+                result.append(
+                    CondensationAction(
+                        forgotten_event_ids=forgotten,
+                        summary=f'Summary {len(result)}',
+                        summary_offset=rng.randint(0, 2),
+                    )
+                )
+    set_ids(result)
+    return result
+
+
+def _assert_same_view(actual: View, expected: View) -> None:
+    assert actual.events == expected.events
+    assert (
+        actual.unhandled_condensation_request == expected.unhandled_condensation_request
+    )
+    assert actual.forgotten_event_ids == expected.forgotten_event_ids
+
+
+@pytest.mark.parametrize('trajectory', ['basic', 'basic_interactions'])
+@pytest.mark.parametrize('seed', range(5))
+def test_view_builder_matches_from_events(trajectory: str, seed: int) -> None:
+    """Tests that building a view one event at a time matches a full rebuild."""
+    events = _with_condensations(_recorded_trajectory(trajectory), seed)
+    history: list[Event] = []
+    builder = ViewBuilder()
+    for event in events:
+        history.append(event)
+        _assert_same_view(builder.update(history), View.from_events(history))
+
+
+def test_view_builder_reuses_view_until_history_changes() -> None:
+    """Tests that the builder returns the same view while the history is unchanged."""
+    history: list[Event] = [MessageAction(content=f'Event {i}') for i in range(3)]
+    set_ids(history)
+    builder = ViewBuilder()
+
+    view = builder.update(history)
+    assert builder.update(history) is view
+
+    history.append(MessageAction(content='Event 3'))
+    set_ids(history)
+    new_view = builder.update(history)
+    assert new_view is not view
+    assert len(new_view) == 4
+    # Appending extends the events of the previous view instead of copying them
+    assert new_view.events is view.events
+
+
+def test_view_builder_rebuilds_replaced_history() -> None:
+    """Tests that a replaced or truncated history is rebuilt from scratch."""
+    events: list[Event] = [
+        *[MessageAction(content=f'Event {i}') for i in range(5)],
+        CondensationAction(forgotten_event_ids=[0, 1]),
+    ]
+    set_ids(events)
+    builder = ViewBuilder()
+    builder.update(events)
+
+    truncated = events[:4]
+    _assert_same_view(builder.update(truncated), View.from_events(truncated))
+
+    truncated[-1] = MessageAction(content='Replaced')
+    truncated[-1]._id = 3  # type: ignore
+    _assert_same_view(builder.update(truncated), View.from_events(truncated))
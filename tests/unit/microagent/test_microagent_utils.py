@@ -1,16 +1,20 @@
 """Tests for the microagent system."""
 
+import os
 import tempfile
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
+from openhands.core.exceptions import MicroagentValidationError
 from openhands.microagent import (
     BaseMicroagent,
     KnowledgeMicroagent,
     MicroagentMetadata,
     MicroagentType,
     RepoMicroagent,
+    clear_microagent_cache,
     load_microagents_from_dir,
 )
 
@@ -545,3 +549,61 @@ def test_load_both_cursorrules_and_agents_md(temp_dir_with_both_cursorrules_and_
     agents_agent = repo_agents['agents']
     assert isinstance(agents_agent, RepoMicroagent)
     assert 'Install deps: `poetry install`' in agents_agent.content
+
+
+def test_load_microagents_reuses_parsed_files(temp_microagents_dir):
+    """Test that unchanged files are not parsed again."""
+    clear_microagent_cache()
+    load_microagents_from_dir(temp_microagents_dir)
+
+    with patch.object(
+        BaseMicroagent, 'load', side_effect=AssertionError('parsed again')
+    ):
+        repo_agents, knowledge_agents = load_microagents_from_dir(temp_microagents_dir)
+    assert knowledge_agents['knowledge'].triggers == ['test', 'pytest']
+    assert 'repo' in repo_agents
+
+    # Callers get their own copies of the cached microagents
+    knowledge_agents['knowledge'].metadata.triggers.append('changed')
+    _, knowledge_agents = load_microagents_from_dir(temp_microagents_dir)
+    assert knowledge_agents['knowledge'].triggers == ['test', 'pytest']
+
+
+def test_load_microagents_reparses_changed_files(temp_microagents_dir):
+    """Test that changed, added and removed files are picked up."""
+    clear_microagent_cache()
+    load_microagents_from_dir(temp_microagents_dir)
+
+    knowledge_file = temp_microagents_dir / 'knowledge.md'
+    knowledge_file.write_text(
+        knowledge_file.read_text().replace('  - pytest\n', '  - unittest\n')
+    )
+    stat = knowledge_file.stat()
+    os.utime(knowledge_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    (temp_microagents_dir / 'repo.md').unlink()
+    (temp_microagents_dir / 'new.md').write_text(
+        '---\ntriggers:\n  - new\n---\n\nNew knowledge.\n'
+    )
+
+    repo_agents, knowledge_agents = load_microagents_from_dir(temp_microagents_dir)
+    assert knowledge_agents['knowledge'].triggers == ['test', 'unittest']
+    assert knowledge_agents['new'].triggers == ['new']
+    assert repo_agents == {}
+
+
+def test_load_microagents_in_parallel(tmp_path):
+    """Test that a cold start parsing files in parallel keeps their order."""
+    clear_microagent_cache()
+    for i in range(20):
+        (tmp_path / f'agent{i:02d}.md').write_text(
+            f'---\ntriggers:\n  - trigger{i}\n---\n\nKnowledge {i}.\n'
+        )
+
+    _, knowledge_agents = load_microagents_from_dir(tmp_path)
+    assert len(knowledge_agents) == 20
+    assert knowledge_agents['agent07'].triggers == ['trigger7']
+
+    (tmp_path / 'agent05.md').write_text('---\ntype: invalid\n---\n')
+    clear_microagent_cache(tmp_path)
+    with pytest.raises(MicroagentValidationError, match='agent05.md'):
+        load_microagents_from_dir(tmp_path, use_cache=False)
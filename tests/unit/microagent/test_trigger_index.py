@@ -0,0 +1,66 @@
+"""Tests for the knowledge microagent trigger index."""
+
+import random
+
+from openhands.microagent import KnowledgeMicroagent, MicroagentMetadata, MicroagentType
+from openhands.microagent.trigger_index import TriggerIndex
+
+
+def make_agent(name: str, triggers: list[str]) -> KnowledgeMicroagent:
+    return KnowledgeMicroagent(
+        name=name,
+        content=f'{name} content',
+        metadata=MicroagentMetadata(name=name, triggers=triggers),
+        source=f'{name}.md',
+        type=MicroagentType.KNOWLEDGE,
+    )
+
+
+def legacy_match(agents: list[KnowledgeMicroagent], message: str):
+    matches = []
+    for agent in agents:
+        trigger = agent.match_trigger(message)
+        if trigger:
+            matches.append((agent, trigger))
+    return matches
+
+
+def test_trigger_index_overlapping_triggers():
+    agents = [
+        make_agent('github', ['GitHub', 'gh']),
+        make_agent('git', ['git']),
+        make_agent('hub', ['hub']),
+        make_agent('python', ['pytest', 'python']),
+    ]
+    index = TriggerIndex(agents)
+
+    matches = index.match('Push it to GITHUB and run pytest')
+    assert [(agent.name, trigger) for agent, trigger in matches] == [
+        ('github', 'GitHub'),
+        ('git', 'git'),
+        ('hub', 'hub'),
+        ('python', 'pytest'),
+    ]
+    assert index.match('nothing to see') == []
+    # match_trigger returns an empty trigger, which doesn't count as a match
+    assert TriggerIndex([make_agent('empty', ['', 'github'])]).match('github') == []
+    assert TriggerIndex([]).match('github') == []
+
+
+def test_trigger_index_matches_legacy_behaviour():
+    rng = random.Random(42)
+    alphabet = 'abc .*'
+    agents = [
+        make_agent(
+            f'agent{i}',
+            [
+                ''.join(rng.choices(alphabet, k=rng.randint(1, 4)))
+                for _ in range(rng.randint(1, 3))
+            ],
+        )
+        for i in range(30)
+    ]
+    index = TriggerIndex(agents)
+    for _ in range(200):
+        message = ''.join(rng.choices(alphabet + 'ABC', k=rng.randint(0, 20)))
+        assert index.match(message) == legacy_match(agents, message)
@@ -0,0 +1,78 @@
+"""Unit tests for uploading directories with ActionExecutionClient.copy_to."""
+
+import zipfile
+
+import httpx
+import pytest
+
+from openhands.runtime.impl.action_execution.action_execution_client import (
+    ActionExecutionClient,
+)
+from openhands.runtime.utils.request import RequestHTTPError
+
+
+class StubClient(ActionExecutionClient):
+    @property
+    def action_execution_server_url(self) -> str:
+        return 'http://sandbox'
+
+
+# Only the upload methods are exercised
+StubClient.__abstractmethods__ = frozenset()
+
+
+class LegacyActionServer:
+    """Stub of an action server predating streamed archives and upload manifests.
+
+    Its /upload_file endpoint requires a multipart zip file, so any other request
+    is answered with a 422, as FastAPI does for a missing required field.
+    """
+
+    def __init__(self):
+        self.requests: list[dict] = []
+        self.received: dict[str, bytes] = {}
+
+    def __call__(self, method: str, url: str, **kwargs) -> httpx.Response:
+        self.requests.append({'url': url, **kwargs})
+        request = httpx.Request(method, url)
+        if not url.endswith('/upload_file') or 'files' not in kwargs:
+            response = httpx.Response(422, request=request)
+            raise RequestHTTPError(
+                'Unprocessable Entity', request=request, response=response
+            )
+        assert 'archive_format' not in kwargs['params']
+        filename, fileobj, _ = kwargs['files']['file']
+        assert filename.endswith('.zip')
+        with zipfile.ZipFile(fileobj) as zipf:
+            for name in zipf.namelist():
+                self.received[name] = zipf.read(name)
+        return httpx.Response(200, json={}, request=request)
+
+
+@pytest.fixture
+def host_dir(tmp_path):
+    src = tmp_path / 'src'
+    (src / 'sub').mkdir(parents=True)
+    (src / 'a.txt').write_text('a')
+    (src / 'sub' / 'b.txt').write_text('b')
+    return src
+
+
+def test_copy_dir_to_falls_back_to_zip_upload(host_dir):
+    """Test that a recursive copy_to works with a server without tar uploads."""
+    client = StubClient.__new__(StubClient)
+    server = LegacyActionServer()
+    client._send_action_server_request = server
+
+    client.copy_to(str(host_dir), '/workspace', recursive=True)
+
+    assert server.received == {'src/a.txt': b'a', 'src/sub/b.txt': b'b'}
+    streamed = [r for r in server.requests if 'content' in r]
+    assert len(streamed) == 1
+
+    # Later uploads go straight to the zip upload
+    server.received.clear()
+    client.copy_to(str(host_dir), '/workspace', recursive=True)
+
+    assert server.received == {'src/a.txt': b'a', 'src/sub/b.txt': b'b'}
+    assert len([r for r in server.requests if 'content' in r]) == 1
@@ -0,0 +1,129 @@
+import io
+import os
+import random
+import tarfile
+import zipfile
+
+import pytest
+from starlette.requests import Request
+
+from openhands.runtime.action_execution_server import _extract_request_body
+from openhands.runtime.utils.archive import (
+    ArchiveStream,
+    ChunkReader,
+    extract_archive,
+    file_sha256,
+    hash_matching_files,
+    iter_archive,
+    walk_files,
+)
+
+
+@pytest.fixture
+def src_dir(tmp_path):
+    src = tmp_path / 'src'
+    (src / 'nested' / 'deeper').mkdir(parents=True)
+    (src / 'empty.txt').write_bytes(b'')
+    (src / 'nested' / 'a.txt').write_text('hello\n')
+    (src / 'nested' / 'deeper' / 'big.bin').write_bytes(
+        random.Random(0).randbytes(700_000)
+    )
+    (src / 'run.sh').write_text('#!/bin/sh\n')
+    os.chmod(src / 'run.sh', 0o755)
+    return src
+
+
+def _read_tree(root) -> dict[str, bytes]:
+    return {arcname: open(path, 'rb').read() for path, arcname in walk_files(str(root))}
+
+
+def _reader(chunks) -> io.BufferedReader:
+    chunks = iter(chunks)
+    return io.BufferedReader(ChunkReader(lambda: next(chunks, None)))
+
+
+@pytest.mark.parametrize('archive_format', ['tar', 'tar.zst'])
+def test_tar_round_trip(src_dir, tmp_path, archive_format):
+    dest = tmp_path / 'dest'
+    files = list(walk_files(str(src_dir), str(tmp_path)))
+
+    extract_archive(
+        _reader(iter_archive(files, archive_format)), str(dest), archive_format
+    )
+
+    assert _read_tree(dest / 'src') == _read_tree(src_dir)
+    assert os.stat(dest / 'src' / 'run.sh').st_mode & 0o777 == 0o755
+
+
+def test_tar_is_readable_by_tarfile(src_dir):
+    data = b''.join(iter_archive(walk_files(str(src_dir)), 'tar'))
+
+    with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+        assert sorted(tar.getnames()) == sorted(_read_tree(src_dir))
+
+
+def test_zip_stream(src_dir):
+    data = b''.join(iter_archive(walk_files(str(src_dir)), 'zip'))
+
+    with zipfile.ZipFile(io.BytesIO(data)) as zipf:
+        assert {name: zipf.read(name) for name in zipf.namelist()} == _read_tree(
+            src_dir
+        )
+
+
+def test_archive_stream_can_be_iterated_again(src_dir):
+    stream = ArchiveStream(list(walk_files(str(src_dir))))
+
+    assert b''.join(stream) == b''.join(stream)
+
+
+def test_extract_refuses_members_outside_dest(tmp_path):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w') as tar:
+        info = tarfile.TarInfo('../escaped.txt')
+        tar.addfile(info, io.BytesIO())
+    dest = tmp_path / 'dest'
+
+    with pytest.raises(tarfile.OutsideDestinationError):
+        extract_archive(io.BytesIO(buffer.getvalue()), str(dest), 'tar')
+    assert not (tmp_path / 'escaped.txt').exists()
+
+
+def test_unsupported_archive_format(src_dir):
+    with pytest.raises(ValueError):
+        list(iter_archive(walk_files(str(src_dir)), 'rar'))
+    with pytest.raises(ValueError):
+        extract_archive(io.BytesIO(), str(src_dir), 'zip')
+
+
+def test_hash_matching_files(src_dir, tmp_path):
+    (tmp_path / 'outside.txt').write_text('')
+    hashes = hash_matching_files(
+        str(src_dir),
+        {
+            'nested/a.txt': 6,
+            'run.sh': 1,
+            'missing.txt': 0,
+            '../outside.txt': 0,
+        },
+    )
+
+    assert hashes == {'nested/a.txt': file_sha256(str(src_dir / 'nested' / 'a.txt'))}
+
+
+async def test_extract_request_body(src_dir, tmp_path):
+    chunks = list(iter_archive(walk_files(str(src_dir)), 'tar'))
+    messages = [
+        {'type': 'http.request', 'body': chunk, 'more_body': True} for chunk in chunks
+    ]
+    messages.append({'type': 'http.request', 'body': b'', 'more_body': False})
+
+    async def receive():
+        return messages.pop(0)
+
+    request = Request({'type': 'http', 'method': 'POST', 'headers': []}, receive)
+    dest = tmp_path / 'dest'
+
+    await _extract_request_body(request, str(dest), 'tar')
+
+    assert _read_tree(dest) == _read_tree(src_dir)
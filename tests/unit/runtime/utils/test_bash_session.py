@@ -0,0 +1,109 @@
+import os
+import shutil
+import time
+
+import pytest
+
+from openhands.events.action import CmdRunAction
+from openhands.runtime.utils.bash import BashSession
+
+requires_tmux = pytest.mark.skipif(
+    shutil.which('tmux') is None, reason='tmux is not installed'
+)
+
+
+@pytest.fixture
+def bash_session(tmp_path, monkeypatch):
+    # Use a tmux server of our own, even when the tests run inside tmux
+    monkeypatch.delenv('TMUX', raising=False)
+    session = BashSession(work_dir=str(tmp_path))
+    session.initialize()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def polling_bash_session(tmp_path, monkeypatch):
+    monkeypatch.delenv('TMUX', raising=False)
+    monkeypatch.setattr(BashSession, 'STREAM_OUTPUT', False)
+    session = BashSession(work_dir=str(tmp_path))
+    session.initialize()
+    yield session
+    session.close()
+
+
+@requires_tmux
+def test_streamed_commands_complete_without_polling(bash_session):
+    assert bash_session._output_stream is not None
+    bash_session.execute(CmdRunAction('echo warmup'))
+
+    start = time.time()
+    obs = bash_session.execute(CmdRunAction('echo hello'))
+
+    assert obs.content == 'hello'
+    assert obs.metadata.exit_code == 0
+    assert time.time() - start < BashSession.POLL_INTERVAL
+
+
+@requires_tmux
+def test_streamed_long_running_command(bash_session):
+    obs = bash_session.execute(
+        CmdRunAction(
+            'for i in 1 2 3; do echo $i; sleep 0.2; done; seq 1 5000 | tail -1'
+        )
+    )
+
+    assert obs.content == '1\n2\n3\n5000'
+    assert obs.metadata.exit_code == 0
+
+
+@requires_tmux
+def test_streamed_hard_timeout(bash_session):
+    action = CmdRunAction('sleep 5 && echo done')
+    action.set_hard_timeout(1)
+
+    obs = bash_session.execute(action)
+    assert 'timed out after 1' in obs.metadata.suffix
+
+    obs = bash_session.execute(CmdRunAction('C-c', is_input=True))
+    assert obs.metadata.exit_code == 130
+
+
+@requires_tmux
+def test_stream_file_is_removed_on_close(tmp_path, monkeypatch):
+    monkeypatch.delenv('TMUX', raising=False)
+    session = BashSession(work_dir=str(tmp_path))
+    session.initialize()
+    path = session._output_stream_path
+
+    session.close()
+
+    assert not os.path.exists(path)
+
+
+@requires_tmux
+def test_polling_without_stream(polling_bash_session):
+    assert polling_bash_session._output_stream is None
+
+    obs = polling_bash_session.execute(CmdRunAction('cd .. && echo $((1 + 2))'))
+
+    assert obs.content == '3'
+    assert obs.metadata.exit_code == 0
+
+
+def test_wait_for_output_finds_prompt_split_between_reads(tmp_path):
+    session = BashSession(work_dir=str(tmp_path))
+    session._output_stream_path = str(tmp_path / 'output')
+    with open(session._output_stream_path, 'wb') as writer:
+        session._output_stream = open(session._output_stream_path, 'rb')
+        session._output_tail = b''
+
+        assert session._wait_for_output(0.01) == (False, False)
+        writer.write(b'output\r\n###PS1')
+        writer.flush()
+        assert session._wait_for_output(0.01) == (True, False)
+        writer.write(b'END###\r\n')
+        writer.flush()
+        assert session._wait_for_output(0.01) == (True, True)
+
+    session._output_stream.close()
@@ -0,0 +1,95 @@
+import base64
+import random
+import tracemalloc
+
+import pytest
+
+from openhands.runtime.utils import files
+from openhands.runtime.utils.files import (
+    LineOffsetIndex,
+    encode_file_as_data_url,
+    get_line_offset_index,
+    read_file_lines,
+    read_lines,
+    read_lines_streaming,
+)
+
+
+@pytest.fixture
+def small_index(monkeypatch):
+    """Index every file, with a checkpoint every few bytes."""
+    monkeypatch.setattr(files, 'LINE_INDEX_MIN_FILE_SIZE', 0)
+    monkeypatch.setattr(files, 'LINE_INDEX_CHECKPOINT_BYTES', 7)
+    monkeypatch.setattr(files, '_line_index_cache', files.OrderedDict())
+
+
+def test_read_file_lines_matches_read_lines(tmp_path, small_index):
+    rng = random.Random(0)
+    path = tmp_path / 'file.txt'
+    pieces = ['a', 'bb', 'é', '\n', '\r\n', '\r', 'line\n']
+    for _ in range(300):
+        text = ''.join(rng.choices(pieces, k=rng.randint(0, 30)))
+        path.write_bytes(text.encode('utf-8'))
+        with open(path, encoding='utf-8') as file:
+            all_lines = file.readlines()
+        for _ in range(10):
+            start = rng.randint(-1, len(all_lines) + 2)
+            end = rng.choice([-1, rng.randint(-1, len(all_lines) + 2)])
+            expected = read_lines(all_lines, start, end)
+            with open(path, encoding='utf-8') as file:
+                assert read_lines_streaming(file, start, end) == expected
+            assert read_file_lines(str(path), start, end) == expected
+
+
+def test_line_offset_index_counts_text_mode_lines(tmp_path):
+    path = tmp_path / 'file.txt'
+    path.write_bytes(b'one\r\ntwo\rthree\nfour')
+
+    index = LineOffsetIndex.build(str(path))
+
+    assert index.num_lines == 4
+    assert index.checkpoint_for(10) == index.checkpoints[-1]
+
+
+def test_line_offset_index_is_rebuilt_when_file_changes(tmp_path, small_index):
+    path = tmp_path / 'file.txt'
+    path.write_text('one\ntwo\n')
+    index = get_line_offset_index(str(path))
+    assert get_line_offset_index(str(path)) is index
+
+    path.write_text('zero\none\ntwo\nthree\n')
+
+    assert get_line_offset_index(str(path)).num_lines == 4
+    assert read_file_lines(str(path), 1, 2) == ['one\n']
+
+
+def test_read_file_lines_memory_is_bounded_by_window(tmp_path, monkeypatch):
+    monkeypatch.setattr(files, 'LINE_INDEX_MIN_FILE_SIZE', 1024 * 1024)
+    monkeypatch.setattr(files, '_line_index_cache', files.OrderedDict())
+    path = tmp_path / 'big.log'
+    with open(path, 'w') as file:
+        for i in range(400_000):
+            file.write(f'log line {i} with some padding to make it longer\n')
+
+    tracemalloc.start()
+    try:
+        lines = read_file_lines(str(path), 300_000, 300_100)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert lines[0] == 'log line 300000 with some padding to make it longer\n'
+    assert len(lines) == 100
+    # The file is ~20MB, reading all of its lines would take far more
+    assert peak < 5 * 1024 * 1024
+
+
+def test_encode_file_as_data_url(tmp_path, monkeypatch):
+    monkeypatch.setattr(files, '_BASE64_CHUNK_SIZE', 3 * 5)
+    path = tmp_path / 'image.png'
+    data = random.Random(0).randbytes(100)
+    path.write_bytes(data)
+
+    encoded = encode_file_as_data_url(str(path), 'image/png')
+
+    assert encoded == f'data:image/png;base64,{base64.b64encode(data).decode()}'
@@ -3,13 +3,20 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import threading
+import time
 import unittest
 from pathlib import Path
 from unittest.mock import patch
 
 import pytest
 
-from openhands.runtime.utils import git_changes, git_diff, git_handler
+from openhands.runtime.utils import (
+    git_changes,
+    git_diff,
+    git_handler,
+    git_status_daemon,
+)
 from openhands.runtime.utils.git_handler import CommandResult, GitHandler
 
 
@@ -292,3 +299,94 @@ class TestGitHandler(unittest.TestCase):
                 'modified': 'unchanged.txt\nLine 1\nLine 2\nLine 3',
             }
             assert diff == expected_diff
+
+
+@pytest.mark.skipif(
+    sys.platform != 'linux', reason='The git status service needs inotify'
+)
+class TestGitHandlerWithGitStatusServer(TestGitHandler):
+    """The same tests, with the commands asking a git status service."""
+
+    def setUp(self):
+        super().setUp()
+        self.socket_path = os.path.join(self.test_dir, 'git-status.sock')
+        self.server = git_status_daemon.GitStatusServer(self.socket_path)
+        self.server_thread = threading.Thread(target=self.server.serve_forever)
+        self.server_thread.start()
+        while not os.path.exists(self.socket_path):
+            time.sleep(0.01)
+
+        script = f'OPENHANDS_GIT_STATUS_SOCKET="{self.socket_path}" python3 {git_status_daemon.__file__}'
+        self.git_handler.git_changes_cmd = f'{script} changes'
+        self.git_handler.git_diff_cmd = f'{script} diff "{{file_path}}"'
+
+    def tearDown(self):
+        self.server.close()
+        self.server_thread.join()
+        super().tearDown()
+
+    def test_changes_are_cached_until_the_work_tree_changes(self):
+        request = {'cmd': 'changes', 'cwd': self.local_dir}
+        with patch.object(
+            git_changes, 'get_git_changes', wraps=git_changes.get_git_changes
+        ) as get_git_changes:
+            changes = self.server.handle(request)
+            assert self.server.handle(request) == changes
+            assert get_git_changes.call_count == 1
+
+            self.write_file(self.local_dir, 'another_add.txt')
+            changes = self.server.handle(request)
+            assert {'status': 'A', 'path': 'another_add.txt'} in changes
+            assert get_git_changes.call_count == 2
+
+            # Committing changes HEAD, which is watched too
+            self.run_command('git add . && git commit -m "More"', self.local_dir)
+            self.run_command('git push -u origin feature-branch', self.local_dir)
+            assert self.server.handle(request) == []
+            assert get_git_changes.call_count == 3
+
+    def test_ignored_directories_are_not_watched(self):
+        self.write_file(self.local_dir, '.gitignore', ('build/',))
+        os.makedirs(os.path.join(self.local_dir, 'build'))
+        request = {'cmd': 'changes', 'cwd': self.local_dir}
+        with patch.object(
+            git_changes, 'get_git_changes', wraps=git_changes.get_git_changes
+        ) as get_git_changes:
+            changes = self.server.handle(request)
+            self.write_file(os.path.join(self.local_dir, 'build'), 'output.txt')
+
+            assert self.server.handle(request) == changes
+            assert get_git_changes.call_count == 1
+
+    def test_diffs_are_cached_until_the_work_tree_changes(self):
+        request = {
+            'cmd': 'diff',
+            'cwd': self.local_dir,
+            'path': 'unstaged_modified.txt',
+        }
+        with patch.object(
+            git_diff, 'get_git_diff', wraps=git_diff.get_git_diff
+        ) as get_git_diff:
+            diff = self.server.handle(request)
+            assert self.server.handle(request) == diff
+            assert get_git_diff.call_count == 1
+
+            self.write_file(self.local_dir, 'unstaged_modified.txt', ('Line 5',))
+            assert self.server.handle(request)['modified'] == (
+                'unstaged_modified.txt\nLine 5'
+            )
+            assert get_git_diff.call_count == 2
+
+    def test_client_answers_when_no_server_is_running(self):
+        self.server.close()
+        self.server_thread.join()
+        with (
+            patch.object(git_status_daemon, 'GIT_STATUS_SOCKET', self.socket_path),
+            patch.object(git_status_daemon, 'start_server') as start_server,
+        ):
+            response = git_status_daemon.request_or_handle(
+                {'cmd': 'changes', 'cwd': self.local_dir}
+            )
+
+        start_server.assert_called_once()
+        assert {'status': 'A', 'path': 'unstaged_add.txt'} in response['result']
@@ -0,0 +1,104 @@
+import asyncio
+import dataclasses
+from datetime import datetime, timezone
+
+import pytest
+
+from openhands.server.conversation_manager.conversation_metadata_writer import (
+    ConversationMetadataWriter,
+)
+from openhands.storage.data_models.conversation_metadata import ConversationMetadata
+
+
+class CountingConversationStore:
+    def __init__(self, metadata: ConversationMetadata):
+        self.metadata = metadata
+        self.num_reads = 0
+        self.num_writes = 0
+
+    async def get_metadata(self, conversation_id: str) -> ConversationMetadata:
+        self.num_reads += 1
+        return dataclasses.replace(self.metadata)
+
+    async def save_metadata(self, metadata: ConversationMetadata) -> None:
+        self.num_writes += 1
+        self.metadata = dataclasses.replace(metadata)
+
+
+@pytest.fixture
+def store():
+    return CountingConversationStore(
+        ConversationMetadata(
+            conversation_id='abc', selected_repository=None, title='Conversation abc'
+        )
+    )
+
+
+def set_cost(cost: float):
+    async def update(metadata: ConversationMetadata):
+        metadata.accumulated_cost = cost
+        metadata.last_updated_at = datetime.now(timezone.utc)
+
+    return update
+
+
+@pytest.mark.asyncio
+async def test_updates_are_coalesced(store):
+    lags = []
+    writer = ConversationMetadataWriter(flush_interval=0.05, on_flush=lags.append)
+
+    for i in range(50):
+        await writer.update(store, 'abc', set_cost(i))
+    assert store.num_writes == 0
+    await asyncio.sleep(0.1)
+
+    assert store.num_reads == 2
+    assert store.num_writes == 1
+    assert store.metadata.accumulated_cost == 49
+    assert len(lags) == 1
+    assert 0.05 <= lags[0] < 0.1
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_immediately(store):
+    writer = ConversationMetadataWriter(flush_interval=60)
+    await writer.update(store, 'abc', set_cost(1.5))
+
+    await writer.flush('abc')
+
+    assert store.num_writes == 1
+    assert store.metadata.accumulated_cost == 1.5
+    await writer.flush('abc')
+    assert store.num_writes == 1
+
+
+@pytest.mark.asyncio
+async def test_updates_without_changes_are_not_written(store):
+    writer = ConversationMetadataWriter(flush_interval=0.01)
+
+    async def no_change(metadata: ConversationMetadata):
+        pass
+
+    await writer.update(store, 'abc', no_change)
+    await writer.flush_all()
+
+    assert store.num_writes == 0
+
+
+@pytest.mark.asyncio
+async def test_changes_made_elsewhere_are_kept(store):
+    writer = ConversationMetadataWriter(flush_interval=60)
+
+    async def set_title(metadata: ConversationMetadata):
+        metadata.title = 'Generated title'
+        metadata.accumulated_cost = 2.0
+
+    await writer.update(store, 'abc', set_title)
+    # Renamed, and linked to a PR, by someone else before the write
+    store.metadata.title = 'Renamed'
+    store.metadata.pr_number = [7]
+    await writer.flush('abc')
+
+    assert store.metadata.title == 'Renamed'
+    assert store.metadata.pr_number == [7]
+    assert store.metadata.accumulated_cost == 2.0
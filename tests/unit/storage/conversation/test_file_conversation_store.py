@@ -1,4 +1,5 @@
 import json
+from unittest.mock import patch
 
 import pytest
 
@@ -200,3 +201,58 @@ async def test_get_all_metadata():
     assert results[0].title == 'First conversation'
     assert results[1].conversation_id == 'conv2'
     assert results[1].title == 'Second conversation'
+
+
+@pytest.mark.asyncio
+async def test_search_reads_metadata_in_bulk():
+    file_store = InMemoryFileStore(
+        {
+            get_conversation_metadata_filename(f'conv{i}'): json.dumps(
+                {
+                    'conversation_id': f'conv{i}',
+                    'selected_repository': 'repo1',
+                    'title': f'Conversation {i}',
+                    'created_at': f'2025-01-1{i}T19:51:04Z',
+                }
+            )
+            for i in range(3)
+        }
+    )
+    # Conversations without valid metadata are skipped
+    file_store.write(get_conversation_metadata_filename('invalid'), '{}')
+    store = FileConversationStore(file_store)
+
+    with patch.object(file_store, 'read_many', wraps=file_store.read_many) as read_many:
+        result = await store.search(limit=2)
+
+    read_many.assert_called_once()
+    assert [c.conversation_id for c in result.results] == ['conv2', 'conv1']
+    assert result.next_page_id is not None
+
+
+@pytest.mark.asyncio
+async def test_search_skips_unreadable_conversation():
+    class ThrottledFileStore(InMemoryFileStore):
+        def read(self, path: str) -> str:
+            if 'conv1' in path:
+                raise OSError('throttled')
+            return super().read(path)
+
+    file_store = ThrottledFileStore(
+        {
+            get_conversation_metadata_filename(f'conv{i}'): json.dumps(
+                {
+                    'conversation_id': f'conv{i}',
+                    'selected_repository': 'repo1',
+                    'title': f'Conversation {i}',
+                    'created_at': f'2025-01-1{i}T19:51:04Z',
+                }
+            )
+            for i in range(3)
+        }
+    )
+    store = FileConversationStore(file_store)
+
+    result = await store.search()
+
+    assert [c.conversation_id for c in result.results] == ['conv2', 'conv0']
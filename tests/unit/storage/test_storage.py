@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import shutil
 import tempfile
 from abc import ABC
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from io import BytesIO, StringIO
 from unittest import TestCase
@@ -106,6 +108,45 @@ class _StorageTest(ABC):
         # Verify everything is gone
         self.assertEqual(store.list(''), [])
 
+    def test_read_many(self):
+        store = self.get_store()
+        store.write('foo/a.txt', 'a')
+        store.write('foo/b.txt', 'b')
+        paths = ['foo/b.txt', 'foo/missing.txt', 'foo/a.txt']
+        self.assertEqual(store.read_many(paths), ['b', None, 'a'])
+        self.assertEqual(store.read_many([]), [])
+
+    def test_write_many(self):
+        store = self.get_store()
+        files = {f'foo/{i}.txt': f'contents {i}' for i in range(40)}
+        store.write_many(files)
+        self.assertEqual(sorted(store.list('foo')), sorted(files))
+        self.assertEqual(store.read_many(list(files)), list(files.values()))
+
+    def test_delete_prefix(self):
+        store = self.get_store()
+        store.write_many({f'foo/bar/{i}.txt': 'Hello, world!' for i in range(150)})
+        store.write('foo/other.txt', 'Hello, world!')
+        store.delete_prefix('foo/bar')
+        self.assertEqual(store.list('foo'), ['foo/other.txt'])
+
+    def test_async_fileops(self):
+        async def run(store: FileStore):
+            await store.awrite('foo/a.txt', 'a')
+            await store.awrite_many({'foo/b.txt': 'b'})
+            self.assertEqual(await store.aread('foo/a.txt'), 'a')
+            self.assertEqual(
+                sorted(await store.alist('foo')), ['foo/a.txt', 'foo/b.txt']
+            )
+            self.assertEqual(
+                await store.aread_many(['foo/a.txt', 'foo/b.txt']), ['a', 'b']
+            )
+            await store.adelete('foo/a.txt')
+            await store.adelete_prefix('foo')
+            self.assertEqual(store.list(''), [])
+
+        asyncio.run(run(self.get_store()))
+
 
 class TestLocalFileStore(TestCase, _StorageTest):
     def setUp(self):
@@ -139,6 +180,23 @@ class TestS3FileStore(TestCase, _StorageTest):
         with patch('boto3.client', lambda service, **kwargs: _MockS3Client()):
             self.store = S3FileStore('dear-liza')
 
+    def test_list_follows_continuation_tokens(self):
+        store = self.get_store()
+        keys = {f'foo/{i:05}.json' for i in range(2500)}
+        store.write_many({key: '{}' for key in keys})
+        store.client.requests.clear()
+        self.assertEqual(set(store.list('foo')), keys)
+        self.assertEqual(store.client.requests, ['ListObjectsV2'] * 3)
+
+    def test_delete_batches_keys(self):
+        store = self.get_store()
+        store.write_many({f'foo/{i:05}.json': '{}' for i in range(2500)})
+        store.write('other.json', '{}')
+        store.client.requests.clear()
+        store.delete('foo')
+        self.assertEqual(store.client.requests.count('DeleteObjects'), 3)
+        self.assertEqual(store.list(''), ['other.json'])
+
 
 # I would have liked to use cloud-storage-mocker here but the python versions were incompatible :(
 # If we write tests for the S3 storage class I would definitely recommend we use moto.
@@ -147,6 +205,11 @@ class _MockGoogleCloudClient:
         assert name == 'dear-liza'
         return _MockGoogleCloudBucket()
 
+    @contextmanager
+    def batch(self, raise_exception: bool = True):
+        # Requests are sent immediately rather than deferred
+        yield
+
 
 @dataclass
 class _MockGoogleCloudBucket:
@@ -205,6 +268,7 @@ class _MockGoogleCloudBlobWriter:
 class _MockS3Client:
     def __init__(self):
         self.objects_by_bucket: dict[str, dict[str, _MockS3Object]] = {}
+        self.requests: list[str] = []
 
     def put_object(self, Bucket: str, Key: str, Body: str | bytes) -> None:
         if Bucket not in self.objects_by_bucket:
@@ -237,7 +301,14 @@ class _MockS3Client:
             return {'Body': BytesIO(content)}
         return {'Body': StringIO(content)}
 
-    def list_objects_v2(self, Bucket: str, Prefix: str = '') -> dict:
+    def list_objects_v2(
+        self,
+        Bucket: str,
+        Prefix: str = '',
+        ContinuationToken: str | None = None,
+        MaxKeys: int = 1000,
+    ) -> dict:
+        self.requests.append('ListObjectsV2')
         if Bucket not in self.objects_by_bucket:
             raise botocore.exceptions.ClientError(
                 {
@@ -249,12 +320,26 @@ class _MockS3Client:
                 'ListObjectsV2',
             )
         objects = self.objects_by_bucket[Bucket]
-        contents = [
-            {'Key': key}
+        # Like S3, keys are listed in order, a page at a time
+        keys = sorted(
+            key
             for key in objects.keys()
-            if not Prefix or key.startswith(Prefix)
-        ]
-        return {'Contents': contents} if contents else {}
+            if (not Prefix or key.startswith(Prefix))
+            and (ContinuationToken is None or key > ContinuationToken)
+        )
+        contents = [{'Key': key} for key in keys[:MaxKeys]]
+        response: dict = {'Contents': contents} if contents else {}
+        if len(keys) > MaxKeys:
+            response['IsTruncated'] = True
+            response['NextContinuationToken'] = keys[MaxKeys - 1]
+        return response
+
+    def delete_objects(self, Bucket: str, Delete: dict) -> dict:
+        self.requests.append('DeleteObjects')
+        assert len(Delete['Objects']) <= 1000
+        for obj in Delete['Objects']:
+            self.objects_by_bucket.get(Bucket, {}).pop(obj['Key'], None)
+        return {}
 
     def delete_object(self, Bucket: str, Key: str) -> None:
         if Bucket not in self.objects_by_bucket:
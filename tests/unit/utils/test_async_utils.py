@@ -1,5 +1,8 @@
 import asyncio
 import concurrent.futures
+import threading
+import time
+from unittest.mock import patch
 
 import pytest
 
@@ -7,7 +10,9 @@ from openhands.utils.async_utils import (
     AsyncException,
     call_async_from_sync,
     call_sync_from_async,
+    get_bridge_stats,
     run_in_loop,
+    submit_coroutine,
     wait_all,
 )
 
@@ -339,3 +344,105 @@ def test_run_in_loop_sync_context():
     # Test the function in a synchronous context
     result = sync_function()
     assert result == 24
+
+
+def test_call_async_from_sync_reuses_bridge_loop():
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    first = call_async_from_sync(current_loop, 0)
+    second = call_async_from_sync(current_loop, 0)
+    assert first is second
+    assert first.is_running()
+
+
+def test_call_async_from_sync_nested_call():
+    async def inner():
+        return 'inner'
+
+    async def outer():
+        # Synchronous code in a coroutine calling back into the bridge
+        return call_async_from_sync(inner, 0)
+
+    assert call_async_from_sync(outer, 0) == 'inner'
+
+
+def test_call_async_from_sync_uses_fallback_when_loops_are_busy():
+    started = threading.Event()
+    release = threading.Event()
+
+    async def blocking():
+        started.set()
+        release.wait()
+
+    async def quick():
+        return 'done'
+
+    fallback_calls = get_bridge_stats()['fallback_calls']
+    with (
+        patch('openhands.utils.async_utils.BRIDGE_LOOPS', 0),
+        patch('openhands.utils.async_utils._bridge_loops', []),
+    ):
+        assert call_async_from_sync(quick, 0) == 'done'
+    assert get_bridge_stats()['fallback_calls'] == fallback_calls + 1
+
+    future = submit_coroutine(blocking)
+    started.wait(1)
+    try:
+        assert get_bridge_stats()['pending_calls'] >= 1
+        assert call_async_from_sync(quick, 0) == 'done'
+    finally:
+        release.set()
+    future.result(1)
+
+
+def test_submit_coroutine_cancel():
+    cancelled = threading.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    future = submit_coroutine(slow)
+    with pytest.raises(concurrent.futures.TimeoutError):
+        future.result(timeout=0.05)
+    assert future.cancel()
+    assert cancelled.wait(1)
+
+
+def test_cancelled_call_keeps_its_loop_until_it_returns():
+    started = threading.Event()
+    release = threading.Event()
+
+    async def blocking():
+        started.set()
+        release.wait()
+
+    async def current_thread():
+        return threading.current_thread()
+
+    with (
+        patch('openhands.utils.async_utils.BRIDGE_LOOPS', 1),
+        patch('openhands.utils.async_utils._bridge_loops', []),
+    ):
+        future = submit_coroutine(blocking)
+        assert started.wait(1)
+        future.cancel()
+        try:
+            # The loop is still blocked, so the next call must not wait on it
+            assert get_bridge_stats()['pending_calls'] == 1
+            thread = call_async_from_sync(current_thread, 0)
+            assert not thread.name.startswith('async-bridge')
+        finally:
+            release.set()
+
+        # Once the coroutine returns, its loop is used again
+        for _ in range(100):
+            if get_bridge_stats()['pending_calls'] == 0:
+                break
+            time.sleep(0.01)
+        thread = call_async_from_sync(current_thread, 0)
+        assert thread.name.startswith('async-bridge')
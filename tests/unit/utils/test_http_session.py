@@ -0,0 +1,39 @@
+import httpx
+
+from openhands.utils import http_session
+from openhands.utils.http_session import HttpSession, get_pool_stats
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    stats = get_pool_stats()
+    return httpx.Response(200, json={'in_flight': stats['requests_in_flight']})
+
+
+def test_pool_stats_track_requests(monkeypatch):
+    client = httpx.Client(transport=httpx.MockTransport(_handler))
+    monkeypatch.setattr(http_session, '_client', client)
+    before = get_pool_stats()['requests_total']
+
+    session = HttpSession()
+    response = session.get('http://sandbox/alive')
+    assert response.json() == {'in_flight': 1}
+    with session.stream('GET', 'http://sandbox/alive') as response:
+        response.read()
+        assert get_pool_stats()['requests_in_flight'] == 1
+
+    stats = get_pool_stats()
+    assert stats['requests_total'] == before + 2
+    assert stats['requests_in_flight'] == 0
+    # A mock transport has no connection pool
+    assert stats['connections'] == 0
+    assert stats['hosts'] == {}
+
+
+def test_client_uses_pool_limits(monkeypatch):
+    monkeypatch.setattr(http_session, 'HTTP2_ENABLED', False)
+    client = http_session._build_client(verify=True)
+    pool = client._transport._pool
+    assert pool._max_connections == http_session.HTTP_MAX_CONNECTIONS
+    assert pool._keepalive_expiry == http_session.HTTP_KEEPALIVE_EXPIRY
+    assert not pool._http2
+    client.close()